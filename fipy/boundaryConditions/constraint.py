@@ -36,8 +36,21 @@
 
 __docformat__ = 'restructuredtext'
 
+import numbers
+
+from fipy.tools import numerix
+from fipy.variables.variable import Variable
+
 __all__ = ["Constraint"]
 
+def _isImmutable(obj):
+    if isinstance(obj, (numbers.Number, str)):
+        return True
+    elif isinstance(obj, tuple):
+        return all(_isImmutable(item) for item in obj)
+    else:
+        return False
+
 class Constraint(object):
     def __init__(self, value, where=None):
         """Object to hold a `Variable` to `value` at `where`
@@ -47,5 +60,87 @@ class Constraint(object):
         self.value = value
         self.where = where
 
+    @staticmethod
+    def _versionOf(obj):
+        if isinstance(obj, Variable):
+            if obj.stale:
+                obj.value
+            return obj._version
+        elif obj is None or _isImmutable(obj):
+            return 0
+        else:
+            return None
+
+    def _getVersion(self):
+        """Key identifying the current `value` and `where` of `self`, or `None`
+        if either might change without notice (e.g., a bare array).
+
+            >>> from fipy.variables.variable import Variable
+            >>> mask = Variable(value=(True, False, False))
+            >>> c = Constraint(value=2., where=mask)
+            >>> v = c._getVersion()
+            >>> v == c._getVersion()
+            True
+            >>> mask[1] = True
+            >>> v == c._getVersion()
+            False
+            >>> print Constraint(value=2., where=numerix.array((True, False)))._getVersion()
+            None
+        """
+        valueVersion = self._versionOf(self.value)
+        whereVersion = self._versionOf(self.where)
+        if valueVersion is None or whereVersion is None:
+            return None
+        return (valueVersion, whereVersion)
+
+    def _getMask(self):
+        """`where` as something that can index the last axis of a value.
+
+        A one-dimensional mask is compiled into an array of indices. The
+        result is reused for as long as a `Variable` mask is unchanged.
+
+            >>> mask = Variable(value=(True, False, True))
+            >>> print Constraint(value=2., where=mask)._getMask()
+            [0 2]
+            >>> print Constraint(value=2., where=[1, 0, 1])._getMask()
+            [0 2]
+        """
+        where = self.where
+        version = self._versionOf(where) if isinstance(where, Variable) else None
+        if (version is not None
+            and getattr(self, "_maskFor", None) is where
+            and self._maskVersion == version):
+            return self._mask
+
+        mask = numerix.asarray(where)
+        if mask.dtype != bool:
+            mask = numerix.array(mask, dtype=numerix.NUMERIX.bool)
+        if mask.ndim == 1:
+            mask = numerix.nonzero(mask)[0]
+
+        if version is not None:
+            self._maskFor = where
+            self._maskVersion = version
+            self._mask = mask
+        return mask
+
+    def _apply(self, value):
+        """Impose `self` on `value` in place"""
+        if self.where is None:
+            value[:] = self.value
+        elif 0 not in value.shape:
+            mask = self._getMask()
+            try:
+                value[..., mask] = self.value
+            except:
+                value[..., mask] = numerix.array(self.value)[..., mask]
+
     def __repr__(self):
         return "Constraint(value=%s, where=%s)" % (repr(self.value), repr(self.where))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
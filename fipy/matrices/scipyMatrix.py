@@ -260,7 +260,7 @@ class _ScipyMatrix(_SparseMatrix):
         if type(vector) in [type(1), type(1.)]:
             vector = numerix.repeat(vector, self._shape[0])
 
-        ids = numerix.arange(len(vector))
+        ids = numerix.arange(len(vector), dtype=numerix._indexDtype(len(vector)))
         self.addAt(vector, ids, ids)
 
     @property
@@ -398,7 +398,7 @@ class _ScipyIdentityMatrix(_ScipyMatrixFromShape):
                 ---        ---     1.000000  
         """
         _ScipyMatrixFromShape.__init__(self, size=size, bandwidth = 1)
-        ids = numerix.arange(size)
+        ids = numerix.arange(size, dtype=numerix._indexDtype(size))
         self.put(numerix.ones(size, 'd'), ids, ids)
 
 class _ScipyIdentityMeshMatrix(_ScipyIdentityMatrix):
@@ -5,6 +5,11 @@ from fipy.meshes.periodicGrid3D import *
 from fipy.meshes.skewedGrid2D import *
 from fipy.meshes.tri2D import *
 from fipy.meshes.gmshMesh import *
+from fipy.meshes.ensembleMesh import *
+from fipy.meshes.interpolationOperator import *
+from fipy.meshes.partitioning import *
+from fipy.meshes.adaptiveGrid import *
+from fipy.meshes.concatenation import *
 
 __all__ = []
 __all__.extend(factoryMeshes.__all__)
@@ -14,3 +19,8 @@ __all__.extend(periodicGrid3D.__all__)
 __all__.extend(skewedGrid2D.__all__)
 __all__.extend(tri2D.__all__)
 __all__.extend(gmshMesh.__all__)
+__all__.extend(ensembleMesh.__all__)
+__all__.extend(interpolationOperator.__all__)
+__all__.extend(partitioning.__all__)
+__all__.extend(adaptiveGrid.__all__)
+__all__.extend(concatenation.__all__)
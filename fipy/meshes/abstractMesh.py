@@ -37,6 +37,8 @@ __docformat__ = 'restructuredtext'
 
 __all__ = ["AbstractMesh"]
 
+import weakref
+
 from fipy.tools import serialComm
 from fipy.tools import numerix
 from fipy.tools.decorators import deprecate
@@ -49,11 +51,53 @@ from fipy.meshes.topologies.abstractTopology import _AbstractTopology
 class MeshAdditionError(Exception):
     pass
 
+def _nbytes(value, seen=None):
+    """Bytes held by the arrays in `value`, counting each array once.
+
+    Only the value of a `Variable` counts, and nothing held by a mesh.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    from fipy.variables.variable import Variable
+    if isinstance(value, numerix.ndarray):
+        nbytes = value.nbytes
+        mask = MA.getmask(value)
+        if mask is not MA.nomask:
+            nbytes += mask.nbytes
+        return nbytes
+    elif isinstance(value, (tuple, list)):
+        return sum([_nbytes(v, seen) for v in value])
+    elif isinstance(value, (dict, weakref.WeakKeyDictionary, weakref.WeakValueDictionary)):
+        return sum([_nbytes(v, seen) for v in value.values()])
+    elif isinstance(value, Variable):
+        return _nbytes(value._value, seen)
+    elif isinstance(value, AbstractMesh) or not hasattr(value, "__dict__"):
+        return 0
+    else:
+        return _nbytes(value.__dict__, seen)
+
 class AbstractMesh(object):
     """
     A class encapsulating all commonalities among meshes in FiPy.
     """
 
+    # Whether connectivity is computed from strides on demand rather than
+    # stored; see `UniformGrid3D`
+    _implicitTopology = False
+
+    # Attributes that are built on first use, and so can be dropped, with
+    # the `kind` of `dropCaches` that drops them
+    _droppableCaches = {"_interiorFaceIDs": "topology",
+                        "_interiorFaceCellIDs": "topology",
+                        "_cellFaceCSR": "topology",
+                        "_cellCenterIndexCache": "interpolation",
+                        "_cellRadiusIndicesCache": "interpolation",
+                        "_remapOperatorCache": "interpolation"}
+
     def __init__(self, communicator, _RepresentationClass=_AbstractRepresentation, _TopologyClass=_AbstractTopology):
         self.communicator = communicator
         self.representation = _RepresentationClass(mesh=self)
@@ -92,6 +136,132 @@ class AbstractMesh(object):
     def getNearestCell(self, point):
         return self._getCellsByID([self._getNearestCellID(point)])[0]
 
+    @property
+    def _cellCenterIndex(self):
+        """Spatial index of the global cell centers, built on first use"""
+        if not hasattr(self, "_cellCenterIndexCache"):
+            from fipy.tools.spatialIndex import _SpatialIndex
+            self._cellCenterIndexCache = _SpatialIndex(self.cellCenters.globalValue)
+        return self._cellCenterIndexCache
+
+    @property
+    def _cellRadiusIndices(self):
+        """Spatial indices of the global cell centers, one for each class
+        of cells whose radii are within a factor of two, as a list of
+        `(cellIDs, index, radius)`, where `radius` is the largest in the
+        class; built on first use"""
+        if not hasattr(self, "_cellRadiusIndicesCache"):
+            from fipy.tools.spatialIndex import _SpatialIndex
+            centers = numerix.array(self.cellCenters.globalValue)
+            radii = numerix.array(self._cellRadii)
+            indices = []
+            if len(radii) > 0 and radii.max() > 0:
+                classes = numerix.floor(numerix.log2(numerix.maximum(radii / radii.max(), 2.**-60)))
+                for cls in numerix.unique(classes):
+                    IDs = numerix.nonzero(classes == cls)[0]
+                    indices.append((IDs, _SpatialIndex(centers[..., IDs]), radii[IDs].max()))
+            self._cellRadiusIndicesCache = indices
+        return self._cellRadiusIndicesCache
+
+    def _getCellIDsWithin(self, points, radius):
+        """Global IDs of the cells whose centers lie within `radius` of
+        each of `points`
+
+           >>> from fipy import Grid2D
+           >>> m = Grid2D(nx=3, ny=2)
+           >>> print [list(ids) for ids in m._getCellIDsWithin(((0.5, 2.), (0.5, 1.)), radius=0.8)]
+           [[0], [1, 2, 4, 5]]
+        """
+        return self._cellCenterIndex.within(points, radius)
+
+    @property
+    def _cellRadii(self):
+        """Distance from each cell center to its farthest vertex, or an
+        upper bound on it"""
+        faceVertexIDs = MA.filled(self.faceVertexIDs, -1)
+        faceRadii = numerix.zeros((self.numberOfFaces,), 'd')
+        for IDs in faceVertexIDs:
+            offsets = self.vertexCoords[..., IDs] - self._faceCenters
+            faceRadii = numerix.where(IDs >= 0,
+                                      numerix.maximum(faceRadii, numerix.sqrt(numerix.sum(offsets**2, axis=0))),
+                                      faceRadii)
+
+        cellFaceIDs = numerix.array(MA.filled(self.cellFaceIDs, 0))
+        offsets = self._faceCenters[..., cellFaceIDs] - self._scaledCellCenters[..., numerix.newaxis, :]
+        radii = numerix.sqrt(numerix.sum(offsets**2, axis=0)) + faceRadii[cellFaceIDs]
+        radii = numerix.where(MA.getmaskarray(self.cellFaceIDs), 0., radii)
+        return radii.max(axis=0)
+
+    def _cellsContainPoints(self, cellIDs, points, tolerance=0.):
+        """Whether each of `points` lies inside the corresponding cell of
+        `cellIDs`, on the inner side of all of its faces"""
+        faceIDs = numerix.array(MA.filled(self.cellFaceIDs, 0))[..., cellIDs]
+        orientations = numerix.array(MA.filled(self._cellToFaceOrientations, 0))[..., cellIDs]
+        normals = numerix.array(self.faceNormals)[..., faceIDs] * orientations
+        offsets = points[..., numerix.newaxis, :] - self._faceCenters[..., faceIDs]
+        return (numerix.sum(normals * offsets, axis=0) <= tolerance).all(axis=0)
+
+    def _locateCellIDs(self, points):
+        """IDs of the cells that contain each of `points`, or -1 for points
+        outside the mesh
+
+        Unlike :meth:`_getNearestCellID`, a point is assigned to the cell it
+        lies in, rather than to the closest cell center. Cells are assumed
+        convex. Points on a face shared by two cells may go to either.
+
+           >>> from fipy import Grid2D
+           >>> m = Grid2D(nx=3, ny=2)
+           >>> print m._locateCellIDs(((0.1, 2.9, 1.5, 4.), (0.1, 1.9, 0.5, 0.5)))
+           [ 0  5  1 -1]
+
+        On a nonuniform grid, the nearest center need not be that of the
+        containing cell
+
+           >>> m = Grid2D(dx=(.1, 1.), dy=1.)
+           >>> points = ((0.2, 2.), (0.5, 0.5))
+           >>> print m._getNearestCellID(points)
+           [0 1]
+           >>> print m._locateCellIDs(points)
+           [ 1 -1]
+        """
+        from fipy.tools.spatialIndex import _SpatialIndex
+        points = _SpatialIndex._asPoints(points)
+        M = points.shape[-1]
+        index = self._cellCenterIndex
+
+        cellIDs = numerix.array(index.nearest(points), dtype=int)
+        if self.numberOfCells == 0:
+            return -numerix.ones((M,), dtype=int)
+
+        radii = self._cellRadii
+        tolerance = 1e-10 * radii.max()
+        inside = self._cellsContainPoints(cellIDs, points, tolerance)
+
+        missed = numerix.nonzero(~inside)[0]
+        cellIDs[missed] = -1
+        if len(missed) > 0:
+            # any cell that holds the point has its center within its own
+            # radius of it; searching each class of cell sizes separately
+            # keeps the large cells of a graded mesh from drawing in all
+            # of the small ones
+            queries = [numerix.zeros((0,), dtype=int)]
+            candidates = [numerix.zeros((0,), dtype=int)]
+            for IDs, classIndex, reach in self._cellRadiusIndices:
+                found = classIndex.within(points[..., missed], reach * (1 + 1e-10))
+                counts = numerix.array([len(f) for f in found], dtype=int)
+                queries.append(numerix.repeat(missed, counts))
+                candidates.append(IDs[numerix.concatenate([numerix.array(f, dtype=int) for f in found]
+                                                          + [numerix.zeros((0,), dtype=int)])])
+            queries = numerix.concatenate(queries)
+            candidates = numerix.concatenate(candidates)
+            inside = self._cellsContainPoints(candidates, points[..., queries], tolerance)
+            queries, candidates = queries[inside], candidates[inside]
+            # lowest containing candidate wins
+            order = numerix.lexsort((-candidates, queries))
+            cellIDs[queries[order]] = candidates[order]
+
+        return cellIDs
+
     def _getCellFaceIDsInternal(self):
         return self._cellFaceIDs
 
@@ -317,195 +487,8 @@ class AbstractMesh(object):
           A `dict` with 3 elements: the new mesh vertexCoords, faceVertexIDs, and cellFaceIDs.
         """
 
-        selfc = self._concatenableMesh
-        otherc = other._concatenableMesh
-
-        selfNumFaces = selfc.faceVertexIDs.shape[-1]
-        selfNumVertices = selfc.vertexCoords.shape[-1]
-        otherNumFaces = otherc.faceVertexIDs.shape[-1]
-        otherNumVertices = otherc.vertexCoords.shape[-1]
-        ## check dimensions
-        if(selfc.vertexCoords.shape[0] != otherc.vertexCoords.shape[0]):
-            raise MeshAdditionError, "Dimensions do not match"
-
-        ## compute vertex correlates
-
-        """
-        from fipy.tools.debug import PRINT
-        PRINT("selfNumFaces", selfNumFaces)
-        PRINT("otherNumFaces", otherNumVertices)
-        PRINT("selfNumVertices", selfNumVertices)
-        PRINT("otherNumVertices", otherNumVertices)
-
-        from fipy.tools.debug import PRINT
-        from fipy.tools.debug import PRINT
-        PRINT("otherExt", otherc.exteriorFaces.value)
-        raw_input()
-        PRINT("selfExt", selfc.exteriorFaces.value)
-
-        PRINT("self filled", selfc.faceVertexIDs.filled())
-        PRINT("othe filled", otherc.faceVertexIDs.filled())
-        raw_input()
-
-        PRINT("selfc.faceVertexIDs.filled()\n",selfc.faceVertexIDs.filled())
-        PRINT("flat\n",selfc.faceVertexIDs.filled()[...,
-            selfc.exteriorFaces.value].flatten())
-        PRINT("selfc.exteriorFaces.value\n",selfc.exteriorFaces.value)
-        PRINT("extfaces type", type(selfc.exteriorFaces))
-        PRINT("extfaces mesh", selfc.exteriorFaces.mesh)
-        """
-
-        ## only try to match along the operation manifold
-        if hasattr(self, "opManifold"):
-            self_faces = self.opManifold(selfc)
-        else:
-            self_faces = selfc.exteriorFaces.value
-        if hasattr(other, "opManifold"):
-            other_faces = other.opManifold(otherc)
-        else:
-            other_faces = otherc.exteriorFaces.value
-
-        ## only try to match exterior (X) vertices
-        self_Xvertices = numerix.unique(selfc.faceVertexIDs.filled()[...,
-            self_faces].flatten())
-        other_Xvertices = numerix.unique(otherc.faceVertexIDs.filled()[...,
-            other_faces].flatten())
-
-        self_XvertexCoords = selfc.vertexCoords[..., self_Xvertices]
-        other_XvertexCoords = otherc.vertexCoords[..., other_Xvertices]
-
-        closest = numerix.nearest(self_XvertexCoords, other_XvertexCoords)
-
-        # just because they're closest, doesn't mean they're close
-        tmp = self_XvertexCoords[..., closest] - other_XvertexCoords
-        distance = numerix.sqrtDot(tmp, tmp)
-        # only want vertex pairs that are 100x closer than the smallest
-        # cell-to-cell distance
-        close = distance < resolution * min(selfc._cellToCellDistances.min(),
-                                            otherc._cellToCellDistances.min())
-        vertexCorrelates = numerix.array((self_Xvertices[closest[close]],
-                                          other_Xvertices[close]))
-
-        # warn if meshes don't touch, but allow it
-        if (selfc._numberOfVertices > 0
-            and otherc._numberOfVertices > 0
-            and vertexCorrelates.shape[-1] == 0):
-            import warnings
-            warnings.warn("Vertices are not aligned", UserWarning, stacklevel=4)
-
-        ## compute face correlates
-
-        # ensure that both sets of faceVertexIDs have the same maximum number of (masked) elements
-        self_faceVertexIDs = selfc.faceVertexIDs
-        other_faceVertexIDs = otherc.faceVertexIDs
-
-        diff = self_faceVertexIDs.shape[0] - other_faceVertexIDs.shape[0]
-        if diff > 0:
-            other_faceVertexIDs = numerix.append(other_faceVertexIDs,
-                                                 -1 * numerix.ones((diff,)
-                                                                   + other_faceVertexIDs.shape[1:], 'l'),
-                                                 axis=0)
-            other_faceVertexIDs = MA.masked_values(other_faceVertexIDs, -1)
-        elif diff < 0:
-            self_faceVertexIDs = numerix.append(self_faceVertexIDs,
-                                                -1 * numerix.ones((-diff,)
-                                                                  + self_faceVertexIDs.shape[1:], 'l'),
-                                                axis=0)
-            self_faceVertexIDs = MA.masked_values(self_faceVertexIDs, -1)
-
-        # want self's Faces for which all faceVertexIDs are in vertexCorrelates
-        self_matchingFaces = numerix.in1d(self_faceVertexIDs,
-                                          vertexCorrelates[0]).reshape(self_faceVertexIDs.shape).all(axis=0).nonzero()[0]
-
-        # want other's Faces for which all faceVertexIDs are in vertexCorrelates
-        other_matchingFaces = numerix.in1d(other_faceVertexIDs,
-                                           vertexCorrelates[1]).reshape(other_faceVertexIDs.shape).all(axis=0).nonzero()[0]
-
-        # map other's Vertex IDs to new Vertex IDs,
-        # accounting for overlaps with self's Vertex IDs
-        vertex_map = numerix.empty(otherNumVertices, dtype=numerix.INT_DTYPE)
-        verticesToAdd = numerix.delete(numerix.arange(otherNumVertices), vertexCorrelates[1])
-        vertex_map[verticesToAdd] = numerix.arange(otherNumVertices - len(vertexCorrelates[1])) + selfNumVertices
-        vertex_map[vertexCorrelates[1]] = vertexCorrelates[0]
-
-        # calculate hashes of faceVertexIDs for comparing Faces
-
-        if self_matchingFaces.shape[-1] == 0:
-            self_faceHash = numerix.empty(self_matchingFaces.shape[:-1] + (0,), dtype="str")
-        else:
-            # sort each of self's Face's vertexIDs for canonical comparison
-            self_faceHash = numerix.sort(self_faceVertexIDs[..., self_matchingFaces], axis=0)
-            # then hash the Faces for comparison (NumPy set operations are only for 1D arrays)
-            self_faceHash = numerix.apply_along_axis(str, axis=0, arr=self_faceHash)
-
-        face_sort = numerix.argsort(self_faceHash)
-        self_faceHash = self_faceHash[face_sort]
-        self_matchingFaces = self_matchingFaces[face_sort]
-
-        if other_matchingFaces.shape[-1] == 0:
-            other_faceHash = numerix.empty(other_matchingFaces.shape[:-1] + (0,), dtype="str")
-        else:
-            # convert each of other's Face's vertexIDs to new IDs
-            other_faceHash = vertex_map[other_faceVertexIDs[..., other_matchingFaces]]
-            # sort each of other's Face's vertexIDs for canonical comparison
-            other_faceHash = numerix.sort(other_faceHash, axis=0)
-            # then hash the Faces for comparison (NumPy set operations are only for 1D arrays)
-            other_faceHash = numerix.apply_along_axis(str, axis=0, arr=other_faceHash)
-
-        face_sort = numerix.argsort(other_faceHash)
-        other_faceHash = other_faceHash[face_sort]
-        other_matchingFaces = other_matchingFaces[face_sort]
-
-        self_matchingFaces = self_matchingFaces[numerix.in1d(self_faceHash,
-                                                             other_faceHash)]
-        other_matchingFaces = other_matchingFaces[numerix.in1d(other_faceHash,
-                                                               self_faceHash)]
-
-        faceCorrelates = numerix.array((self_matchingFaces,
-                                        other_matchingFaces))
-
-        # warn if meshes don't touch, but allow it
-        if (selfc.numberOfFaces > 0
-            and otherc.numberOfFaces > 0
-            and faceCorrelates.shape[-1] == 0):
-            import warnings
-            warnings.warn("Faces are not aligned", UserWarning, stacklevel=4)
-
-        # map other's Face IDs to new Face IDs,
-        # accounting for overlaps with self's Face IDs
-        face_map = numerix.empty(otherNumFaces, dtype=numerix.INT_DTYPE)
-        facesToAdd = numerix.delete(numerix.arange(otherNumFaces), faceCorrelates[1])
-        face_map[facesToAdd] = numerix.arange(otherNumFaces - len(faceCorrelates[1])) + selfNumFaces
-        face_map[faceCorrelates[1]] = faceCorrelates[0]
-
-        other_faceVertexIDs = vertex_map[otherc.faceVertexIDs[..., facesToAdd]]
-
-        # ensure that both sets of cellFaceIDs have the same maximum number of (masked) elements
-        self_cellFaceIDs = selfc.cellFaceIDs
-        other_cellFaceIDs = face_map[otherc.cellFaceIDs]
-        diff = self_cellFaceIDs.shape[0] - other_cellFaceIDs.shape[0]
-        if diff > 0:
-            other_cellFaceIDs = numerix.append(other_cellFaceIDs,
-                                               -1 * numerix.ones((diff,)
-                                                                 + other_cellFaceIDs.shape[1:], 'l'),
-                                               axis=0)
-            other_cellFaceIDs = MA.masked_values(other_cellFaceIDs, -1)
-        elif diff < 0:
-            self_cellFaceIDs = numerix.append(self_cellFaceIDs,
-                                              -1 * numerix.ones((-diff,)
-                                                                + self_cellFaceIDs.shape[1:], 'l'),
-                                              axis=0)
-            self_cellFaceIDs = MA.masked_values(self_cellFaceIDs, -1)
-
-        # concatenate everything and return
-        return {
-            'vertexCoords': numerix.concatenate((selfc.vertexCoords,
-                                                 otherc.vertexCoords[..., verticesToAdd]), axis=1),
-            'faceVertexIDs': numerix.concatenate((self_faceVertexIDs,
-                                                  other_faceVertexIDs), axis=1),
-            'cellFaceIDs': MA.concatenate((self_cellFaceIDs,
-                                           other_cellFaceIDs), axis=1)
-            }
+        from fipy.meshes.concatenation import _concatenatedMeshValues
+        return _concatenatedMeshValues((self, other), resolution=resolution, stacklevel=4)
 
     """
     Topology -- maybe should be elsewhere?
@@ -517,6 +500,25 @@ class AbstractMesh(object):
             self._interiorFaceIDs = numerix.nonzero(self.interiorFaces)[0]
         return self._interiorFaceIDs
 
+    def _interiorFaceChunks(self):
+        """The interior faces and the cells on either side of them, as a
+        sequence of `(faceIDs, id1, id2)`, so that terms can be assembled
+        without holding them all at once
+
+        Meshes that keep their topology give them in one piece
+
+           >>> from fipy import Grid2D
+           >>> m = Grid2D(nx=3, ny=2)
+           >>> for faceIDs, id1, id2 in m._interiorFaceChunks():
+           ...     print faceIDs, id1, id2
+           [ 3  4  5 10 11 14 15] [0 1 2 0 1 3 4] [3 4 5 1 2 4 5]
+        """
+        interiorFaces = numerix.nonzero(self.interiorFaces)[0]
+        id1, id2 = self._adjacentCellIDs
+        return [(interiorFaces,
+                 numerix.take(id1, interiorFaces),
+                 numerix.take(id2, interiorFaces))]
+
     @property
     def interiorFaceCellIDs(self):
         if not hasattr(self, '_interiorFaceCellIDs'):
@@ -539,6 +541,148 @@ class AbstractMesh(object):
     def _maxFacesPerCell(self):
         raise NotImplementedError
 
+    def _arrays(self):
+        """Name, value and `dropCaches` kind, or `None`, of everything the
+        mesh holds"""
+        for name, value in self.__dict__.items():
+            yield name, value, self._droppableCaches.get(name)
+
+    def _dropCache(self, name):
+        self.__dict__.pop(name, None)
+
+    def memoryReport(self):
+        """
+        The topology and geometry arrays held by the mesh, largest first,
+        as a list of (name, bytes, kind) tuples. Arrays of a `kind` other
+        than `None` are rebuilt on demand and can be released with
+        `dropCaches`.
+
+            >>> from fipy import Grid2D
+            >>> from fipy.meshes.mesh2D import Mesh2D
+            >>> grid = Grid2D(nx=3, ny=2)
+            >>> mesh = Mesh2D(grid.vertexCoords, grid.faceVertexIDs, grid.cellFaceIDs)
+            >>> report = mesh.memoryReport()
+            >>> print report[0]
+            ('_cellToFaceDistanceVectors', 612, None)
+            >>> print [kind for name, nbytes, kind in report if kind is not None]
+            []
+
+        Arrays built on first use show up once they are used
+
+            >>> IDs, tangents = mesh.interiorFaceIDs, mesh._faceTangents1
+            >>> print [(name, kind) for name, nbytes, kind in mesh.memoryReport()
+            ...        if kind is not None]
+            [('_faceTangentsCache', 'geometry'), ('_interiorFaceIDs', 'topology')]
+
+        The geometry of a uniform grid is built on first use, too
+
+            >>> centers = grid._cellCenters
+            >>> print [entry for entry in grid.memoryReport() if entry[2] == "geometry"]
+            [('vertexCoords', 192, 'geometry'), ('_cellCenters', 96, 'geometry')]
+        """
+        from fipy.variables.variable import Variable
+        report = [(name, _nbytes(value), kind) for name, value, kind in self._arrays()
+                  if kind is not None or isinstance(value, (numerix.ndarray, tuple, Variable))]
+        return sorted([(name, nbytes, kind) for name, nbytes, kind in report if nbytes > 0],
+                      key=lambda entry: (-entry[1], entry[0]))
+
+    def dropCaches(self, kind=None):
+        """
+        Release the arrays that the mesh rebuilds on demand, so that a long
+        calculation holds only what it still uses.
+
+        :Parameters:
+          - `kind`: ``"topology"`` for connectivity, such as the vertices
+            of each cell; ``"geometry"`` for geometry, such as the face
+            tangents; ``"interpolation"`` for the spatial index and the
+            operators that interpolate to other meshes; or `None` for all
+            of them.
+
+            >>> from fipy import Grid2D
+            >>> mesh = Grid2D(nx=3, ny=2)
+            >>> IDs, centers = mesh._cellVertexIDs, mesh._cellCenters
+            >>> cells = mesh._getCellIDsWithin(((0.5,), (0.5,)), radius=1.)
+            >>> def kinds():
+            ...     return sorted(set([kind for name, nbytes, kind in mesh.memoryReport()
+            ...                        if kind is not None]))
+            >>> print kinds()
+            ['geometry', 'interpolation', 'topology']
+            >>> mesh.dropCaches(kind="topology")
+            >>> print kinds()
+            ['geometry', 'interpolation']
+            >>> mesh.dropCaches()
+            >>> print kinds()
+            []
+
+        Dropped arrays come back when they are next needed
+
+            >>> print numerix.allequal(mesh._cellVertexIDs, IDs)
+            True
+            >>> mesh.dropCaches(kind="connectivity")
+            Traceback (most recent call last):
+                ...
+            ValueError: unknown kind of cache 'connectivity'; expected 'topology', 'geometry' or 'interpolation'
+        """
+        if kind not in (None, "topology", "geometry", "interpolation"):
+            raise ValueError, \
+              "unknown kind of cache '%s'; expected 'topology', 'geometry' or 'interpolation'" % kind
+        for name, value, cacheKind in list(self._arrays()):
+            if cacheKind is not None and kind in (None, cacheKind):
+                self._dropCache(name)
+
+    @property
+    def _cellFaceConnectivity(self):
+        """The faces of each cell in compressed row form, as a
+        `_CellFaceConnectivity`
+
+        It is kept, unless the mesh has `_implicitTopology`, in which case it
+        is rebuilt, like the topology it comes from, on every access
+        """
+        if hasattr(self, '_cellFaceCSR'):
+            return self._cellFaceCSR
+
+        from fipy.meshes.cellFaceConnectivity import _CellFaceConnectivity
+        connectivity = _CellFaceConnectivity(self.cellFaceIDs,
+                                             self._cellToFaceOrientations,
+                                             self._cellToCellIDs)
+        if not self._implicitTopology:
+            self._cellFaceCSR = connectivity
+        return connectivity
+
+    @property
+    def _indexDtype(self):
+        """Integer type of the connectivity arrays, `int32` unless the
+        cells, the cell faces or the vertices of the global mesh are too
+        many to number with it
+
+           >>> from fipy import Grid2D
+           >>> m = Grid2D(nx=3, ny=2)
+           >>> print m._indexDtype is numerix._indexDtype(m.numberOfFaces)
+           True
+
+        Both uniform and unstructured meshes number their connectivity
+        with it
+
+           >>> from fipy.meshes.mesh2D import Mesh2D
+           >>> u = Mesh2D(m.vertexCoords, m.faceVertexIDs, m.cellFaceIDs)
+           >>> for mesh in (m, u):
+           ...     print [a.dtype == m._indexDtype
+           ...            for a in (mesh.faceCellIDs, mesh.cellFaceIDs, mesh._cellToCellIDs,
+           ...                      mesh._adjacentCellIDs[1], mesh._cellFaceConnectivity.cellIDs)]
+           [True, True, True, True, True]
+           [True, True, True, True, True]
+
+        unless `--int64-indices` keeps them at the platform integer size
+
+           >>> saved, numerix._int64Indices = numerix._int64Indices, True
+           >>> print Grid2D(nx=3, ny=2).faceCellIDs.dtype == numerix.INT_DTYPE
+           True
+           >>> numerix._int64Indices = saved
+        """
+        return numerix._indexDtype(max(self.globalNumberOfCells,
+                                       2 * self.globalNumberOfFaces,
+                                       self._numberOfVertices))
+
     @property
     def _numberOfVertices(self):
         if hasattr(self, 'numberOfVertices'):
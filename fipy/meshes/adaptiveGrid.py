@@ -0,0 +1,617 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "adaptiveGrid.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Structured grids that refine and coarsen locally.
+
+An adaptive grid starts from a uniform grid of `nx` by `ny` (by `nz`)
+cells. Any cell can be split into 4 (or 8) children of half its size, up
+to `maxLevel` times, and groups of children can be merged back into their
+parent. The cells of the grid are the leaves of this forest of quadtrees
+(or octrees). Neighboring leaves differ by at most one level, so a large
+cell meets at most 2 (or 4) small cells across each of its sides. Each
+small cell shares its own face with the large cell, so the large cell
+simply has more faces and the terms assemble on these non-conforming
+faces as they do on any other :class:`~fipy.meshes.mesh.Mesh`.
+
+:meth:`~_AdaptiveGrid.adapt` returns a new grid, refined where an
+indicator is large and coarsened where it is small.
+:meth:`~_AdaptiveGrid.transfer` carries a `CellVariable` over to the new
+grid, preserving its integral.
+
+>>> from fipy import CellVariable, numerix
+>>> mesh = AdaptiveGrid2D(nx=16, ny=16, dx=1. / 16, dy=1. / 16, maxLevel=4)
+
+Resolve a thin interface around a circle, as a phase field might
+
+>>> def phaseOn(mesh):
+...     x, y = mesh.cellCenters
+...     r = numerix.sqrt((x - 0.5)**2 + (y - 0.5)**2)
+...     return CellVariable(mesh=mesh, value=0.5 * (1 + numerix.tanh((0.3 - r) / 0.005)))
+>>> for i in range(4):
+...     phase = phaseOn(mesh)
+...     mesh = mesh.adapt(phase.grad.mag, refineAbove=5., coarsenBelow=1.)
+>>> print numerix.bincount(mesh.levels)
+[ 168  168  328  816 3264]
+
+with far fewer cells than a uniform grid of the finest cells
+
+>>> print (256 * 256) / mesh.numberOfCells
+13
+
+The cells tile the domain
+
+>>> print numerix.allclose(mesh.cellVolumes.sum(), 1.)
+True
+>>> print numerix.allclose(mesh.cellVolumes, 0.25**(4 + mesh.levels))
+True
+
+Refinement and coarsening preserve the integral of a transferred
+variable
+
+>>> x, y = mesh.cellCenters
+>>> var = CellVariable(mesh=mesh, value=x * y**2, hasOld=True)
+>>> coarser = mesh.adapt(var, refineAbove=2., coarsenBelow=0.2)
+>>> print coarser.numberOfCells < mesh.numberOfCells
+True
+>>> moved = coarser.transfer(var)
+>>> print numerix.allclose((moved.value * coarser.cellVolumes).sum(),
+...                        (var.value * mesh.cellVolumes).sum())
+True
+>>> print numerix.allclose(moved.old, moved)
+True
+>>> back = mesh.transfer(moved)
+>>> print numerix.allclose((back.value * mesh.cellVolumes).sum(),
+...                        (var.value * mesh.cellVolumes).sum())
+True
+
+Terms assemble across the faces between cells of different size, and
+diffusion with no flux through the boundary conserves the solution
+
+>>> from fipy import TransientTerm, DiffusionTerm
+>>> phase = phaseOn(mesh)
+>>> total = (phase.value * mesh.cellVolumes).sum()
+>>> (TransientTerm() == DiffusionTerm()).solve(var=phase, dt=1e-4)
+>>> print numerix.allclose(phase, phaseOn(mesh))
+False
+>>> print numerix.allclose((phase.value * mesh.cellVolumes).sum(), total)
+True
+
+The flux across a face between cells of different size is found from the
+two cell values, as on any non-orthogonal mesh, so it is only first-order
+accurate there. Keep the features of the solution within the finest
+cells.
+"""
+__docformat__ = 'restructuredtext'
+
+from weakref import WeakKeyDictionary
+
+from fipy.tools import numerix
+
+from fipy.meshes.mesh import Mesh
+from fipy.meshes.mesh2D import Mesh2D
+from fipy.meshes.representations.gridRepresentation import _Grid2DRepresentation
+from fipy.meshes.representations.gridRepresentation import _Grid3DRepresentation
+from fipy.meshes.topologies.meshTopology import _MeshTopology
+from fipy.meshes.topologies.meshTopology import _Mesh2DTopology
+
+__all__ = ["AdaptiveGrid2D", "AdaptiveGrid3D"]
+
+def _keys(ns, levels, indices):
+    """Unique number of each cell of the tree at `levels` and `indices`,
+    counting the cells of the coarser levels first"""
+    D = len(ns)
+    levels = numerix.array(levels, dtype='int64')
+    indices = numerix.array(indices, dtype='int64')
+    N0 = int(numerix.prod(ns))
+    keys = N0 * ((2**(D * levels) - 1) // (2**D - 1))
+    stride = numerix.ones(levels.shape, dtype='int64')
+    for d in range(D):
+        keys = keys + indices[d] * stride
+        stride = stride * (ns[d] * 2**levels)
+    return keys
+
+def _children(levels, indices):
+    """Levels and indices of the children of the cells at `levels` and
+    `indices`, all the children of the first cell first"""
+    D, N = indices.shape
+    bits = numerix.array(numerix.indices((2,) * D), dtype='int64').reshape((D, -1))[::-1]
+    children = (2 * indices[..., numerix.newaxis] + bits[:, numerix.newaxis, :]).reshape((D, -1))
+    return numerix.repeat(levels + 1, 2**D), children
+
+class _Tree(object):
+    """Leaves of a forest of trees over a grid of `ns` cells"""
+    def __init__(self, ns, levels, indices):
+        self.ns = tuple(ns)
+        self.levels = numerix.array(levels, dtype='int64')
+        self.indices = numerix.array(indices, dtype='int64').reshape((len(ns), -1))
+        keys = _keys(self.ns, self.levels, self.indices)
+        self.order = numerix.argsort(keys, kind='mergesort')
+        self.keys = keys[self.order]
+
+    def find(self, levels, indices):
+        """IDs of the leaves at `levels` and `indices`, or -1"""
+        keys = _keys(self.ns, levels, indices)
+        if len(self.keys) == 0:
+            return -numerix.ones(keys.shape, dtype='int64')
+        positions = numerix.minimum(numerix.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return numerix.where(self.keys[positions] == keys, self.order[positions], -1)
+
+    def containing(self, levels, indices):
+        """IDs of the leaves that hold the cells at `levels` and `indices`,
+        or -1 where the cells are divided into smaller leaves"""
+        levels = numerix.array(levels, dtype='int64')
+        indices = numerix.array(indices, dtype='int64')
+        leaves = -numerix.ones(levels.shape, dtype='int64')
+        up = 0
+        while True:
+            todo = numerix.nonzero((leaves < 0) & (levels >= up))[0]
+            if len(todo) == 0:
+                return leaves
+            leaves[todo] = self.find(levels[todo] - up, indices[..., todo] // 2**up)
+            up += 1
+
+    def neighbors(self, axis, side):
+        """Leaves that hold the cell the size of each leaf on its `side`
+        (0 or 1) along `axis`, or -1 where the cell is divided into smaller
+        leaves, and whether that cell lies outside the grid"""
+        indices = self.indices.copy()
+        indices[axis] += 2 * side - 1
+        outside = (indices[axis] < 0) | (indices[axis] >= self.ns[axis] * 2**self.levels)
+        indices[axis] = numerix.where(outside, self.indices[axis], indices[axis])
+        return numerix.where(outside, -1, self.containing(self.levels, indices)), outside
+
+    def unbalanced(self):
+        """Leaves more than one level coarser than a neighbor"""
+        coarse = []
+        for axis in range(len(self.ns)):
+            for side in (0, 1):
+                neighbors, outside = self.neighbors(axis, side)
+                found = neighbors >= 0
+                tooCoarse = found.copy()
+                tooCoarse[found] = self.levels[neighbors[found]] < self.levels[found] - 1
+                coarse.append(neighbors[tooCoarse])
+        return numerix.unique(numerix.concatenate(coarse))
+
+def _balanced(ns, levels, indices):
+    """Split leaves until no neighbors differ by more than one level"""
+    while True:
+        coarse = _Tree(ns, levels, indices).unbalanced()
+        if len(coarse) == 0:
+            return levels, indices
+        keep = numerix.ones(levels.shape, dtype=bool)
+        keep[coarse] = False
+        childLevels, childIndices = _children(levels[coarse], indices[..., coarse])
+        levels = numerix.concatenate((levels[keep], childLevels))
+        indices = numerix.concatenate((indices[..., keep], childIndices), axis=1)
+
+class _AdaptiveGrid(object):
+    """Machinery shared by `AdaptiveGrid2D` and `AdaptiveGrid3D`. The
+    `args` of the grid, its base `ns` and spacings `ds` must be set before
+    calling `_buildArrays`.
+    """
+    _axisNames = ("x", "y", "z")
+
+    _droppableCaches = dict(Mesh._droppableCaches,
+                            _transferOperatorCache="interpolation")
+
+    def _buildArrays(self, levels, indices):
+        """Set the leaves of the tree and calculate the `vertexCoords`,
+        `faceVertexIDs` and `cellFaceIDs` of the grid"""
+        D = len(self.ns)
+        if levels is None:
+            levels = numerix.zeros((int(numerix.prod(self.ns)),), dtype='int64')
+            indices = numerix.array(numerix.indices(self.ns[::-1]),
+                                    dtype='int64').reshape((D, -1))[::-1]
+        levels = numerix.array(levels, dtype='int64')
+        indices = numerix.array(indices, dtype='int64').reshape((D, -1))
+        if len(levels) > 0 and levels.max() > self.maxLevel:
+            raise ValueError, "cells are refined beyond maxLevel=%d" % self.maxLevel
+
+        # number the cells in rows, like a `Grid`
+        corners = indices * 2**(self.maxLevel - levels)
+        order = numerix.lexsort(corners)
+        self.levels = levels[order]
+        self.indices = indices[..., order]
+        self.args['levels'] = self.levels
+        self.args['indices'] = self.indices
+        self._tree = _Tree(self.ns, self.levels, self.indices)
+
+        N = len(self.levels)
+        top = self.levels.max() if N > 0 else 0
+        sizes = 2**(top - self.levels)
+        if D == 2:
+            offsets = ((0,), (1,))
+        else:
+            offsets = ((0, 0), (1, 0), (1, 1), (0, 1))
+
+        # each face belongs to the smaller of its cells, or to the lower
+        # one if they are the same size
+        cells = []
+        neighbors = []
+        corners = []
+        for axis in range(D):
+            others = [(axis + k) % D for k in range(1, D)]
+            for side in (0, 1):
+                neighbor, outside = self._tree.neighbors(axis, side)
+                found = neighbor >= 0
+                coarser = found.copy()
+                coarser[found] = self.levels[neighbor[found]] < self.levels[found]
+                owned = numerix.nonzero(outside | coarser | (found & (side == 1)))[0]
+
+                lower = self.indices[..., owned] * sizes[owned]
+                size = sizes[owned]
+                vertices = numerix.zeros((D, len(offsets), len(owned)), dtype='int64')
+                vertices[axis] = lower[axis] + side * size
+                for v, offset in enumerate(offsets):
+                    for o, other in zip(offset, others):
+                        vertices[other, v] = lower[other] + o * size
+
+                cells.append(owned)
+                neighbors.append(neighbor[owned])
+                corners.append(vertices)
+
+        cells = numerix.concatenate(cells)
+        neighbors = numerix.concatenate(neighbors)
+        corners = numerix.concatenate(corners, axis=2)
+        F = len(cells)
+
+        # number the vertices of the lattice of the finest cells
+        latticeShape = [n * 2**top + 1 for n in self.ns]
+        vertexKeys = numerix.zeros(corners.shape[1:], dtype='int64')
+        for d in reversed(range(D)):
+            vertexKeys = vertexKeys * latticeShape[d] + corners[d]
+        vertexKeys, faceVertexIDs = numerix.unique(vertexKeys.ravel(), return_inverse=True)
+        faceVertexIDs = faceVertexIDs.reshape(corners.shape[1:])
+        lattice = []
+        for d in range(D):
+            lattice.append(vertexKeys % latticeShape[d])
+            vertexKeys = vertexKeys // latticeShape[d]
+        vertexCoords = (numerix.array(lattice, dtype=float) * (self.ds / 2.**top)[..., numerix.newaxis]
+                        + self.origin)
+
+        # list the faces of each cell, around the cell in 2D
+        interior = neighbors >= 0
+        faceCells = numerix.concatenate((cells, neighbors[interior]))
+        faceIDs = numerix.concatenate((numerix.arange(F), numerix.arange(F)[interior]))
+        if D == 2:
+            centers = self._calcCellCenters()[..., faceCells]
+            faceCenters = vertexCoords[..., faceVertexIDs[..., faceIDs]].mean(axis=1)
+            angles = numerix.arctan2(faceCenters[1] - centers[1], faceCenters[0] - centers[0])
+            order = numerix.lexsort((angles, faceCells))
+        else:
+            order = numerix.argsort(faceCells, kind='mergesort')
+        faceCells, faceIDs = faceCells[order], faceIDs[order]
+        counts = numerix.bincount(faceCells, minlength=N)
+        slots = numerix.arange(len(faceCells)) - numerix.repeat(numerix.cumsum(counts) - counts, counts)
+        cellFaceIDs = -numerix.ones((counts.max() if N > 0 else 0, N), dtype='int64')
+        cellFaceIDs[slots, faceCells] = faceIDs
+
+        return vertexCoords, faceVertexIDs, cellFaceIDs
+
+    def _calcCellCenters(self):
+        """The centers of the leaves, rather than the mean of the centers
+        of their faces, which is skewed by the split sides of cells next to
+        smaller ones"""
+        return ((self.indices + 0.5) * self.ds[..., numerix.newaxis] / 2.**self.levels
+                + self.origin)
+
+    def adapt(self, indicator, refineAbove, coarsenBelow=None):
+        """A new grid with each cell where `indicator` exceeds
+        `refineAbove` split once, and each group of cells from the same
+        parent where `indicator` is below `coarsenBelow` merged back into
+        their parent. Further cells are split to keep neighbors within one
+        level of each other.
+
+        :Parameters:
+          - `indicator`: A `CellVariable` or array of cell values on this
+            grid, e.g., ``phase.grad.mag``.
+          - `refineAbove`: The value of `indicator` above which cells are
+            refined, unless they are at `maxLevel`.
+          - `coarsenBelow`: The value of `indicator` below which cells may
+            be coarsened. Cells are not coarsened if `None`.
+        """
+        value = numerix.array(indicator)
+        D = len(self.ns)
+        refine = (value > refineAbove) & (self.levels < self.maxLevel)
+        merge = numerix.zeros(refine.shape, dtype=bool)
+        if coarsenBelow is not None:
+            coarsen = numerix.nonzero((value < coarsenBelow) & (self.levels > 0) & ~refine)[0]
+            parents = _keys(self.ns, self.levels[coarsen] - 1, self.indices[..., coarsen] // 2)
+            unique, inverse, counts = numerix.unique(parents, return_inverse=True, return_counts=True)
+            merge[coarsen] = counts[inverse] == 2**D
+
+        keep = ~refine & ~merge
+        firstChildren = merge & (self.indices % 2 == 0).all(axis=0)
+        childLevels, childIndices = _children(self.levels[refine], self.indices[..., refine])
+        levels = numerix.concatenate((self.levels[keep],
+                                      childLevels,
+                                      self.levels[firstChildren] - 1))
+        indices = numerix.concatenate((self.indices[..., keep],
+                                       childIndices,
+                                       self.indices[..., firstChildren] // 2), axis=1)
+        levels, indices = _balanced(self.ns, levels, indices)
+
+        args = self.args.copy()
+        args['levels'] = levels
+        args['indices'] = indices
+        return self.__class__(**args)
+
+    def transfer(self, var):
+        """A copy of `var`, a `CellVariable` on another adaptive grid with
+        the same base grid, on this grid.
+
+        Cells that lie within a cell of the other grid take its value and
+        cells that hold smaller cells of the other grid take the mean of
+        their values, so the integral of `var` is unchanged. The transfer
+        between a pair of grids is only worked out once.
+        """
+        source = var.mesh
+        if (not isinstance(source, _AdaptiveGrid)
+            or source.ns != self.ns
+            or not numerix.allclose(source.ds, self.ds)
+            or not numerix.allclose(source.origin, self.origin)):
+            raise ValueError, "can only transfer between adaptive grids with the same base grid"
+
+        if not hasattr(self, "_transferOperatorCache"):
+            self._transferOperatorCache = WeakKeyDictionary()
+        if source not in self._transferOperatorCache:
+            self._transferOperatorCache[source] = self._transferOperator(source)
+        operator = self._transferOperatorCache[source]
+
+        from fipy.variables.cellVariable import CellVariable
+        moved = CellVariable(mesh=self, name=var.name, value=operator(var),
+                             elementshape=var.shape[:-1], hasOld=var._old is not None)
+        if var._old is not None:
+            moved.old.value = operator(var.old)
+        return moved
+
+    def _transferOperator(self, source):
+        from fipy.meshes.interpolationOperator import _CellOperator
+        D = len(self.ns)
+
+        # cells within a cell of `source`
+        holders = source._tree.containing(self.levels, self.indices)
+        within = numerix.nonzero(holders >= 0)[0]
+
+        # smaller cells of `source` within a cell
+        holders2 = self._tree.containing(source.levels, source.indices)
+        finer = numerix.nonzero(holders2 >= 0)[0]
+        finer = finer[self.levels[holders2[finer]] < source.levels[finer]]
+
+        return _CellOperator(rows=numerix.concatenate((within, holders2[finer])),
+                             cols=numerix.concatenate((holders[within], finer)),
+                             weights=numerix.concatenate((numerix.ones(within.shape, 'd'),
+                                                          0.5**(D * (source.levels[finer]
+                                                                     - self.levels[holders2[finer]])))),
+                             shape=(self.numberOfCells, source.numberOfCells))
+
+    def _translate(self, vector):
+        args = self.args.copy()
+        args['origin'] = numerix.array(args['origin']) + vector
+        return self.__class__(**args)
+
+    def __mul__(self, factor):
+        D = len(self.ns)
+        if numerix.shape(factor) is ():
+            factor = numerix.resize(factor, (D, 1))
+        factor = numerix.array(factor, dtype=float).reshape((D, -1))
+        args = self.args.copy()
+        for d in range(D):
+            args['d' + self._axisNames[d]] *= factor[d, 0]
+        args['origin'] = numerix.array(args['origin']) * factor
+        return self.__class__(**args)
+
+    __rmul__ = __mul__
+
+    def _test(self):
+        """
+        An unrefined grid matches a `Grid2D`
+
+            >>> from fipy import Grid2D
+            >>> grid = Grid2D(nx=3, ny=2, dx=0.5, dy=2.)
+            >>> mesh = AdaptiveGrid2D(nx=3, ny=2, dx=0.5, dy=2.)
+            >>> print numerix.allclose(mesh.cellCenters, grid.cellCenters)
+            True
+            >>> print numerix.allclose(mesh.cellVolumes, grid.cellVolumes)
+            True
+            >>> print mesh.numberOfFaces, numerix.sort(mesh._cellDistances)[[0, -1]]
+            17 [ 0.25  2.  ]
+
+        A cell next to a refined cell has a face for each small neighbor
+
+            >>> mesh = mesh.adapt(numerix.arange(6) == 0, refineAbove=0.5)
+            >>> print mesh.numberOfCells, numerix.bincount(mesh.levels)
+            9 [5 4]
+            >>> print (~mesh.cellFaceIDs.mask).sum(axis=0)
+            [4 4 5 4 4 4 5 4 4]
+            >>> print numerix.allclose(mesh.cellVolumes.sum(), 6.)
+            True
+            >>> print numerix.allclose(mesh.cellCenters[..., [0, 6]],
+            ...                        [[0.125, 0.25], [0.5, 3.]])
+            True
+            >>> print numerix.allclose(mesh._faceAreas[mesh.exteriorFaces.value].sum(), 11.)
+            True
+
+        Refinement keeps neighbors within one level of each other
+
+            >>> mesh = mesh.adapt(numerix.arange(9) == 1, refineAbove=0.5)
+            >>> print numerix.bincount(mesh.levels)
+            [4 7 4]
+            >>> print len(mesh._tree.unbalanced())
+            0
+
+        A group of cells is merged only once all of them may be coarsened
+
+            >>> indicator = numerix.array(mesh.levels < 2, dtype=float)
+            >>> print numerix.bincount(mesh.adapt(indicator, refineAbove=10.,
+            ...                                   coarsenBelow=0.5).levels)
+            [4 8]
+            >>> indicator[numerix.nonzero(mesh.levels == 2)[0][0]] = 1.
+            >>> print numerix.bincount(mesh.adapt(indicator, refineAbove=10.,
+            ...                                   coarsenBelow=0.5).levels)
+            [4 7 4]
+
+        and cells are coarsened by one level at a time
+
+            >>> print numerix.bincount(mesh.adapt(mesh.levels, refineAbove=10.,
+            ...                                   coarsenBelow=3.).levels)
+            [5 4]
+
+        An octree works the same way
+
+            >>> from fipy import Grid3D
+            >>> grid = Grid3D(nx=2, ny=2, nz=2)
+            >>> mesh = AdaptiveGrid3D(nx=2, ny=2, nz=2)
+            >>> print numerix.allclose(mesh.cellCenters, grid.cellCenters)
+            True
+            >>> mesh = mesh.adapt(numerix.arange(8) == 0, refineAbove=0.5)
+            >>> print mesh.numberOfCells, (~mesh.cellFaceIDs.mask).sum(axis=0).max()
+            15 9
+            >>> print numerix.allclose(mesh.cellVolumes.sum(), 8.)
+            True
+            >>> print numerix.allclose(mesh.cellVolumes, 0.125**mesh.levels)
+            True
+
+            >>> from fipy import CellVariable
+            >>> x, y, z = mesh.cellCenters
+            >>> var = CellVariable(mesh=mesh, value=x + y * z)
+            >>> coarse = AdaptiveGrid3D(nx=2, ny=2, nz=2)
+            >>> print numerix.allclose((coarse.transfer(var).value * coarse.cellVolumes).sum(),
+            ...                        (var.value * mesh.cellVolumes).sum())
+            True
+
+        Grids can be moved, scaled and pickled
+
+            >>> mesh = AdaptiveGrid2D(nx=2, ny=2).adapt(numerix.arange(4) == 3, refineAbove=0.5)
+            >>> print numerix.allclose((mesh + ((1,), (2,))).cellCenters,
+            ...                        mesh.cellCenters + ((1,), (2,)))
+            True
+            >>> print numerix.allclose((mesh * 3).cellVolumes, mesh.cellVolumes * 9)
+            True
+            >>> from fipy.tools import dump
+            >>> (f, filename) = dump.write(mesh, extension='.gz')
+            >>> unpickled = dump.read(filename, f)
+            >>> print numerix.allclose(unpickled.cellCenters, mesh.cellCenters)
+            True
+
+            >>> AdaptiveGrid2D(nx=2, ny=2).transfer(CellVariable(mesh=AdaptiveGrid2D(nx=2, ny=3)))
+            Traceback (most recent call last):
+                ...
+            ValueError: can only transfer between adaptive grids with the same base grid
+        """
+
+class AdaptiveGrid2D(_AdaptiveGrid, Mesh2D):
+    """
+    A 2D grid of `nx` by `ny` cells, each of which can be refined up to
+    `maxLevel` times with :meth:`~_AdaptiveGrid.adapt`.
+
+    Adaptive grids are only available in serial.
+
+    :Parameters:
+      - `dx`: The spacing of the unrefined grid in the horizontal direction.
+      - `dy`: The spacing of the unrefined grid in the vertical direction.
+      - `nx`: The number of unrefined cells in the horizontal direction.
+      - `ny`: The number of unrefined cells in the vertical direction.
+      - `origin`: The lower left corner of the grid.
+      - `maxLevel`: The number of times a cell can be halved.
+      - `levels`, `indices`: The level of refinement and the position
+        among the cells of that level of each cell. The default is the
+        unrefined grid.
+    """
+    def __init__(self, dx=1., dy=1., nx=1, ny=1, origin=((0.,), (0.,)), maxLevel=4,
+                 levels=None, indices=None,
+                 _RepresentationClass=_Grid2DRepresentation, _TopologyClass=_Mesh2DTopology):
+        self.args = {
+            'dx': dx,
+            'dy': dy,
+            'nx': nx,
+            'ny': ny,
+            'origin': origin,
+            'maxLevel': maxLevel
+        }
+        self.ns = (int(nx), int(ny))
+        self.ds = numerix.array((dx, dy), dtype=float)
+        self.origin = numerix.array(origin, dtype=float).reshape((2, 1))
+        self.maxLevel = maxLevel
+
+        Mesh2D.__init__(self, *self._buildArrays(levels, indices),
+                        _RepresentationClass=_RepresentationClass, _TopologyClass=_TopologyClass)
+
+class AdaptiveGrid3D(_AdaptiveGrid, Mesh):
+    """
+    A 3D grid of `nx` by `ny` by `nz` cells, each of which can be refined
+    up to `maxLevel` times with :meth:`~_AdaptiveGrid.adapt`.
+
+    Adaptive grids are only available in serial.
+
+    :Parameters:
+      - `dx`: The spacing of the unrefined grid in the x direction.
+      - `dy`: The spacing of the unrefined grid in the y direction.
+      - `dz`: The spacing of the unrefined grid in the z direction.
+      - `nx`: The number of unrefined cells in the x direction.
+      - `ny`: The number of unrefined cells in the y direction.
+      - `nz`: The number of unrefined cells in the z direction.
+      - `origin`: The lower left front corner of the grid.
+      - `maxLevel`: The number of times a cell can be halved.
+      - `levels`, `indices`: The level of refinement and the position
+        among the cells of that level of each cell. The default is the
+        unrefined grid.
+    """
+    def __init__(self, dx=1., dy=1., dz=1., nx=1, ny=1, nz=1, origin=((0.,), (0.,), (0.,)), maxLevel=3,
+                 levels=None, indices=None,
+                 _RepresentationClass=_Grid3DRepresentation, _TopologyClass=_MeshTopology):
+        self.args = {
+            'dx': dx,
+            'dy': dy,
+            'dz': dz,
+            'nx': nx,
+            'ny': ny,
+            'nz': nz,
+            'origin': origin,
+            'maxLevel': maxLevel
+        }
+        self.ns = (int(nx), int(ny), int(nz))
+        self.ds = numerix.array((dx, dy, dz), dtype=float)
+        self.origin = numerix.array(origin, dtype=float).reshape((3, 1))
+        self.maxLevel = maxLevel
+
+        Mesh.__init__(self, *self._buildArrays(levels, indices),
+                      _RepresentationClass=_RepresentationClass, _TopologyClass=_TopologyClass)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
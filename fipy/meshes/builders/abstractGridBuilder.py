@@ -48,15 +48,20 @@ class _AbstractGridBuilder(object):
     NumPtsCalcClass = None
 
     def buildGridData(self, ds, ns, overlap, communicator,
-                            cacheOccupiedNodes=False):
+                            cacheOccupiedNodes=False, blocks=None):
         """
         Build and save any information relevant to the construction of a grid.
         Generalized to handle any dimension. Has side-effects.
 
-        Dimension specific functionality is built into `_buildOverlap` and
-        `_packOffset`, which are overridden by children of this class. Often,
-        this method is overridden (but always called) by children classes who
-        must distinguish between uniform and non-uniform behavior.
+        Dimension specific functionality is built into `_buildOverlap`,
+        `_packOverlap` and `_packOffset`, which are overridden by children
+        of this class. Often, this method is overridden (but always called)
+        by children classes who must distinguish between uniform and
+        non-uniform behavior.
+
+        In parallel, the grid is divided into a block of cells along each
+        axis for each processor, numbered with x varying fastest, see
+        `_calcBlocks`.
 
         :Note:
             - `spatialNums` is a list whose elements are analogous to
@@ -70,6 +75,9 @@ class _AbstractGridBuilder(object):
             - `ds` - A list containing grid spacing information, e.g. [dx, dy]
             - `ns` - A list containing number of grid points, e.g. [nx, ny, nz]
             - `overlap`
+            - `communicator`
+            - `blocks` - A list containing the number of blocks along
+              each axis, or `None` for any to be chosen automatically
         """
 
         dim = len(ns)
@@ -100,38 +108,45 @@ class _AbstractGridBuilder(object):
 
         globalNumCells = reduce(self._mult, newNs)
         globalNumFaces = self._calcGlobalNumFaces(newNs)
+        globalShape = tuple(newNs)
 
         """
         parallel stuff
         """
 
-        newNs = list(newNs)
-
         procID = communicator.procID
         Nproc = communicator.Nproc
 
-        overlap = min(overlap, newNs[-1])
-        cellsPerNode = max(newNs[-1] // Nproc, overlap)
-        occupiedNodes = min(newNs[-1] // (cellsPerNode or 1), Nproc)
-
-        (firstOverlap,
-         secOverlap,
-         overlap) = self._buildOverlap(overlap, procID, occupiedNodes)
-
-        offsetArg = min(procID, occupiedNodes-1) * cellsPerNode - firstOverlap
-        offset = self._packOffset(offsetArg)
-
-        """
-        local nx, [ny, [nz]] calculation
-        """
-        local_n = cellsPerNode * (procID < occupiedNodes)
-
-        if procID == occupiedNodes - 1:
-            local_n += (newNs[-1] - cellsPerNode * occupiedNodes)
+        blocks = self._calcBlocks(newNs, overlap, Nproc, blocks)
+        occupiedNodes = reduce(self._mult, blocks)
+
+        firstOverlaps = []
+        secOverlaps = []
+        offsets = []
+        localNs = []
+        block = procID
+        for n, numBlocks in zip(newNs, blocks):
+            cellsPerNode = n // numBlocks
+            if procID < occupiedNodes:
+                index = block % numBlocks
+                (first,
+                 sec) = self._buildOverlap(min(overlap, n), index, numBlocks)
+                local_n = cellsPerNode
+                if index == numBlocks - 1:
+                    local_n += n - cellsPerNode * numBlocks
+            else:
+                index = numBlocks - 1
+                first, sec, local_n = 0, 0, 0
+            block //= numBlocks
 
-        local_n += firstOverlap + secOverlap
+            firstOverlaps.append(first)
+            secOverlaps.append(sec)
+            offsets.append(index * cellsPerNode - first)
+            localNs.append(local_n + first + sec)
 
-        newNs = tuple(newNs[:-1] + [local_n])
+        overlap = self._packOverlap(firstOverlaps, secOverlaps)
+        offset = self._packOffset(offsets)
+        newNs = tuple(localNs)
 
         """
         post-parallel
@@ -162,6 +177,7 @@ class _AbstractGridBuilder(object):
 
         self.globalNumberOfCells = globalNumCells
         self.globalNumberOfFaces = globalNumFaces
+        self.globalShape = globalShape
 
         self.offset = offset
         self.overlap = overlap
@@ -188,6 +204,7 @@ class _AbstractGridBuilder(object):
                 self.scale,
                 self.globalNumberOfCells,
                 self.globalNumberOfFaces,
+                self.globalShape,
                 self.overlap,
                 self.offset,
                 self.numberOfVertices,
@@ -271,16 +288,115 @@ class _AbstractGridBuilder(object):
     def _calcNs(self, ns, ds):
         return self.NumPtsCalcClass.calcNs(ns, ds)
 
-    def _buildOverlap(self, overlap, procID, occupiedNodes):
-        (first, sec) = (overlap * (procID > 0) * (procID < occupiedNodes),
-                        overlap * (procID < occupiedNodes - 1))
+    def _calcBlocks(self, ns, overlap, Nproc, blocks=None):
+        """
+        Number of blocks to divide the grid into along each axis.
+
+        Axes whose number of blocks is not given get the most blocks that
+        fit on `Nproc` processors and leave each block at least `overlap`
+        cells wide. Among the arrangements with that many blocks, the one
+        with the fewest cells on the boundaries between blocks wins, and
+        ties go to dividing the later axes.
+
+        >>> from fipy.meshes.builders.grid2DBuilder import _Grid2DBuilder
+        >>> from fipy.meshes.builders.grid3DBuilder import _Grid3DBuilder
+
+        >>> gb = _Grid2DBuilder()
+        >>> print gb._calcBlocks([100, 100], overlap=2, Nproc=4)
+        (2, 2)
+        >>> print gb._calcBlocks([100, 10], overlap=2, Nproc=4)
+        (4, 1)
+        >>> print gb._calcBlocks([10, 10], overlap=2, Nproc=2)
+        (1, 2)
+        >>> print gb._calcBlocks([10, 10], overlap=2, Nproc=3)
+        (1, 3)
+        >>> print gb._calcBlocks([4, 6], overlap=2, Nproc=8)
+        (2, 3)
+        >>> print gb._calcBlocks([100, 100], overlap=2, Nproc=4, blocks=(4, None))
+        (4, 1)
+        >>> print gb._calcBlocks([10, 10], overlap=2, Nproc=8, blocks=(1, 8))
+        (1, 5)
+        >>> print gb._calcBlocks([10, 10], overlap=2, Nproc=4, blocks=(3, 2))
+        Traceback (most recent call last):
+            ...
+        ValueError: 6 blocks do not fit on 4 processors
+
+        A serial grid is always a single block
+
+        >>> print gb._calcBlocks([10, 10], overlap=2, Nproc=1, blocks=(3, 2))
+        (1, 1)
+
+        >>> gb3 = _Grid3DBuilder()
+        >>> print gb3._calcBlocks([40, 40, 40], overlap=2, Nproc=8)
+        (2, 2, 2)
+        >>> print gb3._calcBlocks([40, 40, 4], overlap=2, Nproc=8)
+        (2, 4, 1)
+
+        :Parameters:
+            - `ns` - A list containing number of grid points, e.g. [nx, ny, nz]
+            - `overlap`
+            - `Nproc` - The number of processors
+            - `blocks` - A list containing the number of blocks along
+              each axis, or `None` for any to be chosen automatically
+        """
+        if blocks is None:
+            blocks = [None] * len(ns)
+        elif len(blocks) != len(ns):
+            raise ValueError, "expected %d block counts, got %d" % (len(ns), len(blocks))
+
+        if Nproc == 1:
+            return (1,) * len(ns)
 
-        return first, sec, self._packOverlap(first, sec)
+        limits = [max(n // max(min(overlap, n), 1), 1) for n in ns]
+
+        blocks = [b and min(int(b), limit) for b, limit in zip(blocks, limits)]
+        fixed = reduce(self._mult, [b for b in blocks if b], 1)
+        if fixed > Nproc:
+            raise ValueError, "%d blocks do not fit on %d processors" % (fixed, Nproc)
+
+        free = [a for a, b in enumerate(blocks) if not b]
+        freeLimits = [limits[a] for a in free]
+
+        def factorizations(P, limits):
+            if len(limits) == 0:
+                if P == 1:
+                    yield ()
+            else:
+                for p in range(1, min(P, limits[0]) + 1):
+                    if P % p == 0:
+                        for rest in factorizations(P // p, limits[1:]):
+                            yield (p,) + rest
+
+        def boundaryCells(candidate):
+            return sum([(p - 1) * reduce(self._mult, ns[:a] + ns[a+1:], 1)
+                        for a, p in enumerate(candidate)])
+
+        P = min(Nproc // fixed, reduce(self._mult, freeLimits, 1))
+        while True:
+            candidates = []
+            for factors in factorizations(P, freeLimits):
+                candidate = list(blocks)
+                for a, p in zip(free, factors):
+                    candidate[a] = p
+                candidates.append((boundaryCells(candidate),
+                                   [-p for p in candidate[::-1]],
+                                   tuple(candidate)))
+            if len(candidates) > 0:
+                return min(candidates)[-1]
+            P -= 1
+
+    def _buildOverlap(self, overlap, index, numBlocks):
+        """
+        Number of overlapping cells before and after block `index` of
+        `numBlocks` along an axis.
+        """
+        return (overlap * (index > 0),
+                overlap * (index < numBlocks - 1))
 
-    def _packOverlap(self, first, sec):
+    def _packOverlap(self, firsts, secs):
         raise NotImplementedError
 
-    def _packOffset(self, arg):
+    def _packOffset(self, args):
         raise NotImplementedError
 
     def _mult(self, x, y):
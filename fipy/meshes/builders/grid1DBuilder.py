@@ -50,11 +50,11 @@ class _Grid1DBuilder(_AbstractGridBuilder):
         kwargs["cacheOccupiedNodes"] = True
         super(_Grid1DBuilder, self).buildGridData(*args, **kwargs)
 
-    def _packOverlap(self, first, second):
-        return {'left': first, 'right': second}
+    def _packOverlap(self, firsts, secs):
+        return {'left': firsts[0], 'right': secs[0]}
 
-    def _packOffset(self, arg):
-        return arg
+    def _packOffset(self, args):
+        return args[0]
 
     @property
     def _specificGridData(self):
@@ -127,9 +127,10 @@ class _UniformGrid1DBuilder(_Grid1DBuilder):
 
         super(_UniformGrid1DBuilder, self).__init__()
 
-    def buildGridData(self, ns, ds, overlap, communicator, origin):
+    def buildGridData(self, ns, ds, overlap, communicator, origin, blocks=None):
         super(_UniformGrid1DBuilder, self).buildGridData(ns, ds, overlap,
-                                                        communicator)
+                                                        communicator,
+                                                        blocks=blocks)
 
         self.origin = _UniformOrigin.calcOrigin(origin,
                                                 self.offset, self.ds, self.scale)
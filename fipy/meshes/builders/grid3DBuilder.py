@@ -38,8 +38,11 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import os
+
 from fipy.meshes.builders.abstractGridBuilder import _AbstractGridBuilder
 from fipy.tools import numerix
+from fipy.tools import parser
 from fipy.tools import vector
 from fipy.tools.dimensions.physicalField import PhysicalField
 from fipy.meshes.builders.utilityClasses import (_UniformNumPts,
@@ -47,6 +50,10 @@ from fipy.meshes.builders.utilityClasses import (_UniformNumPts,
                                                  _UniformOrigin,
                                                  _NonuniformNumPts)
 
+def _parseGridThreads():
+    return parser.parse("--grid-threads", action="store", type="int",
+                        default=int(os.getenv("FIPY_GRID_THREADS", 1)))
+
 class _Grid3DBuilder(_AbstractGridBuilder):
 
     def buildGridData(self, *args, **kwargs):
@@ -79,102 +86,196 @@ class _Grid3DBuilder(_AbstractGridBuilder):
                 self.numberOfLayersDeep]
 
 
+    # number of cells, faces or vertices filled at a time by `_fillPlanes`
+    _chunkSize = 2**16
+
+    @staticmethod
+    def _fillPlanes(fill, numPlanes, planeSize, threads=None):
+        """
+        Call `fill(first, last)` over consecutive ranges of the `numPlanes`
+        planes, each holding `planeSize` entries, normal to z.
+
+        Each range holds about `_chunkSize` entries, so the temporaries of
+        `fill` stay small however large the grid is. With `threads`
+        greater than one (by default, the :option:`--grid-threads`), the
+        ranges are filled concurrently; NumPy releases the global
+        interpreter lock for most of the work.
+
+        >>> chunks = []
+        >>> _Grid3DBuilder._fillPlanes(lambda first, last: chunks.append((first, last)),
+        ...                            numPlanes=5, planeSize=2**15, threads=2)
+        >>> print sorted(chunks)
+        [(0, 2), (2, 4), (4, 5)]
+        """
+        planesPerChunk = max(_Grid3DBuilder._chunkSize // max(planeSize, 1), 1)
+        chunks = [(first, min(first + planesPerChunk, numPlanes))
+                  for first in range(0, numPlanes, planesPerChunk)]
+        if threads is None:
+            threads = _parseGridThreads()
+        if threads > 1 and len(chunks) > 1:
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(min(threads, len(chunks)))
+            try:
+                pool.map(lambda chunk: fill(*chunk), chunks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for first, last in chunks:
+                fill(first, last)
+
+    @staticmethod
+    def _planes(array, start, first, last, planeSize):
+        """View of the `first` to `last` planes of the columns of `array`
+        from `start` on, shaped (rows, planes, planeSize)"""
+        view = array[..., start + first * planeSize:start + last * planeSize]
+        view.shape = (array.shape[0], last - first, planeSize)
+        return view
+
     @staticmethod
     def createVertices(dx, dy, dz, nx, ny, nz,
-                       numVertices, numHorizRows, numVertCols):
-        x = _AbstractGridBuilder.calcVertexCoordinates(dx, nx)
-        x = numerix.resize(x, (numVertices,))
+                       numVertices, numHorizRows, numVertCols, threads=None):
+        """
+        Vertex coordinates, filled a few planes of constant z at a time
 
+        >>> print _Grid3DBuilder.createVertices(1., (1., 2.), 3., 1, 2, 1, 12, 3, 2)
+        [[ 0.  1.  0.  1.  0.  1.  0.  1.  0.  1.  0.  1.]
+         [ 0.  0.  1.  1.  3.  3.  0.  0.  1.  1.  3.  3.]
+         [ 0.  0.  0.  0.  0.  0.  3.  3.  3.  3.  3.  3.]]
+        """
+        x = _AbstractGridBuilder.calcVertexCoordinates(dx, nx)
         y = _AbstractGridBuilder.calcVertexCoordinates(dy, ny)
+        z = _AbstractGridBuilder.calcVertexCoordinates(dz, nz)
+
+        planeSize = numHorizRows * numVertCols
+        vertices = numerix.empty((3, numVertices), 'd')
+        if numVertices == 0:
+            return vertices
+
+        x = numerix.resize(x, (planeSize,))
         y = numerix.repeat(y, numVertCols)
-        y = numerix.resize(y, (numVertices,))
 
-        z = _AbstractGridBuilder.calcVertexCoordinates(dz, nz)
-        z = numerix.repeat(z, numHorizRows * numVertCols)
-        z = numerix.resize(z, (numVertices,))
+        def fill(first, last):
+            planes = _Grid3DBuilder._planes(vertices, 0, first, last, planeSize)
+            planes[0] = x
+            planes[1] = y
+            planes[2] = z[first:last, numerix.newaxis]
+
+        _Grid3DBuilder._fillPlanes(fill, numVertices // planeSize, planeSize, threads=threads)
 
-        return numerix.array((x, y, z))
+        return vertices
 
     @staticmethod
-    def createFaces(nx, ny, nz):
+    def createFaces(nx, ny, nz, dtype='l', threads=None):
         """
         XY faces are first, then XZ faces, then YZ faces
+
+        The vertex IDs of each kind of face are filled a few planes of
+        constant z at a time, as `dtype`
+
+        >>> counts, faces = _Grid3DBuilder.createFaces(2, 1, 1, dtype='int32')
+        >>> print counts, faces.dtype
+        [4, 4, 3, 11] int32
+        >>> print faces
+        [[ 0  1  6  7  0  1  3  4  0  1  2]
+         [ 1  2  7  8  1  2  4  5  3  4  5]
+         [ 4  5 10 11  7  8 10 11  9 10 11]
+         [ 3  4  9 10  6  7  9 10  6  7  8]]
         """
+        numberOfXYFaces = (nx * ny * (nz + 1))
+        numberOfXZFaces = (nx * (ny + 1) * nz)
+        numberOfYZFaces = ((nx + 1) * ny * nz)
+        numberOfFaces = numberOfXYFaces + numberOfXZFaces + numberOfYZFaces
+
+        faces = numerix.empty((4, numberOfFaces), dtype)
+        planeVertices = (nx + 1) * (ny + 1)
+
+        def fillFaces(start, firstVertices, numPlanes, corners):
+            # `corners` offset the other three vertices from the first
+            planeSize = len(firstVertices)
+
+            def fill(first, last):
+                planes = _Grid3DBuilder._planes(faces, start, first, last, planeSize)
+                v1 = firstVertices + planeVertices * numerix.arange(first, last)[..., numerix.newaxis]
+                for corner, offset in enumerate((0,) + corners):
+                    planes[corner] = v1 + offset
+
+            _Grid3DBuilder._fillPlanes(fill, numPlanes, planeSize, threads=threads)
+
         ## do the XY faces
-        v1 = numerix.arange((nx + 1) * (ny))
-        v1 = vector.prune(v1, nx + 1, nx)
-        v1 = _Grid3DBuilder._repeatWithOffset(v1, (nx + 1) * (ny + 1), nz + 1)
-        v2 = v1 + 1
-        v3 = v1 + (nx + 2)
-        v4 = v1 + (nx + 1)
-        XYFaces = numerix.array((v1, v2, v3, v4))
+        fillFaces(0,
+                  vector.prune(numerix.arange((nx + 1) * ny), nx + 1, nx),
+                  nz + 1,
+                  (1, nx + 2, nx + 1))
 
         ## do the XZ faces
-        v1 = numerix.arange((nx + 1) * (ny + 1))
-        v1 = vector.prune(v1, nx + 1, nx)
-        v1 = _Grid3DBuilder._repeatWithOffset(v1, (nx + 1) * (ny + 1), nz)
-        v2 = v1 + 1
-        v3 = v1 + ((nx + 1)*(ny + 1)) + 1
-        v4 = v1 + ((nx + 1)*(ny + 1))
-        XZFaces = numerix.array((v1, v2, v3, v4))
+        fillFaces(numberOfXYFaces,
+                  vector.prune(numerix.arange((nx + 1) * (ny + 1)), nx + 1, nx),
+                  nz,
+                  (1, planeVertices + 1, planeVertices))
 
         ## do the YZ faces
-        v1 = numerix.arange((nx + 1) * ny)
-        v1 = _Grid3DBuilder._repeatWithOffset(v1, (nx + 1) * (ny + 1), nz)
-        v2 = v1 + (nx + 1)
-        v3 = v1 + ((nx + 1)*(ny + 1)) + (nx + 1)
-        v4 = v1 + ((nx + 1)*(ny + 1))
-        YZFaces = numerix.array((v1, v2, v3, v4))
-
-        numberOfXYFaces = (nx * ny * (nz + 1))
-        numberOfXZFaces = (nx * (ny + 1) * nz)
-        numberOfYZFaces = ((nx + 1) * ny * nz)
-        numberOfFaces = numberOfXYFaces + numberOfXZFaces + numberOfYZFaces
+        fillFaces(numberOfXYFaces + numberOfXZFaces,
+                  numerix.arange((nx + 1) * ny),
+                  nz,
+                  (nx + 1, planeVertices + nx + 1, planeVertices))
 
         return ([numberOfXYFaces, numberOfXZFaces, numberOfYZFaces, numberOfFaces],
-                numerix.concatenate((XYFaces, XZFaces, YZFaces), axis=1))
+                faces)
 
     @staticmethod
-    def createCells(nx, ny, nz, numXYFaces, numXZFaces, numYZFaces):
+    def createCells(nx, ny, nz, numXYFaces, numXZFaces, numYZFaces, dtype='l', threads=None):
         """
         cells = (front face, back face, left face, right face, bottom face, top face)
         front and back faces are YZ faces
         left and right faces are XZ faces
         top and bottom faces are XY faces
+
+        The face IDs are filled a few planes of constant z at a time, as
+        `dtype`
+
+        >>> print _Grid3DBuilder.createCells(2, 1, 1, 4, 4, 3)
+        [[ 8  9]
+         [ 9 10]
+         [ 4  5]
+         [ 6  7]
+         [ 0  1]
+         [ 2  3]]
         """
-        ## front and back faces
-        frontFaces = numerix.arange(numYZFaces)
-        frontFaces = vector.prune(frontFaces, nx + 1, nx)
-        frontFaces = frontFaces + numXYFaces + numXZFaces
-        backFaces = frontFaces + 1
-
-        ## left and right faces
-        leftFaces = numerix.arange(nx * ny)
-        leftFaces = _Grid3DBuilder._repeatWithOffset(leftFaces, nx * (ny + 1), nz)
-        leftFaces = numerix.ravel(leftFaces)
-        leftFaces = leftFaces + numXYFaces
-        rightFaces = leftFaces + nx
-
-        ## bottom and top faces
-        bottomFaces = numerix.arange(nx * ny * nz)
-        topFaces = bottomFaces + (nx * ny)
-
-        return numerix.array((frontFaces, backFaces, leftFaces,
-                              rightFaces, bottomFaces, topFaces))
+        planeSize = nx * ny
+        cells = numerix.empty((6, planeSize * nz), dtype)
 
-    @staticmethod
-    def _repeatWithOffset(array, offset, reps):
-        a = numerix.fromfunction(lambda rnum, x: array + (offset * rnum),
-                                 (reps, numerix.size(array))).astype('l')
-        return numerix.ravel(a)
+        frontFaces = vector.prune(numerix.arange((nx + 1) * ny), nx + 1, nx) + numXYFaces + numXZFaces
+        leftFaces = numerix.arange(planeSize) + numXYFaces
+        bottomFaces = numerix.arange(planeSize)
+
+        def fill(first, last):
+            planes = _Grid3DBuilder._planes(cells, 0, first, last, planeSize)
+            plane = numerix.arange(first, last)[..., numerix.newaxis]
 
+            ## front and back faces
+            planes[0] = frontFaces + (nx + 1) * ny * plane
+            planes[1] = planes[0] + 1
 
-    def _packOverlap(self, first, second):
-        return {'left': 0, 'right': 0, 'bottom' : 0, 'top' : 0,
-                'front': first, 'back': second}
+            ## left and right faces
+            planes[2] = leftFaces + nx * (ny + 1) * plane
+            planes[3] = planes[2] + nx
 
-    def _packOffset(self, arg):
-        return (0, 0, arg)
+            ## bottom and top faces
+            planes[4] = bottomFaces + planeSize * plane
+            planes[5] = planes[4] + planeSize
+
+        _Grid3DBuilder._fillPlanes(fill, nz, planeSize, threads=threads)
+
+        return cells
+
+    def _packOverlap(self, firsts, secs):
+        return {'left': firsts[0], 'right': secs[0],
+                'bottom' : firsts[1], 'top' : secs[1],
+                'front': firsts[2], 'back': secs[2]}
+
+    def _packOffset(self, args):
+        return tuple(args)
 
 class _NonuniformGrid3DBuilder(_Grid3DBuilder):
 
@@ -200,9 +301,15 @@ class _NonuniformGrid3DBuilder(_Grid3DBuilder):
                                                       self.numberOfVerticalColumns) \
                          + ((self.Xoffset,), (self.Yoffset,), (self.Zoffset,))
 
+        # the mesh's `_indexDtype`, so that it keeps these arrays as they are
+        dtype = numerix._indexDtype(max(self.globalNumberOfCells,
+                                        2 * self.globalNumberOfFaces,
+                                        self.numberOfVertices))
+
         numFacesList, self.faces = _Grid3DBuilder.createFaces(self.ns[0],
                                                               self.ns[1],
-                                                              self.ns[2])
+                                                              self.ns[2],
+                                                              dtype=dtype)
 
         self.numberOfXYFaces = numFacesList[0]
         self.numberOfXZFaces = numFacesList[1]
@@ -214,7 +321,8 @@ class _NonuniformGrid3DBuilder(_Grid3DBuilder):
                                                 self.ns[2],
                                                 self.numberOfXYFaces,
                                                 self.numberOfXZFaces,
-                                                self.numberOfYZFaces)
+                                                self.numberOfYZFaces,
+                                                dtype=dtype)
 
     @property
     def _specificGridData(self):
@@ -231,9 +339,10 @@ class _UniformGrid3DBuilder(_Grid3DBuilder):
 
         super(_UniformGrid3DBuilder, self).__init__()
 
-    def buildGridData(self, ds, ns, overlap, communicator, origin):
+    def buildGridData(self, ds, ns, overlap, communicator, origin, blocks=None):
         super(_UniformGrid3DBuilder, self).buildGridData(ds, ns, overlap,
-                                                        communicator)
+                                                        communicator,
+                                                        blocks=blocks)
 
         self.origin = _UniformOrigin.calcOrigin(origin,
                                                 self.offset, self.ds, self.scale)
@@ -47,9 +47,9 @@ class _PeriodicGrid1DBuilder(_NonuniformGrid1DBuilder):
         return super(_PeriodicGrid1DBuilder, self).buildGridData(*args,
                                                                 **kwargs)
 
-    def _buildOverlap(self, overlap, procID, occupiedNodes):
-        if occupiedNodes == 1:
+    def _buildOverlap(self, overlap, index, numBlocks):
+        if numBlocks == 1:
             return super(_PeriodicGrid1DBuilder, self)._buildOverlap(overlap,
-                     procID, occupiedNodes)
+                     index, numBlocks)
         else:
-            return (overlap, overlap, {'left': overlap, 'right': overlap})
+            return (overlap, overlap)
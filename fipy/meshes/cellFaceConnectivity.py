@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "cellFaceConnectivity.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+"""The faces of each cell, in compressed row form.
+
+`cellFaceIDs`, `_cellToFaceOrientations` and `_cellToCellIDs` are masked
+arrays with a row for each face of the cell with the most faces. Cells
+with fewer faces pad their columns, which wastes memory on meshes of
+mixed cell types, and every calculation over them pays for the masks.
+`_CellFaceConnectivity` instead lists one entry per cell face, grouped by
+cell, with the offset of the first entry of each cell, so per-sweep
+calculations gather and sum plain arrays.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+class _CellFaceConnectivity(object):
+    """Faces of each cell of a mesh, one entry per cell face
+
+    :Parameters:
+      - `cellFaceIDs`: The padded or masked face IDs of each cell.
+      - `cellToFaceOrientations`: Whether each face of each cell points
+        out of (1) or into (-1) the cell.
+      - `cellToCellIDs`: The masked IDs of the cell across each face of
+        each cell.
+
+    >>> from fipy.meshes.mesh2D import Mesh2D
+    >>> vertexCoords = numerix.array(((0., 1., 1., 0., 2.),
+    ...                              (0., 0., 1., 1., 0.)))
+    >>> faceVertexIDs = numerix.array(((0, 1, 2, 3, 1, 4),
+    ...                               (1, 2, 3, 0, 4, 2)))
+    >>> cellFaceIDs = MA.masked_values(((0, 4), (1, 5), (2, 1), (3, -1)), -1)
+    >>> mesh = Mesh2D(vertexCoords=vertexCoords, faceVertexIDs=faceVertexIDs,
+    ...               cellFaceIDs=cellFaceIDs)
+    >>> connectivity = mesh._cellFaceConnectivity
+    >>> print connectivity.offsets
+    [0 4 7]
+    >>> print connectivity.cellIDs
+    [0 0 0 0 1 1 1]
+    >>> print connectivity.faceIDs
+    [0 1 2 3 4 5 1]
+    >>> print connectivity.orientations
+    [ 1  1  1  1  1  1 -1]
+    >>> print connectivity.neighborIDs
+    [0 1 0 0 1 1 0]
+    >>> print connectivity.exterior
+    [ True False  True  True  True  True False]
+
+    Values on the faces are gathered to the entries and summed over the
+    faces of each cell
+
+    >>> faceValues = numerix.arange(6.)
+    >>> print connectivity.sum(connectivity.orientations * faceValues[..., connectivity.faceIDs])
+    [ 6.  8.]
+    >>> print numerix.sum(MA.filled(numerix.take(faceValues, mesh.cellFaceIDs)
+    ...                             * mesh._cellToFaceOrientations, 0), axis=0)
+    [ 6.  8.]
+
+    Padded arrays over the faces of each cell convert to entries
+
+    >>> print connectivity.entries(mesh._cellToFaceOrientations)
+    [ 1  1  1  1  1  1 -1]
+    >>> print connectivity.entries(numerix.array((mesh._cellToCellIDs,) * 2)).shape
+    (2, 7)
+
+    The mesh keeps its connectivity, unless its topology is implicit
+
+    >>> mesh._cellFaceConnectivity is connectivity
+    True
+    >>> from fipy import Grid2D
+    >>> grid = Grid2D(nx=3, ny=2)
+    >>> grid._implicitTopology = True
+    >>> grid._cellFaceConnectivity is grid._cellFaceConnectivity
+    False
+    >>> print hasattr(grid, "_cellFaceCSR")
+    False
+    """
+    def __init__(self, cellFaceIDs, cellToFaceOrientations, cellToCellIDs):
+        filled = numerix.array(MA.filled(cellFaceIDs, -1))
+        M, N = filled.shape
+        valid = filled >= 0
+
+        # entries run over the faces of the first cell, then of the second...
+        # and are numbered with the same integer type as the faces
+        self.cellIDs, self._slots = [IDs.astype(filled.dtype)
+                                     for IDs in numerix.nonzero(valid.swapaxes(0, 1))]
+        counts = valid.sum(axis=0)
+        self.offsets = numerix.concatenate(([0], numerix.cumsum(counts))).astype(filled.dtype)
+        self._filledCells = numerix.nonzero(counts)[0].astype(filled.dtype)
+
+        self.faceIDs = filled[self._slots, self.cellIDs]
+        self.orientations = self.entries(cellToFaceOrientations)
+        self.exterior = MA.getmaskarray(cellToCellIDs)[self._slots, self.cellIDs]
+        self.neighborIDs = numerix.where(self.exterior, self.cellIDs,
+                                         self.entries(cellToCellIDs))
+
+    @property
+    def numberOfCells(self):
+        return len(self.offsets) - 1
+
+    def entries(self, padded):
+        """The values of `padded`, shaped (..., faces per cell, cells), for
+        each entry"""
+        return numerix.array(MA.filled(padded, 0))[..., self._slots, self.cellIDs]
+
+    def sum(self, values):
+        """Sum of `values`, shaped (..., entries), over the faces of each
+        cell"""
+        values = numerix.asarray(values)
+        result = numerix.zeros(values.shape[:-1] + (self.numberOfCells,), dtype=values.dtype)
+        if len(self._filledCells) > 0:
+            result[..., self._filledCells] = numerix.add.reduceat(values, self.offsets[self._filledCells],
+                                                                  axis=-1)
+        return result
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
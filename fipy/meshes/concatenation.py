@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "concatenation.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+"""Join meshes along the vertices and faces they share.
+
+`mesh1 + mesh2` merges the vertices of `mesh2` that lie on the boundary of
+`mesh1`, and then the faces whose vertices are all merged. Vertices are
+matched through a spatial hash: boundary vertices are sorted into buckets
+the size of the matching tolerance, so each vertex is only compared with
+the few vertices in the neighboring buckets and the cost grows linearly
+with the size of the meshes.
+
+:func:`concatenateMeshes` joins any number of meshes in one pass, rather
+than building each intermediate mesh of ``m1 + m2 + m3 + ...``.
+
+>>> from fipy import Grid2D
+>>> pieces = [Grid2D(nx=2, ny=3) + ((2 * i,), (3 * j,)) for j in range(3) for i in range(4)]
+>>> mesh = concatenateMeshes(pieces)
+>>> grid = Grid2D(nx=8, ny=9)
+>>> print mesh.numberOfCells, mesh.numberOfFaces, mesh._numberOfVertices
+72 161 90
+>>> print grid.numberOfCells, grid.numberOfFaces, grid._numberOfVertices
+72 161 90
+>>> print numerix.allclose(numerix.sort(mesh.cellVolumes), grid.cellVolumes)
+True
+>>> print mesh.exteriorFaces.value.sum(), grid.exteriorFaces.value.sum()
+34 34
+
+Joining all of the pieces at once gives the same mesh as adding them one
+after another
+
+>>> added = pieces[0]
+>>> for piece in pieces[1:]:
+...     added = added + piece
+>>> print numerix.allclose(added.vertexCoords, mesh.vertexCoords)
+True
+>>> print (numerix.allequal(added.faceVertexIDs, mesh.faceVertexIDs)
+...        and numerix.allequal(added.cellFaceIDs, mesh.cellFaceIDs))
+True
+
+Vertices only merge if they are within `resolution` times the smallest
+distance between cell centers of each other
+
+>>> import warnings
+>>> from fipy import Grid3D
+>>> cube = Grid3D(nx=2, ny=2, nz=2, dx=0.5, dy=0.5, dz=0.5)
+>>> print concatenateMeshes([cube, cube + ((1.01,), (0,), (0,))],
+...                         resolution=0.05).numberOfFaces
+68
+>>> with warnings.catch_warnings(record=True) as caught:
+...     warnings.simplefilter("always")
+...     print concatenateMeshes([cube, cube + ((1.01,), (0,), (0,))]).numberOfFaces
+72
+
+and the meshes are still joined, with a warning that they don't touch
+
+>>> print [str(w.message) for w in caught]
+['Vertices are not aligned', 'Faces are not aligned']
+"""
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+__all__ = ["concatenateMeshes"]
+
+def _shifted(IDs, rows, offset):
+    """`IDs`, padded with -1 or masked, plus `offset`, as an array of `rows`
+    rows padded with -1"""
+    IDs = numerix.array(MA.filled(IDs, -1))
+    shifted = -numerix.ones((rows,) + IDs.shape[1:], dtype=IDs.dtype)
+    shifted[:IDs.shape[0]] = numerix.where(IDs >= 0, IDs + offset, -1)
+    return shifted
+
+def _renumbered(IDs, newIDs):
+    """`IDs`, padded with -1, in terms of `newIDs`"""
+    return numerix.where(IDs >= 0, newIDs[numerix.maximum(IDs, 0)], -1)
+
+def _bucketKeys(buckets):
+    """Hash of the integer bucket coordinates `buckets`, shaped (D, N).
+    Different buckets may share a key; that only adds candidates."""
+    primes = numerix.array((73856093, 19349663, 83492791), dtype='int64')
+    keys = numerix.zeros(buckets.shape[1:], dtype='int64')
+    for d in range(buckets.shape[0]):
+        keys = keys ^ (buckets[d] * primes[d])
+    return keys
+
+def _closeVertexPairs(coords, pieces, tolerance):
+    """Pairs of vertices from different pieces that are closer than
+    `tolerance`, with the vertex of the later piece first and the closest
+    match of each such vertex from an earlier piece second"""
+    D, N = coords.shape
+    if N == 0 or not tolerance > 0:
+        return numerix.arange(0), numerix.arange(0)
+
+    lower = coords.min(axis=1)[..., numerix.newaxis]
+    buckets = numerix.floor((coords - lower) / tolerance).astype('int64')
+    keys = _bucketKeys(buckets)
+    order = numerix.argsort(keys, kind='mergesort')
+    sortedKeys = keys[order]
+
+    offsets = numerix.array(numerix.indices((3,) * D), dtype='int64').reshape((D, -1)) - 1
+    queries = numerix.repeat(numerix.arange(N), offsets.shape[-1])
+    neighborKeys = _bucketKeys((buckets[..., numerix.newaxis]
+                                + offsets[:, numerix.newaxis, :]).reshape((D, -1)))
+    starts = numerix.searchsorted(sortedKeys, neighborKeys, side='left')
+    counts = numerix.searchsorted(sortedKeys, neighborKeys, side='right') - starts
+
+    queries = numerix.repeat(queries, counts)
+    within = numerix.arange(counts.sum()) - numerix.repeat(numerix.cumsum(counts) - counts, counts)
+    candidates = order[numerix.repeat(starts, counts) + within]
+
+    earlier = pieces[candidates] < pieces[queries]
+    queries, candidates = queries[earlier], candidates[earlier]
+    separation = coords[..., candidates] - coords[..., queries]
+    distance2 = (separation * separation).sum(axis=0)
+    close = distance2 < tolerance**2
+    queries, candidates, distance2 = queries[close], candidates[close], distance2[close]
+
+    # closest, then lowest, candidate for each query
+    order = numerix.lexsort((candidates, distance2, queries))
+    queries, candidates = queries[order], candidates[order]
+    first = numerix.concatenate((queries[:1] == queries[:1], queries[1:] != queries[:-1]))
+    return queries[first], candidates[first]
+
+def _firstOfEach(keys):
+    """For each row of `keys`, shaped (K, N), the index of the first column
+    with the same key"""
+    N = keys.shape[-1]
+    if N == 0:
+        return numerix.arange(0)
+    order = numerix.lexsort(keys[::-1])
+    sortedKeys = keys[..., order]
+    start = numerix.concatenate(([True], (sortedKeys[..., 1:] != sortedKeys[..., :-1]).any(axis=0)))
+    # `lexsort` is stable, so the first of each group has the lowest index
+    groups = numerix.cumsum(start) - 1
+    first = numerix.empty((N,), dtype=int)
+    first[order] = order[start][groups]
+    return first
+
+def _warnUnaligned(what, matched, nonempty, stacklevel):
+    """Warn if any mesh after the first doesn't touch the ones before it"""
+    for piece in range(1, len(nonempty)):
+        if nonempty[piece] and nonempty[:piece].any() and not matched[piece]:
+            import warnings
+            warnings.warn("%s are not aligned" % what, UserWarning, stacklevel=stacklevel + 1)
+            return
+
+def _concatenatedMeshValues(meshes, resolution=1e-2, stacklevel=2):
+    """Calculate the parameters to define a concatenation of `meshes`
+
+    :Parameters:
+      - `meshes`: A sequence of :class:`~fipy.meshes.mesh.Mesh` objects
+      - `resolution`: How close vertices have to be (relative to the smallest
+        cell-to-cell distance in any of the meshes) to be considered the same
+
+    :Returns:
+      A `dict` with 3 elements: the new mesh vertexCoords, faceVertexIDs, and cellFaceIDs.
+    """
+    from fipy.meshes.abstractMesh import MeshAdditionError
+
+    concatenable = [mesh._concatenableMesh for mesh in meshes]
+    dims = set([meshc.vertexCoords.shape[0] for meshc in concatenable])
+    if len(dims) > 1:
+        raise MeshAdditionError, "Dimensions do not match"
+
+    numVertices = numerix.array([meshc.vertexCoords.shape[-1] for meshc in concatenable])
+    numFaces = numerix.array([meshc.faceVertexIDs.shape[-1] for meshc in concatenable])
+    vertexOffsets = numerix.cumsum(numVertices) - numVertices
+    faceOffsets = numerix.cumsum(numFaces) - numFaces
+    maxFaceVertices = max([meshc.faceVertexIDs.shape[0] for meshc in concatenable])
+    maxCellFaces = max([meshc.cellFaceIDs.shape[0] for meshc in concatenable])
+
+    vertexCoords = numerix.concatenate([numerix.array(meshc.vertexCoords) for meshc in concatenable], axis=1)
+    faceVertexIDs = numerix.concatenate([_shifted(meshc.faceVertexIDs, maxFaceVertices, offset)
+                                         for meshc, offset in zip(concatenable, vertexOffsets)], axis=1)
+
+    ## only try to match exterior (X) vertices along the operation manifold
+    exteriorVertices = []
+    for mesh, meshc, offset in zip(meshes, concatenable, vertexOffsets):
+        if hasattr(mesh, "opManifold"):
+            faces = mesh.opManifold(meshc)
+        else:
+            faces = meshc.exteriorFaces.value
+        vertices = numerix.array(MA.filled(meshc.faceVertexIDs, -1))[..., faces].ravel()
+        exteriorVertices.append(numerix.unique(vertices[vertices >= 0]) + offset)
+    exteriorVertices = numerix.concatenate(exteriorVertices)
+    vertexPieces = numerix.repeat(numerix.arange(len(meshes)), numVertices)
+
+    distances = [meshc._cellToCellDistances for meshc in concatenable if meshc.numberOfCells > 0]
+    if len(distances) > 0:
+        tolerance = resolution * min([numerix.array(d).min() for d in distances])
+    else:
+        tolerance = 0.
+
+    ## map each matched vertex to the vertex of the earliest mesh
+    queries, matches = _closeVertexPairs(vertexCoords[..., exteriorVertices],
+                                         vertexPieces[exteriorVertices], tolerance)
+    vertexMap = numerix.arange(vertexCoords.shape[-1])
+    vertexMap[exteriorVertices[queries]] = exteriorVertices[matches]
+    while True:
+        jumped = vertexMap[vertexMap]
+        if (jumped == vertexMap).all():
+            break
+        vertexMap = jumped
+
+    matched = numerix.zeros((len(meshes),), dtype=bool)
+    matched[vertexPieces[exteriorVertices[queries]]] = True
+    _warnUnaligned("Vertices", matched, numVertices > 0, stacklevel)
+
+    ## map each face whose vertices match those of a face of an earlier
+    ## mesh to that face
+    facePieces = numerix.repeat(numerix.arange(len(meshes)), numFaces)
+    faceKeys = numerix.sort(_renumbered(faceVertexIDs, vertexMap), axis=0)
+    faceMap = _firstOfEach(faceKeys)
+    merged = facePieces[faceMap] < facePieces
+    faceMap = numerix.where(merged, faceMap, numerix.arange(len(faceMap)))
+
+    matched = numerix.zeros((len(meshes),), dtype=bool)
+    matched[facePieces[merged]] = True
+    _warnUnaligned("Faces", matched, numFaces > 0, stacklevel)
+
+    ## number the remaining vertices and faces in order
+    keptVertices = vertexMap == numerix.arange(len(vertexMap))
+    newVertexIDs = numerix.cumsum(keptVertices) - 1
+    keptFaces = ~merged
+    newFaceIDs = numerix.cumsum(keptFaces) - 1
+
+    cellFaceIDs = numerix.concatenate([_shifted(meshc.cellFaceIDs, maxCellFaces, offset)
+                                       for meshc, offset in zip(concatenable, faceOffsets)], axis=1)
+
+    return {
+        'vertexCoords': vertexCoords[..., keptVertices],
+        'faceVertexIDs': MA.masked_values(_renumbered(faceVertexIDs[..., keptFaces],
+                                                      newVertexIDs[vertexMap]), -1),
+        'cellFaceIDs': MA.masked_values(_renumbered(cellFaceIDs, newFaceIDs[faceMap]), -1)
+        }
+
+def concatenateMeshes(meshes, resolution=1e-2):
+    """Join `meshes` along the vertices and faces they share, like ``m1 + m2
+    + ...``, without building the intermediate meshes.
+
+    :Parameters:
+      - `meshes`: A sequence of :class:`~fipy.meshes.mesh.Mesh` objects of
+        the same dimension. The result is of the class that the first of
+        them concatenates to.
+      - `resolution`: How close vertices have to be (relative to the smallest
+        cell-to-cell distance in any of the meshes) to be considered the same
+    """
+    meshes = list(meshes)
+    return meshes[0]._concatenatedClass(**_concatenatedMeshValues(meshes, resolution=resolution,
+                                                                  stacklevel=3))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
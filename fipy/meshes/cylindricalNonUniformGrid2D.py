@@ -84,7 +84,8 @@ class CylindricalNonUniformGrid2D(NonUniformGrid2D):
         return CylindricalNonUniformGrid2D(dx=self.args['dx'], nx=self.args['nx'],
                                            dy=self.args['dy'], ny=self.args['ny'],
                                            origin=self.args['origin'] + vector,
-                                           overlap=self.args['overlap'])
+                                           overlap=self.args['overlap'],
+                                           blocks=self.args['blocks'])
 
     def __mul__(self, factor):
         if numerix.shape(factor) is ():
@@ -93,7 +94,8 @@ class CylindricalNonUniformGrid2D(NonUniformGrid2D):
         return CylindricalNonUniformGrid2D(dx=self.args['dx'] * numerix.array(factor[0]), nx=self.args['nx'],
                                            dy=self.args['dy'] * numerix.array(factor[1]), ny=self.args['ny'],
                                            origin=self.args['origin'] * factor,
-                                           overlap=self.args['overlap'])
+                                           overlap=self.args['overlap'],
+                                           blocks=self.args['blocks'])
 
     def _test(self):
         """
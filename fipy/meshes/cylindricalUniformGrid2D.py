@@ -59,7 +59,8 @@ class CylindricalUniformGrid2D(UniformGrid2D):
         return CylindricalUniformGrid2D(dx = self.args['dx'], nx = self.args['nx'],
                                         dy = self.args['dy'], ny = self.args['ny'],
                                         origin=numerix.array(self.args['origin']) + vector,
-                                        overlap=self.args['overlap'])
+                                        overlap=self.args['overlap'],
+                                        blocks=self.args['blocks'])
 
     @property
     def _faceAreas(self):
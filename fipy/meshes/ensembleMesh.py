@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "ensembleMesh.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Run many variants of the same problem as one simulation.
+
+An ensemble mesh holds `size` disconnected copies of a base mesh. Cell
+`i` of member `k` is cell ``k * N + i`` of the ensemble, where `N` is
+the number of cells of the base mesh, and likewise for faces. Because
+no face is shared between members, every `Term` assembles one
+block-diagonal matrix for the whole ensemble and the solver solves all
+members together, so `K` parameter variants cost one pass through the
+Python term and assembly stack instead of `K`.
+
+The members occupy the same region of space, so boundary selections
+such as `facesLeft` pick the corresponding faces of every member. Use
+:func:`ensembleValue` to spread per-member parameters over the ensemble
+and :func:`ensembleView` to look at a result with a leading ensemble
+axis.
+
+>>> from fipy import Grid1D, CellVariable, TransientTerm, DiffusionTerm
+>>> baseMesh = Grid1D(nx=10, dx=0.1)
+>>> mesh = EnsembleMesh(baseMesh, size=3)
+>>> print mesh.numberOfCells, mesh.numberOfFaces
+30 33
+>>> print mesh.ensembleSize
+3
+
+>>> coeffs = (1., 2., 4.)
+>>> D = CellVariable(mesh=mesh, value=ensembleValue(mesh, coeffs))
+>>> phi = CellVariable(mesh=mesh, value=0.)
+>>> phi.constrain(1., where=mesh.facesLeft)
+>>> eq = TransientTerm() == DiffusionTerm(coeff=D.harmonicFaceValue)
+>>> eq.solve(var=phi, dt=0.01)
+>>> print ensembleView(phi).shape
+(3, 10)
+
+Each member matches the same problem solved on its own
+
+>>> for k, coeff in enumerate(coeffs):
+...     single = CellVariable(mesh=baseMesh, value=0.)
+...     single.constrain(1., where=baseMesh.facesLeft)
+...     (TransientTerm() == DiffusionTerm(coeff=coeff)).solve(var=single, dt=0.01)
+...     print numerix.allclose(ensembleView(phi)[k], single, atol=1e-8)
+True
+True
+True
+
+Per-member values may also vary from cell to cell
+
+>>> seeds = numerix.arange(30.).reshape((3, 10))
+>>> print numerix.allequal(ensembleView(ensembleValue(mesh, seeds), mesh), seeds)
+True
+>>> print ensembleValue(mesh, (1., 2.)) # doctest: +IGNORE_EXCEPTION_DETAIL
+Traceback (most recent call last):
+    ...
+ValueError: expected 3 ensemble members, got 2
+
+.. note::
+
+   Iterative solvers apply their tolerance to the residual of the
+   whole ensemble, not to each member.
+"""
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+__all__ = ["EnsembleMesh", "ensembleValue", "ensembleView"]
+
+def _offsetIDs(IDs, offset):
+    IDs = MA.filled(IDs, -1)
+    return numerix.where(IDs >= 0, IDs + offset, -1)
+
+def EnsembleMesh(mesh, size):
+    """Create a mesh of `size` disconnected copies of `mesh`.
+
+    :Parameters:
+      - `mesh`: The base mesh, in serial.
+      - `size`: The number of ensemble members.
+
+    :Returns:
+      A mesh of the class that concatenating `mesh` would produce, with
+      `ensembleSize` and `ensembleBase` attributes.
+    """
+    size = int(size)
+    if size < 1:
+        raise ValueError, "an ensemble needs at least one member"
+
+    base = mesh._concatenableMesh
+    numberOfVertices = base.vertexCoords.shape[-1]
+    numberOfFaces = base.faceVertexIDs.shape[-1]
+
+    vertexCoords = numerix.concatenate([base.vertexCoords] * size, axis=1)
+    faceVertexIDs = numerix.concatenate([_offsetIDs(base.faceVertexIDs, k * numberOfVertices)
+                                         for k in range(size)], axis=1)
+    cellFaceIDs = numerix.concatenate([_offsetIDs(base.cellFaceIDs, k * numberOfFaces)
+                                       for k in range(size)], axis=1)
+
+    ensemble = base._concatenatedClass(vertexCoords=vertexCoords,
+                                       faceVertexIDs=faceVertexIDs,
+                                       cellFaceIDs=cellFaceIDs)
+    ensemble.ensembleSize = size
+    ensemble.ensembleBase = mesh
+
+    return ensemble
+
+def _memberLength(mesh, length):
+    size = mesh.ensembleSize
+    if length == mesh.numberOfCells:
+        return mesh.numberOfCells // size
+    elif length == mesh.numberOfFaces:
+        return mesh.numberOfFaces // size
+    else:
+        raise ValueError, "length %d matches neither the cells nor the faces of the ensemble" % length
+
+def ensembleValue(mesh, values, faces=False):
+    """Spread per-member `values` over the cells (or faces) of `mesh`.
+
+    :Parameters:
+      - `mesh`: An ensemble mesh made by :func:`EnsembleMesh`.
+      - `values`: An array with a leading axis of length
+        `mesh.ensembleSize`. Each entry is either a single value for the
+        member or an array over the cells (or faces) of the base mesh,
+        optionally preceded by the axes of a vector or tensor value.
+      - `faces`: Whether to build a face value instead of a cell value.
+
+    :Returns:
+      An array suitable as the value of a `CellVariable` (or
+      `FaceVariable`) on `mesh`.
+    """
+    values = numerix.asarray(values)
+    size = mesh.ensembleSize
+    if values.shape[:1] != (size,):
+        raise ValueError, "expected %d ensemble members, got %d" % (size, len(values))
+
+    if faces:
+        memberLength = mesh.numberOfFaces // size
+    else:
+        memberLength = mesh.numberOfCells // size
+
+    if values.ndim == 1:
+        return numerix.repeat(values, memberLength)
+    else:
+        values = numerix.rollaxis(values, 0, values.ndim - 1)
+        return numerix.reshape(values, values.shape[:-2] + (size * memberLength,))
+
+def ensembleView(var, mesh=None):
+    """Return the value of `var` with a leading ensemble axis.
+
+    :Parameters:
+      - `var`: A `CellVariable` or `FaceVariable` on an ensemble mesh, or
+        an array over its cells or faces.
+      - `mesh`: The ensemble mesh, if `var` is an array.
+
+    :Returns:
+      An array of shape ``(size,) + elementshape + (N,)``, where `N` is
+      the number of cells (or faces) of the base mesh.
+    """
+    if mesh is None:
+        mesh = var.mesh
+        value = var.value
+    else:
+        value = numerix.asarray(var)
+
+    size = mesh.ensembleSize
+    memberLength = _memberLength(mesh, value.shape[-1])
+    value = numerix.reshape(value, value.shape[:-1] + (size, memberLength))
+
+    return numerix.rollaxis(value, value.ndim - 2, 0)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -81,7 +81,7 @@ def _dnl(dx, nx, Lx):
 def Grid3D(dx=1., dy=1., dz=1.,
            nx=None, ny=None, nz=None,
            Lx=None, Ly=None, Lz=None,
-           overlap=2, communicator=parallelComm):
+           overlap=2, communicator=parallelComm, blocks=None):
 
     r""" Factory function to select between UniformGrid3D and
     NonUniformGrid3D.  If `Lx` is specified the length of the domain
@@ -105,6 +105,11 @@ def Grid3D(dx=1., dy=1., dz=1.,
         `fipy.tools.serialComm`. Select `fipy.tools.serialComm` to create a
         serial mesh when running in parallel. Mostly used for test
         purposes.
+      - `blocks`: the number of blocks to divide the mesh into along each
+        axis for parallel simulations, e.g., ``(2, 2, 1)``. Any axis given
+        as `None`, or all of them if `blocks` is `None`, is divided so as
+        to use as many processors as possible with the fewest cells on the
+        boundaries between blocks.
 
     """
 
@@ -118,13 +123,15 @@ def Grid3D(dx=1., dy=1., dz=1.,
         from fipy.meshes.uniformGrid3D import UniformGrid3D
         return UniformGrid3D(dx = dx, dy = dy, dz = dz,
                              nx = nx or 1, ny = ny or 1, nz = nz or 1,
-                             overlap=overlap, communicator=communicator)
+                             overlap=overlap, communicator=communicator,
+                             blocks=blocks)
     else:
         from fipy.meshes.nonUniformGrid3D import NonUniformGrid3D
         return NonUniformGrid3D(dx = dx, dy = dy, dz = dz, nx = nx, ny = ny, nz = nz,
-                                overlap=overlap, communicator=communicator)
+                                overlap=overlap, communicator=communicator,
+                                blocks=blocks)
 
-def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communicator=parallelComm):
+def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communicator=parallelComm, blocks=None):
     r""" Factory function to select between UniformGrid2D and
     NonUniformGrid2D.  If `Lx` is specified the length of the domain
     is always `Lx` regardless of `dx`.
@@ -144,6 +151,11 @@ def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communic
           `fipy.tools.serialComm`. Select `fipy.tools.serialComm` to create a
           serial mesh when running in parallel. Mostly used for test
           purposes.
+        - `blocks`: the number of blocks to divide the mesh into along
+          each axis for parallel simulations, e.g., ``(2, 2)``. Any axis
+          given as `None`, or both if `blocks` is `None`, is divided so as
+          to use as many processors as possible with the fewest cells on
+          the boundaries between blocks.
 
     >>> print Grid2D(Lx=3., nx=2).dx
     1.5
@@ -159,10 +171,12 @@ def Grid2D(dx=1., dy=1., nx=None, ny=None, Lx=None, Ly=None, overlap=2, communic
         return UniformGrid2D(dx=dx, dy=dy,
                              nx=nx, ny=ny,
                              overlap=overlap,
-                             communicator=communicator)
+                             communicator=communicator,
+                             blocks=blocks)
     else:
         from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
-        return NonUniformGrid2D(dx=dx, dy=dy, nx=nx, ny=ny, overlap=overlap, communicator=communicator)
+        return NonUniformGrid2D(dx=dx, dy=dy, nx=nx, ny=ny, overlap=overlap, communicator=communicator,
+                                blocks=blocks)
 
 def Grid1D(dx=1., nx=None, Lx=None, overlap=2, communicator=parallelComm):
     r""" Factory function to select between UniformGrid1D and
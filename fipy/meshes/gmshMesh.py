@@ -54,7 +54,7 @@ from fipy.tests.doctestPlus import register_skipper
 
 from fipy.meshes.mesh import Mesh
 from fipy.meshes.mesh2D import Mesh2D
-from fipy.meshes.topologies.meshTopology import _MeshTopology
+from fipy.meshes.topologies.meshTopology import _PartitionedMeshTopology
 
 from fipy.tools.debug import PRINT
 
@@ -64,6 +64,11 @@ __all__ = ["openMSHFile", "openPOSFile",
 
 DEBUG = False
 
+# part of every mesh cache key; increment it whenever `MSHFile` reads a
+# file differently or `_CachedMSHFile` stores different arrays, so that
+# entries written by the old reader are not used
+_readerVersion = 1
+
 def _checkForGmsh():
     hasGmsh = True
     try:
@@ -139,11 +144,6 @@ def openMSHFile(name, dimensions=None, coordDimensions=None, communicator=parall
     if order > 1:
         communicator = serialComm
 
-    # Enforce gmsh version to be either >= 2 or 2.5, based on Nproc.
-    version = _gmshVersion(communicator=communicator)
-    if version < StrictVersion("2.0"):
-        raise EnvironmentError("Gmsh version must be >= 2.0.")
-
     # If we're being passed a .msh file, leave it be. Otherwise,
     # we've gotta compile a .msh file from either (i) a .geo file,
     # or (ii) a gmsh script passed as a string.
@@ -181,6 +181,11 @@ def openMSHFile(name, dimensions=None, coordDimensions=None, communicator=parall
                 geoFile = name
 
         if geoFile is not None:
+            # Enforce gmsh version to be either >= 2 or 2.5, based on Nproc.
+            version = _gmshVersion(communicator=communicator)
+            if version < StrictVersion("2.0"):
+                raise EnvironmentError("Gmsh version must be >= 2.0.")
+
             gmshFlags = ["-%d" % dimensions, "-nopopup"]
 
             if communicator.Nproc > 1:
@@ -494,9 +499,13 @@ class MSHFile(GmshFile):
 
     Does not support gmsh versions < 2. If partitioning, gmsh
     version must be >= 2.5.
-
-    TODO: Refactor face extraction functions.
     """
+
+    # Gmsh-order IDs of the cells, faces and vertices, if `read` reordered them
+    originalCellIDs = None
+    originalFaceIDs = None
+    originalVertexIDs = None
+
     def __init__(self, filename,
                        dimensions,
                        coordDimensions=None,
@@ -526,173 +535,380 @@ class MSHFile(GmshFile):
 
         GmshFile.__init__(self, filename=filename, communicator=communicator, mode=mode, fileIsTemporary=fileIsTemporary)
 
-    def _getMetaData(self):
-        """
-        Extracts gmshVersion, file-type, and data-size in that
-        order.
-        """
-        self._seekForHeader("MeshFormat")
-        metaData = self.fileobj.readline().split()
-        self.fileobj.seek(0)
-        return [float(x) for x in metaData]
+    # number of nodes of each type of Gmsh element, needed to read binary files
+    _nodesPerElement = { 1: 2,  2: 3,  3: 4,  4: 4,  5: 8,  6: 6,  7: 5,  8: 3,
+                         9: 6, 10: 9, 11: 10, 12: 27, 13: 18, 14: 14, 15: 1, 16: 8,
+                        17: 20, 18: 15, 19: 13, 20: 9, 21: 10, 22: 12, 23: 15,
+                        24: 15, 25: 21, 26: 4, 27: 5, 28: 6, 29: 20, 30: 35,
+                        31: 56, 92: 64, 93: 125}
+
+    # lines of ASCII data parsed at a time
+    _chunkLines = 2**16
 
-    def _isolateData(self, title):
+    def _readSections(self):
         """
-        Gets all data between $[title] and $End[title], writes
-        it out to its own file.
+        Read the file in a single pass, handing each section we need to its
+        reader and skipping the rest.
+
+        Sets `version`, `fileType` and `dataSize` from $MeshFormat,
+        `physicalNames` from $PhysicalNames, `nodeTags` and `nodeCoords`
+        from $Nodes, and `elements` from $Elements.
         """
-        newF, newPath = tempfile.mkstemp(title, text=True)
-        newF = os.fdopen(newF, 'w')
-        try:
-            self._seekForHeader(title)
-        except Exception, e:
-            newF.close()
-            os.unlink(newPath)
-            raise
-
-        # extract the actual data within section
-        while True:
-            line = self.fileobj.readline()
-            if ("$End%s" % title) not in line:
-                newF.write(line)
-            else: break
+        readers = {"MeshFormat": self._readMeshFormat,
+                   "PhysicalNames": self._readPhysicalNames,
+                   "Entities": self._readEntities,
+                   "PartitionedEntities": self._readPartitionedEntities,
+                   "Nodes": self._readNodes,
+                   "Elements": self._readElements}
+
+        self.version = None
+        self.physicalNames = {
+            0: dict(),
+            1: dict(),
+            2: dict(),
+            3: dict()
+        }
+        self.entityPhysicalTags = {}
+        self.nodeTags = self.nodeCoords = self.elements = None
 
         self.fileobj.seek(0)
-        newF.close()
-        return newPath
+        while True:
+            line = self.fileobj.readline()
+            if len(line) == 0:
+                break
+            line = line.strip()
+            if line.startswith("$") and not line.startswith("$End"):
+                title = line[1:]
+                if title in readers:
+                    readers[title]()
+                self._skipSection(title)
+
+        for title, value in [("MeshFormat", self.version),
+                             ("Nodes", self.nodeTags),
+                             ("Elements", self.elements)]:
+            if value is None:
+                raise EOFError("No `%s' header found!" % title)
 
-    def _seekForHeader(self, title):
+    def _skipSection(self, title):
         """
-        Iterate through a file until we end up at the section header
-        for `title`. Function has obvious side-effects on `self.fileobj`.
+        Read up to and including $End[title].
         """
         while True:
             line = self.fileobj.readline()
             if len(line) == 0:
-                raise EOFError("No `%s' header found!" % title)
+                raise EOFError("No `$End%s' found!" % title)
+            elif line.startswith("$End%s" % title):
                 break
-            elif (("$%s" % title) not in line):
-                continue
+
+    def _readMeshFormat(self):
+        version, fileType, dataSize = self.fileobj.readline().split()
+        self.version = float(version)
+        self.fileType = int(fileType)
+        self.dataSize = int(dataSize)
+
+        if 3 <= self.version < 4.1:
+            raise GmshException("MSH file format version %s is not supported; use 2.2 or 4.1" % version)
+
+        if self.fileType == 1:
+            if 'b' not in self.mode:
+                # reopen, so that newline translation can't corrupt the data
+                position = self.fileobj.tell()
+                self.fileobj.close()
+                self.fileobj = open(self.filename, self.mode + 'b')
+                self.fileobj.seek(position)
+
+            # the integer 1, written in the byte order of the file
+            one = nx.frombuffer(self.fileobj.read(4), dtype='<i4')[0]
+            if one == 1:
+                self.byteOrder = '<'
             else:
-                break # found header
+                self.byteOrder = '>'
 
-    def _deriveCellsAndFaces(self, cellsToVertIDs, shapeTypes, numCells):
+        # size of the `size_t` counts and tags of MSH 4 binary files
+        self._size_t = 'u%d' % self.dataSize
+
+    def _readBinary(self, dtype, count):
         """
-        Uses element information obtained from `_parseElementFile` to deliver
-        `facesToVertices` and `cellsToFaces`.
+        Read `count` values of `dtype` from a binary file.
         """
+        dtype = nx.dtype(dtype).newbyteorder(self.byteOrder)
+        data = nx.frombuffer(self.fileobj.read(dtype.itemsize * count), dtype=dtype, count=count)
+        return data.astype(dtype.newbyteorder('='))
 
-        allShapes  = nx.unique(shapeTypes).tolist()
-        maxFaces   = max([self.numFacesPerCell[x] for x in allShapes])
+    def _readASCII(self, lines, dtype):
+        """
+        Read the numbers on the next `lines` lines, and how many there are
+        on each line.
 
-        # `cellsToFaces` must be padded with -1; see mesh.py
-        currNumFaces = 0
-        cellsToFaces = nx.ones((numCells, maxFaces), 'l') * -1
-        facesDict    = {}
-        uniqueFaces  = []
-
-        # we now build `cellsToFaces` and `uniqueFaces`,
-        # the latter will result in `facesToVertices`.
-        for cellIdx in range(numCells):
-            shapeType = shapeTypes[cellIdx]
-            cell = cellsToVertIDs[cellIdx]
-
-            if shapeType in [5, 12, 17]: # hexahedron
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2, 3], # ordering of vertices gleaned from
-                                                                 [4, 5, 6, 7], # a one-cube Grid3D example
-                                                                 [0, 1, 5, 4],
-                                                                 [3, 2, 6, 7],
-                                                                 [0, 3, 7, 4],
-                                                                 [1, 2, 6, 5]])
-            elif shapeType in [6, 13, 18]: # prism
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2],
-                                                                 [5, 4, 3],
-                                                                 [3, 4, 1, 0],
-                                                                 [4, 5, 2, 1],
-                                                                 [5, 3, 0, 2]])
-            elif shapeType in [7, 14, 19]: # pyramid
-                faces = self._extractOrderedFaces(cell=cell,
-                                                  faceOrderings=[[0, 1, 2, 3],
-                                                                 [0, 1, 4],
-                                                                 [1, 2, 4],
-                                                                 [2, 3, 4],
-                                                                 [3, 0, 4]])
+        Lines are parsed in chunks, so memory use follows the size of the
+        numbers rather than of the text.
+        """
+        values = [nx.zeros((0,), dtype=dtype)]
+        counts = [nx.zeros((0,), dtype=nx.INT_DTYPE)]
+        while lines > 0:
+            chunk = "".join([self.fileobj.readline() for i in range(min(lines, self._chunkLines))])
+            if not chunk.endswith("\n"):
+                chunk += "\n"
+            values.append(nx.fromstring(chunk, dtype=dtype, sep=" "))
+            counts.append(_tokensPerLine(chunk))
+            lines -= self._chunkLines
+
+        return nx.concatenate(values), nx.concatenate(counts)
+
+    def _readCounts(self, count):
+        """
+        Read the `count` numbers that start a section of a MSH 4 file.
+        """
+        if self.fileType == 1:
+            return [int(x) for x in self._readBinary(self._size_t, count)]
+        else:
+            return [int(x) for x in self.fileobj.readline().split()]
+
+    def _readPhysicalNames(self):
+        for i in range(int(self.fileobj.readline())):
+            nm = self.fileobj.readline().split()
+            if self.version > 2.0:
+                dim = [int(nm.pop(0))]
             else:
-                if shapeType in [2, 9, 20, 21, 22, 23, 24, 25]:
-                    faceLength = 2 # triangle
-                elif shapeType in [3, 10, 16]:
-                    faceLength = 2 # quadrangle
-                elif shapeType in [4, 11, 29, 30, 31]:
-                    faceLength = 3 # tetrahedron
-
-                faces = self._extractRegularFaces(cell=cell,
-                                                  faceLength=faceLength,
-                                                  facesPerCell=self.numFacesPerCell[shapeType])
-
-            for faceIdx in range(len(faces)):
-                # NB: currFace is sorted for the key to spot duplicates
-                currFace = faces[faceIdx]
-                keyStr   = ' '.join([str(x) for x in sorted(currFace)])
-
-                if keyStr in facesDict:
-                    cellsToFaces[cellIdx][faceIdx] = facesDict[keyStr]
-                else: # new face
-                    facesDict[keyStr] = currNumFaces
-                    cellsToFaces[cellIdx][faceIdx] = currNumFaces
-                    uniqueFaces.append(currFace)
-                    currNumFaces += 1
-
-        # pad short faces with -1
-        maxFaceLen = max([len(f) for f in uniqueFaces])
-        uniqueFaces = [[-1] * (maxFaceLen - len(f)) + f for f in uniqueFaces]
-
-        facesToVertices = nx.array(uniqueFaces, dtype=nx.INT_DTYPE)
-
-        return facesToVertices.swapaxes(0,1)[::-1], cellsToFaces.swapaxes(0,1).copy('C'), facesDict
+                # Gmsh format prior to 2.1 did not unambiguously tie
+                # physical names to physical entities of different dimensions
+                # http://article.gmane.org/gmane.comp.cad.gmsh.general/1601
+                dim = [0, 1, 2, 3]
+            num = int(nm.pop(0))
+            name = " ".join(nm)[1:-1]
+            for d in dim:
+                self.physicalNames[d][name] = int(num)
+
+    def _readEntities(self):
+        """
+        Record the first physical tag of each geometrical entity of a MSH 4
+        file, as MSH 4 elements only refer to their entity.
+        """
+        for dim, count in enumerate(self._readCounts(4)):
+            for i in range(count):
+                if self.fileType == 1:
+                    tag = self._readBinary('i4', 1)[0]
+                    # point coordinates or bounding box
+                    if dim == 0:
+                        self._readBinary('f8', 3)
+                    else:
+                        self._readBinary('f8', 6)
+                    physical = self._readBinary('i4', int(self._readBinary(self._size_t, 1)[0]))
+                    if dim > 0:
+                        # bounding entities
+                        self._readBinary('i4', int(self._readBinary(self._size_t, 1)[0]))
+                else:
+                    line = [int(float(x)) for x in self.fileobj.readline().split()]
+                    tag = line[0]
+                    if dim == 0:
+                        line = line[4:]
+                    else:
+                        line = line[7:]
+                    physical = line[1:1 + line[0]]
 
-    def _translateNodesToVertices(self, entitiesNodes, vertexMap):
-        """Translates entitiesNodes from Gmsh node IDs to `vertexCoords` indices.
+                if len(physical) > 0:
+                    self.entityPhysicalTags[(dim, int(tag))] = int(physical[0])
+
+    def _readPartitionedEntities(self):
+        raise GmshException("Partitioned MSH 4 files are not supported; partition in MSH 2.2 format instead")
+
+    def _readNodes(self):
+        """
+        Read the tags of the nodes into `nodeTags` and their coordinates, as
+        rows of an (N, 3) array, into `nodeCoords`.
         """
-        entitiesVertices = []
+        if self.version < 3:
+            numNodes = int(self.fileobj.readline())
+            if self.fileType == 1:
+                nodes = self._readBinary([('tag', 'i4'), ('coords', 'f8', (3,))], numNodes)
+                self.nodeTags = nodes['tag'].astype(nx.INT_DTYPE)
+                self.nodeCoords = nodes['coords'].copy()
+            else:
+                values, counts = self._readASCII(numNodes, float)
+                values = values.reshape((numNodes, 4))
+                self.nodeTags = values[:, 0].astype(nx.INT_DTYPE)
+                self.nodeCoords = values[:, 1:].copy()
+        else:
+            numBlocks = self._readCounts(4)[0]
+            tags = [nx.zeros((0,), dtype=nx.INT_DTYPE)]
+            coords = [nx.zeros((0, 3), 'd')]
+            for block in range(numBlocks):
+                if self.fileType == 1:
+                    entityDim, entityTag, parametric = [int(x) for x in self._readBinary('i4', 3)]
+                    numNodes = int(self._readBinary(self._size_t, 1)[0])
+                    # parametric nodes also have a coordinate per dimension of their entity
+                    width = 3 + parametric * entityDim
+                    tags.append(self._readBinary(self._size_t, numNodes).astype(nx.INT_DTYPE))
+                    coords.append(self._readBinary('f8', numNodes * width).reshape((numNodes, width))[:, :3])
+                else:
+                    entityDim, entityTag, parametric, numNodes = [int(x) for x in self.fileobj.readline().split()]
+                    width = 3 + parametric * entityDim
+                    tags.append(self._readASCII(numNodes, nx.INT_DTYPE)[0])
+                    coords.append(self._readASCII(numNodes, float)[0].reshape((numNodes, width))[:, :3])
 
-        for entity in entitiesNodes:
-            try:
-                vertIndices = vertexMap[nx.array(entity)]
-            except IndexError:
-                vertIndices = nx.ones((len(entity),), 'l') * -1
-            entitiesVertices.append(vertIndices)
+            self.nodeTags = nx.concatenate(tags)
+            self.nodeCoords = nx.concatenate(coords)
 
-        return entitiesVertices
+    def _readElements(self):
+        """
+        Read all elements into `elements`.
+        """
+        numTags = [nx.zeros((0,), dtype=nx.INT_DTYPE)]
+        tags = [nx.zeros((0, 0), dtype=nx.INT_DTYPE)]
+        nodes = [nx.zeros((0, 0), dtype=nx.INT_DTYPE)]
+        IDs = [nx.zeros((0,), dtype=nx.INT_DTYPE)]
+        shapes = [nx.zeros((0,), dtype=nx.INT_DTYPE)]
+
+        if self.version < 3:
+            numElements = int(self.fileobj.readline())
+            if self.fileType == 1:
+                # elements come in blocks of the same type and number of tags
+                read = 0
+                while read < numElements:
+                    elType, count, blockTags = [int(x) for x in self._readBinary('i4', 3)]
+                    data = self._readBinary('i4', count * (1 + blockTags + self._nodesPerElement[elType]))
+                    data = data.reshape((count, -1)).astype(nx.INT_DTYPE)
+                    IDs.append(data[:, 0])
+                    shapes.append(nx.repeat([elType], count))
+                    numTags.append(nx.repeat([blockTags], count))
+                    tags.append(data[:, 1:1 + blockTags])
+                    nodes.append(data[:, 1 + blockTags:])
+                    read += count
+            else:
+                values, counts = self._readASCII(numElements, nx.INT_DTYPE)
+                starts = nx.cumsum(counts) - counts
+                IDs.append(values[starts])
+                shapes.append(values[starts + 1])
+                numTags.append(values[starts + 2])
+                tags.append(_ragged(values, starts + 3, numTags[-1], fill=0))
+                nodes.append(_ragged(values, starts + 3 + numTags[-1], counts - 3 - numTags[-1], fill=-1))
+        else:
+            numBlocks = self._readCounts(4)[0]
+            for block in range(numBlocks):
+                if self.fileType == 1:
+                    entityDim, entityTag, elType = [int(x) for x in self._readBinary('i4', 3)]
+                    count = int(self._readBinary(self._size_t, 1)[0])
+                    data = self._readBinary(self._size_t, count * (1 + self._nodesPerElement[elType]))
+                else:
+                    entityDim, entityTag, elType, count = [int(x) for x in self.fileobj.readline().split()]
+                    data = self._readASCII(count, nx.INT_DTYPE)[0]
+                if count == 0:
+                    continue
+                data = data.reshape((count, -1)).astype(nx.INT_DTYPE)
+
+                # MSH 4 elements refer to their entity, which has the physical tags;
+                # write them the way MSH 2 does
+                physical = self.entityPhysicalTags.get((entityDim, entityTag), 0)
+                IDs.append(data[:, 0])
+                shapes.append(nx.repeat([elType], count))
+                numTags.append(nx.repeat([2], count))
+                tags.append(nx.resize(nx.array([physical, entityTag], dtype=nx.INT_DTYPE), (count, 2)))
+                nodes.append(data[:, 1:])
+
+        physicalEntities, geometricalEntities, partitions = self._parseTags(_stacked(numTags, fill=0),
+                                                                            _stacked(tags, fill=0))
+        self.elements = _ElementData(nodes=_stacked(nodes, fill=-1),
+                                     shapes=_stacked(shapes, fill=0),
+                                     idmap=_stacked(IDs, fill=0),
+                                     physicalEntities=physicalEntities,
+                                     geometricalEntities=geometricalEntities,
+                                     partitions=partitions)
 
-    def _extractRegularFaces(self, cell, faceLength, facesPerCell):
-        """Return faces for a regular poly(gon|hedron)
+    def _deriveCellsAndFaces(self, cellsToVertIDs, shapeTypes, numCells):
+        """
+        Uses element information obtained from `_parseElementFile` to deliver
+        `facesToVertices` and `cellsToFaces`.
+
+        Every face of every cell is gathered into one array. Faces whose
+        sorted vertices agree are the same face, and are numbered in the
+        order that the cells first use them.
 
-        Given `cell`, defined by node IDs, returns an array of
-        `facesPerCell` faces of length `faceLength` in terms of nodes.
+        Also returns the vertices of each face, in the order of
+        `facesToVertices` but padded with -1 at the end.
         """
-        faces = []
-        for i in range(facesPerCell):
-            aFace = []
-            for j in range(faceLength):
-                aVertex = (i + j) % len(cell) # we may wrap
-                aFace.append(int(cell[aVertex]))
-            faces.append(aFace)
-        return faces
-
-    def _extractOrderedFaces(self, cell, faceOrderings):
-        """Return faces for a 8-node hexahedron cell.
+        numVerts = (cellsToVertIDs >= 0).sum(axis=1)
+        maxFaces = max([self.numFacesPerCell[x] for x in nx.unique(shapeTypes)])
+
+        # the faces of each cell, as lists of positions in the cell
+        templates = {}
+        for shapeType in nx.unique(shapeTypes):
+            for numVert in nx.unique(numVerts[shapeTypes == shapeType]):
+                templates[(shapeType, numVert)] = self._faceTemplate(shapeType, numVert)
+        maxFaceLen = max([len(f) for t in templates.values() for f in t])
+
+        # all faces of all cells, in cell order, padded with -1
+        cellFaces = nx.zeros((numCells, maxFaces, maxFaceLen), dtype=nx.INT_DTYPE) - 1
+        for (shapeType, numVert), template in templates.items():
+            cells = nx.nonzero((shapeTypes == shapeType) & (numVerts == numVert))[0]
+            for faceIdx, face in enumerate(template):
+                cellFaces[cells, faceIdx, :len(face)] = cellsToVertIDs[cells][:, face]
+
+        cellFaces = cellFaces.reshape((numCells * maxFaces, maxFaceLen))
+        present = cellFaces[:, 0] >= 0
+        allFaces = cellFaces[present]
+
+        # NB: faces are sorted to spot duplicates
+        first, faceIDs = _uniqueRows(nx.sort(allFaces, axis=1))
+        uniqueFaces = allFaces[first]
+
+        # `cellsToFaces` must be padded with -1; see mesh.py
+        cellsToFaces = nx.zeros((numCells * maxFaces,), 'l') - 1
+        cellsToFaces[present] = faceIDs
+        cellsToFaces = cellsToFaces.reshape((numCells, maxFaces))
+
+        # pad short faces with -1 in front
+        faceLens = (uniqueFaces >= 0).sum(axis=1)
+        maxFaceLen = faceLens.max()
+        columns = nx.arange(maxFaceLen)[nx.newaxis, :] - (maxFaceLen - faceLens)[:, nx.newaxis]
+        facesToVertices = nx.where(columns >= 0,
+                                   uniqueFaces[nx.arange(len(uniqueFaces))[:, nx.newaxis], columns.clip(min=0)],
+                                   -1).astype(nx.INT_DTYPE)
+
+        return facesToVertices.swapaxes(0,1)[::-1], cellsToFaces.swapaxes(0,1).copy('C'), uniqueFaces
+
+    def _faceTemplate(self, shapeType, numVert):
+        """Return the faces of a cell of `shapeType` with `numVert` vertices,
+        as lists of the positions of their vertices in the cell.
         """
-        def orderingToFace(vertList):
-            aFace = []
-            for i in vertList:
-                aFace.append(int(cell[i]))
-            return aFace
+        if shapeType in [5, 12, 17]: # hexahedron
+            return [[0, 1, 2, 3], # ordering of vertices gleaned from
+                    [4, 5, 6, 7], # a one-cube Grid3D example
+                    [0, 1, 5, 4],
+                    [3, 2, 6, 7],
+                    [0, 3, 7, 4],
+                    [1, 2, 6, 5]]
+        elif shapeType in [6, 13, 18]: # prism
+            return [[0, 1, 2],
+                    [5, 4, 3],
+                    [3, 4, 1, 0],
+                    [4, 5, 2, 1],
+                    [5, 3, 0, 2]]
+        elif shapeType in [7, 14, 19]: # pyramid
+            return [[0, 1, 2, 3],
+                    [0, 1, 4],
+                    [1, 2, 4],
+                    [2, 3, 4],
+                    [3, 0, 4]]
+        else:
+            if shapeType in [2, 9, 20, 21, 22, 23, 24, 25]:
+                faceLength = 2 # triangle
+            elif shapeType in [3, 10, 16]:
+                faceLength = 2 # quadrangle
+            elif shapeType in [4, 11, 29, 30, 31]:
+                faceLength = 3 # tetrahedron
+
+            # we may wrap
+            return [[(i + j) % numVert for j in range(faceLength)]
+                    for i in range(self.numFacesPerCell[shapeType])]
 
-        return [orderingToFace(o) for o in faceOrderings]
+    def _translateNodesToVertices(self, entitiesNodes, vertexMap):
+        """Translates entitiesNodes, padded with -1, from Gmsh node IDs to
+        `vertexCoords` indices. Nodes that are not vertices become -1.
+        """
+        valid = (entitiesNodes >= 0) & (entitiesNodes < len(vertexMap))
+        return nx.where(valid, vertexMap[nx.where(valid, entitiesNodes, 0)], -1)
 
-    def read(self):
+    def read(self, reorder=None):
         """
         0. Build cellsToVertices
         1. Recover needed vertexCoords and mapping from file using
@@ -700,163 +916,289 @@ class MSHFile(GmshFile):
         2. Build cellsToVertIDs proper from vertexCoords and vertex map
         3. Build faces
         4. Build cellsToFaces
+        5. Optionally renumber cells, faces and vertices; see `_reorder`
 
-        Isolate relevant data into three files, store in
-        `self.nodesPath` for $Nodes,
-        `self.elemsPath` for $Elements.
-        `self.namesFile` for $PhysicalNames.
+        The file is read in a single pass by `_readSections`, which parses
+        the $Nodes and $Elements of ASCII files in bulk and loads those of
+        binary files directly. MSH formats 2.2 and 4.1 are understood,
+        although partitioned meshes must be in format 2.2.
 
         Returns vertexCoords, facesToVertexID, cellsToFaceID,
                 cellGlobalIDMap, ghostCellGlobalIDMap.
         """
-        self.version, self.fileType, self.dataSize = self._getMetaData()
-        self.nodesPath = self._isolateData("Nodes")
-        self.elemsPath = self._isolateData("Elements")
-        try:
-            self.namesPath = self._isolateData("PhysicalNames")
-        except EOFError, e:
-            self.namesPath = None
-
-        try:
-            if self.dimensions is None:
-                nodesFile = open(self.nodesPath, 'r')
-                nodesFile.readline() # skip number of nodes
-
-                # We assume we have a 2D file unless we find a node
-                # with a non-zero Z coordinate
-                self.dimensions = 2
-                for node in nodesFile:
-                    line   = node.split()
+        self._readSections()
 
-                    newVert = [float(x) for x in line]
-
-                    if newVert[2] != 0.0:
-                        self.dimensions = 3
-                        break
-
-                nodesFile.close()
-
-            self.coordDimensions = self.coordDimensions or self.dimensions
-
-            # we need a conditional here so we don't pick up 2D shapes in 3D
-            if self.dimensions == 2:
-                self.numVertsPerFace = {1: 2, # 2-node line
-                                        8: 2} # 3-node line
-                self.numFacesPerCell = { 2: 3, # 3-node triangle (3 faces)
-                                         9: 3, # 6-node triangle (we only read 1st 3)
-                                        20: 3, # 9-node triangle (we only read 1st 3)
-                                        21: 3, # 10-node triangle (we only read 1st 3)
-                                        22: 3, # 12-node triangle (we only read 1st 3)
-                                        23: 3, # 15-node triangle (we only read 1st 3)
-                                        24: 3, # 15-node triangle (we only read 1st 3)
-                                        25: 3, # 21-node triangle (we only read 1st 3)
-                                         3: 4, # 4-node quadrangle (4 faces)
-                                        10: 4, # 9-node quadrangle (we only read 1st 4)
-                                        16: 4} # 8-node quadrangle (we only read 1st 4)
-            elif self.dimensions == 3:
-                self.numVertsPerFace = { 2: 3, # 3-node triangle (3 vertices)
-                                         9: 3, # 6-node triangle (we only read 1st 3)
-                                        20: 3, # 9-node triangle (we only read 1st 3)
-                                        21: 3, # 10-node triangle (we only read 1st 3)
-                                        22: 3, # 12-node triangle (we only read 1st 3)
-                                        23: 3, # 15-node triangle (we only read 1st 3)
-                                        24: 3, # 15-node triangle (we only read 1st 3)
-                                        25: 3, # 21-node triangle (we only read 1st 3)
-                                         3: 4, # 4-node quadrangle (4 vertices)
-                                        10: 4, # 9-node quadrangle (we only read 1st 4)
-                                        16: 4} # 8-node quadrangle (we only read 1st 4)
-                self.numFacesPerCell = { 4: 4, # 4-node tetrahedron (4 faces)
-                                        11: 4, # 10-node tetrahedron (we only read 1st 4)
-                                        29: 4, # 20-node tetrahedron (we only read 1st 4)
-                                        30: 4, # 35-node tetrahedron (we only read 1st 4)
-                                        31: 4, # 56-node tetrahedron (we only read 1st 4)
-                                         5: 6, # 8-node hexahedron (6 faces)
-                                        12: 6, # 27-node tetrahedron (we only read 1st 6)
-                                        17: 6, # 20-node tetrahedron (we only read 1st 6)
-                                         6: 5, # 6-node prism (5 faces)
-                                        13: 5, # 18-node prism (we only read 1st 6)
-                                        18: 5, # 15-node prism (we only read 1st 6)
-                                         7: 5, # 5-node pyramid (5 faces)
-                                        14: 5, # 14-node pyramid (we only read 1st 5)
-                                        19: 5} # 13-node pyramid (we only read 1st 5)
+        if self.dimensions is None:
+            # We assume we have a 2D file unless we find a node
+            # with a non-zero Z coordinate
+            if nx.sometrue(self.nodeCoords[:, 2] != 0.0):
+                self.dimensions = 3
             else:
-                raise GmshException("Mesh has fewer than 2 or more than 3 dimensions")
-
-            parprint("Parsing elements.")
-            (cellsData,
-             ghostsData,
-             facesData) = self._parseElementFile()
-
-            cellsToGmshVerts = cellsData.nodes + ghostsData.nodes
-            numCellsTotal    = len(cellsData.nodes) + len(ghostsData.nodes)
-            allShapeTypes    = cellsData.shapes + ghostsData.shapes
-            allShapeTypes    = nx.array(allShapeTypes)
-            allShapeTypes    = nx.delete(allShapeTypes, nx.s_[numCellsTotal:])
-            self.physicalCellMap = nx.array(cellsData.physicalEntities
-                                            + ghostsData.physicalEntities)
-            self.geometricalCellMap = nx.array(cellsData.geometricalEntities
-                                               + ghostsData.geometricalEntities)
-
-            if numCellsTotal < 1:
-                errStr = "Gmsh hasn't produced any cells! Check your Gmsh code."
-                errStr += "\n\nGmsh output:\n%s" % "".join(self.gmshOutput).rstrip()
-                raise GmshException(errStr)
-
-            parprint("Recovering coords.")
-            parprint("numcells %d" % numCellsTotal)
-            vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(cellsToGmshVerts)
-
-            # translate Gmsh IDs to `vertexCoord` indices
-            cellsToVertIDs = self._translateNodesToVertices(cellsToGmshVerts,
-                                                            vertIDtoIdx)
-
-            parprint("Building cells and faces.")
-            (facesToV,
-             cellsToF,
-             facesDict) = self._deriveCellsAndFaces(cellsToVertIDs,
-                                                    allShapeTypes,
-                                                    numCellsTotal)
-
-            # cell entities were easy to record on parsing
-            # but we don't use Gmsh faces, so we need to correlate the nodes
-            # that make up the Gmsh faces with the vertex IDs of the FiPy faces
-            # so that we can check if any are named
-            faceEntitiesDict = dict()
-
-            # translate Gmsh IDs to `vertexCoord` indices
-            facesToVertIDs = self._translateNodesToVertices(facesData.nodes,
-                                                            vertIDtoIdx)
-
-            for face, physicalEntity, geometricalEntity in zip(facesToVertIDs,
-                                                               facesData.physicalEntities,
-                                                               facesData.geometricalEntities):
-                faceEntitiesDict[' '.join([str(x) for x in sorted(face)])] = (physicalEntity, geometricalEntity)
-
-            self.physicalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
-            self.geometricalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
-            for face in facesDict.keys():
-                # not all faces are necessarily tagged
-                if face in faceEntitiesDict:
-                    self.physicalFaceMap[facesDict[face]] = faceEntitiesDict[face][0]
-                    self.geometricalFaceMap[facesDict[face]] = faceEntitiesDict[face][1]
-
-            self.physicalNames = self._parseNamesFile()
-
-        finally:
-            os.unlink(self.nodesPath)
-            os.unlink(self.elemsPath)
-            if self.namesPath is not None:
-                os.unlink(self.namesPath)
-
-        # convert lists of cell vertices to a properly oriented masked array
-        maxVerts = max([len(v) for v in cellsToVertIDs])
-        # ticket:539 - NumPy 1.7 casts to array before concatenation and empty array defaults to float
-        cellsToVertIDs = [nx.concatenate((v, nx.array([-1] * (maxVerts-len(v)), dtype=nx.INT_DTYPE))) for v in cellsToVertIDs]
+                self.dimensions = 2
+
+        self.coordDimensions = self.coordDimensions or self.dimensions
+
+        # we need a conditional here so we don't pick up 2D shapes in 3D
+        if self.dimensions == 2:
+            self.numVertsPerFace = {1: 2, # 2-node line
+                                    8: 2} # 3-node line
+            self.numFacesPerCell = { 2: 3, # 3-node triangle (3 faces)
+                                     9: 3, # 6-node triangle (we only read 1st 3)
+                                    20: 3, # 9-node triangle (we only read 1st 3)
+                                    21: 3, # 10-node triangle (we only read 1st 3)
+                                    22: 3, # 12-node triangle (we only read 1st 3)
+                                    23: 3, # 15-node triangle (we only read 1st 3)
+                                    24: 3, # 15-node triangle (we only read 1st 3)
+                                    25: 3, # 21-node triangle (we only read 1st 3)
+                                     3: 4, # 4-node quadrangle (4 faces)
+                                    10: 4, # 9-node quadrangle (we only read 1st 4)
+                                    16: 4} # 8-node quadrangle (we only read 1st 4)
+        elif self.dimensions == 3:
+            self.numVertsPerFace = { 2: 3, # 3-node triangle (3 vertices)
+                                     9: 3, # 6-node triangle (we only read 1st 3)
+                                    20: 3, # 9-node triangle (we only read 1st 3)
+                                    21: 3, # 10-node triangle (we only read 1st 3)
+                                    22: 3, # 12-node triangle (we only read 1st 3)
+                                    23: 3, # 15-node triangle (we only read 1st 3)
+                                    24: 3, # 15-node triangle (we only read 1st 3)
+                                    25: 3, # 21-node triangle (we only read 1st 3)
+                                     3: 4, # 4-node quadrangle (4 vertices)
+                                    10: 4, # 9-node quadrangle (we only read 1st 4)
+                                    16: 4} # 8-node quadrangle (we only read 1st 4)
+            self.numFacesPerCell = { 4: 4, # 4-node tetrahedron (4 faces)
+                                    11: 4, # 10-node tetrahedron (we only read 1st 4)
+                                    29: 4, # 20-node tetrahedron (we only read 1st 4)
+                                    30: 4, # 35-node tetrahedron (we only read 1st 4)
+                                    31: 4, # 56-node tetrahedron (we only read 1st 4)
+                                     5: 6, # 8-node hexahedron (6 faces)
+                                    12: 6, # 27-node tetrahedron (we only read 1st 6)
+                                    17: 6, # 20-node tetrahedron (we only read 1st 6)
+                                     6: 5, # 6-node prism (5 faces)
+                                    13: 5, # 18-node prism (we only read 1st 6)
+                                    18: 5, # 15-node prism (we only read 1st 6)
+                                     7: 5, # 5-node pyramid (5 faces)
+                                    14: 5, # 14-node pyramid (we only read 1st 5)
+                                    19: 5} # 13-node pyramid (we only read 1st 5)
+        else:
+            raise GmshException("Mesh has fewer than 2 or more than 3 dimensions")
+
+        parprint("Parsing elements.")
+        (cellsData,
+         ghostsData,
+         facesData) = self._parseElementFile()
+
+        cellsToGmshVerts = nx.concatenate((cellsData.nodes, ghostsData.nodes))
+        numCellsTotal    = len(cellsToGmshVerts)
+        allShapeTypes    = nx.concatenate((cellsData.shapes, ghostsData.shapes))
+        self.physicalCellMap = nx.concatenate((cellsData.physicalEntities,
+                                               ghostsData.physicalEntities))
+        self.geometricalCellMap = nx.concatenate((cellsData.geometricalEntities,
+                                                  ghostsData.geometricalEntities))
+
+        if numCellsTotal < 1:
+            errStr = "Gmsh hasn't produced any cells! Check your Gmsh code."
+            errStr += "\n\nGmsh output:\n%s" % "".join(self.gmshOutput).rstrip()
+            raise GmshException(errStr)
+
+        # drop the padding that only longer faces need
+        cellsToGmshVerts = cellsToGmshVerts[:, :(cellsToGmshVerts >= 0).sum(axis=1).max()]
+
+        parprint("Recovering coords.")
+        parprint("numcells %d" % numCellsTotal)
+        vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(cellsToGmshVerts)
+
+        # translate Gmsh IDs to `vertexCoord` indices
+        cellsToVertIDs = self._translateNodesToVertices(cellsToGmshVerts,
+                                                        vertIDtoIdx)
+
+        parprint("Building cells and faces.")
+        (facesToV,
+         cellsToF,
+         uniqueFaces) = self._deriveCellsAndFaces(cellsToVertIDs,
+                                                  allShapeTypes,
+                                                  numCellsTotal)
+
+        # cell entities were easy to record on parsing
+        # but we don't use Gmsh faces, so we need to correlate the nodes
+        # that make up the Gmsh faces with the vertex IDs of the FiPy faces
+        # so that we can check if any are named
+
+        # translate Gmsh IDs to `vertexCoord` indices
+        facesToVertIDs = self._translateNodesToVertices(facesData.nodes,
+                                                        vertIDtoIdx)
+
+        # Gmsh faces with nodes that aren't vertices can't be FiPy faces
+        known = nx.nonzero(((facesToVertIDs >= 0) == (facesData.nodes >= 0)).all(axis=1))[0]
+        gmshFaces = _lastMatches(uniqueFaces, facesToVertIDs[known])
+
+        # not all faces are necessarily tagged
+        tagged = gmshFaces >= 0
+        gmshFaces = known[gmshFaces[tagged]]
+
+        self.physicalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
+        self.geometricalFaceMap = nx.zeros(facesToV.shape[-1:], 'l')
+        self.physicalFaceMap[tagged] = facesData.physicalEntities[gmshFaces]
+        self.geometricalFaceMap[tagged] = facesData.geometricalEntities[gmshFaces]
+
+        # release what was read from the file
+        self.nodeTags = self.nodeCoords = self.elements = None
+
+        # convert padded cell vertices to a properly oriented masked array
         cellsToVertIDs = nx.MA.masked_equal(cellsToVertIDs, value=-1).swapaxes(0,1)
 
         parprint("Done with cells and faces.")
+
+        cellGlobalIDs = cellsData.idmap.tolist()
+        ghostCellGlobalIDs = ghostsData.idmap.tolist()
+        if reorder is not None:
+            parprint("Reordering cells, faces and vertices.")
+            (vertexCoords, facesToV, cellsToF,
+             cellGlobalIDs, ghostCellGlobalIDs,
+             cellsToVertIDs) = self._reorder(reorder, vertexCoords, facesToV, cellsToF,
+                                             cellGlobalIDs, ghostCellGlobalIDs, cellsToVertIDs)
+
+        return (vertexCoords, facesToV, cellsToF,
+                cellGlobalIDs, ghostCellGlobalIDs,
+                cellsToVertIDs)
+
+    def _reorder(self, method, vertexCoords, facesToV, cellsToF,
+                 cellGlobalIDs, ghostCellGlobalIDs, cellsToVertIDs):
+        """Renumber the cells, faces and vertices read from the file.
+
+        Local cells stay ahead of ghost cells. When this process reads the
+        whole mesh, the global cell IDs follow the new order. Otherwise,
+        each process only reorders its own storage, and every cell keeps its
+        global ID from the file, so that the ghost cells of the processes
+        still agree. The Gmsh-order IDs of the renumbered cells, faces and
+        vertices are kept in `originalCellIDs`, `originalFaceIDs` and
+        `originalVertexIDs`.
+
+        :Parameters:
+          - `method`: ``"rcm"`` or ``"morton"``; see
+            :mod:`fipy.meshes.reordering`
+
+        A mesh written from a grid needs no Gmsh to read
+
+        >>> import os, shutil, tempfile
+        >>> from fipy import Grid2D, CellVariable, numerix
+        >>> directory = tempfile.mkdtemp()
+        >>> name = os.path.join(directory, "grid.msh")
+        >>> f = openMSHFile(name, mode='w')
+        >>> f.write(Grid2D(nx=7, ny=5))
+        >>> f.close()
+        >>> plain = Gmsh2D(name)
+
+        Values of the whole mesh, such as the cell centers, land on the
+        cells they belong to, however the mesh is ordered
+
+        >>> for reorder in ("rcm", "morton"):
+        ...     mesh = Gmsh2D(name, reorder=reorder)
+        ...     IDs = mesh.originalCellIDs
+        ...     x = CellVariable(mesh=mesh, value=mesh._cellCenters[0])
+        ...     print (numerix.allequal(mesh._globalOverlappingCellIDs, numerix.arange(35)),
+        ...            numerix.allclose(mesh.cellCenters.value, mesh._cellCenters),
+        ...            numerix.allclose(mesh.cellCenters.value, plain.cellCenters.value[..., IDs]),
+        ...            numerix.allclose(x.value, mesh.x.value),
+        ...            numerix.allclose(x.globalValue, mesh._cellCenters[0]))
+        (True, True, True, True, True)
+        (True, True, True, True, True)
+
+        and so does the solution of an equation
+
+        >>> from fipy import DiffusionTerm
+        >>> def integral(mesh):
+        ...     phi = CellVariable(mesh=mesh)
+        ...     phi.constrain(1., where=mesh.facesLeft)
+        ...     phi.constrain(0., where=mesh.facesRight)
+        ...     DiffusionTerm(coeff=1. + mesh.y).solve(var=phi)
+        ...     return (phi * mesh.cellVolumes).sum().value
+        >>> print [numerix.allclose(integral(Gmsh2D(name, reorder=reorder)), integral(plain))
+        ...        for reorder in ("rcm", "morton")]
+        [True, True]
+
+        >>> shutil.rmtree(directory)
+        """
+        from fipy.meshes.reordering import _cellOrder, _renumber, _renumbered
+
+        cellOrder = _cellOrder(method, vertexCoords, facesToV, cellsToF)
+        numberOfLocalCells = len(cellGlobalIDs)
+        cellOrder = nx.concatenate((cellOrder[cellOrder < numberOfLocalCells],
+                                    cellOrder[cellOrder >= numberOfLocalCells]))
+
+        (vertexCoords, facesToV, cellsToF,
+         faceOrder, vertexOrder) = _renumber(cellOrder, vertexCoords, facesToV, cellsToF)
+
+        vertexIDs = nx.zeros(vertexOrder.shape, dtype=vertexOrder.dtype)
+        vertexIDs[vertexOrder] = nx.arange(len(vertexOrder))
+        cellsToVertIDs = _renumbered(cellsToVertIDs[..., cellOrder], vertexIDs)
+
+        self.physicalCellMap = self.physicalCellMap[cellOrder]
+        self.geometricalCellMap = self.geometricalCellMap[cellOrder]
+        self.physicalFaceMap = self.physicalFaceMap[faceOrder]
+        self.geometricalFaceMap = self.geometricalFaceMap[faceOrder]
+
+        globalIDs = cellGlobalIDs + ghostCellGlobalIDs
+        if self.communicator.Nproc > 1:
+            globalIDs = [globalIDs[ID] for ID in cellOrder]
+        else:
+            globalIDs = sorted(globalIDs)
+
+        self.originalCellIDs = cellOrder
+        self.originalFaceIDs = faceOrder
+        self.originalVertexIDs = vertexOrder
+
+        return (vertexCoords, facesToV, cellsToF,
+                globalIDs[:numberOfLocalCells], globalIDs[numberOfLocalCells:],
+                cellsToVertIDs)
+
+    def _partition(self, method, overlap, communicator, vertexCoords, facesToV, cellsToF,
+                   cellGlobalIDs, ghostCellGlobalIDs, cellsToVertIDs):
+        """Keep the share of this process of the cells read from an
+        unpartitioned file, followed by `overlap` layers of ghost cells.
+
+        The kept cells, faces and vertices retain their global IDs, maps
+        and any `originalCellIDs`, `originalFaceIDs` and
+        `originalVertexIDs`.
+
+        :Parameters:
+          - `method`: ``"rcb"`` or ``"inertial"``; see
+            :mod:`fipy.meshes.partitioning`
+          - `communicator`: the processes to share the cells among
+        """
+        from fipy.meshes.partitioning import (_cellParts, _edgeCut, _balance,
+                                              _overlappingCells, _extract)
+        from fipy.meshes.reordering import _renumbered
+
+        parts = _cellParts(method, vertexCoords, facesToV, cellsToF, Nparts=communicator.Nproc)
+        parprint("Partition edge-cut %d, balance %g." % (_edgeCut(parts, cellsToF),
+                                                        _balance(parts, communicator.Nproc)))
+
+        localIDs, ghostIDs = _overlappingCells(parts, communicator.procID, overlap, cellsToF)
+        cellIDs = nx.concatenate((localIDs, ghostIDs))
+
+        numberOfVertices = vertexCoords.shape[-1]
+        (vertexCoords, facesToV, cellsToF,
+         faceIDs, vertexIDs) = _extract(cellIDs, vertexCoords, facesToV, cellsToF)
+
+        vertexInverse = nx.zeros((numberOfVertices,), dtype=vertexIDs.dtype)
+        vertexInverse[vertexIDs] = nx.arange(len(vertexIDs))
+        cellsToVertIDs = _renumbered(cellsToVertIDs[..., cellIDs], vertexInverse)
+
+        self.physicalCellMap = self.physicalCellMap[cellIDs]
+        self.geometricalCellMap = self.geometricalCellMap[cellIDs]
+        self.physicalFaceMap = self.physicalFaceMap[faceIDs]
+        self.geometricalFaceMap = self.geometricalFaceMap[faceIDs]
+
+        if self.originalCellIDs is not None:
+            self.originalCellIDs = self.originalCellIDs[cellIDs]
+            self.originalFaceIDs = self.originalFaceIDs[faceIDs]
+            self.originalVertexIDs = self.originalVertexIDs[vertexIDs]
+
+        globalIDs = nx.array(cellGlobalIDs + ghostCellGlobalIDs)[cellIDs].tolist()
+        self.communicator = communicator
+
         return (vertexCoords, facesToV, cellsToF,
-                cellsData.idmap, ghostsData.idmap,
+                globalIDs[:len(localIDs)], globalIDs[len(localIDs):],
                 cellsToVertIDs)
 
     def write(self, obj, time=0.0, timeindex=0):
@@ -989,46 +1331,52 @@ class MSHFile(GmshFile):
     def _vertexCoordsAndMap(self, cellsToGmshVerts):
         """
         Returns `vertexCoords` and mapping from Gmsh ID to `vertexCoords`
-        indices (same as in MSHFile).
+        indices.
 
-        Unlike parent, doesn't use genfromtxt
-        because we want to avoid loading the entire msh file into memory.
+        Only the nodes used by `cellsToGmshVerts`, padded with -1, are kept.
         """
-        allVerts     = [v for c in cellsToGmshVerts for v in c] # flatten
-        allVerts     = nx.unique(nx.array(allVerts, dtype=nx.INT_DTYPE)) # remove dups
-        allVerts     = nx.sort(allVerts)
+        allVerts     = nx.unique(cellsToGmshVerts[cellsToGmshVerts >= 0]) # sorted, without dups
         maxVertIdx   = allVerts[-1] + 1 # add one to offset zero
         vertGIDtoIdx = nx.ones(maxVertIdx, 'l') * -1 # gmsh ID -> vertexCoords idx
-        vertexCoords = nx.empty((len(allVerts), self.coordDimensions))
-        nodeCount    = 0
 
         # establish map. This works because allVerts is a sorted set.
         vertGIDtoIdx[allVerts] = nx.arange(len(allVerts))
 
-        nodesFile = open(self.nodesPath, 'r')
-        nodesFile.readline() # skip number of nodes
-
-        # now we walk through node file with a sorted unique list of vertices
-        # in hand. When we encounter 0th element in `allVerts`, save it
-        # to `vertexCoords` then pop its ID off `allVerts`.
-        for node in nodesFile:
-            line   = node.split()
-            nodeID = int(line[0])
+        # find the nodes of allVerts among those read from the file
+        order = nx.argsort(self.nodeTags, kind='mergesort')
+        rows = order[nx.searchsorted(self.nodeTags[order], allVerts).clip(max=len(order) - 1)]
+        if not nx.alltrue(self.nodeTags[rows] == allVerts):
+            raise GmshException("Elements refer to nodes that are not in $Nodes")
 
-            if nodeID == allVerts[nodeCount]:
-                newVert = [float(x) for x in line[1:self.coordDimensions+1]]
-                vertexCoords[nodeCount,:] = nx.array(newVert)
-                nodeCount += 1
-
-            if len(allVerts) == nodeCount:
-                break
-
-        nodesFile.close()
+        vertexCoords = self.nodeCoords[rows, :self.coordDimensions]
 
         # transpose for FiPy
         transCoords = vertexCoords.swapaxes(0,1)
         return transCoords, vertGIDtoIdx
 
+    def _parseTags(self, numTags, tags):
+        """
+        Return the physical and geometrical entities and the partitions of
+        elements with `numTags` tags, given as rows of `tags` padded with 0.
+        """
+        # the partition tags for don't seem to always be present
+        # and don't always make much sense when they are
+        tags = nx.concatenate((tags, nx.zeros((len(tags), max(0, 3 - tags.shape[1])), dtype=tags.dtype)),
+                              axis=1)
+
+        tagged = numTags >= 2
+        physicalEntities = nx.where(tagged, tags[:, 0], -1)
+        geometricalEntities = nx.where(tagged, tags[:, 1], -1)
+
+        # next item is a count
+        partitioned = numTags > 2
+        if nx.sometrue(partitioned & (tags[:, 2] != numTags - 3)):
+            warnings.warn("Partition count does not agree with number of remaining tags.",
+                          SyntaxWarning, stacklevel=2)
+        partitions = tags[:, 3:]
+
+        return physicalEntities, geometricalEntities, partitions
+
     def _parseElementFile(self):
         """
         Return three objects, the first for non-ghost cells, the second for
@@ -1038,124 +1386,29 @@ class MSHFile(GmshFile):
         calculation is consolidated here: if we were ever to need to CALCULATE
         GHOST CELLS OURSELVES, the only code we'd have to change is in here.
         """
+        isCell = nx.in1d(self.elements.shapes, self.numFacesPerCell.keys())
+        isFace = nx.in1d(self.elements.shapes, self.numVertsPerFace.keys())
 
-        def _parseTags(offset, currLineInts):
-            if offset == -1:
-                # if first valid shape
-                offset = currLineInts[0]
+        cellsData = self.elements.take(isCell)
+        facesData = self.elements.take(isFace)
 
-            numTags = currLineInts[2]
-            tags    = currLineInts[3:(3+numTags)]
+        # the gmsh ID of the first valid shape
+        # will be subtracted from gmsh ID to obtain global ID
+        for data in [cellsData, facesData]:
+            if len(data.idmap) > 0:
+                data.idmap = data.idmap - data.idmap[0]
 
-            # the partition tags for don't seem to always be present
-            # and don't always make much sense when they are
-
-            if len(tags) >= 2:
-                physicalEntity = tags.pop(0)
-                geometricalEntity = tags.pop(0)
-            else:
-                physicalEntity = geometricalEntity = -1
-
-            return offset, tags, physicalEntity, geometricalEntity
-
-
-        cellsData = _ElementData()
-        ghostsData = _ElementData()
-        facesData = _ElementData()
-
-        cellOffset = -1 # this will be subtracted from gmsh ID to obtain global ID
-        faceOffset = -1 # this will be subtracted from gmsh ID to obtain global ID
-        pid = self.communicator.procID + 1
-
-        elemsFile = open(self.elemsPath, 'r')
-
-        elemsFile.readline() # skip number of elements
-        for el in elemsFile:
-            currLineInts = [int(x) for x in el.split()]
-            elemType     = currLineInts[1]
-
-            if elemType in self.numFacesPerCell.keys():
-                # element is a cell
-
-                (cellOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=cellOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= cellOffset
-
-                if len(tags) > 0:
-                    # next item is a count
-                    if tags[0] != len(tags) - 1:
-                        warnings.warn("Partition count %d does not agree with number of remaining tags %d." % (tags[0], len(tags) - 1),
-                                      SyntaxWarning, stacklevel=2)
-                    tags = tags[1:]
-
-                if self.communicator.Nproc > 1:
-                    for tag in tags:
-                        if -tag == pid:
-                            # if we're collecting ghost cells and this is our ghost cell
-                            ghostsData.add(currLine=currLineInts, elType=elemType,
-                                           physicalEntity=physicalEntity,
-                                           geometricalEntity=geometricalEntity)
-                        elif tag == pid:
-                            # el is in this processor's partition or we collect all cells
-                            cellsData.add(currLine=currLineInts, elType=elemType,
-                                          physicalEntity=physicalEntity,
-                                          geometricalEntity=geometricalEntity)
-                else:
-                    # we collect all cells
-                    cellsData.add(currLine=currLineInts, elType=elemType,
-                                  physicalEntity=physicalEntity,
-                                  geometricalEntity=geometricalEntity)
-            elif elemType in self.numVertsPerFace.keys():
-                # element is a face
-
-                (faceOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=faceOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= faceOffset
-
-                facesData.add(currLine=currLineInts, elType=elemType,
-                              physicalEntity=physicalEntity,
-                              geometricalEntity=geometricalEntity)
-
-        elemsFile.close()
+        if self.communicator.Nproc > 1:
+            pid = self.communicator.procID + 1
+            # ghost cells are tagged with the negative of our partition
+            ghostsData = cellsData.take((cellsData.partitions == -pid).any(axis=1))
+            cellsData = cellsData.take((cellsData.partitions == pid).any(axis=1))
+        else:
+            # we collect all cells
+            ghostsData = cellsData.take(nx.zeros(cellsData.shapes.shape, dtype=bool))
 
         return cellsData, ghostsData, facesData
 
-
-    def _parseNamesFile(self):
-        physicalNames = {
-            0: dict(),
-            1: dict(),
-            2: dict(),
-            3: dict()
-        }
-        if self.namesPath is not None:
-            namesFile = open(self.namesPath, 'r')
-
-            namesFile.readline() # skip number of elements
-            for nm in namesFile:
-                nm = nm.split()
-                if self.version > 2.0:
-                    dim = [int(nm.pop(0))]
-                else:
-                    # Gmsh format prior to 2.1 did not unambiguously tie
-                    # physical names to physical entities of different dimensions
-                    # http://article.gmane.org/gmane.comp.cad.gmsh.general/1601
-                    dim = [0, 1, 2, 3]
-                num = int(nm.pop(0))
-                name = " ".join(nm)[1:-1]
-                for d in dim:
-                    physicalNames[d][name] = int(num)
-
-            namesFile.close()
-
-        return physicalNames
-
     def makeMapVariables(self, mesh):
         """Utility function to make MeshVariables that define different domains in the mesh
         """
@@ -1253,116 +1506,436 @@ class MSHFile(GmshFile):
         ...     p = Popen(["gmsh", os.path.join(dir, "cyl.msh")]) # doctest: +GMSH
         ...     doctest_raw_input("CylindricalGrid2D... Press enter.")
 
+        Test reading each MSH format, here for a unit square split into
+        two triangles
+
+        >>> names = '''$PhysicalNames
+        ... 2
+        ... 1 1 "edge"
+        ... 2 2 "inside"
+        ... $EndPhysicalNames
+        ... '''
+
+        >>> ascii22 = '''$MeshFormat
+        ... 2.2 0 8
+        ... $EndMeshFormat
+        ... ''' + names + '''$Nodes
+        ... 4
+        ... 1 0 0 0
+        ... 2 1 0 0
+        ... 3 1 1 0
+        ... 4 0 1 0
+        ... $EndNodes
+        ... $Elements
+        ... 6
+        ... 1 1 2 1 1 1 2
+        ... 2 1 2 1 2 2 3
+        ... 3 1 2 1 3 3 4
+        ... 4 1 2 1 4 4 1
+        ... 5 2 2 2 6 1 2 3
+        ... 6 2 2 2 6 1 3 4
+        ... $EndElements
+        ... '''
+
+        >>> def readMSH(text):
+        ...     f = open(os.path.join(dir, "read.msh"), 'wb')
+        ...     f.write(text)
+        ...     f.close()
+        ...     f = MSHFile(os.path.join(dir, "read.msh"), dimensions=2)
+        ...     data = f.read()
+        ...     f.close()
+        ...     return data + (f.physicalCellMap, f.physicalFaceMap, f.geometricalFaceMap)
+
+        >>> square = readMSH(ascii22)
+        >>> print square[0]
+        [[ 0.  1.  1.  0.]
+         [ 0.  0.  1.  1.]]
+        >>> print square[1]
+        [[1 2 0 3 0]
+         [0 1 2 2 3]]
+        >>> print square[2]
+        [[0 2]
+         [1 3]
+         [2 4]]
+        >>> print square[3], square[4]
+        [0, 1] []
+        >>> print square[6], square[7], square[8]
+        [2 2] [1 1 0 1 1] [1 2 0 3 4]
+
+        Binary files hold the same data as raw integers and doubles
+
+        >>> def i4(*values):
+        ...     return nx.array(values, dtype='<i4').tostring()
+        >>> def u8(*values):
+        ...     return nx.array(values, dtype='<u8').tostring()
+        >>> def f8(*values):
+        ...     return nx.array(values, dtype='<f8').tostring()
+
+        >>> binary22 = ('$MeshFormat\\n2.2 1 8\\n' + i4(1) + '\\n$EndMeshFormat\\n'
+        ...             + names
+        ...             + '$Nodes\\n4\\n'
+        ...             + i4(1) + f8(0, 0, 0) + i4(2) + f8(1, 0, 0)
+        ...             + i4(3) + f8(1, 1, 0) + i4(4) + f8(0, 1, 0)
+        ...             + '\\n$EndNodes\\n$Elements\\n6\\n'
+        ...             + i4(1, 4, 2) + i4(1, 1, 1, 1, 2, 2, 1, 2, 2, 3,
+        ...                                3, 1, 3, 3, 4, 4, 1, 4, 4, 1)
+        ...             + i4(2, 2, 2) + i4(5, 2, 6, 1, 2, 3, 6, 2, 6, 1, 3, 4)
+        ...             + '\\n$EndElements\\n')
+
+        MSH 4.1 files give physical groups to geometrical entities, not to
+        elements
+
+        >>> ascii41 = '''$MeshFormat
+        ... 4.1 0 8
+        ... $EndMeshFormat
+        ... ''' + names + '''$Entities
+        ... 0 4 1 0
+        ... 1 0 0 0 1 0 0 1 1 0
+        ... 2 1 0 0 1 1 0 1 1 0
+        ... 3 0 1 0 1 1 0 1 1 0
+        ... 4 0 0 0 0 1 0 1 1 0
+        ... 6 0 0 0 1 1 0 1 2 0
+        ... $EndEntities
+        ... $Nodes
+        ... 1 4 1 4
+        ... 2 6 0 4
+        ... 1
+        ... 2
+        ... 3
+        ... 4
+        ... 0 0 0
+        ... 1 0 0
+        ... 1 1 0
+        ... 0 1 0
+        ... $EndNodes
+        ... $Elements
+        ... 5 6 1 6
+        ... 1 1 1 1
+        ... 1 1 2
+        ... 1 2 1 1
+        ... 2 2 3
+        ... 1 3 1 1
+        ... 3 3 4
+        ... 1 4 1 1
+        ... 4 4 1
+        ... 2 6 2 2
+        ... 5 1 2 3
+        ... 6 1 3 4
+        ... $EndElements
+        ... '''
+
+        >>> curve = lambda tag, box: i4(tag) + f8(*box) + u8(1) + i4(1) + u8(0)
+        >>> binary41 = ('$MeshFormat\\n4.1 1 8\\n' + i4(1) + '\\n$EndMeshFormat\\n'
+        ...             + names
+        ...             + '$Entities\\n' + u8(0, 4, 1, 0)
+        ...             + curve(1, (0, 0, 0, 1, 0, 0)) + curve(2, (1, 0, 0, 1, 1, 0))
+        ...             + curve(3, (0, 1, 0, 1, 1, 0)) + curve(4, (0, 0, 0, 0, 1, 0))
+        ...             + i4(6) + f8(0, 0, 0, 1, 1, 0) + u8(1) + i4(2) + u8(0)
+        ...             + '\\n$EndEntities\\n'
+        ...             + '$Nodes\\n' + u8(1, 4, 1, 4) + i4(2, 6, 0) + u8(4)
+        ...             + u8(1, 2, 3, 4) + f8(0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0)
+        ...             + '\\n$EndNodes\\n'
+        ...             + '$Elements\\n' + u8(5, 6, 1, 6)
+        ...             + i4(1, 1, 1) + u8(1) + u8(1, 1, 2)
+        ...             + i4(1, 2, 1) + u8(1) + u8(2, 2, 3)
+        ...             + i4(1, 3, 1) + u8(1) + u8(3, 3, 4)
+        ...             + i4(1, 4, 1) + u8(1) + u8(4, 4, 1)
+        ...             + i4(2, 6, 2) + u8(2) + u8(5, 1, 2, 3, 6, 1, 3, 4)
+        ...             + '\\n$EndElements\\n')
+
+        >>> for text in (binary22, ascii41, binary41):
+        ...     other = readMSH(text)
+        ...     print [nx.allequal(a, b) for a, b in zip(square[:3] + square[6:8], other[:3] + other[6:8])]
+        [True, True, True, True, True]
+        [True, True, True, True, True]
+        [True, True, True, True, True]
+
         >>> import shutil
         >>> shutil.rmtree(dir)
         """
         pass
 
-class _ElementData(object):
+class _CachedMSHFile(MSHFile):
+    """Stand-in for an `MSHFile` whose contents come from the mesh cache
     """
-    Bookkeeping for cells. Declared as own class for generality.
+    _maps = ("physicalCellMap", "geometricalCellMap",
+             "physicalFaceMap", "geometricalFaceMap")
+    _originalIDs = ("originalCellIDs", "originalFaceIDs", "originalVertexIDs")
 
-    "nodes": A Python list of the vertices that make up this element
-    "shapes": A shapeTypes Python list
-    "idmap": A Python list which maps vertexCoords idx -> global ID
-    "physicalEntities": A Python list of the Gmsh physical entities each element is in
-    "geometricalEntities": A Python list of the Gmsh geometrical entities each element is in
-    """
-    def __init__(self):
-        self.nodes = []
-        self.shapes = []
-        self.idmap = [] # vertexCoords idx -> gmsh ID (global ID)
-        self.physicalEntities = []
-        self.geometricalEntities = []
-
-    def add(self, currLine, elType, physicalEntity, geometricalEntity):
-        numTags = currLine[2]
-        self.nodes.append(currLine[(numTags+3):])
-        self.shapes.append(elType)
-        self.idmap.append(currLine[0])
-        self.physicalEntities.append(physicalEntity)
-        self.geometricalEntities.append(geometricalEntity)
-
-class _GmshTopology(_MeshTopology):
+    def __init__(self, arrays, info, communicator):
+        self.dimensions = info["dimensions"]
+        self.coordDimensions = info["coordDimensions"]
+        self.communicator = communicator
+        self.fileIsTemporary = False
+
+        self.physicalNames = dict([(int(dim), dict([(name.encode('utf-8'), ID)
+                                                    for name, ID in names.items()]))
+                                   for dim, names in info["physicalNames"].items()])
+        for name in self._maps + self._originalIDs:
+            if name in arrays:
+                setattr(self, name, arrays[name])
+
+        self._data = (arrays["vertexCoords"],
+                      arrays["faceVertexIDs"],
+                      arrays["cellFaceIDs"],
+                      arrays["cellGlobalIDs"].tolist(),
+                      arrays["ghostCellGlobalIDs"].tolist(),
+                      nx.MA.masked_less(arrays["cellVertexIDs"], 0))
+
+    @classmethod
+    def _entry(cls, mshFile, data):
+        """The arrays and information to cache for `mshFile`, given the
+        result of its `read`"""
+        (vertexCoords, faceVertexIDs, cellFaceIDs,
+         cellGlobalIDs, ghostCellGlobalIDs, cellVertexIDs) = data
+
+        arrays = dict(vertexCoords=vertexCoords,
+                      faceVertexIDs=faceVertexIDs,
+                      cellFaceIDs=cellFaceIDs,
+                      cellGlobalIDs=nx.array(cellGlobalIDs, dtype=nx.INT_DTYPE),
+                      ghostCellGlobalIDs=nx.array(ghostCellGlobalIDs, dtype=nx.INT_DTYPE),
+                      cellVertexIDs=nx.MA.filled(cellVertexIDs, -1))
+        for name in cls._maps + cls._originalIDs:
+            if getattr(mshFile, name) is not None:
+                arrays[name] = getattr(mshFile, name)
+
+        info = dict(dimensions=mshFile.dimensions,
+                    coordDimensions=mshFile.coordDimensions,
+                    physicalNames=mshFile.physicalNames)
+
+        return arrays, info
+
+    def read(self, reorder=None):
+        return self._data
 
-    @property
-    def _globalNonOverlappingCellIDs(self):
-        """
-        Return the IDs of the local mesh in the context of the
-        global parallel mesh. Does not include the IDs of boundary cells.
+    def close(self):
+        pass
 
-        E.g., would return [0, 1, 4, 5] for mesh A
+def _readMSHFile(arg, dimensions, coordDimensions=None, communicator=parallelComm,
+                 order=1, background=None, reorder=None, partitioner=None, overlap=2):
+    """Open and read a Gmsh mesh, through the mesh cache if one is
+    configured; see :mod:`fipy.meshes.meshCache`.
+
+    Meshes made with a `background` are not cached. With a `partitioner`,
+    every process reads the whole mesh and keeps its own share; see
+    :mod:`fipy.meshes.partitioning`.
+
+    :Returns:
+      The `MSHFile` and the result of its `read`.
+
+    An MSH file, with physical names for its cells and for one face,
+    needs no Gmsh to read
+
+    >>> import os, shutil, tempfile
+    >>> from fipy import Grid2D, numerix
+    >>> directory = tempfile.mkdtemp()
+    >>> name = os.path.join(directory, "grid.msh")
+    >>> f = openMSHFile(name, mode='w')
+    >>> f.write(Grid2D(nx=3, ny=2))
+    >>> f.close()
+    >>> text = open(name).read()
+    >>> for ID in range(1, 7):
+    ...     text = text.replace("\\n%d 3 0 " % ID, "\\n%d 3 2 %d 1 " % (ID, 1 + (ID > 3)))
+    >>> text = text.replace("$Elements\\n6\\n", "$Elements\\n7\\n7 1 2 3 2 2 3\\n")
+    >>> text = text.replace("$Nodes", "$PhysicalNames\\n3\\n"
+    ...                               "2 1 \\"Bottom\\"\\n2 2 \\"Top\\"\\n1 3 \\"Edge\\"\\n"
+    ...                               "$EndPhysicalNames\\n$Nodes")
+    >>> open(name, 'w').write(text)
+
+    With the cache on, the second read comes from the cache
+
+    >>> os.environ["FIPY_MESH_CACHE"] = os.path.join(directory, "cache")
+    >>> print [isinstance(_readMSHFile(name, dimensions=2)[0], _CachedMSHFile)
+    ...        for i in range(2)]
+    [False, True]
+
+    and builds the same mesh
+
+    >>> read, cached = Gmsh2D(name), Gmsh2D(name)
+    >>> print numerix.allclose(read.vertexCoords, cached.vertexCoords)
+    True
+    >>> print numerix.allequal(read.faceVertexIDs, cached.faceVertexIDs)
+    True
+    >>> print numerix.allequal(read.cellFaceIDs, cached.cellFaceIDs)
+    True
+    >>> print cached.physicalCells["Top"]
+    [False False False  True  True  True]
+    >>> print [numerix.allequal(read.physicalCells[key].value, cached.physicalCells[key].value)
+    ...        for key in ("Bottom", "Top")]
+    [True, True]
+    >>> print numerix.nonzero(cached.physicalFaces["Edge"])[0]
+    [6]
+    >>> print numerix.allequal(read.physicalFaces["Edge"], cached.physicalFaces["Edge"])
+    True
 
-            A        B
-        ------------------
-        | 4 | 5 || 6 | 7 |
-        ------------------
-        | 0 | 1 || 2 | 3 |
-        ------------------
+    >>> del os.environ["FIPY_MESH_CACHE"]
+    >>> shutil.rmtree(directory)
+    """
+    import fipy
+    from fipy.meshes.meshCache import _meshCache
+
+    cache = _meshCache()
+    key = None
+    if cache is not None and background is None:
+        key = cache.key(arg,
+                        dimensions=dimensions,
+                        coordDimensions=coordDimensions,
+                        order=order,
+                        reorder=reorder,
+                        partitioner=partitioner,
+                        overlap=overlap,
+                        Nproc=communicator.Nproc,
+                        procID=communicator.procID,
+                        gmshVersion=str(_gmshVersion(communicator=communicator)),
+                        fipyVersion=fipy.__version__,
+                        readerVersion=_readerVersion)
+        entry = cache.get(key)
+        # every process must agree, or those that missed would wait on
+        # Gmsh collectively without the others
+        if communicator.all(nx.array(entry is not None)):
+            mshFile = _CachedMSHFile(entry[0], entry[1], communicator=communicator)
+            return mshFile, mshFile.read()
+
+    if partitioner is None:
+        readCommunicator = communicator
+    else:
+        readCommunicator = serialComm
 
-        .. note:: Trivial except for parallel meshes
-        """
-        return nx.array(self.mesh.cellGlobalIDs)
+    mshFile = openMSHFile(arg,
+                          dimensions=dimensions,
+                          coordDimensions=coordDimensions,
+                          communicator=readCommunicator,
+                          order=order,
+                          mode='r',
+                          background=background)
+    data = mshFile.read(reorder=reorder)
 
-    @property
-    def _globalOverlappingCellIDs(self):
-        """
-        Return the IDs of the local mesh in the context of the
-        global parallel mesh. Includes the IDs of boundary cells.
+    if partitioner is not None:
+        parprint("Partitioning cells.")
+        data = mshFile._partition(partitioner, overlap, communicator, *data)
 
-        E.g., would return [0, 1, 2, 4, 5, 6] for mesh A
+    if key is not None:
+        arrays, info = _CachedMSHFile._entry(mshFile, data)
+        cache.put(key, arrays=arrays, info=info)
 
-            A        B
-        ------------------
-        | 4 | 5 || 6 | 7 |
-        ------------------
-        | 0 | 1 || 2 | 3 |
-        ------------------
+    return mshFile, data
 
-        .. note:: Trivial except for parallel meshes
+class _ElementData(object):
+    """
+    Bookkeeping for elements, as arrays with an entry for each element.
+    Declared as own class for generality.
+
+    "nodes": An array of the vertices that make up each element, padded with -1
+    "shapes": An array of the shape type of each element
+    "idmap": An array which maps vertexCoords idx -> global ID
+    "physicalEntities": An array of the Gmsh physical entity each element is in
+    "geometricalEntities": An array of the Gmsh geometrical entity each element is in
+    "partitions": An array of the partitions each element is in, padded with 0
+    """
+    def __init__(self, nodes, shapes, idmap, physicalEntities, geometricalEntities, partitions):
+        self.nodes = nodes
+        self.shapes = shapes
+        self.idmap = idmap # vertexCoords idx -> gmsh ID (global ID)
+        self.physicalEntities = physicalEntities
+        self.geometricalEntities = geometricalEntities
+        self.partitions = partitions
+
+    def take(self, which):
         """
-        return nx.array(self.mesh.cellGlobalIDs + self.mesh.gCellGlobalIDs)
-
-    @property
-    def _localNonOverlappingCellIDs(self):
+        The elements selected by the boolean array `which`.
         """
-        Return the IDs of the local mesh in isolation.
-        Does not include the IDs of boundary cells.
+        return _ElementData(nodes=self.nodes[which],
+                            shapes=self.shapes[which],
+                            idmap=self.idmap[which],
+                            physicalEntities=self.physicalEntities[which],
+                            geometricalEntities=self.geometricalEntities[which],
+                            partitions=self.partitions[which])
+
+def _tokensPerLine(text):
+    """
+    Number of whitespace-separated tokens on each newline-terminated line
+    of `text`.
+    """
+    chars = nx.frombuffer(text, dtype='uint8')
+    blank = chars <= ord(' ')
+    starts = ~blank & nx.concatenate(([True], blank[:-1]))
+    tokens = nx.cumsum(starts)[chars == ord('\n')]
+    return nx.diff(nx.concatenate(([0], tokens))).astype(nx.INT_DTYPE)
 
-        E.g., would return [0, 1, 2, 3] for mesh A
+def _uniqueRows(rows):
+    """
+    Return the index of the first of each distinct row of `rows`, in order
+    of appearance, and the number of the distinct row of each row.
+
+    >>> first, inverse = _uniqueRows(nx.array([[1, 2], [0, 3], [1, 2], [-1, 5], [0, 3]]))
+    >>> print first
+    [0 1 3]
+    >>> print inverse
+    [0 1 0 2 1]
+    """
+    if len(rows) == 0:
+        return nx.zeros((0,), dtype=nx.INT_DTYPE), nx.zeros((0,), dtype=nx.INT_DTYPE)
 
-            A        B
-        ------------------
-        | 3 | 4 || 4 | 5 |
-        ------------------
-        | 0 | 1 || 1 | 2 |
-        ------------------
+    # lexsort is stable, so equal rows stay in order of appearance
+    order = nx.lexsort([rows[:, k] for k in range(rows.shape[1])[::-1]])
+    sortedRows = rows[order]
+    starts = nx.concatenate(([True], (sortedRows[1:] != sortedRows[:-1]).any(axis=1)))
+    first = order[starts]
 
-        .. note:: Trivial except for parallel meshes
-        """
-        return nx.arange(len(self.mesh.cellGlobalIDs))
+    # number the distinct rows in order of appearance
+    numbers = nx.zeros(first.shape, dtype=nx.INT_DTYPE)
+    numbers[nx.argsort(first)] = nx.arange(len(first))
+    inverse = nx.zeros(order.shape, dtype=nx.INT_DTYPE)
+    inverse[order] = numbers[nx.cumsum(starts) - 1]
 
-    @property
-    def _localOverlappingCellIDs(self):
-        """
-        Return the IDs of the local mesh in isolation.
-        Includes the IDs of boundary cells.
+    return nx.sort(first), inverse
 
-        E.g., would return [0, 1, 2, 3, 4, 5] for mesh A
+def _lastMatches(faces, candidates):
+    """
+    Return the index of the last of `candidates` with the same vertices as
+    each of the distinct `faces`, or -1. Both are padded with -1.
+    """
+    width = max(faces.shape[1], candidates.shape[1])
+    keys = nx.sort(_stacked([faces, candidates, nx.zeros((0, width), dtype=faces.dtype)], fill=-1),
+                   axis=1)
+    first, inverse = _uniqueRows(keys)
 
-            A        B
-        ------------------
-        | 3 | 4 || 5 |   |
-        ------------------
-        | 0 | 1 || 2 |   |
-        ------------------
+    groups = inverse[len(faces):]
+    order = nx.lexsort((nx.arange(len(groups)), groups))
+    last = nx.concatenate((groups[order][1:] != groups[order][:-1], [True]))[:len(order)]
 
-        .. note:: Trivial except for parallel meshes
-        """
-        return nx.arange(len(self.mesh.cellGlobalIDs)
-                         + len(self.mesh.gCellGlobalIDs))
+    matches = nx.zeros(first.shape, dtype=nx.INT_DTYPE) - 1
+    matches[groups[order][last]] = order[last]
+    return matches[inverse[:len(faces)]]
 
+def _ragged(values, starts, lengths, fill):
+    """
+    Rows of `lengths` entries of `values`, beginning at `starts`, padded
+    with `fill`.
+    """
+    width = 0
+    if len(lengths) > 0:
+        width = max(0, lengths.max())
+    columns = nx.arange(width)
+    inside = columns[nx.newaxis, :] < lengths[:, nx.newaxis]
+    return nx.where(inside, values[nx.where(inside, starts[:, nx.newaxis] + columns, 0)], fill)
+
+def _stacked(arrays, fill):
+    """
+    Concatenate `arrays`, padding the rows of two-dimensional arrays with
+    `fill` to the widest.
+    """
+    if arrays[0].ndim == 1:
+        return nx.concatenate(arrays)
 
+    width = max([a.shape[1] for a in arrays])
+    stacked = nx.empty((sum([a.shape[0] for a in arrays]), width), dtype=arrays[0].dtype)
+    stacked.fill(fill)
+    row = 0
+    for a in arrays:
+        stacked[row:row + a.shape[0], :a.shape[1]] = a
+        row += a.shape[0]
+    return stacked
 
 
 class Gmsh2D(Mesh2D):
@@ -1370,7 +1943,7 @@ class Gmsh2D(Mesh2D):
 
     >>> radius = 5.
     >>> side = 4.
-    >>> squaredCircle = Gmsh2D('''
+    >>> squaredCircleGeo = '''
     ... // A mesh consisting of a square inside a circle inside a circle
     ...
     ... // define the basic dimensions of the mesh
@@ -1455,7 +2028,8 @@ class Gmsh2D(Mesh2D):
     ... // construct the Mesh.
     ...
     ... Physical Line("NW") = {5};
-    ... ''' % locals()) # doctest: +GMSH
+    ... ''' % locals()
+    >>> squaredCircle = Gmsh2D(squaredCircleGeo) # doctest: +GMSH
 
     It can be easier to specify certain domains and boundaries within Gmsh
     than it is to define the same domains and boundaries with FiPy expressions.
@@ -1481,6 +2055,58 @@ class Gmsh2D(Mesh2D):
     >>> print (NW == squaredCircle.physicalFaces["NW"]).all() # doctest: +GMSH
     True
 
+    The cells, faces and vertices can be renumbered so that neighbors lie
+    close together in memory. Named domains follow the renumbering.
+
+    >>> from fipy.meshes.reordering import _bandwidth
+    >>> reordered = Gmsh2D(squaredCircleGeo, reorder="rcm") # doctest: +GMSH
+    >>> print _bandwidth(reordered.cellFaceIDs) < _bandwidth(squaredCircle.cellFaceIDs) # doctest: +GMSH
+    True
+    >>> IDs = reordered.originalCellIDs # doctest: +GMSH
+    >>> print numerix.allclose(reordered.cellCenters,
+    ...                        numerix.array(squaredCircle.cellCenters)[..., IDs]) # doctest: +GMSH
+    True
+    >>> print numerix.allequal(reordered.physicalCells["Middle"],
+    ...                        numerix.array(squaredCircle.physicalCells["Middle"])[IDs]) # doctest: +GMSH
+    True
+    >>> IDs = reordered.originalFaceIDs # doctest: +GMSH
+    >>> print numerix.allequal(reordered.physicalFaces["NW"],
+    ...                        numerix.array(squaredCircle.physicalFaces["NW"])[IDs]) # doctest: +GMSH
+    True
+
+    FiPy can also partition the mesh among the processes itself, instead
+    of relying on Gmsh. Named domains follow each share of the cells.
+
+    >>> from fipy.meshes.partitioning import partitionQuality
+    >>> partitioned = Gmsh2D(squaredCircleGeo, partitioner="inertial") # doctest: +GMSH
+    >>> x, y = partitioned.cellCenters # doctest: +GMSH
+    >>> middle = ((x**2 + y**2 <= radius**2)
+    ...           & ~((x > -side/2) & (x < side/2)
+    ...               & (y > -side/2) & (y < side/2))) # doctest: +GMSH
+    >>> print (middle == partitioned.physicalCells["Middle"]).all() # doctest: +GMSH
+    True
+    >>> print partitioned.globalNumberOfCells == squaredCircle.globalNumberOfCells # doctest: +GMSH
+    True
+    >>> edgeCut, balance = partitionQuality(partitioned) # doctest: +GMSH
+    >>> print balance < 1.1 # doctest: +GMSH
+    True
+
+    With a mesh cache, a second mesh from the same geometry is loaded
+    from disk instead of from Gmsh; see :mod:`fipy.meshes.meshCache`.
+
+    >>> import shutil, tempfile
+    >>> os.environ["FIPY_MESH_CACHE"] = tempfile.mkdtemp()
+    >>> first = Gmsh2D(squaredCircleGeo) # doctest: +GMSH
+    >>> print len(os.listdir(os.environ["FIPY_MESH_CACHE"])) # doctest: +GMSH
+    1
+    >>> second = Gmsh2D(squaredCircleGeo) # doctest: +GMSH
+    >>> print numerix.allclose(second.cellCenters, first.cellCenters) # doctest: +GMSH
+    True
+    >>> print numerix.allequal(second.physicalCells["Middle"],
+    ...                        first.physicalCells["Middle"]) # doctest: +GMSH
+    True
+    >>> shutil.rmtree(os.environ.pop("FIPY_MESH_CACHE"))
+
     It is possible to direct Gmsh to give the mesh different densities in
     different locations
 
@@ -1554,6 +2180,15 @@ class Gmsh2D(Mesh2D):
       - `order`: ???
       - `background`: a `CellVariable` that specifies the desired characteristic
         lengths of the mesh cells
+      - `reorder`: ``"rcm"`` or ``"morton"`` to renumber the cells, faces
+        and vertices for locality; see :mod:`fipy.meshes.reordering`.
+        `originalCellIDs`, `originalFaceIDs` and `originalVertexIDs` then
+        give the ID in the Gmsh file of each cell, face and vertex.
+      - `partitioner`: ``"rcb"`` or ``"inertial"`` to partition the mesh
+        in FiPy instead of with Gmsh, which needs neither Gmsh 2.5 nor a
+        partitioned MSH file; see :mod:`fipy.meshes.partitioning`.
+      - `overlap`: the number of layers of ghost cells around the cells
+        of each process when using a `partitioner`.
     """
 
     def __init__(self,
@@ -1561,22 +2196,30 @@ class Gmsh2D(Mesh2D):
                  coordDimensions=2,
                  communicator=parallelComm,
                  order=1,
-                 background=None):
-
-        self.mshFile = openMSHFile(arg,
-                                   dimensions=2,
-                                   coordDimensions=coordDimensions,
-                                   communicator=communicator,
-                                   order=order,
-                                   mode='r',
-                                   background=background)
-
-        (verts,
-         faces,
-         cells,
-         self.cellGlobalIDs,
-         self.gCellGlobalIDs,
-         self._orderedCellVertexIDs_data) = self.mshFile.read()
+                 background=None,
+                 reorder=None,
+                 partitioner=None,
+                 overlap=2):
+
+        (self.mshFile,
+         (verts,
+          faces,
+          cells,
+          self.cellGlobalIDs,
+          self.gCellGlobalIDs,
+          self._orderedCellVertexIDs_data)) = _readMSHFile(arg,
+                                                           dimensions=2,
+                                                           coordDimensions=coordDimensions,
+                                                           communicator=communicator,
+                                                           order=order,
+                                                           background=background,
+                                                           reorder=reorder,
+                                                           partitioner=partitioner,
+                                                           overlap=overlap)
+
+        self.originalCellIDs = self.mshFile.originalCellIDs
+        self.originalFaceIDs = self.mshFile.originalFaceIDs
+        self.originalVertexIDs = self.mshFile.originalVertexIDs
 
         self.mshFile.close()
 
@@ -1589,7 +2232,7 @@ class Gmsh2D(Mesh2D):
                               faceVertexIDs=faces,
                               cellFaceIDs=cells,
                               communicator=communicator,
-                              _TopologyClass=_GmshTopology)
+                              _TopologyClass=_PartitionedMeshTopology)
 
         (self.physicalCellMap,
          self.geometricalCellMap,
@@ -1608,6 +2251,9 @@ class Gmsh2D(Mesh2D):
         self.gCellGlobalIDs = []
         self.communicator = serialComm
         self.mshFile = None
+        self.originalCellIDs = None
+        self.originalFaceIDs = None
+        self.originalVertexIDs = None
 
     def _test(self):
         """
@@ -1846,14 +2492,27 @@ class Gmsh2DIn3DSpace(Gmsh2D):
       - `order`: ???
       - `background`: a `CellVariable` that specifies the desired characteristic
         lengths of the mesh cells
+      - `reorder`: ``"rcm"`` or ``"morton"`` to renumber the cells, faces
+        and vertices for locality; see :mod:`fipy.meshes.reordering`.
+        `originalCellIDs`, `originalFaceIDs` and `originalVertexIDs` then
+        give the ID in the Gmsh file of each cell, face and vertex.
+      - `partitioner`: ``"rcb"`` or ``"inertial"`` to partition the mesh
+        in FiPy instead of with Gmsh, which needs neither Gmsh 2.5 nor a
+        partitioned MSH file; see :mod:`fipy.meshes.partitioning`.
+      - `overlap`: the number of layers of ghost cells around the cells
+        of each process when using a `partitioner`.
     """
-    def __init__(self, arg, communicator=parallelComm, order=1, background=None):
+    def __init__(self, arg, communicator=parallelComm, order=1, background=None, reorder=None,
+                 partitioner=None, overlap=2):
         Gmsh2D.__init__(self,
                         arg,
                         coordDimensions=3,
                         communicator=communicator,
                         order=order,
-                        background=background)
+                        background=background,
+                        reorder=reorder,
+                        partitioner=partitioner,
+                        overlap=overlap)
 
     def _test(self):
         """
@@ -1921,21 +2580,36 @@ class Gmsh3D(Mesh):
       - `order`: ???
       - `background`: a `CellVariable` that specifies the desired characteristic
         lengths of the mesh cells
+      - `reorder`: ``"rcm"`` or ``"morton"`` to renumber the cells, faces
+        and vertices for locality; see :mod:`fipy.meshes.reordering`.
+        `originalCellIDs`, `originalFaceIDs` and `originalVertexIDs` then
+        give the ID in the Gmsh file of each cell, face and vertex.
+      - `partitioner`: ``"rcb"`` or ``"inertial"`` to partition the mesh
+        in FiPy instead of with Gmsh, which needs neither Gmsh 2.5 nor a
+        partitioned MSH file; see :mod:`fipy.meshes.partitioning`.
+      - `overlap`: the number of layers of ghost cells around the cells
+        of each process when using a `partitioner`.
     """
-    def __init__(self, arg, communicator=parallelComm, order=1, background=None):
-        self.mshFile  = openMSHFile(arg,
-                                    dimensions=3,
-                                    communicator=communicator,
-                                    order=order,
-                                    mode='r',
-                                    background=background)
-
-        (verts,
-         faces,
-         cells,
-         self.cellGlobalIDs,
-         self.gCellGlobalIDs,
-         self._orderedCellVertexIDs_data) = self.mshFile.read()
+    def __init__(self, arg, communicator=parallelComm, order=1, background=None, reorder=None,
+                 partitioner=None, overlap=2):
+        (self.mshFile,
+         (verts,
+          faces,
+          cells,
+          self.cellGlobalIDs,
+          self.gCellGlobalIDs,
+          self._orderedCellVertexIDs_data)) = _readMSHFile(arg,
+                                                           dimensions=3,
+                                                           communicator=communicator,
+                                                           order=order,
+                                                           background=background,
+                                                           reorder=reorder,
+                                                           partitioner=partitioner,
+                                                           overlap=overlap)
+
+        self.originalCellIDs = self.mshFile.originalCellIDs
+        self.originalFaceIDs = self.mshFile.originalFaceIDs
+        self.originalVertexIDs = self.mshFile.originalVertexIDs
 
         self.mshFile.close()
 
@@ -1943,7 +2617,7 @@ class Gmsh3D(Mesh):
                             faceVertexIDs=faces,
                             cellFaceIDs=cells,
                             communicator=communicator,
-                            _TopologyClass=_GmshTopology)
+                            _TopologyClass=_PartitionedMeshTopology)
 
         if self.communicator.Nproc > 1:
             self.globalNumberOfCells = self.communicator.sum(len(self.cellGlobalIDs))
@@ -1963,6 +2637,9 @@ class Gmsh3D(Mesh):
         self.gCellGlobalIDs = []
         self.communicator = serialComm
         self.mshFile = None
+        self.originalCellIDs = None
+        self.originalFaceIDs = None
+        self.originalVertexIDs = None
 
     def _test(self):
         """
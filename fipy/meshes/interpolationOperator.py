@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "interpolationOperator.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Reusable interpolation from the cells of a mesh.
+
+Calling a `CellVariable` with a set of points searches the mesh and
+evaluates the gradient every time. When the same points are probed, or
+the same target mesh is remapped to, over and over, build the
+interpolation once as a sparse linear operator and apply it to each new
+value.
+
+>>> from fipy import Grid2D, CellVariable
+>>> m0 = Grid2D(nx=2, ny=2, dx=1., dy=1.)
+>>> m1 = Grid2D(nx=4, ny=4, dx=.5, dy=.5)
+>>> x, y = m0.cellCenters
+>>> v0 = CellVariable(mesh=m0, value=x * y)
+
+>>> probe = InterpolationOperator(m0, ((0.25, 1.5), (0.25, 1.2)), order=0)
+>>> print probe(v0)
+[ 0.25  2.25]
+
+An operator of order 1 reproduces the gradient-corrected interpolation of
+a variable without constraints
+
+>>> remap = remapOperator(m0, m1, order=1)
+>>> print numerix.allclose(remap(v0), v0(m1.cellCenters.globalValue, order=1))
+True
+>>> remap is remapOperator(m0, m1, order=1)
+True
+
+Operators apply to values of any rank
+
+>>> v1 = CellVariable(mesh=m0, value=(x, y), rank=1)
+>>> print remapOperator(m0, m1)(v1).shape
+(2, 16)
+
+A conservative remap onto a coarser mesh preserves the integral
+
+>>> x, y = m1.cellCenters
+>>> v1 = CellVariable(mesh=m1, value=x * y)
+>>> coarse = remapOperator(m1, m0, conservative=True)(v1)
+>>> print coarse
+[ 0.25  0.75  0.75  2.25]
+>>> print numerix.allclose(numerix.sum(coarse * m0.cellVolumes),
+...                        numerix.sum(v1.value * m1.cellVolumes))
+True
+
+and so does one onto a finer mesh, where each source cell is shared among
+the target cells it covers
+
+>>> fine = remapOperator(m0, m1, conservative=True)(v0)
+>>> print fine.reshape((4, 4))
+[[ 0.25  0.25  0.75  0.75]
+ [ 0.25  0.25  0.75  0.75]
+ [ 0.75  0.75  2.25  2.25]
+ [ 0.75  0.75  2.25  2.25]]
+>>> print numerix.allclose(numerix.sum(fine * m1.cellVolumes),
+...                        numerix.sum(v0.value * m0.cellVolumes))
+True
+
+even when the meshes are graded and not nested
+
+>>> m2 = Grid2D(dx=(.1, .2, .4, .8, 1.6), dy=(1.6, .8, .4, .2, .1))
+>>> m3 = Grid2D(nx=7, ny=5, dx=3.1 / 7, dy=3.1 / 5)
+>>> x, y = m2.cellCenters
+>>> v2 = CellVariable(mesh=m2, value=1. + x * y)
+>>> for m, n, v in ((m2, m3, v2), (m3, m2, remapOperator(m2, m3, conservative=True)(v2))):
+...     print numerix.allclose(numerix.sum(remapOperator(m, n, conservative=True)(v) * n.cellVolumes),
+...                            numerix.sum(numerix.asarray(v) * m.cellVolumes))
+True
+True
+"""
+__docformat__ = 'restructuredtext'
+
+from weakref import WeakKeyDictionary
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+__all__ = ["InterpolationOperator", "remapOperator"]
+
+class _CellOperator(object):
+    """Sparse linear map from cell values to `shape[0]` output values,
+    stored as `(row, column, weight)` entries sorted by row.
+    """
+    def __init__(self, rows, cols, weights, shape):
+        order = numerix.argsort(rows, kind='mergesort')
+        self.rows = numerix.array(rows, dtype=int)[order]
+        self.cols = numerix.array(cols, dtype=int)[order]
+        self.weights = numerix.array(weights, dtype=float)[order]
+        self.shape = shape
+
+        counts = numerix.bincount(self.rows, minlength=shape[0])
+        self._filledRows = numerix.nonzero(counts)[0]
+        self._starts = (numerix.cumsum(counts) - counts)[self._filledRows]
+
+    def __call__(self, var):
+        """Apply the operator to the cell values `var`
+
+        :Parameters:
+          - `var`: A `CellVariable`, or an array whose last axis runs over
+            the cells.
+        """
+        value = numerix.asarray(var)
+        if value.shape[-1] != self.shape[1]:
+            raise ValueError, "expected %d cell values, got %d" % (self.shape[1], value.shape[-1])
+
+        result = numerix.zeros(value.shape[:-1] + (self.shape[0],), 'd')
+        if len(self.cols) > 0:
+            products = value[..., self.cols] * self.weights
+            result[..., self._filledRows] = numerix.add.reduceat(products, self._starts, axis=-1)
+        return result
+
+def _containingCellIDs(mesh, points):
+    """Cells that contain `points`, or the nearest cells for points outside
+    the mesh"""
+    cellIDs = mesh._locateCellIDs(points)
+    outside = numerix.nonzero(cellIDs < 0)[0]
+    if len(outside) > 0:
+        cellIDs[outside] = mesh._getNearestCellID(numerix.array(points)[..., outside])
+    return cellIDs
+
+class InterpolationOperator(_CellOperator):
+    """Interpolation of the cell values of `mesh` to fixed `points`.
+
+    Each point takes the value of the cell that contains it (or of the
+    nearest cell, if it lies outside the mesh) and, for `order` 1, adds
+    the Gauss gradient of that cell dotted with the offset from the cell
+    center. The gradient is taken with the unconstrained arithmetic face
+    values, so the operator is a fixed sparse matrix and each application
+    costs one sparse matrix-vector product.
+
+    :Parameters:
+      - `mesh`: The mesh whose cell values are interpolated, in serial.
+      - `points`: The points in the format (X, Y, Z).
+      - `order`: The order of interpolation, 0 or 1, default is 0.
+    """
+    def __init__(self, mesh, points, order=0):
+        from fipy.tools.spatialIndex import _SpatialIndex
+        points = _SpatialIndex._asPoints(points)
+        M = points.shape[-1]
+        cellIDs = _containingCellIDs(mesh, points)
+
+        rows = [numerix.arange(M)]
+        cols = [cellIDs]
+        weights = [numerix.ones((M,), 'd')]
+
+        if order == 1:
+            faceIDs = numerix.array(MA.filled(mesh.cellFaceIDs, 0))[..., cellIDs]
+            orientations = numerix.array(MA.filled(mesh._cellToFaceOrientations, 0))[..., cellIDs]
+            offsets = points - numerix.array(mesh.cellCenters.value)[..., cellIDs]
+            projections = numerix.array(mesh._areaProjections)[..., faceIDs]
+            volumes = numerix.array(mesh.cellVolumes)[cellIDs]
+            # contribution of each face value to the gradient correction
+            faceWeights = (orientations * numerix.sum(offsets[..., numerix.newaxis, :] * projections, axis=0)
+                           / volumes)
+
+            alpha = numerix.array(mesh._faceToCellDistanceRatio)[faceIDs]
+            id1, id2 = [numerix.array(IDs)[faceIDs] for IDs in mesh._adjacentCellIDs]
+            used = orientations != 0
+            queries = numerix.resize(numerix.arange(M), faceIDs.shape)[used]
+
+            rows += [queries, queries]
+            cols += [id1[used], id2[used]]
+            weights += [(faceWeights * (1 - alpha))[used], (faceWeights * alpha)[used]]
+        elif order != 0:
+            raise ValueError, 'order should be either 0 or 1'
+
+        _CellOperator.__init__(self,
+                               rows=numerix.concatenate(rows),
+                               cols=numerix.concatenate(cols),
+                               weights=numerix.concatenate(weights),
+                               shape=(M, mesh.numberOfCells))
+
+class _ConservativeRemapOperator(_CellOperator):
+    """Volume-weighted sums of the `source` cells that overlap each
+    `target` cell.
+
+    A source cell overlaps the target cell that holds its center and, where
+    the target is finer than the source, any target cells whose centers
+    it holds but that hold no source center themselves. Each source cell
+    splits its volume among the target cells it overlaps, in proportion to
+    an estimate of the overlap: the volume of the smaller cell. The shares
+    of every source cell sum to one, so the integral is preserved.
+    """
+    def __init__(self, source, target):
+        sourceVolumes = numerix.array(source.cellVolumes)
+        targetVolumes = numerix.array(target.cellVolumes)
+
+        owners = _containingCellIDs(target, numerix.array(source.cellCenters.value))
+        rows = [owners]
+        cols = [numerix.arange(source.numberOfCells)]
+        overlaps = [numerix.minimum(sourceVolumes, targetVolumes[owners])]
+
+        empty = numerix.nonzero(numerix.bincount(owners, minlength=target.numberOfCells) == 0)[0]
+        if len(empty) > 0:
+            rows.append(empty)
+            cols.append(_containingCellIDs(source, numerix.array(target.cellCenters.value)[..., empty]))
+            overlaps.append(targetVolumes[empty])
+
+        rows = numerix.concatenate(rows)
+        cols = numerix.concatenate(cols)
+        overlaps = numerix.concatenate(overlaps)
+        shares = overlaps / numerix.bincount(cols, weights=overlaps, minlength=source.numberOfCells)[cols]
+
+        _CellOperator.__init__(self,
+                               rows=rows,
+                               cols=cols,
+                               weights=sourceVolumes[cols] * shares / targetVolumes[rows],
+                               shape=(target.numberOfCells, source.numberOfCells))
+
+def remapOperator(source, target, order=0, conservative=False):
+    """Operator that maps cell values of `source` to the cells of `target`.
+
+    Operators are cached on `source` for as long as `target` exists, so
+    repeated remaps between the same pair of meshes only build the
+    operator once. The cache is dropped when the geometry of `source` is
+    rescaled.
+
+    :Parameters:
+      - `source`: The mesh to interpolate from, in serial.
+      - `target`: The mesh to interpolate to.
+      - `order`: The order of interpolation, 0 or 1, default is 0.
+      - `conservative`: Whether to preserve the integral over the mesh
+        instead of interpolating at the target cell centers. Only
+        available with `order` 0.
+    """
+    if conservative and order != 0:
+        raise ValueError, 'conservative remapping is only available for order 0'
+
+    if not hasattr(source, "_remapOperatorCache"):
+        source._remapOperatorCache = WeakKeyDictionary()
+    operators = source._remapOperatorCache.setdefault(target, {})
+
+    key = (order, conservative)
+    if key not in operators:
+        if conservative:
+            operators[key] = _ConservativeRemapOperator(source, target)
+        else:
+            operators[key] = InterpolationOperator(source, target.cellCenters.value, order=order)
+
+    return operators[key]
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
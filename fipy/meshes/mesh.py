@@ -61,6 +61,9 @@ class Mesh(AbstractMesh):
         This is built for a non-mixed element mesh.
     """
 
+    _droppableCaches = dict(AbstractMesh._droppableCaches,
+                            _faceTangentsCache="geometry")
+
     def __init__(self, vertexCoords, faceVertexIDs, cellFaceIDs, communicator=serialComm, _RepresentationClass=_MeshRepresentation, _TopologyClass=_MeshTopology):
         super(Mesh, self).__init__(communicator=communicator,
                                    _RepresentationClass=_RepresentationClass,
@@ -83,7 +86,10 @@ class Mesh(AbstractMesh):
         if not hasattr(self, "globalNumberOfFaces"):
             self.globalNumberOfFaces = self.numberOfFaces
 
-        self.faceCellIDs = self._calcFaceCellIDs()
+        dtype = self._indexDtype
+        self.faceVertexIDs = numerix._asIndices(self.faceVertexIDs, dtype)
+        self.cellFaceIDs = numerix._asIndices(self.cellFaceIDs, dtype)
+        self.faceCellIDs = numerix._asIndices(self._calcFaceCellIDs(), dtype)
 
         self._setTopology()
         self._setGeometry(scaleLength = 1.)
@@ -98,9 +104,10 @@ class Mesh(AbstractMesh):
         (self._interiorCellIDs,
          self._exteriorCellIDs) = self._calcInteriorAndExteriorCellIDs()
         self._cellToFaceOrientations = self._calcCellToFaceOrientations()
-        self._adjacentCellIDs = self._calcAdjacentCellIDs()
-        self._cellToCellIDs = self._calcCellToCellIDs()
-        self._cellToCellIDsFilled = self._calcCellToCellIDsFilled()
+        dtype = self._indexDtype
+        self._adjacentCellIDs = numerix._asIndices(self._calcAdjacentCellIDs(), dtype)
+        self._cellToCellIDs = numerix._asIndices(self._calcCellToCellIDs(), dtype)
+        self._cellToCellIDsFilled = numerix._asIndices(self._calcCellToCellIDsFilled(), dtype)
 
     def _calcInteriorAndExteriorFaceIDs(self):
         from fipy.variables.faceVariable import FaceVariable
@@ -129,7 +136,7 @@ class Mesh(AbstractMesh):
 
     def _calcCellToFaceOrientations(self):
         tmp = numerix.take(self.faceCellIDs[0], self.cellFaceIDs)
-        return (tmp == MA.indices(tmp.shape)[-1]) * 2 - 1
+        return (tmp == numerix.arange(tmp.shape[-1])) * 2 - 1
 
     def _calcAdjacentCellIDs(self):
         return (MA.filled(self.faceCellIDs[0]),
@@ -166,8 +173,7 @@ class Mesh(AbstractMesh):
         self._orientedFaceNormals = self._calcOrientedFaceNormals()
         self._cellVolumes = self._calcCellVolumes()
         self._faceCellToCellNormals = self._calcFaceCellToCellNormals()
-        (self._faceTangents1,
-         self._faceTangents2) = self._calcFaceTangents()
+        self.__dict__.pop("_faceTangentsCache", None)
         self._cellToCellDistances = self._calcCellToCellDist()
 
         self._setScaledGeometry(self.scale['length'])
@@ -292,6 +298,16 @@ class Mesh(AbstractMesh):
         faceTangents2 = tmp / numerix.sqrtDot(tmp, tmp)
         return faceTangents1, faceTangents2
 
+    @property
+    def _faceTangents(self):
+        """Both tangents of each face, built on first use"""
+        if not hasattr(self, "_faceTangentsCache"):
+            self._faceTangentsCache = self._calcFaceTangents()
+        return self._faceTangentsCache
+
+    _faceTangents1 = property(lambda s: s._faceTangents[0])
+    _faceTangents2 = property(lambda s: s._faceTangents[1])
+
     def _calcCellToCellDist(self):
         return numerix.take(self._cellDistances, self.cellFaceIDs)
 
@@ -362,6 +378,9 @@ class Mesh(AbstractMesh):
         self._scaledFaceAreas = self._scale['area'] * self._faceAreas
         self._scaledCellVolumes = self._scale['volume'] * self._cellVolumes
         self._scaledCellCenters = self._scale['length'] * self._cellCenters
+        self.__dict__.pop("_cellCenterIndexCache", None)
+        self.__dict__.pop("_cellRadiusIndicesCache", None)
+        self.__dict__.pop("_remapOperatorCache", None)
         self._scaledFaceToCellDistances = self._scale['length'] * self._faceToCellDistances
         self._scaledCellDistances = self._scale['length'] * self._cellDistances
         self._setFaceDependentScaledValues()
@@ -460,9 +479,11 @@ class Mesh(AbstractMesh):
     """calc Topology methods"""
 
     def _calcFaceCellIDs(self):
-        array = MA.array(MA.indices(self.cellFaceIDs.shape, 'l')[1],
+        dtype = self._indexDtype
+        array = MA.array(numerix.resize(numerix.arange(self.cellFaceIDs.shape[-1], dtype=dtype),
+                                        self.cellFaceIDs.shape),
                          mask=MA.getmask(self.cellFaceIDs))
-        faceCellIDs = MA.zeros((2, self.numberOfFaces), 'l')
+        faceCellIDs = MA.zeros((2, self.numberOfFaces), dtype)
 
         ## Nasty bug: MA.put(arr, ids, values) fills its ids and
         ## values arguments when masked!  This was not the behavior
@@ -579,7 +600,7 @@ class Mesh(AbstractMesh):
            [4 5 7 8]
 
         """
-        return numerix.nearest(data=self.cellCenters.globalValue, points=points)
+        return self._cellCenterIndex.nearest(points)
 
     def _test(self):
         """
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "meshCache.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""On-disk cache of the arrays that meshes are built from.
+
+Generating and parsing a large Gmsh mesh can take minutes, and batches of
+jobs often build the same mesh again and again. When the
+:option:`--mesh-cache` flag or the :envvar:`FIPY_MESH_CACHE` environment
+variable names a directory, :class:`~fipy.meshes.gmshMesh.Gmsh2D` and
+:class:`~fipy.meshes.gmshMesh.Gmsh3D` store what they read there. A later
+run with the same input finds it and skips both Gmsh and the parser.
+Only these two classes use the cache: meshes built directly from arrays,
+like :class:`~fipy.meshes.mesh.Mesh` or the grids, are not cached, because
+hashing their arrays would cost about as much as building them.
+
+An entry is keyed on the Gmsh script or MSH file, on the files that the
+script's ``Merge`` and ``Include`` directives name, on the Gmsh version,
+on the version of the reader, and on the mesh options.
+
+Each entry is a directory of ``.npy`` files, loaded memory-mapped and
+copy-on-write, plus a small JSON file for everything else. Entries are
+written atomically, so concurrent jobs may share a cache. Once the cache
+grows beyond :envvar:`FIPY_MESH_CACHE_SIZE` megabytes, the least recently
+used entries are removed.
+
+>>> import shutil, tempfile
+>>> directory = tempfile.mkdtemp()
+>>> cache = _MeshCache(directory, maxSize=1)
+>>> key = cache.key("Point(1) = {0, 0, 0, 1};", dimensions=2, order=1)
+>>> key == cache.key("Point(1) = {0, 0, 0, 1};", dimensions=2, order=1)
+True
+>>> key == cache.key("Point(1) = {0, 0, 0, 1};", dimensions=3, order=1)
+False
+>>> print cache.get(key)
+None
+
+Editing a file that a script includes changes the key
+
+>>> import os
+>>> script = os.path.join(directory, "main.geo")
+>>> open(script, 'w').write('Include "points.geo";\\n')
+>>> open(os.path.join(directory, "points.geo"), 'w').write("Point(1) = {0, 0, 0, 1};\\n")
+>>> key = cache.key(script, dimensions=2)
+>>> key == cache.key(script, dimensions=2)
+True
+>>> open(os.path.join(directory, "points.geo"), 'w').write("Point(1) = {1, 0, 0, 1};\\n")
+>>> key == cache.key(script, dimensions=2)
+False
+
+>>> cache.put(key,
+...           arrays=dict(vertexCoords=numerix.arange(6.).reshape((2, 3)),
+...                       cellFaceIDs=numerix.arange(3)),
+...           info=dict(names={"top": 1}))
+>>> arrays, info = cache.get(key)
+>>> print arrays["vertexCoords"]
+[[ 0.  1.  2.]
+ [ 3.  4.  5.]]
+>>> print info["names"]["top"]
+1
+
+Entries beyond the size limit are evicted, oldest use first
+
+>>> big = dict(data=numerix.zeros((100000,), 'd'))
+>>> cache.put("first", arrays=big)
+>>> cache.put("second", arrays=big)
+>>> cache.get("first") is None, cache.get("second") is None
+(True, False)
+
+>>> shutil.rmtree(directory)
+"""
+__docformat__ = 'restructuredtext'
+
+import json
+import os
+import re
+import shutil
+import tempfile
+
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import new as sha1
+
+from fipy.tools import numerix
+from fipy.tools import parser
+
+__all__ = []
+
+_includePattern = re.compile(br'\b(?:Merge|Include)\s*"([^"]*)"')
+
+class _MeshCache(object):
+    """Directory of cached mesh arrays, limited to `maxSize` megabytes"""
+    def __init__(self, directory, maxSize=1024):
+        self.directory = directory
+        self.maxSize = maxSize * 2**20
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another process may have just made it
+                if not os.path.isdir(directory):
+                    raise
+
+    def key(self, arg, **params):
+        """Hash of a mesh source and the parameters it was built with
+
+        Files that a Gmsh script pulls in with ``Merge`` or ``Include`` are
+        hashed too, as are the files those pull in.
+
+        :Parameters:
+          - `arg`: a path to a file, whose contents are hashed, or a string
+        """
+        digest = sha1()
+        if os.path.exists(arg):
+            self._hashFile(digest, arg, visited=set())
+        else:
+            if not isinstance(arg, bytes):
+                arg = arg.encode('utf-8')
+            digest.update(arg)
+            self._hashIncludes(digest, arg, directory=os.getcwd(), visited=set())
+        for name in sorted(params.keys()):
+            digest.update(("%s=%r;" % (name, params[name])).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _hashFile(self, digest, path, visited):
+        path = os.path.realpath(path)
+        if path in visited:
+            return
+        visited.add(path)
+
+        f = open(path, 'rb')
+        for block in iter(lambda: f.read(2**20), b''):
+            digest.update(block)
+        f.close()
+
+        if os.path.splitext(path)[1].lower() == ".geo":
+            f = open(path, 'rb')
+            text = f.read()
+            f.close()
+            self._hashIncludes(digest, text, directory=os.path.dirname(path), visited=visited)
+
+    def _hashIncludes(self, digest, text, directory, visited):
+        """Hash the files named by the ``Merge`` and ``Include`` directives
+        of the Gmsh script `text`, relative to `directory`"""
+        for name in _includePattern.findall(text):
+            name = name.decode('utf-8')
+            path = os.path.join(directory, os.path.expanduser(name))
+            digest.update(("%s:" % name).encode('utf-8'))
+            if os.path.isfile(path):
+                self._hashFile(digest, path, visited=visited)
+            else:
+                digest.update(b"missing;")
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """The arrays and information stored under `key`, or `None`"""
+        path = self._path(key)
+        try:
+            f = open(os.path.join(path, "info.json"), 'r')
+            try:
+                info = json.load(f)
+            finally:
+                f.close()
+            arrays = {}
+            for name in info.pop("_arrays"):
+                arrays[name] = numerix.asarray(numerix.load(os.path.join(path, name + ".npy"),
+                                                            mmap_mode='c'))
+            # mark as recently used
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            return None
+
+        return arrays, info
+
+    def put(self, key, arrays, info=None):
+        """Store `arrays`, a dictionary of arrays, and `info`, a dictionary
+        that JSON can represent, under `key`"""
+        info = dict(info or {})
+        info["_arrays"] = sorted(arrays.keys())
+
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            for name, value in arrays.items():
+                numerix.save(os.path.join(staging, name + ".npy"), numerix.asarray(value))
+            f = open(os.path.join(staging, "info.json"), 'w')
+            try:
+                json.dump(info, f)
+            finally:
+                f.close()
+            os.rename(staging, self._path(key))
+        except OSError:
+            # an entry for `key` already exists
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._evict(keep=key)
+
+    def _entries(self):
+        """Paths, sizes and times of last use of the entries, oldest first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                size = sum([os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)])
+                entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                # removed by another process
+                pass
+        entries.sort()
+        return entries
+
+    def _evict(self, keep=None):
+        """Remove the least recently used entries, other than `keep`, until
+        the cache fits in `maxSize`"""
+        entries = self._entries()
+        total = sum([size for time, size, path in entries])
+        for time, size, path in entries:
+            if total <= self.maxSize:
+                break
+            if keep is not None and path == self._path(keep):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+def _parseMeshCache():
+    return parser.parse("--mesh-cache", action="store", type="string",
+                        default=os.getenv("FIPY_MESH_CACHE"))
+
+def _parseMeshCacheSize():
+    return parser.parse("--mesh-cache-size", action="store", type="int",
+                        default=int(os.getenv("FIPY_MESH_CACHE_SIZE", 1024)))
+
+def _meshCache():
+    """The configured mesh cache, or `None`"""
+    directory = _parseMeshCache()
+    if directory is None:
+        return None
+    return _MeshCache(os.path.expanduser(directory), maxSize=_parseMeshCacheSize())
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -52,7 +52,7 @@ class NonUniformGrid2D(Mesh2D):
     Creates a 2D grid mesh with horizontal faces numbered
     first and then vertical faces.
     """
-    def __init__(self, dx=1., dy=1., nx=None, ny=None, overlap=2, communicator=parallelComm,
+    def __init__(self, dx=1., dy=1., nx=None, ny=None, overlap=2, communicator=parallelComm, blocks=None,
                  _RepresentationClass=_Grid2DRepresentation, _TopologyClass=_Grid2DTopology):
 
         builder = _NonuniformGrid2DBuilder()
@@ -63,10 +63,12 @@ class NonUniformGrid2D(Mesh2D):
             'nx': nx,
             'ny': ny,
             'overlap': overlap,
-            'communicator': communicator
+            'communicator': communicator,
+            'blocks': blocks
         }
 
-        builder.buildGridData([dx, dy], [nx, ny], overlap, communicator)
+        builder.buildGridData([dx, dy], [nx, ny], overlap, communicator,
+                              blocks=blocks)
 
         ([self.dx, self.dy],
          [self.nx, self.ny],
@@ -74,6 +76,7 @@ class NonUniformGrid2D(Mesh2D):
          scale,
          self.globalNumberOfCells,
          self.globalNumberOfFaces,
+         self.globalShape,
          self.overlap,
          self.offset,
          self.numberOfVertices,
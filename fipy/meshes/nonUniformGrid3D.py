@@ -61,7 +61,7 @@ class NonUniformGrid3D(Mesh):
 
     Faces: XY faces numbered first, then XZ faces, then YZ faces. Within each subcategory, it is numbered in the usual way.
     """
-    def __init__(self, dx = 1., dy = 1., dz = 1., nx = None, ny = None, nz = None, overlap=2, communicator=parallelComm,
+    def __init__(self, dx = 1., dy = 1., dz = 1., nx = None, ny = None, nz = None, overlap=2, communicator=parallelComm, blocks=None,
                  _RepresentationClass=_Grid3DRepresentation, _TopologyClass=_Grid3DTopology):
 
         builder = _NonuniformGrid3DBuilder()
@@ -74,11 +74,12 @@ class NonUniformGrid3D(Mesh):
             'ny': ny,
             'nz': nz,
             'overlap': overlap,
-            'communicator': communicator
+            'communicator': communicator,
+            'blocks': blocks
         }
 
         builder.buildGridData([dx, dy, dz], [nx, ny, nz], overlap,
-                              communicator)
+                              communicator, blocks=blocks)
 
         ([self.dx, self.dy, self.dz],
          [self.nx, self.ny, self.nz],
@@ -86,6 +87,7 @@ class NonUniformGrid3D(Mesh):
          scale,
          self.globalNumberOfCells,
          self.globalNumberOfFaces,
+         self.globalShape,
          self.overlap,
          self.offset,
          self.numberOfVertices,
@@ -400,6 +402,35 @@ class NonUniformGrid3D(Mesh):
             >>> print min(m.z) == 5.5 # doctest: +PROCESSOR_2_OF_3
             True
 
+        In parallel, a grid is divided along every axis into blocks that
+        each hold about the same number of cells.
+
+            >>> from fipy.tools.comms.dummyComm import DummyComm
+            >>> class Processor(DummyComm):
+            ...     def __init__(self, procID, Nproc):
+            ...         self._procID, self._Nproc = procID, Nproc
+            ...     procID = property(lambda self: self._procID)
+            ...     Nproc = property(lambda self: self._Nproc)
+
+            >>> from fipy.meshes.uniformGrid3D import UniformGrid3D
+            >>> for Grid, args in ((UniformGrid3D, dict(nx=6, ny=5, nz=4)),
+            ...                    (NonUniformGrid3D, dict(dx=(1., 2., 3., 4., 5., 6.), dy=.5, ny=5,
+            ...                                            dz=(1., 2., 3., 4.)))):
+            ...     whole = Grid(communicator=Processor(0, 1), **args)
+            ...     owned = []
+            ...     for procID in range(8):
+            ...         block = Grid(communicator=Processor(procID, 8), **args)
+            ...         assert numerix.allclose(numerix.take(block.cellCenters.value, block._localOverlappingCellIDs, axis=1),
+            ...                                 numerix.take(whole.cellCenters.value, block._globalOverlappingCellIDs, axis=1))
+            ...         owned.append(len(block._globalNonOverlappingCellIDs))
+            ...     print owned
+            [12, 12, 18, 18, 12, 12, 18, 18]
+            [12, 12, 18, 18, 12, 12, 18, 18]
+
+            >>> print NonUniformGrid3D(nx=4, ny=4, nz=4, blocks=(1, 2, 1),
+            ...                        communicator=Processor(1, 2)).overlap['bottom']
+            2
+
         """
 
 def _test():
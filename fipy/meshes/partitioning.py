@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "partitioning.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Divide an unstructured mesh among parallel processes.
+
+Gmsh partitions the meshes it generates, but only from version 2.5 on,
+and a `Mesh` built from arrays is not partitioned at all.
+:func:`PartitionedMesh` gives each process its share of the cells of any
+mesh, together with `overlap` layers of ghost cells from its neighbors,
+by recursive bisection of the cell centers:
+
+ - ``"rcb"``: recursive coordinate bisection, which cuts each piece
+   across its longest extent.
+ - ``"inertial"``: recursive inertial bisection, which cuts each piece
+   across its principal axis of inertia, so pieces lying at an angle to
+   the coordinate axes are still cut across their length.
+
+Each bisection divides the cells in proportion to the number of parts on
+either side, so any number of parts is possible.
+
+>>> from fipy import Grid1D, Grid2D
+>>> mesh = Grid2D(nx=8, ny=4)
+>>> parts = _cellParts("rcb", mesh.vertexCoords, mesh.faceVertexIDs, mesh.cellFaceIDs, Nparts=4)
+>>> print parts.reshape((4, 8))
+[[0 0 1 1 2 2 3 3]
+ [0 0 1 1 2 2 3 3]
+ [0 0 1 1 2 2 3 3]
+ [0 0 1 1 2 2 3 3]]
+>>> print _edgeCut(parts, mesh.cellFaceIDs), _balance(parts, Nparts=4)
+12 1.0
+
+>>> line = Grid1D(nx=10)._concatenableMesh
+>>> parts = _cellParts("rcb", line.vertexCoords, line.faceVertexIDs, line.cellFaceIDs, Nparts=3)
+>>> print parts
+[0 0 0 1 1 1 2 2 2 2]
+>>> print _edgeCut(parts, line.cellFaceIDs), _balance(parts, Nparts=3)
+2 1.2
+
+Inertial bisection follows a strip that runs at an angle
+
+>>> from fipy.meshes.mesh2D import Mesh2D
+>>> strip = Grid2D(nx=32, ny=4)
+>>> x, y = strip.vertexCoords
+>>> c, s = numerix.cos(numerix.pi / 6), numerix.sin(numerix.pi / 6)
+>>> strip = Mesh2D(vertexCoords=numerix.array((c * x - s * y, s * x + c * y)),
+...                faceVertexIDs=strip.faceVertexIDs, cellFaceIDs=strip.cellFaceIDs)
+>>> for method in ("rcb", "inertial"):
+...     parts = _cellParts(method, strip.vertexCoords, strip.faceVertexIDs, strip.cellFaceIDs, Nparts=4)
+...     print method, _edgeCut(parts, strip.cellFaceIDs), _balance(parts, Nparts=4)
+rcb 18 1.0
+inertial 12 1.0
+
+Each part is surrounded by `overlap` layers of ghost cells
+
+>>> parts = _cellParts("rcb", mesh.vertexCoords, mesh.faceVertexIDs, mesh.cellFaceIDs, Nparts=4)
+>>> cellIDs, ghostIDs = _overlappingCells(parts, part=1, overlap=1, cellFaceIDs=mesh.cellFaceIDs)
+>>> print cellIDs
+[ 2  3 10 11 18 19 26 27]
+>>> print ghostIDs
+[ 1  4  9 12 17 20 25 28]
+>>> print _overlappingCells(parts, part=0, overlap=2, cellFaceIDs=mesh.cellFaceIDs)[1]
+[ 2 10 18 26  3 11 19 27]
+
+The local mesh of each part holds its own cells followed by its ghosts,
+and knows their global IDs
+
+>>> pieces = [_localMesh(mesh, parts, part, overlap=1) for part in range(4)]
+>>> print [local.numberOfCells for local in pieces]
+[12, 16, 16, 12]
+>>> print numerix.sort(numerix.concatenate([local._globalNonOverlappingCellIDs
+...                                         for local in pieces]))
+[ 0  1  2  3  4  5  6  7  8  9 10 11 12 13 14 15 16 17 18 19 20 21 22 23 24
+ 25 26 27 28 29 30 31]
+>>> for local in pieces:
+...     print (numerix.allclose(local.cellCenters,
+...                             mesh.cellCenters[..., local._globalOverlappingCellIDs])
+...            and numerix.allclose(local.cellVolumes,
+...                                 mesh.cellVolumes[local._globalOverlappingCellIDs])),
+True True True True
+
+A partitioned mesh solves the same problem as the mesh it came from, on
+any number of processes
+
+>>> from fipy import CellVariable, DiffusionTerm
+>>> partitioned = PartitionedMesh(mesh, partitioner="inertial")
+>>> phi = CellVariable(mesh=partitioned, value=0.)
+>>> phi.constrain(1., where=partitioned.facesLeft)
+>>> phi.constrain(0., where=partitioned.facesRight)
+>>> DiffusionTerm().solve(var=phi)
+>>> print numerix.allclose(phi.globalValue, 1 - mesh.cellCenters[0].globalValue / 8)
+True
+>>> edgeCut, balance = partitionQuality(partitioned)
+>>> print balance
+1.0
+"""
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+from fipy.tools import parallelComm
+from fipy.tools import serialComm
+
+from fipy.meshes.reordering import _approximateCellCenters, _cellAdjacency, _Graph
+from fipy.meshes.reordering import _firstUse, _renumbered
+
+__all__ = ["PartitionedMesh", "partitionQuality"]
+
+def _coordinateDirection(centers):
+    """Unit vector along the longest extent of `centers`"""
+    direction = numerix.zeros(centers.shape[:1], 'd')
+    if centers.shape[-1] > 0:
+        direction[numerix.argmax(centers.max(axis=1) - centers.min(axis=1))] = 1.
+    else:
+        direction[0] = 1.
+    return direction
+
+def _inertialDirection(centers):
+    """Principal axis of inertia of `centers`"""
+    if centers.shape[-1] < 2:
+        return _coordinateDirection(centers)
+    offsets = centers - centers.mean(axis=1)[..., numerix.newaxis]
+    values, vectors = numerix.linalg.eigh(numerix.tensordot(offsets, offsets, axes=(1, 1)))
+    return vectors[..., numerix.argmax(values)]
+
+def _bisectionParts(centers, Nparts, direction):
+    """Part of each of `centers`, by recursive bisection across `direction`"""
+    parts = numerix.zeros(centers.shape[-1:], dtype=int)
+    pending = [(numerix.arange(centers.shape[-1]), 0, Nparts)]
+    while len(pending) > 0:
+        IDs, first, count = pending.pop()
+        if count == 1:
+            parts[IDs] = first
+            continue
+
+        lower = count // 2
+        split = (len(IDs) * lower) // count
+        projection = numerix.tensordot(direction(centers[..., IDs]), centers[..., IDs], axes=(0, 0))
+        order = numerix.argsort(projection, kind='mergesort')
+        pending.append((IDs[numerix.sort(order[:split])], first, lower))
+        pending.append((IDs[numerix.sort(order[split:])], first + lower, count - lower))
+
+    return parts
+
+def _cellParts(method, vertexCoords, faceVertexIDs, cellFaceIDs, Nparts):
+    """Part that owns each cell
+
+    :Parameters:
+      - `method`: ``"rcb"`` or ``"inertial"``.
+      - `Nparts`: The number of parts.
+    """
+    if method == "rcb":
+        direction = _coordinateDirection
+    elif method == "inertial":
+        direction = _inertialDirection
+    else:
+        raise ValueError, "unknown partitioner '%s'; expected 'rcb' or 'inertial'" % method
+
+    centers = _approximateCellCenters(vertexCoords, faceVertexIDs, cellFaceIDs)
+    return _bisectionParts(centers, Nparts, direction)
+
+def _edgeCut(parts, cellFaceIDs):
+    """Number of faces between cells of different parts"""
+    cells1, cells2 = _cellAdjacency(cellFaceIDs)
+    return int((parts[cells1] != parts[cells2]).sum())
+
+def _balance(parts, Nparts):
+    """Cells in the largest part, relative to the average"""
+    counts = numerix.bincount(parts, minlength=Nparts)
+    return counts.max() * Nparts / float(counts.sum())
+
+def _overlappingCells(parts, part, overlap, cellFaceIDs):
+    """Global IDs of the cells of `part` and of `overlap` layers of ghost
+    cells around them, layer by layer"""
+    graph = _Graph(cellFaceIDs)
+    inside = (parts == part)
+    cellIDs = numerix.nonzero(inside)[0]
+
+    layers = [numerix.arange(0)]
+    frontier = cellIDs
+    for layer in range(overlap):
+        parents, neighbors = graph.gather(frontier)
+        frontier = numerix.unique(neighbors[~inside[neighbors]])
+        inside[frontier] = True
+        layers.append(frontier)
+
+    return cellIDs, numerix.concatenate(layers).astype(cellIDs.dtype)
+
+def _extract(cellIDs, vertexCoords, faceVertexIDs, cellFaceIDs):
+    """The mesh arrays of just the cells `cellIDs`, with their faces and
+    vertices renumbered in the order the cells first use them.
+
+    :Returns:
+      The `vertexCoords`, `faceVertexIDs` and `cellFaceIDs` of the cells,
+      followed by the original ID of each of their faces and vertices.
+    """
+    cellFaceIDs = cellFaceIDs[..., cellIDs]
+    faceOrder, faceInverse = _firstUse(cellFaceIDs, numerix.shape(faceVertexIDs)[-1])
+    faceOrder = faceOrder[:len(numerix.unique(MA.compressed(cellFaceIDs)))]
+    faceVertexIDs = faceVertexIDs[..., faceOrder]
+    vertexOrder, vertexInverse = _firstUse(faceVertexIDs, numerix.shape(vertexCoords)[-1])
+    vertexOrder = vertexOrder[:len(numerix.unique(MA.compressed(faceVertexIDs)))]
+
+    return (numerix.array(vertexCoords)[..., vertexOrder],
+            _renumbered(faceVertexIDs, vertexInverse),
+            _renumbered(cellFaceIDs, faceInverse),
+            faceOrder,
+            vertexOrder)
+
+def _localMesh(mesh, parts, part, overlap, communicator=serialComm):
+    """Mesh of the cells of `mesh` that belong to `part`, followed by
+    `overlap` layers of ghost cells"""
+    from fipy.meshes.mesh1D import Mesh1D
+    from fipy.meshes.mesh2D import Mesh2D
+    from fipy.meshes.mesh import Mesh
+    from fipy.meshes.topologies.meshTopology import (_PartitionedMesh1DTopology,
+                                                    _PartitionedMesh2DTopology,
+                                                    _PartitionedMeshTopology)
+
+    base = mesh._concatenableMesh
+    MeshClass, TopologyClass = {1: (Mesh1D, _PartitionedMesh1DTopology),
+                                2: (Mesh2D, _PartitionedMesh2DTopology),
+                                3: (Mesh, _PartitionedMeshTopology)}[base.dim]
+
+    cellIDs, ghostIDs = _overlappingCells(parts, part, overlap, base.cellFaceIDs)
+    vertexCoords, faceVertexIDs, cellFaceIDs, faceIDs, vertexIDs = \
+      _extract(numerix.concatenate((cellIDs, ghostIDs)),
+               base.vertexCoords, base.faceVertexIDs, base.cellFaceIDs)
+
+    # the global IDs must be known before any `CellVariable` is built
+    local = MeshClass.__new__(MeshClass)
+    local.cellGlobalIDs = cellIDs.tolist()
+    local.gCellGlobalIDs = ghostIDs.tolist()
+    local.globalNumberOfCells = len(parts)
+    MeshClass.__init__(local,
+                       vertexCoords=vertexCoords,
+                       faceVertexIDs=faceVertexIDs,
+                       cellFaceIDs=cellFaceIDs,
+                       communicator=communicator,
+                       _TopologyClass=TopologyClass)
+
+    return local
+
+def PartitionedMesh(mesh, communicator=parallelComm, partitioner="rcb", overlap=2):
+    """Create this process's share of `mesh`.
+
+    Every process partitions the whole mesh the same way and keeps the
+    cells it owns, followed by `overlap` layers of ghost cells.
+
+    :Parameters:
+      - `mesh`: The mesh to partition, in serial, as built by every process.
+      - `communicator`: The processes to share `mesh` among.
+      - `partitioner`: ``"rcb"`` or ``"inertial"``.
+      - `overlap`: The number of layers of ghost cells.
+
+    :Returns:
+      A mesh of the class that concatenating `mesh` would produce.
+    """
+    base = mesh._concatenableMesh
+    parts = _cellParts(partitioner, base.vertexCoords, base.faceVertexIDs, base.cellFaceIDs,
+                       Nparts=communicator.Nproc)
+    return _localMesh(base, parts, communicator.procID, overlap, communicator=communicator)
+
+def partitionQuality(mesh):
+    """Edge-cut and balance of the partition of a parallel mesh.
+
+    The edge-cut is the number of faces between cells owned by different
+    processes, which is the amount of ghost data exchanged; the balance is
+    the number of cells on the busiest process relative to the average.
+    Both apply to meshes partitioned by Gmsh, by the grids, or by
+    :func:`PartitionedMesh`, so their partitions can be compared.
+
+    :Returns:
+      The edge-cut and the balance.
+    """
+    communicator = mesh.communicator
+    owned = numerix.zeros((mesh.numberOfCells,), 'bool')
+    owned[mesh._localNonOverlappingCellIDs] = True
+
+    id1, id2 = numerix.array(MA.filled(mesh.faceCellIDs, -1))
+    interior = (id1 >= 0) & (id2 >= 0)
+    cut = interior & (owned[id1] != owned[numerix.where(interior, id2, 0)])
+    # each cut face is seen by both of its processes
+    edgeCut = int(communicator.sum(cut.sum())) // 2
+
+    count = owned.sum()
+    balance = (numerix.array(communicator.MaxAll(numerix.array([count]))).max()
+               * communicator.Nproc / float(communicator.sum(count)))
+
+    return edgeCut, balance
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -44,8 +44,16 @@ from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
 __all__ = ["PeriodicGrid2D", "PeriodicGrid2DLeftRight", "PeriodicGrid2DTopBottom"]
 
 class _BasePeriodicGrid2D(NonUniformGrid2D):
-    def __init__(self, dx = 1., dy = 1., nx = None, ny = None, overlap=2, communicator=parallelComm, *args, **kwargs):
-        super(_BasePeriodicGrid2D, self).__init__(dx = dx, dy = dy, nx = nx, ny = ny, overlap=overlap, communicator=communicator, *args, **kwargs)
+    _periodicAxes = (0, 1)
+
+    def __init__(self, dx = 1., dy = 1., nx = None, ny = None, overlap=2, communicator=parallelComm, blocks=None, *args, **kwargs):
+        # faces are only connected within a block, so periodic axes stay
+        # whole, except that a fully periodic grid is still divided into
+        # slabs along its last axis
+        blocks = list(blocks or (None, None))
+        for axis in self._periodicAxes[:len(blocks) - 1]:
+            blocks[axis] = 1
+        super(_BasePeriodicGrid2D, self).__init__(dx = dx, dy = dy, nx = nx, ny = ny, overlap=overlap, communicator=communicator, blocks=blocks, *args, **kwargs)
         self._nonPeriodicCellVertexIDs = super(_BasePeriodicGrid2D, self)._cellVertexIDs
         self._orderedCellVertexIDs_data = super(_BasePeriodicGrid2D, self)._orderedCellVertexIDs
         self._nonPeriodicCellFaceIDs = numerix.array(super(_BasePeriodicGrid2D, self).cellFaceIDs)
@@ -135,11 +143,15 @@ class PeriodicGrid2D(_BasePeriodicGrid2D):
                            numerix.nonzero(self.facesTop))
 
 class PeriodicGrid2DLeftRight(_BasePeriodicGrid2D):
+    _periodicAxes = (0,)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesLeft),
                            numerix.nonzero(self.facesRight))
 
 class PeriodicGrid2DTopBottom(_BasePeriodicGrid2D):
+    _periodicAxes = (1,)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesBottom),
                            numerix.nonzero(self.facesTop))
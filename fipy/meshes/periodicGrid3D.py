@@ -46,8 +46,16 @@ __all__ = ["PeriodicGrid3D", "PeriodicGrid3DLeftRight", "PeriodicGrid3DTopBottom
            "PeriodicGrid3DLeftRightFrontBack", "PeriodicGrid3DTopBottomFrontBack"]
 
 class _BasePeriodicGrid3D(NonUniformGrid3D):
-    def __init__(self, dx=1., dy=1., dz=1., nx=None, ny=None, nz=None, overlap=2, communicator=parallelComm, *args, **kwargs):
-        super(_BasePeriodicGrid3D, self).__init__(dx=dx, dy=dy, dz=dz, nx=nx, ny=ny, nz=nz, overlap=overlap, communicator=communicator, *args, **kwargs)
+    _periodicAxes = (0, 1, 2)
+
+    def __init__(self, dx=1., dy=1., dz=1., nx=None, ny=None, nz=None, overlap=2, communicator=parallelComm, blocks=None, *args, **kwargs):
+        # faces are only connected within a block, so periodic axes stay
+        # whole, except that a fully periodic grid is still divided into
+        # slabs along its last axis
+        blocks = list(blocks or (None, None, None))
+        for axis in self._periodicAxes[:len(blocks) - 1]:
+            blocks[axis] = 1
+        super(_BasePeriodicGrid3D, self).__init__(dx=dx, dy=dy, dz=dz, nx=nx, ny=ny, nz=nz, overlap=overlap, communicator=communicator, blocks=blocks, *args, **kwargs)
         self._nonPeriodicCellVertexIDs = super(_BasePeriodicGrid3D, self)._cellVertexIDs
         self._orderedCellVertexIDs_data = super(_BasePeriodicGrid3D, self)._orderedCellVertexIDs
         self._nonPeriodicCellFaceIDs = numerix.array(super(_BasePeriodicGrid3D, self).cellFaceIDs)
@@ -172,11 +180,15 @@ class PeriodicGrid3D(_BasePeriodicGrid3D):
         pass
 
 class PeriodicGrid3DLeftRight(_BasePeriodicGrid3D):
+    _periodicAxes = (0,)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesLeft),
                            numerix.nonzero(self.facesRight))
 
 class PeriodicGrid3DLeftRightTopBottom(_BasePeriodicGrid3D):
+    _periodicAxes = (0, 1)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesLeft),
                            numerix.nonzero(self.facesRight))
@@ -184,6 +196,8 @@ class PeriodicGrid3DLeftRightTopBottom(_BasePeriodicGrid3D):
                            numerix.nonzero(self.facesTop))
 
 class PeriodicGrid3DLeftRightFrontBack(_BasePeriodicGrid3D):
+    _periodicAxes = (0, 2)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesLeft),
                            numerix.nonzero(self.facesRight))
@@ -191,11 +205,15 @@ class PeriodicGrid3DLeftRightFrontBack(_BasePeriodicGrid3D):
                            numerix.nonzero(self.facesBack))
 
 class PeriodicGrid3DTopBottom(_BasePeriodicGrid3D):
+    _periodicAxes = (1,)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesBottom),
                            numerix.nonzero(self.facesTop))
 
 class PeriodicGrid3DTopBottomFrontBack(_BasePeriodicGrid3D):
+    _periodicAxes = (1, 2)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesBottom),
                            numerix.nonzero(self.facesTop))
@@ -203,6 +221,8 @@ class PeriodicGrid3DTopBottomFrontBack(_BasePeriodicGrid3D):
                            numerix.nonzero(self.facesBack))
 
 class PeriodicGrid3DFrontBack(_BasePeriodicGrid3D):
+    _periodicAxes = (2,)
+
     def _makePeriodic(self):
         self._connectFaces(numerix.nonzero(self.facesFront),
                            numerix.nonzero(self.facesBack))
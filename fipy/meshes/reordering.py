@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "reordering.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Renumber the cells, faces and vertices of an unstructured mesh.
+
+Meshes read from a file keep the numbering of the file, which may scatter
+neighboring cells far apart in memory and in the matrix. Reordering the
+cells so that neighbors get nearby IDs narrows the matrix bandwidth and
+makes the gathers over `faceCellIDs` more local. Two orderings are
+available:
+
+ - ``"rcm"``: Reverse Cuthill-McKee, a breadth-first ordering of the cell
+   adjacency graph, for the narrowest bandwidth.
+ - ``"morton"``: the Morton (Z-order) space-filling curve through the cell
+   centers, for spatial locality.
+
+Faces are then numbered in the order the renumbered cells first use them,
+and vertices in the order the renumbered faces first use them.
+
+>>> from fipy import Grid2D
+>>> from fipy.meshes.mesh2D import Mesh2D
+>>> grid = Grid2D(nx=20, ny=20)
+>>> shuffled = numerix.random.RandomState(seed=0).permutation(grid.numberOfCells)
+>>> vertexCoords, faceVertexIDs, cellFaceIDs, faceOrder, vertexOrder = \\
+...     _renumber(shuffled, grid.vertexCoords, grid.faceVertexIDs, grid.cellFaceIDs)
+>>> mesh = Mesh2D(vertexCoords=vertexCoords, faceVertexIDs=faceVertexIDs, cellFaceIDs=cellFaceIDs)
+>>> print _bandwidth(mesh.cellFaceIDs) > 300
+True
+
+>>> for method in ("rcm", "morton"):
+...     cellOrder = _cellOrder(method, mesh.vertexCoords, mesh.faceVertexIDs, mesh.cellFaceIDs)
+...     arrays = _renumber(cellOrder, mesh.vertexCoords, mesh.faceVertexIDs, mesh.cellFaceIDs)
+...     reordered = Mesh2D(vertexCoords=arrays[0], faceVertexIDs=arrays[1], cellFaceIDs=arrays[2])
+...     print _bandwidth(reordered.cellFaceIDs) < 200
+...     print numerix.allclose(reordered.cellCenters, mesh.cellCenters[..., cellOrder])
+...     print numerix.allclose(reordered.cellVolumes, mesh.cellVolumes[..., cellOrder])
+...     print numerix.allclose(reordered._faceCenters, mesh._faceCenters[..., arrays[3]])
+True
+True
+True
+True
+True
+True
+True
+True
+
+The Reverse Cuthill-McKee ordering brings the bandwidth down to the
+width of the grid
+
+>>> print _bandwidth(_renumber(_reverseCuthillMcKee(mesh.cellFaceIDs),
+...                            mesh.vertexCoords, mesh.faceVertexIDs, mesh.cellFaceIDs)[2])
+20
+
+Disconnected pieces are each ordered in turn
+
+>>> from fipy import Grid1D
+>>> pieces = Grid1D(nx=3) + (Grid1D(nx=2) + [[10.]])
+>>> print _reverseCuthillMcKee(pieces.cellFaceIDs)
+[3 4 0 1 2]
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+def _cellAdjacency(cellFaceIDs):
+    """Pairs of cells that share a face"""
+    cellFaceIDs = numerix.array(MA.filled(cellFaceIDs, -1))
+    faces = cellFaceIDs.ravel()
+    cells = numerix.resize(numerix.arange(cellFaceIDs.shape[-1]), cellFaceIDs.shape).ravel()
+    faces, cells = faces[faces >= 0], cells[faces >= 0]
+
+    order = numerix.argsort(faces, kind='mergesort')
+    faces, cells = faces[order], cells[order]
+    shared = faces[1:] == faces[:-1]
+    return cells[:-1][shared], cells[1:][shared]
+
+def _bandwidth(cellFaceIDs):
+    """Largest difference between the IDs of neighboring cells"""
+    cells1, cells2 = _cellAdjacency(cellFaceIDs)
+    if len(cells1) == 0:
+        return 0
+    return abs(cells1 - cells2).max()
+
+class _Graph(object):
+    """Cell adjacency in compressed row form"""
+    def __init__(self, cellFaceIDs):
+        N = numerix.shape(cellFaceIDs)[-1]
+        cells1, cells2 = _cellAdjacency(cellFaceIDs)
+        rows = numerix.concatenate((cells1, cells2))
+        cols = numerix.concatenate((cells2, cells1))
+        self.neighbors = cols[numerix.argsort(rows, kind='mergesort')]
+        self.degree = numerix.bincount(rows, minlength=N)
+        self.starts = numerix.cumsum(self.degree) - self.degree
+
+    def gather(self, frontier):
+        """Positions in `frontier` and IDs of the neighbors of each cell of
+        `frontier`"""
+        counts = self.degree[frontier]
+        parents = numerix.repeat(numerix.arange(len(frontier)), counts)
+        offsets = numerix.arange(counts.sum()) - numerix.repeat(numerix.cumsum(counts) - counts, counts)
+        return parents, self.neighbors[numerix.repeat(self.starts[frontier], counts) + offsets]
+
+    def levels(self, start, visited):
+        """Cuthill-McKee ordering of the unvisited cells connected to
+        `start`, as a list of breadth-first levels. Marks them visited.
+        """
+        levels = [numerix.array([start])]
+        visited[start] = True
+        while True:
+            parents, candidates = self.gather(levels[-1])
+            fresh = ~visited[candidates]
+            parents, candidates = parents[fresh], candidates[fresh]
+            if len(candidates) == 0:
+                return levels
+
+            # children of earlier parents first, lowest degree first
+            order = numerix.lexsort((self.degree[candidates], parents))
+            candidates = candidates[order]
+            unique, first = numerix.unique(candidates, return_index=True)
+            levels.append(candidates[numerix.sort(first)])
+            visited[levels[-1]] = True
+
+    def peripheralCell(self, start, visited):
+        """A cell far from the others in the component of `start`"""
+        depth = 0
+        for sweep in range(5):
+            levels = self.levels(start, visited)
+            for level in levels:
+                visited[level] = False
+            if len(levels) <= depth:
+                break
+            depth = len(levels)
+            last = levels[-1]
+            start = last[numerix.argmin(self.degree[last])]
+        return start
+
+def _reverseCuthillMcKee(cellFaceIDs):
+    """Cell IDs in Reverse Cuthill-McKee order"""
+    graph = _Graph(cellFaceIDs)
+    N = len(graph.degree)
+    visited = numerix.zeros((N,), 'bool')
+
+    order = []
+    for start in numerix.argsort(graph.degree, kind='mergesort'):
+        if not visited[start]:
+            start = graph.peripheralCell(start, visited)
+            order.extend(graph.levels(start, visited))
+
+    if len(order) == 0:
+        return numerix.arange(0)
+    return numerix.concatenate(order)[::-1]
+
+def _approximateCellCenters(vertexCoords, faceVertexIDs, cellFaceIDs):
+    """Mean of the centers of the faces of each cell, which is close enough
+    to the cell center for ordering"""
+    def means(coords, IDs):
+        IDs = numerix.array(MA.filled(IDs, -1))
+        valid = IDs >= 0
+        return (numerix.sum(numerix.where(valid, coords[..., IDs], 0.), axis=1)
+                / numerix.maximum(valid.sum(axis=0), 1))
+
+    return means(means(numerix.array(vertexCoords), faceVertexIDs), cellFaceIDs)
+
+def _mortonOrder(centers):
+    """Indices of `centers` in Morton (Z-curve) order"""
+    D, N = centers.shape
+    if N == 0:
+        return numerix.arange(0)
+
+    bits = min(21, 62 // D)
+    lower = centers.min(axis=1)
+    extent = centers.max(axis=1) - lower
+    extent[extent == 0] = 1.
+    quantized = ((centers - lower[..., numerix.newaxis]) / extent[..., numerix.newaxis]
+                 * (2**bits - 1)).astype('int64')
+
+    keys = numerix.zeros((N,), 'int64')
+    for bit in range(bits):
+        for d in range(D):
+            keys |= ((quantized[d] >> bit) & 1) << (bit * D + d)
+
+    return numerix.argsort(keys, kind='mergesort')
+
+def _cellOrder(method, vertexCoords, faceVertexIDs, cellFaceIDs):
+    """New cell order, as the old ID of each renumbered cell
+
+    :Parameters:
+      - `method`: ``"rcm"`` or ``"morton"``.
+    """
+    if method == "rcm":
+        return _reverseCuthillMcKee(cellFaceIDs)
+    elif method == "morton":
+        return _mortonOrder(_approximateCellCenters(vertexCoords, faceVertexIDs, cellFaceIDs))
+    else:
+        raise ValueError, "unknown reordering '%s'; expected 'rcm' or 'morton'" % method
+
+def _firstUse(IDs, number):
+    """Order of the `number` IDs by their first appearance in the columns of
+    `IDs`, followed by any that never appear, and its inverse"""
+    flat = numerix.array(MA.filled(IDs, -1)).swapaxes(0, 1).ravel()
+    flat = flat[flat >= 0]
+    unique, first = numerix.unique(flat, return_index=True)
+    order = flat[numerix.sort(first)]
+
+    unused = numerix.ones((number,), 'bool')
+    unused[order] = False
+    order = numerix.concatenate((order, numerix.nonzero(unused)[0]))
+
+    inverse = numerix.zeros((number,), dtype=order.dtype)
+    inverse[order] = numerix.arange(number)
+    return order, inverse
+
+def _renumbered(IDs, inverse):
+    """`IDs`, padded with -1 or masked, in terms of the new numbering"""
+    filled = numerix.array(MA.filled(IDs, -1))
+    renumbered = numerix.where(filled >= 0, inverse[filled], -1)
+    if MA.isMaskedArray(IDs):
+        renumbered = MA.masked_less(renumbered, 0)
+    return renumbered
+
+def _renumber(cellOrder, vertexCoords, faceVertexIDs, cellFaceIDs):
+    """Apply `cellOrder` to the mesh arrays and renumber faces and vertices
+    to follow it.
+
+    :Returns:
+      The renumbered `vertexCoords`, `faceVertexIDs` and `cellFaceIDs`,
+      followed by the old ID of each renumbered face and of each
+      renumbered vertex.
+    """
+    vertexCoords = numerix.array(vertexCoords)
+    cellFaceIDs = cellFaceIDs[..., cellOrder]
+    faceOrder, faceInverse = _firstUse(cellFaceIDs, numerix.shape(faceVertexIDs)[-1])
+    faceVertexIDs = faceVertexIDs[..., faceOrder]
+    vertexOrder, vertexInverse = _firstUse(faceVertexIDs, vertexCoords.shape[-1])
+
+    return (vertexCoords[..., vertexOrder],
+            _renumbered(faceVertexIDs, vertexInverse),
+            _renumbered(cellFaceIDs, faceInverse),
+            faceOrder,
+            vertexOrder)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -48,6 +48,14 @@ def _suite():
         'fipy.meshes.nonUniformGrid3D',
         'fipy.meshes.tri2D',
         'fipy.meshes.gmshMesh',
+        'fipy.meshes.ensembleMesh',
+        'fipy.meshes.interpolationOperator',
+        'fipy.meshes.reordering',
+        'fipy.meshes.partitioning',
+        'fipy.meshes.meshCache',
+        'fipy.meshes.adaptiveGrid',
+        'fipy.meshes.concatenation',
+        'fipy.meshes.cellFaceConnectivity',
         'fipy.meshes.periodicGrid1D',
         'fipy.meshes.periodicGrid2D',
         'fipy.meshes.periodicGrid3D',
@@ -60,7 +68,8 @@ def _suite():
         'fipy.meshes.cylindricalNonUniformGrid2D',
         'fipy.meshes.factoryMeshes',
         'fipy.meshes.abstractMesh',
-        'fipy.meshes.representations.gridRepresentation'))
+        'fipy.meshes.representations.gridRepresentation',
+        'fipy.meshes.builders.grid3DBuilder'))
 
 if __name__ == '__main__':
     fipy.tests.testProgram.main(defaultTest='_suite')
@@ -51,6 +51,40 @@ class _GridTopology(_AbstractTopology):
     def _isOrthogonal(self):
         return True
 
+    @staticmethod
+    def _blockCellIDs(shape, lower, upper):
+        """IDs of the cells from `lower` up to, but not including, `upper`
+        along each axis of a grid of `shape`, with x varying fastest.
+        """
+        IDs = numerix.zeros((), 'l')
+        for n, start, stop in reversed(zip(shape, lower, upper)):
+            IDs = IDs[..., numerix.newaxis] * n + numerix.arange(start, stop)
+        return IDs.ravel()
+
+    @property
+    def _localShape(self):
+        raise NotImplementedError
+
+    @property
+    def _lowerOverlaps(self):
+        raise NotImplementedError
+
+    @property
+    def _upperOverlaps(self):
+        raise NotImplementedError
+
+    @property
+    def _globalLowerCorner(self):
+        return numerix.array(self.mesh.offset)
+
+    def _nonOverlappingCellIDs(self, shape, lower):
+        return self._blockCellIDs(shape,
+                                  lower + self._lowerOverlaps,
+                                  lower + self._localShape - self._upperOverlaps)
+
+    def _overlappingCellIDs(self, shape, lower):
+        return self._blockCellIDs(shape, lower, lower + self._localShape)
+
 class _Grid1DTopology(_GridTopology):
 
     _concatenatedClass = Mesh1D
@@ -226,8 +260,7 @@ class _Grid2DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange((self.mesh.offset[1] + self.mesh.overlap['bottom']) * self.mesh.nx,
-                              (self.mesh.offset[1] + self.mesh.ny - self.mesh.overlap['top']) * self.mesh.nx)
+        return self._nonOverlappingCellIDs(self.mesh.globalShape, self._globalLowerCorner)
 
     @property
     def _globalOverlappingCellIDs(self):
@@ -247,7 +280,7 @@ class _Grid2DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.offset[1] * self.mesh.nx, (self.mesh.offset[1] + self.mesh.ny) * self.mesh.nx)
+        return self._overlappingCellIDs(self.mesh.globalShape, self._globalLowerCorner)
 
     @property
     def _localNonOverlappingCellIDs(self):
@@ -267,8 +300,7 @@ class _Grid2DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.overlap['bottom'] * self.mesh.nx,
-                              (self.mesh.ny - self.mesh.overlap['top']) * self.mesh.nx)
+        return self._nonOverlappingCellIDs(self._localShape, 0)
 
     @property
     def _localOverlappingCellIDs(self):
@@ -290,6 +322,18 @@ class _Grid2DTopology(_GridTopology):
         """
         return numerix.arange(0, self.mesh.ny * self.mesh.nx)
 
+    @property
+    def _localShape(self):
+        return numerix.array((self.mesh.nx, self.mesh.ny))
+
+    @property
+    def _lowerOverlaps(self):
+        return numerix.array((self.mesh.overlap['left'], self.mesh.overlap['bottom']))
+
+    @property
+    def _upperOverlaps(self):
+        return numerix.array((self.mesh.overlap['right'], self.mesh.overlap['top']))
+
     @property
     def _cellTopology(self):
         """return a map of the topology of each cell of grid"""
@@ -311,8 +355,7 @@ class _Grid3DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange((self.mesh.offset[2] + self.mesh.overlap['front']) * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.offset[2] + self.mesh.nz - self.mesh.overlap['back']) * self.mesh.nx * self.mesh.ny)
+        return self._nonOverlappingCellIDs(self.mesh.globalShape, self._globalLowerCorner)
 
     @property
     def _globalOverlappingCellIDs(self):
@@ -323,8 +366,7 @@ class _Grid3DTopology(_GridTopology):
         .. note:: Trivial except for parallel meshes
         """
 
-        return numerix.arange(self.mesh.offset[2] * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.offset[2] + self.mesh.nz) * self.mesh.nx * self.mesh.ny)
+        return self._overlappingCellIDs(self.mesh.globalShape, self._globalLowerCorner)
 
     @property
     def _localNonOverlappingCellIDs(self):
@@ -334,8 +376,7 @@ class _Grid3DTopology(_GridTopology):
 
         .. note:: Trivial except for parallel meshes
         """
-        return numerix.arange(self.mesh.overlap['front'] * self.mesh.nx * self.mesh.ny,
-                              (self.mesh.nz - self.mesh.overlap['back']) * self.mesh.nx * self.mesh.ny)
+        return self._nonOverlappingCellIDs(self._localShape, 0)
 
     @property
     def _localOverlappingCellIDs(self):
@@ -347,6 +388,22 @@ class _Grid3DTopology(_GridTopology):
         """
         return numerix.arange(0, self.mesh.ny * self.mesh.nx * self.mesh.nz)
 
+    @property
+    def _localShape(self):
+        return numerix.array((self.mesh.nx, self.mesh.ny, self.mesh.nz))
+
+    @property
+    def _lowerOverlaps(self):
+        return numerix.array((self.mesh.overlap['left'],
+                              self.mesh.overlap['bottom'],
+                              self.mesh.overlap['front']))
+
+    @property
+    def _upperOverlaps(self):
+        return numerix.array((self.mesh.overlap['right'],
+                              self.mesh.overlap['top'],
+                              self.mesh.overlap['back']))
+
     @property
     def _cellTopology(self):
         """return a map of the topology of each cell of grid"""
@@ -34,10 +34,74 @@
  ##
 __docformat__ = 'restructuredtext'
 
-from fipy.meshes.abstractMesh import AbstractMesh
+import weakref
+
+from fipy.tools import numerix
+from fipy.meshes.abstractMesh import AbstractMesh, _nbytes
 
 __all__ = ["UniformGrid"]
 
+_cachingGrids = weakref.WeakKeyDictionary()
+
+def _clearGeometryCaches():
+    """Drop the cached geometry and topology of every `UniformGrid`."""
+    for grid in _cachingGrids.keys():
+        grid._clearGeometryCache()
+
+def _freeze(value):
+    if isinstance(value, tuple):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, numerix.ndarray):
+        value.flags.writeable = False
+    return value
+
+def _cacheKind(value):
+    """Floating point arrays are geometry and the rest topology"""
+    if isinstance(value, tuple) and len(value) > 0:
+        value = value[0]
+    value = getattr(value, "_value", value)
+    if isinstance(value, numerix.ndarray) and numerix.issubdtype(value.dtype, numerix.floating):
+        return "geometry"
+    return "topology"
+
+class _memoized(object):
+    """Read-only property of a `UniformGrid` that is computed on first
+    access and then kept until the grid's cache is cleared.
+
+    The cached arrays are shared by every caller, so they are made
+    read-only. Integer arrays are IDs and take the grid's `_indexDtype`.
+    """
+    def __init__(self, fget):
+        self.fget = fget
+        self.__name__ = fget.__name__
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, grid, cls=None):
+        if grid is None:
+            return self
+        cache = grid.__dict__.get("_geometryCache")
+        if cache is None:
+            cache = grid.__dict__["_geometryCache"] = {}
+            _cachingGrids[grid] = None
+        try:
+            return cache[self.__name__]
+        except KeyError:
+            value = cache[self.__name__] = _freeze(numerix._asIndices(self.fget(grid), grid._indexDtype))
+            return value
+
+    def __set__(self, grid, value):
+        raise AttributeError, "can't set attribute"
+
+class _memoizedTopology(_memoized):
+    """`_memoized` connectivity array that is not kept, but rebuilt on
+    every access, when the grid has `_implicitTopology`.
+    """
+    def __get__(self, grid, cls=None):
+        if grid is not None and grid._implicitTopology:
+            return numerix._asIndices(self.fget(grid), grid._indexDtype)
+        return _memoized.__get__(self, grid, cls)
+
 class UniformGrid(AbstractMesh):
     """Wrapped scaled geometry properties"""
     @property
@@ -82,3 +146,42 @@ class UniformGrid(AbstractMesh):
 
     _faceToCellDistances = property(_getFaceToCellDistances,
                                     _setFaceToCellDistances)
+
+    """Geometry cache, filled by `_memoized` properties"""
+    def _clearGeometryCache(self):
+        """Drop the cached geometry and topology arrays.
+
+        They are rebuilt on next access.
+        """
+        self.__dict__.pop("_geometryCache", None)
+        self.__dict__.pop("_cellCenterIndexCache", None)
+        self.__dict__.pop("_cellRadiusIndicesCache", None)
+        self.__dict__.pop("_remapOperatorCache", None)
+        self.__dict__.pop("_cellFaceCSR", None)
+        _cachingGrids.pop(self, None)
+
+    @property
+    def _geometryCacheNbytes(self):
+        """Number of bytes held by the geometry cache."""
+        return sum([_nbytes(value) for value in self.__dict__.get("_geometryCache", {}).values()])
+
+    def _arrays(self):
+        for name, value, kind in super(UniformGrid, self)._arrays():
+            if name == "_geometryCache":
+                for name, value in value.items():
+                    yield name, value, _cacheKind(value)
+            else:
+                yield name, value, kind
+
+    def _dropCache(self, name):
+        cache = self.__dict__.get("_geometryCache", {})
+        if name in cache:
+            del cache[name]
+        else:
+            super(UniformGrid, self)._dropCache(name)
+
+    def _setScale(self, scaleLength = 1.):
+        self._clearGeometryCache()
+        super(UniformGrid, self)._setScale(scaleLength=scaleLength)
+
+    scale = property(lambda s: s._scale, _setScale)
@@ -42,7 +42,7 @@ from fipy.tools import numerix
 from fipy.tools.numerix import MA
 from fipy.tools import parallelComm
 
-from fipy.meshes.uniformGrid import UniformGrid
+from fipy.meshes.uniformGrid import UniformGrid, _memoized
 from fipy.meshes.builders import _UniformGrid1DBuilder
 from fipy.meshes.builders import _Grid1DBuilder
 from fipy.meshes.representations.gridRepresentation import _Grid1DRepresentation
@@ -93,6 +93,7 @@ class UniformGrid1D(UniformGrid):
          scale,
          self.globalNumberOfCells,
          self.globalNumberOfFaces,
+         self.globalShape,
          self.overlap,
          self.offset,
          self.numberOfVertices,
@@ -120,7 +121,7 @@ class UniformGrid1D(UniformGrid):
         interiorFaces[numerix.arange(self.numberOfFaces-2) + 1] = True
         return interiorFaces
 
-    @property
+    @_memoized
     def _cellToFaceOrientations(self):
         orientations = numerix.ones((2, self.numberOfCells), 'l')
         if self.numberOfCells > 0:
@@ -128,7 +129,7 @@ class UniformGrid1D(UniformGrid):
             orientations[0,0] = 1
         return orientations
 
-    @property
+    @_memoized
     def _adjacentCellIDs(self):
         c1 = numerix.arange(self.numberOfFaces)
         ids = numerix.array((c1 - 1, c1))
@@ -137,7 +138,7 @@ class UniformGrid1D(UniformGrid):
             ids[1,-1] = ids[0,-1]
         return ids[0], ids[1]
 
-    @property
+    @_memoized
     def _cellToCellIDs(self):
         c1 = numerix.arange(self.numberOfCells)
         ids = MA.array((c1 - 1, c1 + 1))
@@ -146,7 +147,7 @@ class UniformGrid1D(UniformGrid):
             ids[1,-1] = MA.masked
         return ids
 
-    @property
+    @_memoized
     def _cellToCellIDsFilled(self):
         ids = self._cellToCellIDs.filled()
         if self.numberOfCells > 0:
@@ -166,15 +167,15 @@ class UniformGrid1D(UniformGrid):
     Geometry set and calc
     """
 
-    @property
+    @_memoized
     def _faceAreas(self):
         return numerix.ones(self.numberOfFaces,'d')
 
-    @property
+    @_memoized
     def _faceCenters(self):
         return numerix.arange(self.numberOfFaces)[numerix.NewAxis, ...] * self.dx + self.origin
 
-    @property
+    @_memoized
     def faceNormals(self):
         faceNormals = numerix.ones((1, self.numberOfFaces), 'd')
         # The left-most face has neighboring cells None and the left-most cell.
@@ -187,17 +188,17 @@ class UniformGrid1D(UniformGrid):
     def _orientedFaceNormals(self):
         return self.faceNormals
 
-    @property
+    @_memoized
     def _cellVolumes(self):
         return numerix.ones(self.numberOfCells, 'd') * self.dx
 
-    @property
+    @_memoized
     def _cellCenters(self):
         ccs = ((numerix.arange(self.numberOfCells)[numerix.NewAxis, ...] + 0.5) \
                * self.dx + self.origin) * self.scale['length']
         return ccs
 
-    @property
+    @_memoized
     def _cellDistances(self):
         distances = numerix.ones(self.numberOfFaces, 'd')
         distances *= self.dx
@@ -206,15 +207,15 @@ class UniformGrid1D(UniformGrid):
             distances[-1] = self.dx / 2.
         return distances
 
-    @property
+    @_memoized
     def _faceTangents1(self):
         return numerix.zeros(self.numberOfFaces, 'd')[numerix.NewAxis, ...]
 
-    @property
+    @_memoized
     def _faceTangents2(self):
         return numerix.zeros(self.numberOfFaces, 'd')[numerix.NewAxis, ...]
 
-    @property
+    @_memoized
     def _cellToCellDistances(self):
         distances = MA.zeros((2, self.numberOfCells), 'd')
         distances[:] = self.dx
@@ -223,22 +224,22 @@ class UniformGrid1D(UniformGrid):
             distances[1,-1] = self.dx / 2.
         return distances
 
-    @property
+    @_memoized
     def _cellNormals(self):
         normals = numerix.ones((1, 2, self.numberOfCells), 'd')
         if self.numberOfCells > 0:
             normals[:,0] = -1
         return normals
 
-    @property
+    @_memoized
     def _cellAreas(self):
         return numerix.ones((2, self.numberOfCells), 'd')
 
-    @property
+    @_memoized
     def _cellAreaProjections(self):
         return MA.array(self._cellNormals)
 
-    @property
+    @_memoized
     def _cellVolumes(self):
         return numerix.ones(self.numberOfCells, 'd') * self.dx
 
@@ -246,7 +247,7 @@ class UniformGrid1D(UniformGrid):
     Scaled geometry set and calc
     """
 
-    @property
+    @_memoized
     def _faceToCellDistanceRatio(self):
         """how far face is from first to second cell
         
@@ -260,7 +261,7 @@ class UniformGrid1D(UniformGrid):
             distances[-1] = 1
         return distances
 
-    @property
+    @_memoized
     def _areaProjections(self):
         return self.faceNormals
 
@@ -292,7 +293,7 @@ class UniformGrid1D(UniformGrid):
                       faceVertexIDs = _Grid1DBuilder.createFaces(self.numberOfVertices),
                       cellFaceIDs = _Grid1DBuilder.createCells(self.nx))
 
-    @property
+    @_memoized
     def _cellFaceIDs(self):
         return MA.array(_Grid1DBuilder.createCells(self.nx))
 
@@ -300,11 +301,11 @@ class UniformGrid1D(UniformGrid):
     def _maxFacesPerCell(self):
         return 2
 
-    @property
+    @_memoized
     def vertexCoords(self):
         return numerix.array(self.faceCenters)
 
-    @property
+    @_memoized
     def faceCellIDs(self):
         c1 = numerix.arange(self.numberOfFaces)
         ids = MA.array((c1 - 1, c1))
@@ -314,7 +315,7 @@ class UniformGrid1D(UniformGrid):
             ids[1,-1] = MA.masked
         return ids
 
-    @property
+    @_memoized
     def _cellVertexIDs(self):
         c1 = numerix.arange(self.numberOfCells)
         return numerix.array((c1 + 1, c1))
@@ -43,7 +43,7 @@ from fipy.tools.numerix import MA
 from fipy.tools import inline
 from fipy.tools import parallelComm
 
-from fipy.meshes.uniformGrid import UniformGrid
+from fipy.meshes.uniformGrid import UniformGrid, _memoized
 from fipy.meshes.builders import _UniformGrid2DBuilder
 from fipy.meshes.builders import _Grid2DBuilder
 from fipy.meshes.representations.gridRepresentation import _Grid2DRepresentation
@@ -57,7 +57,7 @@ class UniformGrid2D(UniformGrid):
     first and then vertical faces.
     """
     def __init__(self, dx=1., dy=1., nx=1, ny=1, origin=((0,),(0,)),
-                       overlap=2, communicator=parallelComm,
+                       overlap=2, communicator=parallelComm, blocks=None,
                        _RepresentationClass=_Grid2DRepresentation,
                        _TopologyClass=_Grid2DTopology):
 
@@ -75,11 +75,12 @@ class UniformGrid2D(UniformGrid):
             'ny': ny,
             'origin': origin,
             'overlap': overlap,
-            'communicator': communicator
+            'communicator': communicator,
+            'blocks': blocks
         }
 
         builder.buildGridData([dx, dy], [nx, ny], overlap, communicator,
-                              origin)
+                              origin, blocks=blocks)
 
         ([self.dx, self.dy],
          [self.nx, self.ny],
@@ -87,6 +88,7 @@ class UniformGrid2D(UniformGrid):
          scale,
          self.globalNumberOfCells,
          self.globalNumberOfFaces,
+         self.globalShape,
          self.overlap,
          self.offset,
          self.numberOfVertices,
@@ -141,7 +143,7 @@ class UniformGrid2D(UniformGrid):
         interiorFaces[interiorIDs] = True
         return interiorFaces
 
-    @property
+    @_memoized
     def _cellToFaceOrientations(self):
         cellFaceOrientations = numerix.ones((4, self.numberOfCells), 'l')
         if self.numberOfCells > 0:
@@ -151,7 +153,7 @@ class UniformGrid2D(UniformGrid):
         return cellFaceOrientations
 
     if inline.doInline:
-        @property
+        @_memoized
         def _adjacentCellIDs(self):
             faceCellIDs0 =  numerix.zeros(self.numberOfFaces, 'l')
             faceCellIDs1 =  numerix.zeros(self.numberOfFaces, 'l')
@@ -193,7 +195,7 @@ class UniformGrid2D(UniformGrid):
             return (faceCellIDs0, faceCellIDs1)
 
     else:
-        @property
+        @_memoized
         def _adjacentCellIDs(self):
             Hids = numerix.zeros((self.numberOfHorizontalRows, self.nx, 2), 'l')
             indices = numerix.indices((self.numberOfHorizontalRows, self.nx))
@@ -221,7 +223,7 @@ class UniformGrid2D(UniformGrid):
 
             return (faceCellIDs[:,0], faceCellIDs[:,1])
 
-    @property
+    @_memoized
     def _cellToCellIDs(self):
         ids = MA.zeros((4, self.nx, self.ny), 'l')
         indices = numerix.indices((self.nx, self.ny))
@@ -239,7 +241,7 @@ class UniformGrid2D(UniformGrid):
 
         return MA.reshape(ids.swapaxes(1,2), (4, self.numberOfCells))
 
-    @property
+    @_memoized
     def _cellToCellIDsFilled(self):
         N = self.numberOfCells
         M = self._maxFacesPerCell
@@ -256,7 +258,7 @@ class UniformGrid2D(UniformGrid):
         return self._areaProjections
 
     if inline.doInline:
-        @property
+        @_memoized
         def _areaProjections(self):
             areaProjections = numerix.zeros((2, self.numberOfFaces), 'd')
 
@@ -283,22 +285,22 @@ class UniformGrid2D(UniformGrid):
             return areaProjections
 
     else:
-        @property
+        @_memoized
         def _areaProjections(self):
             return self.faceNormals * self._faceAreas
 
-    @property
+    @_memoized
     def _faceAspectRatios(self):
         return self._faceAreas / self._cellDistances
 
-    @property
+    @_memoized
     def _faceAreas(self):
         faceAreas = numerix.zeros(self.numberOfFaces, 'd')
         faceAreas[:self.numberOfHorizontalFaces] = self.dx
         faceAreas[self.numberOfHorizontalFaces:] = self.dy
         return faceAreas
 
-    @property
+    @_memoized
     def faceNormals(self):
         normals = numerix.zeros((2, self.numberOfFaces), 'd')
 
@@ -311,11 +313,11 @@ class UniformGrid2D(UniformGrid):
 
         return normals
 
-    @property
+    @_memoized
     def _cellVolumes(self):
         return numerix.ones(self.numberOfCells, 'd') * self.dx * self.dy
 
-    @property
+    @_memoized
     def _cellCenters(self):
         centers = numerix.zeros((2, self.nx, self.ny), 'd')
         indices = numerix.indices((self.nx, self.ny))
@@ -325,7 +327,7 @@ class UniformGrid2D(UniformGrid):
                                order="FORTRAN") + self.origin
         return ccs
 
-    @property
+    @_memoized
     def _cellDistances(self):
         Hdis = numerix.repeat((self.dy,), self.numberOfHorizontalFaces)
         Hdis = numerix.reshape(Hdis, (self.nx, self.numberOfHorizontalRows))
@@ -342,7 +344,7 @@ class UniformGrid2D(UniformGrid):
         return numerix.concatenate((numerix.reshape(numerix.swapaxes(Hdis,0,1), (self.numberOfHorizontalFaces,)),
                                     numerix.reshape(numerix.swapaxes(Vdis,0,1), (self.numberOfFaces - self.numberOfHorizontalFaces,))))
 
-    @property
+    @_memoized
     def _faceToCellDistanceRatio(self):
         """how far face is from first to second cell
         
@@ -377,7 +379,7 @@ class UniformGrid2D(UniformGrid):
     _faceToCellDistances = property(_getFaceToCellDistances,
                                     _setFaceToCellDistances)
 
-    @property
+    @_memoized
     def _faceTangents1(self):
         tangents = numerix.zeros((2,self.numberOfFaces), 'd')
 
@@ -389,11 +391,11 @@ class UniformGrid2D(UniformGrid):
 
         return tangents
 
-    @property
+    @_memoized
     def _faceTangents2(self):
         return numerix.zeros((2, self.numberOfFaces), 'd')
 
-    @property
+    @_memoized
     def _cellToCellDistances(self):
         distances = numerix.zeros((4, self.nx, self.ny), 'd')
         distances[0] = self.dy
@@ -411,7 +413,7 @@ class UniformGrid2D(UniformGrid):
         return distances.reshape((4, self.numberOfCells), order="FORTRAN")
 
 
-    @property
+    @_memoized
     def _cellNormals(self):
         normals = numerix.zeros((2, 4, self.numberOfCells), 'd')
         normals[:, 0] = [[ 0], [-1]]
@@ -421,7 +423,7 @@ class UniformGrid2D(UniformGrid):
 
         return normals
 
-    @property
+    @_memoized
     def _cellAreas(self):
         areas = numerix.ones((4, self.numberOfCells), 'd')
         areas[0] = self.dx
@@ -430,11 +432,11 @@ class UniformGrid2D(UniformGrid):
         areas[3] = self.dy
         return areas
 
-    @property
+    @_memoized
     def _cellAreaProjections(self):
         return self._cellAreas * self._cellNormals
 
-    @property
+    @_memoized
     def _faceCenters(self):
         Hcen = numerix.zeros((2, self.nx, self.numberOfHorizontalRows), 'd')
         indices = numerix.indices((self.nx, self.numberOfHorizontalRows))
@@ -454,7 +456,8 @@ class UniformGrid2D(UniformGrid):
     def _translate(self, vector):
         return self.__class__(dx = self.args['dx'], nx = self.args['nx'],
                               dy = self.args['dy'], ny = self.args['ny'],
-                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'])
+                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'],
+                              blocks=self.args['blocks'])
 
     def __mul__(self, factor):
         if numerix.shape(factor) is ():
@@ -462,7 +465,8 @@ class UniformGrid2D(UniformGrid):
 
         return UniformGrid2D(dx=self.args['dx'] * numerix.array(factor[0]), nx=self.args['nx'],
                              dy=self.args['dy'] * numerix.array(factor[1]), ny=self.args['ny'],
-                             origin=numerix.array(self.args['origin']) * factor, overlap=self.args['overlap'])
+                             origin=numerix.array(self.args['origin']) * factor, overlap=self.args['overlap'],
+                             blocks=self.args['blocks'])
 
     @property
     def _concatenableMesh(self):
@@ -474,7 +478,7 @@ class UniformGrid2D(UniformGrid):
         del args['origin']
         return NonUniformGrid2D(**args) + origin
 
-    @property
+    @_memoized
     def _cellFaceIDs(self):
         return _Grid2DBuilder.createCells(self.nx, self.ny,
                                           self.numberOfFaces,
@@ -485,7 +489,7 @@ class UniformGrid2D(UniformGrid):
     def _maxFacesPerCell(self):
         return 4
 
-    @property
+    @_memoized
     def vertexCoords(self):
         return _Grid2DBuilder.createVertices(self.nx, self.ny,
                                              self.dx, self.dy,
@@ -494,7 +498,7 @@ class UniformGrid2D(UniformGrid):
                  + self.origin
 
     if inline.doInline:
-        @property
+        @_memoized
         def faceCellIDs(self):
             faceCellIDs = numerix.zeros((2, self.numberOfFaces), 'l')
             mask = numerix.zeros((2, self.numberOfFaces), 'l')
@@ -537,7 +541,7 @@ class UniformGrid2D(UniformGrid):
 
             return MA.masked_where(mask, faceCellIDs)
     else:
-        @property
+        @_memoized
         def faceCellIDs(self):
             Hids = numerix.zeros((2, self.nx, self.numberOfHorizontalRows), 'l')
             indices = numerix.indices((self.nx, self.numberOfHorizontalRows))
@@ -560,11 +564,11 @@ class UniformGrid2D(UniformGrid):
             return MA.masked_values(numerix.concatenate((Hids.reshape((2, self.numberOfHorizontalFaces), order="FORTRAN"),
                                                          Vids.reshape((2, self.numberOfFaces - self.numberOfHorizontalFaces), order="FORTRAN")), axis=1), value = -1)
 
-    @property
+    @_memoized
     def _cellVertexIDs(self):
         return self._orderedCellVertexIDs
 
-    @property
+    @_memoized
     def faceVertexIDs(self):
         Hids = numerix.zeros((2, self.nx, self.numberOfHorizontalRows), 'l')
         indices = numerix.indices((self.nx, self.numberOfHorizontalRows))
@@ -834,6 +838,61 @@ class UniformGrid2D(UniformGrid):
             >>> var = CellVariable(mesh=mesh)
             >>> DiffusionTerm().solve(var)
 
+        Geometry is built on first access and shared until the cache is
+        cleared.
+
+            >>> mesh = UniformGrid2D(nx=3, ny=2)
+            >>> centers = mesh._cellCenters
+            >>> print centers is mesh._cellCenters
+            True
+            >>> print mesh._geometryCacheNbytes == centers.nbytes
+            True
+            >>> centers[0, 0] = 10. # doctest: +IGNORE_EXCEPTION_DETAIL
+            Traceback (most recent call last):
+                ...
+            ValueError: assignment destination is read-only
+            >>> mesh._clearGeometryCache()
+            >>> print mesh._geometryCacheNbytes
+            0
+            >>> print centers is mesh._cellCenters
+            False
+            >>> print numerix.allequal(centers, mesh._cellCenters)
+            True
+
+        In parallel, each processor holds a block of the grid. Building the
+        blocks of four processors in turn gives each cell to exactly one of
+        them, at the same place it has in the whole grid.
+
+            >>> from fipy.tools.comms.dummyComm import DummyComm
+            >>> class Processor(DummyComm):
+            ...     def __init__(self, procID, Nproc):
+            ...         self._procID, self._Nproc = procID, Nproc
+            ...     procID = property(lambda self: self._procID)
+            ...     Nproc = property(lambda self: self._Nproc)
+
+            >>> from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
+            >>> for Grid, args in ((UniformGrid2D, dict(nx=6, ny=5)),
+            ...                    (NonUniformGrid2D, dict(dx=(1., 2., 3., 4., 5., 6.), dy=.5, ny=5))):
+            ...     whole = Grid(communicator=Processor(0, 1), **args)
+            ...     owned = []
+            ...     for procID in range(4):
+            ...         block = Grid(communicator=Processor(procID, 4), **args)
+            ...         print block.shape, block.overlap['left'], block.overlap['bottom'],
+            ...         print numerix.allclose(numerix.take(block._cellCenters, block._localOverlappingCellIDs, axis=1),
+            ...                                numerix.take(whole._cellCenters, block._globalOverlappingCellIDs, axis=1))
+            ...         owned.append(block._globalNonOverlappingCellIDs)
+            ...     print numerix.allequal(numerix.sort(numerix.concatenate(owned)), numerix.arange(30))
+            (5, 4) 0 0 True
+            (5, 4) 2 0 True
+            (5, 5) 0 2 True
+            (5, 5) 2 2 True
+            True
+            (5, 4) 0 0 True
+            (5, 4) 2 0 True
+            (5, 5) 0 2 True
+            (5, 5) 2 2 True
+            True
+
         """
 
 def _test():
@@ -33,11 +33,14 @@
  # ########################################################################
  ##
 
+import os
+
 from fipy.tools import numerix
 from fipy.tools.numerix import MA
 from fipy.tools import parallelComm
+from fipy.tools import parser
 
-from fipy.meshes.uniformGrid import UniformGrid
+from fipy.meshes.uniformGrid import UniformGrid, _memoized, _memoizedTopology
 from fipy.meshes.builders import _UniformGrid3DBuilder
 from fipy.meshes.builders import _Grid3DBuilder
 from fipy.meshes.representations.gridRepresentation import _Grid3DRepresentation
@@ -63,8 +66,19 @@ class UniformGrid3D(UniformGrid):
 
     Faces: XY faces numbered first, then XZ faces, then YZ faces. Within each subcategory, it is numbered in the usual way.
     """
+
+    _implicitTopology = (os.getenv("FIPY_IMPLICIT_TOPOLOGY") is not None) or False
+    if parser.parse("--no-implicit-topology", action="store_true"):
+        _implicitTopology = False
+    if parser.parse("--implicit-topology", action="store_true"):
+        _implicitTopology = True
+
+    ## Number of cells whose interior faces are handed to a term at once
+    ## when the topology is implicit (see `_interiorFaceChunks()`)
+    _interiorFaceChunkSize = 2**20
+
     def __init__(self, dx = 1., dy = 1., dz = 1., nx = 1, ny = 1, nz = 1,
-                 origin = [[0], [0], [0]], overlap=2, communicator=parallelComm,
+                 origin = [[0], [0], [0]], overlap=2, communicator=parallelComm, blocks=None,
                  _RepresentationClass=_Grid3DRepresentation,
                  _TopologyClass=_Grid3DTopology):
 
@@ -83,11 +97,12 @@ class UniformGrid3D(UniformGrid):
             'nz': nz,
             'origin': origin,
             'overlap': overlap,
-            'communicator': communicator
+            'communicator': communicator,
+            'blocks': blocks
         }
 
         builder.buildGridData([dx, dy, dz], [nx, ny, nz], overlap,
-                              communicator, origin)
+                              communicator, origin, blocks=blocks)
 
         ([self.dx, self.dy, self.dz],
          [self.nx, self.ny, self.nz],
@@ -95,6 +110,7 @@ class UniformGrid3D(UniformGrid):
          scale,
          self.globalNumberOfCells,
          self.globalNumberOfFaces,
+         self.globalShape,
          self.overlap,
          self.offset,
          self.numberOfVertices,
@@ -126,8 +142,8 @@ class UniformGrid3D(UniformGrid):
 
         exteriorIDs = numerix.concatenate((numerix.ravel(XYids[...,      0].swapaxes(0,1)),
                                            numerix.ravel(XYids[...,     -1].swapaxes(0,1)),
-                                           numerix.ravel(XZids[...,  0,...]),
-                                           numerix.ravel(XZids[..., -1,...]),
+                                           numerix.ravel(XZids[...,  0,:]),
+                                           numerix.ravel(XZids[..., -1,:]),
                                            numerix.ravel(YZids[ 0,     ...]),
                                            numerix.ravel(YZids[-1,     ...])))
 
@@ -146,7 +162,7 @@ class UniformGrid3D(UniformGrid):
         YZids = self._YZFaceIDs
 
         interiorIDs = numerix.concatenate((numerix.ravel(XYids[ ...     ,1:-1]),
-                                           numerix.ravel(XZids[ ...,1:-1, ...]),
+                                           numerix.ravel(XZids[ ...,1:-1, :]),
                                            numerix.ravel(YZids[1:-1,      ...].swapaxes(0,1))))
 
         from fipy.variables.faceVariable import FaceVariable
@@ -154,18 +170,77 @@ class UniformGrid3D(UniformGrid):
         interiorFaces[interiorIDs] = True
         return interiorFaces
 
-    @property
+    def _interiorFaceChunks(self):
+        """
+        With implicit topology, the interior faces and the cells on either
+        side of them are counted out a few planes of cells at a time,
+        rather than taken from the connectivity arrays
+
+            >>> from fipy.meshes.nonUniformGrid3D import NonUniformGrid3D
+            >>> mesh = NonUniformGrid3D(nx=3, ny=4, nz=5)
+            >>> implicitMesh = UniformGrid3D(nx=3, ny=4, nz=5)
+            >>> implicitMesh._implicitTopology = True
+            >>> implicitMesh._interiorFaceChunkSize = 2 * 12
+            >>> chunks = [zip(*mesh._interiorFaceChunks()),
+            ...           zip(*implicitMesh._interiorFaceChunks())]
+            >>> print [len(faceIDs) for faceIDs in chunks[1][0]]
+            [12, 24, 12, 18, 18, 9, 16, 16, 8]
+            >>> for ids, implicitIDs in zip(*chunks):
+            ...     print numerix.allequal(numerix.concatenate(ids),
+            ...                            numerix.concatenate(implicitIDs))
+            True
+            True
+            True
+        """
+        if not self._implicitTopology:
+            return super(UniformGrid3D, self)._interiorFaceChunks()
+        return self._implicitInteriorFaceChunks()
+
+    def _implicitInteriorFaceChunks(self):
+        nx, ny, nz = self.nx, self.ny, self.nz
+        nxy = nx * ny
+        if nxy * nz == 0:
+            return
+
+        def cells(first, last):
+            return numerix.arange(first * nxy, last * nxy, dtype=self._indexDtype)
+
+        planesPerChunk = max(self._interiorFaceChunkSize // nxy, 1)
+        chunks = [(first, min(first + planesPerChunk, nz))
+                  for first in range(0, nz, planesPerChunk)]
+
+        # XY faces are numbered like the cells above them
+        for first, last in chunks:
+            id2 = cells(max(first, 1), last)
+            yield id2, id2 - nxy, id2
+
+        # XZ faces follow, with an extra row in each plane
+        for first, last in chunks:
+            id2 = cells(first, last).reshape((last - first, ny, nx))[:, 1:, :].ravel()
+            yield id2 + self.numberOfXYFaces + (id2 // nxy) * nx, id2 - nx, id2
+
+        # YZ faces come last, with an extra column in each row
+        for first, last in chunks:
+            id2 = cells(first, last).reshape((-1, nx))[:, 1:].ravel()
+            yield id2 + self.numberOfXYFaces + self.numberOfXZFaces + id2 // nx, id2 - 1, id2
+
+    @_memoizedTopology
     def _cellToFaceOrientations(self):
         tmp = numerix.take(self.faceCellIDs[0], self.cellFaceIDs)
         return (tmp == MA.indices(tmp.shape)[-1]) * 2 - 1
 
-    @property
+    @_memoizedTopology
     def _adjacentCellIDs(self):
+        if self._implicitTopology:
+            cellIDs = numerix.arange(self.numberOfCells).reshape((self.nz, self.ny, self.nx))
+            return (self._facesFromCells(cellIDs, lambda low, high: low),
+                    self._facesFromCells(cellIDs, lambda low, high: high))
+
         faceCellIDs = self.faceCellIDs
         return (MA.where(MA.getmaskarray(faceCellIDs[0]), faceCellIDs[1], faceCellIDs[0]).filled(),
                 MA.where(MA.getmaskarray(faceCellIDs[1]), faceCellIDs[0], faceCellIDs[1]).filled())
 
-    @property
+    @_memoizedTopology
     def _cellToCellIDs(self):
         ids = MA.zeros((6, self.nx, self.ny, self.nz), 'l')
         indices = numerix.indices((self.nx, self.ny, self.nz))
@@ -183,15 +258,15 @@ class UniformGrid3D(UniformGrid):
             ids[0, 0,    ...] = MA.masked
             ids[1,-1,    ...] = MA.masked
         if self.ny > 0:
-            ids[2,..., 0,...] = MA.masked
-            ids[3,...,-1,...] = MA.masked
+            ids[2,..., 0,:] = MA.masked
+            ids[3,...,-1,:] = MA.masked
         if self.nz > 0:
             ids[4,...,     0] = MA.masked
             ids[5,...,    -1] = MA.masked
 
         return MA.reshape(ids.swapaxes(1,3), (6, self.numberOfCells))
 
-    @property
+    @_memoizedTopology
     def _cellToCellIDsFilled(self):
         N = self.numberOfCells
         M = self._maxFacesPerCell
@@ -203,13 +278,13 @@ class UniformGrid3D(UniformGrid):
     Geometry set and calc
     """
 
-    @property
+    @_memoized
     def _faceAreas(self):
         return numerix.concatenate((numerix.repeat((self.dx * self.dy,), self.numberOfXYFaces),
                                     numerix.repeat((self.dx * self.dz,), self.numberOfXZFaces),
                                     numerix.repeat((self.dy * self.dz,), self.numberOfYZFaces)))
 
-    @property
+    @_memoized
     def faceNormals(self):
         XYnor = numerix.zeros((3, self.nx, self.ny, self.nz + 1), 'l')
         XYnor[0,      ...] =  1
@@ -217,7 +292,7 @@ class UniformGrid3D(UniformGrid):
 
         XZnor = numerix.zeros((3, self.nx, self.ny + 1, self.nz), 'l')
         XZnor[1,      ...] =  1
-        XZnor[1,...,0,...] = -1
+        XZnor[1,...,0,:] = -1
 
         YZnor = numerix.zeros((3, self.nx + 1, self.ny, self.nz), 'l')
         YZnor[2,      ...] =  1
@@ -227,11 +302,11 @@ class UniformGrid3D(UniformGrid):
                                     numerix.reshape(XZnor[::-1].swapaxes(1,3), (3, self.numberOfXZFaces)),
                                     numerix.reshape(YZnor[::-1].swapaxes(1,3), (3, self.numberOfYZFaces))), axis=1)
 
-    @property
+    @_memoized
     def _cellVolumes(self):
         return numerix.ones(self.numberOfCells, 'd') * self.dx * self.dy * self.dz
 
-    @property
+    @_memoized
     def _cellCenters(self):
         centers = numerix.zeros((3, self.nx, self.ny, self.nz), 'd')
         indices = numerix.indices((self.nx, self.ny, self.nz))
@@ -241,7 +316,7 @@ class UniformGrid3D(UniformGrid):
         ccs = numerix.reshape(centers.swapaxes(1,3), (3, self.numberOfCells)) + self.origin
         return ccs
 
-    @property
+    @_memoized
     def _cellDistances(self):
         XYdis = numerix.zeros((self.nz + 1, self.ny, self.nx),'d')
         XYdis[:] = self.dz
@@ -250,8 +325,8 @@ class UniformGrid3D(UniformGrid):
 
         XZdis = numerix.zeros((self.nz, self.ny + 1, self.nx),'d')
         XZdis[:] = self.dy
-        XZdis[..., 0,...] = self.dy / 2.
-        XZdis[...,-1,...] = self.dy / 2.
+        XZdis[..., 0,:] = self.dy / 2.
+        XZdis[...,-1,:] = self.dy / 2.
 
         YZdis = numerix.zeros((self.nz, self.ny, self.nx + 1),'d')
         YZdis[:] = self.dx
@@ -262,7 +337,7 @@ class UniformGrid3D(UniformGrid):
                                     numerix.ravel(XZdis),
                                     numerix.ravel(YZdis)))
 
-    @property
+    @_memoized
     def _faceToCellDistanceRatio(self):
         """how far face is from first to second cell
         
@@ -276,8 +351,8 @@ class UniformGrid3D(UniformGrid):
 
         XZdis = numerix.zeros((self.nx, self.ny + 1, self.nz),'d')
         XZdis[:] = 0.5
-        XZdis[..., 0,...] = 1
-        XZdis[...,-1,...] = 1
+        XZdis[..., 0,:] = 1
+        XZdis[...,-1,:] = 1
 
         YZdis = numerix.zeros((self.nx + 1, self.ny, self.nz),'d')
         YZdis[:] = 0.5
@@ -292,7 +367,7 @@ class UniformGrid3D(UniformGrid):
     def _orientedFaceNormals(self):
         return self.faceNormals
 
-    @property
+    @_memoized
     def _faceTangents1(self):
         XYtan = numerix.zeros((3, self.nx, self.ny, self.nz + 1), 'l')
         XYtan[2,      ...] =  1
@@ -307,7 +382,7 @@ class UniformGrid3D(UniformGrid):
                                     numerix.reshape(XZtan[::-1].swapaxes(1,3), (3, self.numberOfXZFaces)),
                                     numerix.reshape(YZtan[::-1].swapaxes(1,3), (3, self.numberOfYZFaces))), axis=1)
 
-    @property
+    @_memoized
     def _faceTangents2(self):
         XYtan = numerix.zeros((3, self.nx, self.ny, self.nz + 1), 'l')
         XYtan[1,      ...] =  1
@@ -322,7 +397,7 @@ class UniformGrid3D(UniformGrid):
                                     numerix.reshape(XZtan[::-1].swapaxes(1,3), (3, self.numberOfXZFaces)),
                                     numerix.reshape(YZtan[::-1].swapaxes(1,3), (3, self.numberOfYZFaces))), axis=1)
 
-    @property
+    @_memoized
     def _cellToCellDistances(self):
         distances = numerix.zeros((6, self.nx, self.ny, self.nz), 'd')
         distances[0] = self.dx
@@ -334,26 +409,26 @@ class UniformGrid3D(UniformGrid):
 
         distances[0,  0,...    ] = self.dx / 2.
         distances[1, -1,...    ] = self.dx / 2.
-        distances[2,...,  0,...] = self.dy / 2.
-        distances[3,..., -1,...] = self.dy / 2.
+        distances[2,...,  0,:] = self.dy / 2.
+        distances[3,..., -1,:] = self.dy / 2.
         distances[4,...,      0] = self.dz / 2.
         distances[5,...,     -1] = self.dz / 2.
 
         return numerix.reshape(distances.swapaxes(1,3), (6, self.numberOfCells))
 
-    @property
+    @_memoized
     def _cellNormals(self):
         normals = numerix.zeros((3, 6, self.numberOfCells), 'd')
-        normals[...,0,...] = [[-1], [ 0], [ 0]]
-        normals[...,1,...] = [[ 1], [ 0], [ 0]]
-        normals[...,2,...] = [[ 0], [-1], [ 0]]
-        normals[...,3,...] = [[ 0], [ 1], [ 0]]
-        normals[...,4,...] = [[ 0], [ 0], [-1]]
-        normals[...,5,...] = [[ 0], [ 0], [ 1]]
+        normals[...,0,:] = [[-1], [ 0], [ 0]]
+        normals[...,1,:] = [[ 1], [ 0], [ 0]]
+        normals[...,2,:] = [[ 0], [-1], [ 0]]
+        normals[...,3,:] = [[ 0], [ 1], [ 0]]
+        normals[...,4,:] = [[ 0], [ 0], [-1]]
+        normals[...,5,:] = [[ 0], [ 0], [ 1]]
 
         return normals
 
-    @property
+    @_memoized
     def _cellAreas(self):
         areas = numerix.ones((6, self.numberOfCells), 'd')
         areas[0] = self.dy * self.dz
@@ -364,13 +439,13 @@ class UniformGrid3D(UniformGrid):
         areas[5] = self.dx * self.dy
         return areas
 
-    @property
+    @_memoized
     def _cellAreaProjections(self):
         return self._cellAreas * self._cellNormals
 
 ##         from numMesh/mesh
 
-    @property
+    @_memoized
     def _faceCenters(self):
 
         XYcen = numerix.zeros((3, self.nx, self.ny, self.nz + 1), 'd')
@@ -399,19 +474,88 @@ class UniformGrid3D(UniformGrid):
     def _orientedAreaProjections(self):
         return self._areaProjections
 
-    @property
+    @_memoized
     def _areaProjections(self):
         return self.faceNormals * self._faceAreas
 
-    @property
+    @_memoized
     def _faceAspectRatios(self):
         return self._faceAreas / self._cellDistances
 
+    """
+    Strided kernels
+
+    Cells are stored in (z, y, x) order, as are the faces in each of the XY,
+    XZ and YZ blocks, so values can be shifted between cells and faces by
+    slicing, without any connectivity arrays.
+    """
+
+    def _faceBlocks(self, faceValues):
+        """Views of `faceValues` on the YZ, XZ and XY faces, i.e., on the
+        faces normal to x, y and z, each shaped like the faces it holds.
+        """
+        shape = faceValues.shape[:-1]
+        XY = self.numberOfXYFaces
+        XZ = XY + self.numberOfXZFaces
+        return (faceValues[..., XZ:].reshape(shape + (self.nz, self.ny, self.nx + 1)),
+                faceValues[..., XY:XZ].reshape(shape + (self.nz, self.ny + 1, self.nx)),
+                faceValues[..., :XY].reshape(shape + (self.nz + 1, self.ny, self.nx)))
+
+    def _facesFromCells(self, cells, combine):
+        """Face values computed from the values of `cells`, shaped
+        ``(..., nz, ny, nx)``.
+
+        `combine(low, high)` is called with the cell values below and
+        above each interior face. The value of a boundary face is that of
+        its cell.
+        """
+        shape = cells.shape[:-3]
+        blocks = []
+        for axis in (-3, -2, -1):
+            low = _slab(cells, axis, slice(None, -1))
+            high = _slab(cells, axis, slice(1, None))
+            block = numerix.concatenate((_slab(cells, axis, slice(None, 1)),
+                                         combine(low, high),
+                                         _slab(cells, axis, slice(-1, None))), axis=axis)
+            blocks.append(block.reshape(shape + (-1,)))
+        return numerix.concatenate(blocks, axis=-1)
+
+    def _arithmeticFaceValues(self, cellValues):
+        """Arithmetic average of `cellValues` on the faces."""
+        cells = cellValues.reshape(cellValues.shape[:-1] + (self.nz, self.ny, self.nx))
+        return self._facesFromCells(cells, lambda low, high: (high - low) * 0.5 + low)
+
+    def _faceDifferences(self, faceValues):
+        """For each direction, the value on the high face of each cell less
+        the value on its low face.
+        """
+        shape = faceValues.shape[:-1] + (self.numberOfCells,)
+        return numerix.array([(_slab(block, axis, slice(1, None))
+                               - _slab(block, axis, slice(None, -1))).reshape(shape)
+                              for axis, block in zip((-1, -2, -3), self._faceBlocks(faceValues))])
+
+    def _sumOverFaces(self, faceValues):
+        """Sum of `faceValues` over the faces of each cell, with the sign of
+        `_cellToFaceOrientations`.
+
+        Faces on the low boundaries belong to their cell as the first
+        neighbor, so they count positively, like those on the high
+        boundaries.
+        """
+        shape = faceValues.shape[:-1]
+        total = numerix.zeros(shape + (self.nz, self.ny, self.nx), 'd')
+        for axis, block in zip((-1, -2, -3), self._faceBlocks(faceValues)):
+            total += _slab(block, axis, slice(1, None)) - _slab(block, axis, slice(None, -1))
+            lowest = _slab(total, axis, slice(None, 1))
+            lowest += 2 * _slab(block, axis, slice(None, 1))
+        return total.reshape(shape + (self.numberOfCells,))
+
     def _translate(self, vector):
         return self.__class__(dx = self.args['dx'], nx = self.args['nx'],
                               dy = self.args['dy'], ny = self.args['ny'],
                               dz = self.args['dz'], nz = self.args['nz'],
-                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'])
+                             origin = numerix.array(self.args['origin']) + vector, overlap=self.args['overlap'],
+                              blocks=self.args['blocks'])
 
     def __mul__(self, factor):
         return UniformGrid3D(dx = self.dx * factor, nx = self.nx,
@@ -429,26 +573,27 @@ class UniformGrid3D(UniformGrid):
         del args['origin']
         return NonUniformGrid3D(**args) + origin
 
-    @property
+    @_memoizedTopology
     def _cellFaceIDs(self):
         return MA.array(_Grid3DBuilder.createCells(self.nx,
                                                    self.ny,
                                                    self.nz,
                                                    self.numberOfXYFaces,
                                                    self.numberOfXZFaces,
-                                                   self.numberOfYZFaces))
+                                                   self.numberOfYZFaces,
+                                                   dtype=self._indexDtype))
 
-    @property
+    @_memoizedTopology
     def _XYFaceIDs(self):
         ids = numerix.arange(0, self.numberOfXYFaces)
         return ids.reshape((self.nz + 1, self.ny, self.nx)).swapaxes(0,2)
 
-    @property
+    @_memoizedTopology
     def _XZFaceIDs(self):
         ids = numerix.arange(self.numberOfXYFaces, self.numberOfXYFaces + self.numberOfXZFaces)
         return ids.reshape((self.nz, self.ny + 1, self.nx)).swapaxes(0,2)
 
-    @property
+    @_memoizedTopology
     def _YZFaceIDs(self):
         ids = numerix.arange(self.numberOfXYFaces + self.numberOfXZFaces, self.numberOfFaces)
         return ids.reshape((self.nz, self.ny, self.nx + 1)).swapaxes(0,2)
@@ -459,7 +604,7 @@ class UniformGrid3D(UniformGrid):
 
 ##         from numMesh/mesh
 
-    @property
+    @_memoized
     def vertexCoords(self):
         return _Grid3DBuilder.createVertices(self.dx, self.dy, self.dz,
                                              self.nx, self.ny, self.nz,
@@ -468,7 +613,7 @@ class UniformGrid3D(UniformGrid):
                                              self.numberOfVerticalColumns) \
                 + self.origin
 
-    @property
+    @_memoizedTopology
     def faceCellIDs(self):
         XYids = MA.zeros((2, self.nx, self.ny, self.nz + 1), 'l')
         indices = numerix.indices((self.nx, self.ny, self.nz + 1))
@@ -482,9 +627,9 @@ class UniformGrid3D(UniformGrid):
         indices = numerix.indices((self.nx, self.ny + 1, self.nz))
         XZids[1] = indices[0] + (indices[1] + indices[2] * self.ny) * self.nx
         XZids[0] = XZids[1] - self.nx
-        XZids[0,..., 0,...] = XZids[1,..., 0,...]
-        XZids[1,..., 0,...] = MA.masked
-        XZids[1,...,-1,...] = MA.masked
+        XZids[0,..., 0,:] = XZids[1,..., 0,:]
+        XZids[1,..., 0,:] = MA.masked
+        XZids[1,...,-1,:] = MA.masked
 
         YZids = MA.zeros((2, self.nx + 1, self.ny, self.nz), 'l')
         indices = numerix.indices((self.nx + 1, self.ny, self.nz))
@@ -500,13 +645,13 @@ class UniformGrid3D(UniformGrid):
 
 ##         from common/mesh
 
-    @property
+    @_memoizedTopology
     def _cellVertexIDs(self):
         return self._orderedCellVertexIDs
 
-    @property
+    @_memoizedTopology
     def faceVertexIDs(self):
-       return _Grid3DBuilder.createFaces(self.nx, self.ny, self.nz)[1]
+       return _Grid3DBuilder.createFaces(self.nx, self.ny, self.nz, dtype=self._indexDtype)[1]
 
     def _calcOrderedCellVertexIDs(self):
         """Correct ordering for VTK_VOXEL"""
@@ -951,8 +1096,53 @@ class UniformGrid3D(UniformGrid):
             True
 
             Oh, how boring. We'll assume the 3x2x1 permutations are good enough for everything else until proven otherwise.
+
+        With implicit topology, face values, gradients and divergences are
+        computed by slicing, and connectivity arrays are not kept.
+
+            >>> from fipy import CellVariable, DiffusionTerm, PowerLawConvectionTerm
+            >>> def evaluate(mesh):
+            ...     x, y, z = mesh.cellCenters
+            ...     var = CellVariable(mesh=mesh, value=x * y + z**2)
+            ...     var.constrain(1., where=mesh.facesFront)
+            ...     vector = var.grad
+            ...     phi = CellVariable(mesh=mesh)
+            ...     phi.constrain(1., where=mesh.facesLeft)
+            ...     phi.constrain(0., where=mesh.facesRight)
+            ...     (DiffusionTerm(coeff=1. + mesh.faceCenters[1])
+            ...      + PowerLawConvectionTerm(coeff=(1., -2., 3.))).solve(var=phi)
+            ...     return (var.faceValue.value, var.grad.value, var.faceGrad.divergence.value,
+            ...             vector.faceValue.value, vector.grad.value, var.leastSquaresGrad.value,
+            ...             phi.value)
+            >>> explicit = evaluate(UniformGrid3D(nx=4, ny=3, nz=3, dx=dx, dy=dy, dz=dz))
+
+        Terms are assembled from the interior faces of a plane of cells at a
+        time here
+
+            >>> implicitMesh = UniformGrid3D(nx=4, ny=3, nz=3, dx=dx, dy=dy, dz=dz)
+            >>> implicitMesh._implicitTopology = True
+            >>> implicitMesh._interiorFaceChunkSize = 4 * 3
+            >>> implicit = evaluate(implicitMesh)
+            >>> for a, b in zip(explicit, implicit):
+            ...     print numerix.allclose(a, b) # doctest: +PROCESSOR_0
+            True
+            True
+            True
+            True
+            True
+            True
+            True
+            >>> print implicitMesh.faceCellIDs is implicitMesh.faceCellIDs
+            False
+            >>> print hasattr(implicitMesh, "_cellFaceCSR")
+            False
         """
 
+def _slab(arr, axis, s):
+    index = [slice(None)] * arr.ndim
+    index[axis] = s
+    return arr[tuple(index)]
+
 def _test():
     import fipy.tests.doctestPlus
     return fipy.tests.doctestPlus.testmod()
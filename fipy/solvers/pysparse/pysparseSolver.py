@@ -90,6 +90,8 @@ class PysparseSolver(_PysparseMatrixSolver):
         if self.var.mesh.communicator.Nproc > 1:
             raise Exception("PySparse solvers cannot be used with multiple processors")
 
+        # the solution is written into `array` in place
+        self.var._makeWritable()
         array = self.var.numericValue.ravel()
 
         from fipy.terms import SolutionVariableNumberError
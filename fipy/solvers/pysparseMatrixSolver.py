@@ -75,6 +75,8 @@ class _PysparseMatrixSolver(Solver):
             raise Exception("%ss cannot be used with multiple processors" \
                             % self.__class__)
 
+        # the solution is written into `array` in place
+        self.var._makeWritable()
         array = self.var.numericValue
         newArr = self._solve_(self.matrix, array, self.RHSvector)
 
@@ -72,7 +72,7 @@ class LinearLUSolver(_ScipySolver):
                 break
 
             xError = LU.solve(errorVector)
-            x[:] = x - xError
+            x = x - xError
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT
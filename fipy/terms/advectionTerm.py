@@ -36,7 +36,6 @@ __docformat__ = 'restructuredtext'
 
 __all__ = ["AdvectionTerm"]
 
-from fipy.tools.numerix import MA
 from fipy.tools import numerix
 
 from fipy.terms.firstOrderAdvectionTerm import FirstOrderAdvectionTerm
@@ -203,27 +202,25 @@ class AdvectionTerm(FirstOrderAdvectionTerm):
     The maximum error is 2 % when using a higher order contribution.
 
     """
-    def _getDifferences(self, adjacentValues, cellValues, oldArray, cellToCellIDs, mesh):
+    def _getDifferences(self, adjacentValues, cellValues, oldArray, connectivity, mesh):
 
-        dAP = mesh._cellToCellDistances
+        dAP = connectivity.entries(mesh._cellToCellDistances)
+        cellNormals = connectivity.entries(mesh._cellNormals)
+        gradient = numerix.array(oldArray.grad)
 
-##        adjacentGradient = numerix.take(oldArray.grad, cellToCellIDs)
-        adjacentGradient = numerix.take(oldArray.grad, mesh._cellToCellIDs, axis=-1)
-        adjacentNormalGradient = numerix.dot(adjacentGradient, mesh._cellNormals)
+        adjacentGradient = gradient[..., connectivity.neighborIDs]
+        adjacentNormalGradient = numerix.sum(adjacentGradient * cellNormals, axis=0)
         adjacentUpValues = cellValues + 2 * dAP * adjacentNormalGradient
 
-        cellIDs = numerix.repeat(numerix.arange(mesh.numberOfCells)[numerix.newaxis, ...],
-                mesh._maxFacesPerCell, axis=0)
-        cellIDs = MA.masked_array(cellIDs, mask = MA.getmask(mesh._cellToCellIDs))
-        cellGradient = numerix.take(oldArray.grad, cellIDs, axis=-1)
-        cellNormalGradient = numerix.dot(cellGradient, mesh._cellNormals)
+        cellGradient = gradient[..., connectivity.cellIDs]
+        cellNormalGradient = numerix.sum(cellGradient * cellNormals, axis=0)
         cellUpValues = adjacentValues - 2 * dAP * cellNormalGradient
 
         cellLaplacian = (cellUpValues + adjacentValues - 2 * cellValues) / dAP**2
 
         adjacentLaplacian = (adjacentUpValues + cellValues - 2 * adjacentValues) / dAP**2
-        adjacentLaplacian = adjacentLaplacian.filled(0)
-        cellLaplacian = cellLaplacian.filled(0)
+        adjacentLaplacian = numerix.where(connectivity.exterior, 0., adjacentLaplacian)
+        cellLaplacian = numerix.where(connectivity.exterior, 0., cellLaplacian)
 
         mm = numerix.where(cellLaplacian * adjacentLaplacian < 0.,
                            0.,
@@ -231,7 +228,7 @@ class AdvectionTerm(FirstOrderAdvectionTerm):
                                          adjacentLaplacian,
                                          cellLaplacian))
 
-        return FirstOrderAdvectionTerm._getDifferences(self, adjacentValues, cellValues, oldArray, cellToCellIDs, mesh) -  mm * dAP / 2.
+        return FirstOrderAdvectionTerm._getDifferences(self, adjacentValues, cellValues, oldArray, connectivity, mesh) -  mm * dAP / 2.
 
 class __AdvectionTerm(FirstOrderAdvectionTerm):
     """
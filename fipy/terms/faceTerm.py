@@ -64,17 +64,18 @@ class FaceTerm(_NonDiffusionTerm):
                                 'cell 2 offdiag': coeff * weight['cell 2 offdiag']}
         return self.coeffMatrix
 
-    def _implicitBuildMatrix_(self, SparseMatrix, L, id1, id2, b, weight, var, boundaryConditions, interiorFaces, dt):
+    def _implicitBuildMatrix_(self, SparseMatrix, L, interiorFaceChunks, b, weight, var, boundaryConditions, dt):
         mesh = var.mesh
         coeffMatrix = self._getCoeffMatrix_(var, weight)
 
-        id1 = self._reshapeIDs(var, id1)
-        id2 = self._reshapeIDs(var, id2)
+        for interiorFaces, id1, id2 in interiorFaceChunks:
+            id1 = self._reshapeIDs(var, id1)
+            id2 = self._reshapeIDs(var, id2)
 
-        L.addAt(numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id2.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id2.swapaxes(0,1).ravel())
+            L.addAt(numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id1.swapaxes(0,1).ravel())
+            L.addAt(numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id2.swapaxes(0,1).ravel())
+            L.addAt(numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id1.swapaxes(0,1).ravel())
+            L.addAt(numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id2.swapaxes(0,1).ravel())
 
         N = mesh.numberOfCells
         M = mesh._maxFacesPerCell
@@ -163,11 +164,6 @@ class FaceTerm(_NonDiffusionTerm):
         """Implicit portion considers
         """
         mesh = var.mesh
-        id1, id2 = mesh._adjacentCellIDs
-        interiorFaces = numerix.nonzero(mesh.interiorFaces)[0]
-
-        id1 = numerix.take(id1, interiorFaces)
-        id2 = numerix.take(id2, interiorFaces)
 
         b = numerix.zeros(var.shape,'d').ravel()
         L = SparseMatrix(mesh=mesh)
@@ -175,9 +171,15 @@ class FaceTerm(_NonDiffusionTerm):
         weight = self._getWeight(var, transientGeomCoeff, diffusionGeomCoeff)
 
         if 'implicit' in weight:
-            self._implicitBuildMatrix_(SparseMatrix, L, id1, id2, b, weight['implicit'], var, boundaryConditions, interiorFaces, dt)
+            self._implicitBuildMatrix_(SparseMatrix, L, mesh._interiorFaceChunks(), b, weight['implicit'], var, boundaryConditions, dt)
 
         if 'explicit' in weight:
+            id1, id2 = mesh._adjacentCellIDs
+            interiorFaces = numerix.nonzero(mesh.interiorFaces)[0]
+
+            id1 = numerix.take(id1, interiorFaces)
+            id2 = numerix.take(id2, interiorFaces)
+
             self._explicitBuildMatrix_(SparseMatrix, var.old, id1, id2, b, weight['explicit'], var, boundaryConditions, interiorFaces, dt)
 
         return (var, L, b)
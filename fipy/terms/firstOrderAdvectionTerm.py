@@ -37,7 +37,6 @@ __docformat__ = 'restructuredtext'
 __all__ = ['FirstOrderAdvectionTerm']
 
 from fipy.tools import numerix
-from fipy.tools.numerix import MA
 
 from fipy.terms.nonDiffusionTerm import _NonDiffusionTerm
 
@@ -124,23 +123,16 @@ class FirstOrderAdvectionTerm(_NonDiffusionTerm):
 
         mesh = var.mesh
         NCells = mesh.numberOfCells
-        NCellFaces = mesh._maxFacesPerCell
-
-        cellValues = numerix.repeat(oldArray[numerix.newaxis, ...], NCellFaces, axis = 0)
-
-        cellIDs = numerix.repeat(numerix.arange(NCells)[numerix.newaxis, ...], NCellFaces, axis = 0)
-        cellToCellIDs = mesh._cellToCellIDs
 
         if NCells > 0:
-            cellToCellIDs = MA.where(MA.getmask(cellToCellIDs), cellIDs, cellToCellIDs)
-
-            adjacentValues = numerix.take(oldArray, cellToCellIDs)
+            connectivity = mesh._cellFaceConnectivity
+            cellValues = numerix.array(oldArray)[connectivity.cellIDs]
+            adjacentValues = numerix.array(oldArray)[connectivity.neighborIDs]
 
-            differences = self._getDifferences(adjacentValues, cellValues, oldArray, cellToCellIDs, mesh)
-            differences = MA.filled(differences, 0)
+            differences = self._getDifferences(adjacentValues, cellValues, oldArray, connectivity, mesh)
 
-            minsq = numerix.sqrt(numerix.sum(numerix.minimum(differences, numerix.zeros((NCellFaces, NCells), 'l'))**2, axis=0))
-            maxsq = numerix.sqrt(numerix.sum(numerix.maximum(differences, numerix.zeros((NCellFaces, NCells), 'l'))**2, axis=0))
+            minsq = numerix.sqrt(connectivity.sum(numerix.minimum(differences, 0.)**2))
+            maxsq = numerix.sqrt(connectivity.sum(numerix.maximum(differences, 0.)**2))
 
             coeff = numerix.array(self._getGeomCoeff(var))
 
@@ -150,8 +142,8 @@ class FirstOrderAdvectionTerm(_NonDiffusionTerm):
 
         return (var, SparseMatrix(mesh=var.mesh), -coeffXdifferences * mesh.cellVolumes)
 
-    def _getDifferences(self, adjacentValues, cellValues, oldArray, cellToCellIDs, mesh):
-        return (adjacentValues - cellValues) / mesh._cellToCellDistances
+    def _getDifferences(self, adjacentValues, cellValues, oldArray, connectivity, mesh):
+        return (adjacentValues - cellValues) / connectivity.entries(mesh._cellToCellDistances)
 
     def _getDefaultSolver(self, var, solver, *args, **kwargs):
         solver = solver or super(FirstOrderAdvectionTerm, self)._getDefaultSolver(var, solver, *args, **kwargs)
@@ -461,7 +461,7 @@ class Term(object):
     def _getOldAdjacentValues(self, oldArray, id1, id2, dt):
         raise NotImplementedError
 
-    def _getDifferences(self, adjacentValues, cellValues, oldArray, cellToCellIDs, mesh):
+    def _getDifferences(self, adjacentValues, cellValues, oldArray, connectivity, mesh):
         raise NotImplementedError
 
     def _alpha(self, P):
@@ -120,6 +120,7 @@ class _UnaryTerm(Term):
 
     def _reshapeIDs(self, var, ids):
         shape = (self._vectorSize(var), self._vectorSize(var), ids.shape[-1])
+        ids = numerix.asarray(ids, dtype=numerix._indexDtype(shape[0] * var.mesh.globalNumberOfCells))
         ids = numerix.resize(ids, shape)
         X, Y =  numerix.indices(shape[:-1])
         X *= var.mesh.numberOfCells
@@ -95,6 +95,7 @@ recommended values from CODATA_. Other conversion factors
 """
 __docformat__ = 'restructuredtext'
 
+import copy
 import re
 
 from fipy.tools import numerix
@@ -1444,6 +1445,20 @@ class PhysicalUnit:
         self.factor = factor
         self.offset = offset
         self.powers = numerix.array(powers)
+        self._setExponents()
+
+    def _setExponents(self):
+        # A plain `tuple` of `powers` is much quicker to compare than the
+        # array, and is all that most unit checks need
+        self._exponents = tuple(self.powers.tolist())
+        self._dimensionless = not any(self._exponents)
+
+    def __getattr__(self, attr):
+        # units pickled before `_exponents` was introduced
+        if attr in ("_exponents", "_dimensionless") and "powers" in self.__dict__:
+            self._setExponents()
+            return self.__dict__[attr]
+        raise AttributeError, attr
 
     def __repr__(self):
         """
@@ -1462,7 +1477,7 @@ class PhysicalUnit:
                 return self.isDimensionless()
             else:
                 raise TypeError, 'PhysicalUnits can only be compared with other PhysicalUnits'
-        if not numerix.alltrue(self.powers == other.powers):
+        if self._exponents != other._exponents:
             raise TypeError, 'Incompatible units'
 
     def __eq__(self, other):
@@ -1720,7 +1735,7 @@ class PhysicalUnit:
                 ...
             TypeError: Unit conversion (K to degF) cannot be expressed as a simple multiplicative factor
         """
-        if not numerix.alltrue(self.powers == other.powers):
+        if self._exponents != other._exponents:
             if self.isDimensionlessOrAngle() and other.isDimensionlessOrAngle():
                 return self.factor/other.factor
             else:
@@ -1741,7 +1756,7 @@ class PhysicalUnit:
             >>> [str(numerix.round_(element,6)) for element in b.conversionTupleTo(a)]
             ['0.555556', '459.67']
         """
-        if not numerix.alltrue(self.powers == other.powers):
+        if self._exponents != other._exponents:
             raise TypeError, 'Incompatible units'
 
         # let (s1,d1) be the conversion tuple from 'self' to base units
@@ -1790,7 +1805,7 @@ class PhysicalUnit:
             >>> PhysicalField("1. inch").unit.isDimensionless()
             0
         """
-        return not numerix.logical_or.reduce(self.powers)
+        return self._dimensionless
 
     def isAngle(self):
         """
@@ -1803,8 +1818,7 @@ class PhysicalUnit:
             >>> PhysicalField("1. inch").unit.isAngle()
             0
         """
-        return self.powers[7] == 1 and \
-               numerix.add.reduce(self.powers) == 1
+        return self._exponents[7] == 1 and sum(self._exponents) == 1
 
     def isInverseAngle(self):
         """
@@ -1817,8 +1831,7 @@ class PhysicalUnit:
             >>> PhysicalField("1. inch").unit.isInverseAngle()
             0
         """
-        return self.powers[7] == -1 and \
-               numerix.add.reduce(self.powers) == -1
+        return self._exponents[7] == -1 and sum(self._exponents) == -1
 
 
     def isDimensionlessOrAngle(self):
@@ -1880,6 +1893,9 @@ class PhysicalUnit:
 
 # Helper functions
 
+## `PhysicalUnit` objects parsed from strings by `_findUnit()`
+_parsedUnits = {}
+
 def _findUnit(unit):
     """
     Return the `PhysicalUnit` corresponding to `unit`
@@ -1896,6 +1912,14 @@ def _findUnit(unit):
         Traceback (most recent call last):
             ...
         TypeError: 2.0 is not a unit
+
+    A string is only parsed the first time it is seen. Later requests get
+    a copy of the result, which can be renamed without affecting others
+
+        >>> a = _findUnit('m/s')
+        >>> a.setName('meterpersecond')
+        >>> _findUnit('m/s')
+        <PhysicalUnit m/s>
     """
 ##     print unit, type(unit)
 
@@ -1903,11 +1927,15 @@ def _findUnit(unit):
         name = unit.strip()
         if len(name) == 0 or unit == '1':
             unit = _unity
+        elif name in _parsedUnits:
+            unit = copy.copy(_parsedUnits[name])
         else:
             unit = eval(name, _unit_table)
             for cruft in ['__builtins__', '__args__']:
                 try: del _unit_table[cruft]
                 except: pass
+            if isinstance(unit, PhysicalUnit):
+                _parsedUnits[name] = copy.copy(unit)
 
     if not isinstance(unit,PhysicalUnit):
         if unit == 1:
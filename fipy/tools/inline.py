@@ -4,10 +4,30 @@ import inspect
 import os
 import sys
 
+def _importWeave():
+    """Return the `weave` module, or `None` if it cannot be found
+
+    `weave` was split out of :mod:`scipy` and is not available at all on
+    recent interpreters.
+    """
+    try:
+        from scipy import weave
+    except ImportError:
+        try:
+            import weave
+        except ImportError:
+            weave = None
+
+    return weave
+
 if '--inline' in [s.lower() for s in sys.argv[1:]]:
-    doInline = True
+    _inlineRequested = True
 else:
-    doInline = 'FIPY_INLINE' in os.environ
+    _inlineRequested = 'FIPY_INLINE' in os.environ
+
+# without `weave`, `--inline` selects the fused NumPy kernels of
+# `fipy.tools.kernel` instead of the C code below
+doInline = _inlineRequested and _importWeave() is not None
 
 _inlineFrameComment = 'FIPY_INLINE_COMMENT' in os.environ
 
@@ -95,7 +115,7 @@ def _runInline(code_in, converters=None, verbose=0, comment=None, **args):
 
     code = "\n" + comment + "\n" + code
 
-    from scipy import weave
+    weave = _importWeave()
 
     for key in args.keys():
         if hasattr(args[key], 'dtype') and args[key].dtype.char == '?':
@@ -146,7 +166,7 @@ for(i=0; i < ni; i++) {
 
     code = "\n" + comment + "\n" + code
 
-    from scipy import weave
+    weave = _importWeave()
 
     for key in args.keys():
         if hasattr(args[key], 'dtype') and args[key].dtype.char == '?':
@@ -0,0 +1,544 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "kernel.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Backends that evaluate a whole tree of `_OperatorVariable` objects at once
+
+An `_OperatorVariable` whose inputs are themselves uncached
+`_OperatorVariable` objects is the root of an expression tree. Evaluated
+node-by-node, every operator in the tree allocates a full-size temporary
+array. A kernel backend instead evaluates the fused tree in one pass. The
+backend is chosen with the :option:`--kernel` flag or the
+:envvar:`FIPY_KERNEL` environment variable:
+
+``none``
+    evaluate each node separately (the default)
+``numpy``
+    evaluate the fused tree in chunks along the last (mesh element) axis,
+    writing each operator into a small reusable buffer with the `out`
+    argument of the corresponding ufunc
+``numexpr``
+    spell the fused tree as a single `numexpr` expression, which is
+    compiled to `numexpr` bytecode and run in cache-sized blocks, on
+    several threads. Falls back to ``numpy`` if `numexpr` cannot be
+    imported.
+``inline``
+    generate and compile C code for the fused tree with `weave`. Falls back
+    to ``numexpr``, or else ``numpy``, if `weave` cannot be imported.
+
+For backwards compatibility, :option:`--inline` or :envvar:`FIPY_INLINE`
+select ``inline`` when no kernel is specified.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+import os
+
+from fipy.tools import numerix
+from fipy.tools import inline
+from fipy.tools import parser
+from fipy.tests.doctestPlus import register_skipper
+
+def _checkForNumexpr():
+    try:
+        import numexpr
+    except ImportError:
+        return False
+    return True
+
+register_skipper(flag="NUMEXPR",
+                 test=_checkForNumexpr,
+                 why="the `numexpr` package cannot be imported")
+
+class _Symbol(object):
+    """Placeholder that records the ufuncs applied to it
+
+    Passing `_Symbol` arguments to the `op` of an `_OperatorVariable`
+    recovers the ufuncs it is composed of, so that they can be called with
+    an `out` buffer.
+
+    >>> a, b = _Symbol(args=(0,)), _Symbol(args=(1,))
+    >>> (lambda a, b: b - numerix.sin(a) * 2)(a, b)
+    subtract(arg1, multiply(sin(arg0), 2))
+    """
+    def __init__(self, func=None, args=()):
+        self.func = func
+        self.args = args
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or len(kwargs) > 0 or ufunc.nout != 1:
+            return NotImplemented
+        return _Symbol(func=ufunc, args=inputs)
+
+    __hash__ = object.__hash__
+
+    def _call(self, args, out=None):
+        """Evaluate the recorded expression for the values `args`
+
+        >>> s = (lambda a, b: (a - b) ** 2)(_Symbol(args=(0,)), _Symbol(args=(1,)))
+        >>> out = numerix.zeros(3)
+        >>> print s._call((numerix.array((1., 2., 3.)), 1.), out=out) is out, out
+        True [ 0.  1.  4.]
+        """
+        if self.func is None:
+            return args[self.args[0]]
+
+        ins = [arg._call(args) if isinstance(arg, _Symbol) else arg
+               for arg in self.args]
+        func = self.func
+        if _isSquare(func, ins[-1]):
+            func, ins = numerix.NUMERIX.square, ins[:1]
+
+        if out is None:
+            return func(*ins)
+        else:
+            return func(*ins, out=out)
+
+    def __repr__(self):
+        if self.func is None:
+            return "arg%d" % self.args[0]
+        else:
+            return "%s(%s)" % (self.func.__name__,
+                               ", ".join([repr(arg) for arg in self.args]))
+
+def _symbolOperator(ufunc, reflected=False):
+    if reflected:
+        return lambda self, other: _Symbol(func=ufunc, args=(other, self))
+    else:
+        return lambda self, other: _Symbol(func=ufunc, args=(self, other))
+
+for _name, _ufunc in (("add", "add"), ("sub", "subtract"), ("mul", "multiply"),
+                      ("div", "divide"), ("truediv", "true_divide"),
+                      ("floordiv", "floor_divide"), ("mod", "remainder"),
+                      ("pow", "power"), ("and", "bitwise_and"),
+                      ("or", "bitwise_or"), ("xor", "bitwise_xor")):
+    _ufunc = getattr(numerix.NUMERIX, _ufunc)
+    setattr(_Symbol, "__%s__" % _name, _symbolOperator(_ufunc))
+    setattr(_Symbol, "__r%s__" % _name, _symbolOperator(_ufunc, reflected=True))
+
+for _name, _ufunc in (("lt", "less"), ("le", "less_equal"),
+                      ("eq", "equal"), ("ne", "not_equal"),
+                      ("gt", "greater"), ("ge", "greater_equal")):
+    setattr(_Symbol, "__%s__" % _name, _symbolOperator(getattr(numerix.NUMERIX, _ufunc)))
+
+for _name, _ufunc in (("neg", "negative"), ("abs", "absolute"), ("invert", "invert")):
+    setattr(_Symbol, "__%s__" % _name,
+            lambda self, ufunc=getattr(numerix.NUMERIX, _ufunc): _Symbol(func=ufunc, args=(self,)))
+
+_Symbol.__pos__ = lambda self: self
+
+def _isSquare(func, exponent):
+    # the same shortcut `ndarray.__pow__` takes
+    return (func is numerix.NUMERIX.power
+            and type(exponent) in (type(1), type(1.), type(numerix.array(1)))
+            and numerix.getShape(exponent) == ()
+            and exponent == 2)
+
+def _trace(op, nargs):
+    """Return the `_Symbol` expression computed by `op`, or `None`
+
+    >>> print _trace(lambda a: a.any(), 1)
+    None
+    """
+    try:
+        result = op(*[_Symbol(args=(i,)) for i in range(nargs)])
+    except Exception:
+        return None
+
+    if isinstance(result, _Symbol):
+        return result
+    else:
+        return None
+
+def _symbolFor(var):
+    """Return the traced `op` of the `_OperatorVariable` `var`, or `None`
+    """
+    if not hasattr(var, "_kernelSymbol"):
+        var._kernelSymbol = _trace(var.op, len(var.var))
+
+    return var._kernelSymbol
+
+class _NumpyKernel(object):
+    """Evaluate a fused `_OperatorVariable` tree in chunks of `chunkSize` elements
+
+    >>> from fipy import Grid1D, CellVariable
+    >>> mesh = Grid1D(nx=10)
+    >>> x = mesh.cellCenters[0]
+    >>> a = CellVariable(mesh=mesh, value=x)
+    >>> b = CellVariable(mesh=mesh, value=2.)
+    >>> expr = numerix.exp(-a) * (1 - b) / (a + 1) + (a > 5) * 3
+    >>> kernel = _NumpyKernel(chunkSize=3)
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_())
+    True
+
+    Nodes evaluated as part of the fused tree are fresh afterwards, so that
+    changes to their inputs still propagate to the root
+
+    >>> b.value = 3.
+    >>> print numerix.allclose(kernel._evaluate(expr),
+    ...                        numerix.exp(-x) * (1 - 3.) / (x + 1) + (x > 5) * 3)
+    True
+
+    Vector quantities are chunked along their last axis
+
+    >>> from fipy import Grid2D
+    >>> mesh = Grid2D(nx=3, ny=4)
+    >>> v = CellVariable(mesh=mesh, rank=1, value=mesh.cellCenters)
+    >>> expr = -(v * v + 1) ** 0.5
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_())
+    True
+
+    Operators that cannot be traced to ufuncs are called directly
+
+    >>> expr = (a + 1)._UnaryOperatorVariable(lambda a: numerix.where(a > 3, a, 0.))
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_())
+    True
+    """
+    def __init__(self, chunkSize=8192):
+        self.chunkSize = chunkSize
+
+    def _leaf(self, slots, value):
+        slots.append((None, False, value))
+        return len(slots) - 1
+
+    def _expand(self, symbol, args, slots):
+        if symbol.func is None:
+            return args[symbol.args[0]]
+
+        ins = []
+        for arg in symbol.args:
+            if isinstance(arg, _Symbol):
+                ins.append(self._expand(arg, args, slots))
+            else:
+                ins.append(self._leaf(slots, arg))
+
+        exponent = slots[ins[-1]]
+        if exponent[0] is None and _isSquare(symbol.func, exponent[2]):
+            slots.append((numerix.NUMERIX.square, True, ins[:1]))
+        else:
+            slots.append((symbol.func, True, tuple(ins)))
+        return len(slots) - 1
+
+    def _compile(self, var, slots):
+        """Flatten the tree rooted at `var` into `slots`
+
+        Each slot is a tuple `(func, isUfunc, args)`, where `args` are the
+        indices of earlier slots. A leaf has `func` of `None` and holds its
+        value in `args`.
+        """
+        from fipy.variables.variable import Variable
+
+        args = []
+        for v in var.var:
+            if hasattr(v, "_canFuse") and v._canFuse():
+                args.append(self._compile(v, slots))
+                # like the "C" style of `_getRepresentation()`, discard any
+                # value left over from when `v` was cached and record that
+                # it is now consistent with its inputs
+                v._value = None
+                v._markCalculated()
+            elif isinstance(v, Variable):
+                args.append(self._leaf(slots, v.value))
+            else:
+                args.append(self._leaf(slots, v))
+
+        symbol = _symbolFor(var)
+        if symbol is None:
+            slots.append((var.op, False, tuple(args)))
+            return len(slots) - 1
+        else:
+            return self._expand(symbol, args, slots)
+
+    @staticmethod
+    def _run(slots, values, outs=None):
+        for k in range(len(slots)):
+            func, isUfunc, args = slots[k]
+            if func is not None and values[k] is None:
+                ins = [values[i] for i in args]
+                if outs is None or outs[k] is None:
+                    values[k] = func(*ins)
+                elif isUfunc:
+                    values[k] = func(*ins, out=outs[k])
+                else:
+                    outs[k][...] = func(*ins)
+                    values[k] = outs[k]
+
+        return values
+
+    @staticmethod
+    def _isPlain(value):
+        # masked arrays and `PhysicalField` objects are left to
+        # the node-by-node evaluation
+        return (type(value) in (type(1), type(1.), type(True))
+                or type(value) is type(numerix.array(1)))
+
+    def _evaluate(self, var):
+        slots = []
+        root = self._compile(var, slots)
+        return self._evaluateSlots(var, slots, root)
+
+    def _evaluateSlots(self, var, slots, root):
+        leaves = [value for (func, isUfunc, value) in slots if func is None]
+        for value in leaves:
+            if not self._isPlain(value):
+                return var._calcValue_()
+
+        if slots[root][0] is None:
+            return var._calcValue_()
+
+        N = 0
+        size = 0
+        for value in leaves:
+            shape = numerix.getShape(value)
+            if len(shape) > 0:
+                N = max(N, shape[-1])
+                size = max(size, numerix.size(value))
+
+        values = [args if func is None else None for (func, isUfunc, args) in slots]
+
+        if N <= 1 or size <= self.chunkSize:
+            return self._run(slots, values)[root]
+
+        width = max(1, self.chunkSize // (size // N))
+
+        chunked = [func is None and len(numerix.getShape(args)) > 0 and numerix.getShape(args)[-1] == N
+                   for (func, isUfunc, args) in slots]
+        for k, (func, isUfunc, args) in enumerate(slots):
+            if func is not None:
+                chunked[k] = True in [chunked[i] for i in args]
+
+        if not chunked[root]:
+            return self._run(slots, values)[root]
+
+        # a single column determines the shape and type of every buffer
+        # and the full value of any slot that does not vary along the chunked axis
+        probe = list(values)
+        for k in range(len(slots)):
+            if chunked[k] and slots[k][0] is None:
+                probe[k] = probe[k][..., :1]
+        probe = self._run(slots, probe)
+
+        outs = [None] * len(slots)
+        for k, (func, isUfunc, args) in enumerate(slots):
+            if func is None:
+                continue
+            if not chunked[k]:
+                values[k] = probe[k]
+            elif k != root:
+                outs[k] = numerix.empty(probe[k].shape[:-1] + (width,), probe[k].dtype)
+
+        def calc(result):
+            if result is None:
+                result = numerix.empty(probe[root].shape[:-1] + (N,), probe[root].dtype)
+
+            for begin in range(0, N, width):
+                end = min(begin + width, N)
+                chunkValues = list(values)
+                chunkOuts = list(outs)
+                for k, (func, isUfunc, args) in enumerate(slots):
+                    if chunked[k]:
+                        if func is None:
+                            chunkValues[k] = args[..., begin:end]
+                        elif k == root:
+                            chunkOuts[k] = result[..., begin:end]
+                        else:
+                            chunkOuts[k] = outs[k][..., :end - begin]
+                self._run(slots, chunkValues, outs=chunkOuts)
+
+            return result
+
+        return var._calcValueInto(calc, *leaves)
+
+def _numexprFunction(name):
+    return lambda *args: "%s(%s)" % (name, ", ".join(args))
+
+def _numexprOperator(symbol):
+    return lambda a, b: "(%s %s %s)" % (a, symbol, b)
+
+## How `numexpr` spells each ufunc it supports, given the spelling of its arguments
+_numexprSpellings = {numerix.NUMERIX.negative: lambda a: "(-%s)" % a,
+                     numerix.NUMERIX.square: lambda a: "(%s**2)" % a,
+                     numerix.NUMERIX.absolute: _numexprFunction("abs")}
+
+for _ufunc, _symbol in (("add", "+"), ("subtract", "-"), ("multiply", "*"),
+                        ("divide", "/"), ("power", "**"),
+                        ("less", "<"), ("less_equal", "<="),
+                        ("equal", "=="), ("not_equal", "!="),
+                        ("greater", ">"), ("greater_equal", ">=")):
+    _numexprSpellings[getattr(numerix.NUMERIX, _ufunc)] = _numexprOperator(_symbol)
+
+for _ufunc in ("sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2",
+               "sinh", "cosh", "tanh", "arcsinh", "arccosh", "arctanh",
+               "exp", "expm1", "log", "log10", "log1p", "sqrt"):
+    _numexprSpellings[getattr(numerix.NUMERIX, _ufunc)] = _numexprFunction(_ufunc)
+
+class _NumexprKernel(_NumpyKernel):
+    """Evaluate a fused `_OperatorVariable` tree as one `numexpr` expression
+
+    The tree is traced to ufuncs as for `_NumpyKernel`, and spelled out
+    for `numexpr`, with each leaf as a variable
+
+    >>> from fipy import Grid1D, CellVariable
+    >>> mesh = Grid1D(nx=10)
+    >>> x = mesh.cellCenters[0]
+    >>> a = CellVariable(mesh=mesh, value=x)
+    >>> b = CellVariable(mesh=mesh, value=2.)
+    >>> expr = numerix.exp(-a) * (1 - b) / (a + 1) + (a > 5) * 3
+    >>> kernel = _NumexprKernel()
+    >>> slots = []
+    >>> print kernel._spell(slots, kernel._compile(expr, slots))[0]
+    (((exp((-leaf0)) * (leaf4 - leaf3)) / (leaf7 + leaf8)) + ((leaf11 > leaf12) * leaf14))
+    >>> kernel = _NumexprKernel(chunkSize=3)
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_()) # doctest: +NUMEXPR
+    True
+
+    Vector quantities need no chunking of their own
+
+    >>> from fipy import Grid2D
+    >>> mesh = Grid2D(nx=3, ny=4)
+    >>> v = CellVariable(mesh=mesh, rank=1, value=mesh.cellCenters)
+    >>> expr = -(v * v + 1) ** 0.5
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_()) # doctest: +NUMEXPR
+    True
+
+    Trees holding operators that `numexpr` does not know are evaluated by
+    `_NumpyKernel`
+
+    >>> expr = (a + 1)._UnaryOperatorVariable(lambda a: numerix.where(a > 3, a, 0.))
+    >>> slots = []
+    >>> print kernel._spell(slots, kernel._compile(expr, slots))
+    None
+    >>> print numerix.allclose(kernel._evaluate(expr), expr._calcValue_())
+    True
+    """
+    def _spell(self, slots, root):
+        """Return the `numexpr` expression for `slots`, and the values of
+        its variables, or `None` if it cannot be written as one
+        """
+        spellings = []
+        localDict = {}
+        for k, (func, isUfunc, args) in enumerate(slots):
+            if func is None:
+                if not self._isPlain(args):
+                    return None
+                spellings.append("leaf%d" % k)
+                localDict[spellings[k]] = args
+            elif isUfunc and func in _numexprSpellings:
+                spellings.append(_numexprSpellings[func](*[spellings[i] for i in args]))
+            else:
+                return None
+
+        if slots[root][0] is None:
+            return None
+
+        return spellings[root], localDict
+
+    def _evaluate(self, var):
+        slots = []
+        root = self._compile(var, slots)
+        spelling = self._spell(slots, root)
+        if spelling is None:
+            return self._evaluateSlots(var, slots, root)
+
+        expression, localDict = spelling
+        leaves = [args for (func, isUfunc, args) in slots if func is None]
+        if max([numerix.size(value) for value in leaves]) <= self.chunkSize:
+            # too small to repay calling `numexpr`
+            return self._evaluateSlots(var, slots, root)
+
+        import numexpr
+
+        return var._calcValueInto(lambda out: numexpr.evaluate(expression,
+                                                               local_dict=localDict,
+                                                               out=out,
+                                                               truediv=False),
+                                  *leaves)
+
+class _InlineKernel(object):
+    """Evaluate a fused `_OperatorVariable` tree as compiled C code
+    """
+    def _evaluate(self, var):
+        return var._execInline(comment=var.comment)
+
+def _getBackend(name):
+    """Return the kernel backend called `name`
+
+    >>> print _getBackend("none")
+    None
+    >>> print _getBackend("NumPy").__class__.__name__
+    _NumpyKernel
+    >>> print _getBackend("numexpr").__class__.__name__ # doctest: +NUMEXPR
+    _NumexprKernel
+    >>> _getBackend("fortran")
+    Traceback (most recent call last):
+        ...
+    ValueError: Unknown kernel backend: 'fortran'
+    """
+    name = name.lower()
+    if name == "none":
+        return None
+    elif name == "numpy":
+        return _NumpyKernel()
+    elif name == "numexpr":
+        if _checkForNumexpr():
+            return _NumexprKernel()
+        else:
+            return _NumpyKernel()
+    elif name == "inline":
+        if inline.doInline:
+            return _InlineKernel()
+        else:
+            return _getBackend("numexpr")
+    else:
+        raise ValueError("Unknown kernel backend: %s" % repr(name))
+
+def _parseKernel():
+    name = parser.parse("--kernel", action="store", type="string",
+                        default=os.getenv("FIPY_KERNEL"))
+    if name is None:
+        if inline._inlineRequested:
+            name = "inline"
+        else:
+            name = "none"
+
+    return name
+
+backend = _getBackend(_parseKernel())
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
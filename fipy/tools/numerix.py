@@ -92,6 +92,16 @@ elif arch == '64bit':
 else:
     raise Exception('Cannot set integer dtype because architecture is unknown.')
 
+# Connectivity arrays are stored as 32-bit integers when every index of the
+# mesh fits, which halves their footprint on 64-bit platforms; the
+# `--int64-indices` flag keeps them at INT_DTYPE throughout.
+import os
+from fipy.tools import parser
+_int64Indices = (os.getenv("FIPY_INT64_INDICES", "").strip().lower()
+                 not in ("", "0", "false", "no", "off"))
+if parser.parse("--int64-indices", action="store_true"):
+    _int64Indices = True
+
 from numpy.core import umath
 from numpy import newaxis as NewAxis
 from numpy import *
@@ -684,6 +694,42 @@ def indices(dimensions, typecode=None):
     ## we don't turn the list back into an array because that is expensive and not required
     return lst
 
+def _indexDtype(count):
+    """Integer type for indices smaller than `count`: `int32` if they all
+    fit, otherwise (or with `--int64-indices`) `INT_DTYPE`.
+
+       >>> from fipy.tools import numerix
+       >>> int64Indices, numerix._int64Indices = numerix._int64Indices, False
+       >>> print numerix._indexDtype(1000) is NUMERIX.int32
+       True
+       >>> print numerix._indexDtype(2**31) == INT_DTYPE
+       True
+       >>> numerix._int64Indices = True
+       >>> print numerix._indexDtype(1000) == INT_DTYPE
+       True
+       >>> numerix._int64Indices = int64Indices
+    """
+    if _int64Indices or count > NUMERIX.iinfo(NUMERIX.int32).max:
+        return INT_DTYPE
+    return NUMERIX.int32
+
+def _asIndices(value, dtype):
+    """`value` with its integer arrays, masked or not, cast to `dtype`.
+    Tuples are cast element by element and anything else is returned as is.
+
+       >>> ids = MA.masked_values((2, -1, 0), -1)
+       >>> cast = _asIndices((ids, array((.5,)), 3), 'int32')
+       >>> print cast[0].dtype, cast[0], cast[1].dtype, cast[2]
+       int32 [2 -- 0] float64 3
+    """
+    if isinstance(value, tuple):
+        return tuple([_asIndices(v, dtype) for v in value])
+    elif (isinstance(value, NUMERIX.ndarray)
+          and NUMERIX.issubdtype(value.dtype, NUMERIX.integer)
+          and value.dtype != dtype):
+        return value.astype(dtype)
+    return value
+
 
 if not hasattr(NUMERIX, 'empty'):
     print 'defining empty'
@@ -0,0 +1,404 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "variableProfiler.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+import json
+import os
+import sys
+import weakref
+from timeit import default_timer as _timer
+
+from fipy.tools import parser
+
+__all__ = ["VariableProfiler"]
+
+class _NodeStats(object):
+    __slots__ = ("id", "ref", "label", "className", "children",
+                 "recalculations", "hits", "time", "selfTime", "bytes")
+
+    def __init__(self, var, callback=None):
+        self.id = id(var)
+        self.ref = weakref.ref(var, callback)
+        self.label = _label(var)
+        self.className = var.__class__.__name__
+        self.children = [id(v) for v in var.requiredVariables]
+        self.recalculations = 0
+        self.hits = 0
+        self.time = 0.
+        self.selfTime = 0.
+        self.bytes = 0
+
+    @property
+    def misses(self):
+        return self.recalculations
+
+    def _add(self, other):
+        """Add the counts of `other` to these"""
+        for name in ("recalculations", "hits", "time", "selfTime", "bytes"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+def _collector(profiler, ID):
+    """Weak reference callback that retires the statistics of the
+    `Variable` with `ID` from `profiler` when the `Variable` is collected"""
+    profiler = weakref.ref(profiler)
+    def collected(ref):
+        p = profiler()
+        if p is not None:
+            p._collected(ID, ref)
+    return collected
+
+def _label(var):
+    try:
+        name = var.name
+    except Exception:
+        name = ""
+    return name or "%s(...)" % var.__class__.__name__
+
+def _nbytes(value):
+    return getattr(getattr(value, "value", value), "nbytes", 0)
+
+class VariableProfiler(object):
+    """
+    Records, for each :class:`~fipy.variables.variable.Variable` that is
+    evaluated while it is running, how many times it is recalculated, how
+    long that takes (with and without the time spent evaluating the
+    `Variable` objects it requires), how many bytes the results occupy and
+    how often a cached value is used instead.
+
+        >>> from fipy.variables.variable import Variable
+        >>> from fipy.tools import kernel
+        >>> backend, kernel.backend = kernel.backend, None
+        >>> a = Variable(value=(1., 2.), name="a")
+        >>> b = a * 2
+        >>> c = (b + 1) * b
+        >>> profiler = VariableProfiler()
+        >>> profiler.start()
+        >>> print c
+        [  6.  20.]
+        >>> print c
+        [  6.  20.]
+        >>> a.value = (3., 4.)
+        >>> print c
+        [ 42.  72.]
+        >>> profiler.stop()
+
+    `b` is shared, so it is cached and only recalculated when `a` changes
+
+        >>> stats = profiler.getStats(b)
+        >>> print stats.label, stats.recalculations, stats.hits
+        (a * _Constant(...)) 2 4
+        >>> print profiler.getStats(c).recalculations
+        3
+        >>> print profiler.getStats(a).recalculations, profiler.getStats(a).hits
+        0 2
+
+    Nothing is recorded once the profiler is stopped
+
+        >>> print c
+        [ 42.  72.]
+        >>> print profiler.getStats(c).recalculations
+        3
+
+    The statistics can be reported as a table
+
+        >>> print profiler.report(sort="hits", limit=1) # doctest: +ELLIPSIS
+        recalcs     hits  hit%   time (s)   self (s)   alloc (MB)  variable
+              2        4    66 ... (a * _Constant(...))
+
+    or as a graph, in which the `Variable` objects that account for the
+    largest share of the time are highlighted
+
+        >>> graph = json.loads(profiler.toJSON())
+        >>> print len(graph["nodes"]), len(graph["edges"])
+        6 6
+        >>> print profiler.toDOT() # doctest: +ELLIPSIS
+        digraph variables {
+        ...
+        }
+
+    A profiler can also be used as a context manager
+
+        >>> with VariableProfiler() as profiler:
+        ...     a.value = (5., 6.)
+        ...     print c
+        [ 110.  156.]
+        >>> print profiler.getStats(b).recalculations
+        1
+
+    The statistics of `Variable` objects that have been collected are
+    merged with those of earlier ones of the same class and label, so a
+    profiler that sees a new temporary every sweep does not grow
+
+        >>> with VariableProfiler() as profiler:
+        ...     for sweep in range(100):
+        ...         print (a + 1).value, # doctest: +ELLIPSIS
+        [ 6.  7.] ...
+        >>> print [stats.label for stats in profiler._nodes.values()]
+        ['a']
+        >>> for stats in sorted(profiler._retired.values(), key=lambda stats: stats.label):
+        ...     print stats.label, stats.recalculations
+        (a + _Constant(...)) 100
+        _Constant(...) 0
+
+        >>> kernel.backend = backend
+
+    The profiler is cheap enough to be left running for a whole simulation
+    with the :option:`--profile-variables` flag or the
+    :envvar:`FIPY_PROFILE_VARIABLES` environment variable, in which case a
+    report is written when Python exits.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Discard all statistics gathered so far"""
+        self._nodes = {}
+        # statistics of collected `Variable` objects, merged by class and label
+        self._retired = {}
+        self._childTimes = []
+
+    def start(self):
+        """Begin recording the evaluation of `Variable` objects"""
+        from fipy.variables.variable import Variable
+        Variable._profiler = self
+
+    def stop(self):
+        """Stop recording the evaluation of `Variable` objects"""
+        from fipy.variables.variable import Variable
+        if Variable._profiler is self:
+            Variable._profiler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def _statsFor(self, var):
+        stats = self._nodes.get(id(var))
+        if stats is None or stats.ref() is not var:
+            if stats is not None:
+                self._retire(stats)
+            stats = self._nodes[id(var)] = _NodeStats(var, callback=_collector(self, id(var)))
+        return stats
+
+    def _retire(self, stats):
+        key = (stats.className, stats.label)
+        merged = self._retired.get(key)
+        if merged is None:
+            self._retired[key] = stats
+        else:
+            merged._add(stats)
+
+    def _collected(self, ID, ref):
+        stats = self._nodes.get(ID)
+        if stats is not None and stats.ref is ref:
+            del self._nodes[ID]
+            self._retire(stats)
+
+    def _hit(self, var):
+        self._statsFor(var).hits += 1
+
+    def _calcValue(self, var):
+        stats = self._statsFor(var)
+        previous = var._value
+        self._childTimes.append(0.)
+        start = _timer()
+        try:
+            value = var._calcValue()
+        finally:
+            elapsed = _timer() - start
+            childTime = self._childTimes.pop()
+            if self._childTimes:
+                self._childTimes[-1] += elapsed
+
+        stats.recalculations += 1
+        stats.time += elapsed
+        stats.selfTime += elapsed - childTime
+        if value is not previous:
+            stats.bytes += _nbytes(value)
+
+        return value
+
+    def getStats(self, var):
+        """The statistics gathered for `var`, or `None` if it has not been
+        evaluated while the profiler was running
+
+        The result has attributes `label`, `className`, `recalculations`
+        (also available as `misses`), `hits`, `time` and `selfTime` (in
+        seconds) and `bytes`.
+        """
+        stats = self._nodes.get(id(var))
+        if stats is not None and stats.ref() is var:
+            return stats
+        return None
+
+    def _allStats(self):
+        return self._retired.values() + self._nodes.values()
+
+    _sortKeys = ("time", "selfTime", "recalculations", "hits", "bytes")
+
+    def _sorted(self, sort):
+        if sort not in self._sortKeys:
+            raise ValueError, "`sort` must be one of %s" % ", ".join(self._sortKeys)
+        return sorted(self._allStats(), key=lambda stats: getattr(stats, sort), reverse=True)
+
+    def report(self, sort="time", limit=None):
+        """Tabulate the statistics of each `Variable`
+
+        :Parameters:
+          - `sort`: the statistic to order by, one of `'time'`, `'selfTime'`,
+            `'recalculations'`, `'hits'` or `'bytes'`
+          - `limit`: the maximum number of `Variable` objects to list
+        """
+        lines = ["%7s %8s %5s %10s %10s %12s  %s"
+                 % ("recalcs", "hits", "hit%", "time (s)", "self (s)", "alloc (MB)", "variable")]
+        for stats in self._sorted(sort)[:limit]:
+            accesses = stats.recalculations + stats.hits
+            lines.append("%7d %8d %5d %10.4f %10.4f %12.3f  %s"
+                         % (stats.recalculations, stats.hits,
+                            100 * stats.hits // max(accesses, 1),
+                            stats.time, stats.selfTime,
+                            stats.bytes / 1048576., stats.label))
+        return "\n".join(lines)
+
+    def _hotIDs(self, hot):
+        total = sum(stats.selfTime for stats in self._allStats())
+        return set(stats.id for stats in self._nodes.values()
+                   if total > 0 and stats.selfTime >= hot * total)
+
+    def _graph(self, hot):
+        hotIDs = self._hotIDs(hot)
+        nodes = self._nodes.values()
+        edges = []
+        for stats in nodes:
+            var = stats.ref()
+            if var is not None:
+                stats.children = [id(v) for v in var.requiredVariables]
+            edges.extend((child, stats.id) for child in stats.children
+                         if child in self._nodes)
+        return nodes, edges, hotIDs
+
+    def toJSON(self, hot=0.1):
+        """The dependency graph of the `Variable` objects evaluated so far,
+        as a JSON document with lists of `nodes` and `edges`
+
+        :Parameters:
+          - `hot`: the fraction of the total time, spent in a single
+            `Variable`, above which it is flagged as hot
+        """
+        nodes, edges, hotIDs = self._graph(hot)
+        return json.dumps({
+            "nodes": [{"id": stats.id,
+                       "label": stats.label,
+                       "class": stats.className,
+                       "recalculations": stats.recalculations,
+                       "hits": stats.hits,
+                       "time": stats.time,
+                       "selfTime": stats.selfTime,
+                       "bytes": stats.bytes,
+                       "hot": stats.id in hotIDs} for stats in nodes],
+            "edges": [{"source": source, "target": target} for source, target in edges]
+        }, indent=1)
+
+    def toDOT(self, hot=0.1):
+        """The dependency graph of the `Variable` objects evaluated so far,
+        in the DOT language of Graphviz
+
+        :Parameters:
+          - `hot`: the fraction of the total time, spent in a single
+            `Variable`, above which it is drawn in red
+        """
+        nodes, edges, hotIDs = self._graph(hot)
+        lines = ["digraph variables {",
+                 "    node [shape=box, fontname=Courier];"]
+        for stats in nodes:
+            label = "%s\\n%d recalcs, %d hits, %.4g s" % (stats.label.replace('"', '\\"'),
+                                                           stats.recalculations,
+                                                           stats.hits, stats.selfTime)
+            attributes = 'label="%s"' % label
+            if stats.id in hotIDs:
+                attributes += ", style=filled, fillcolor=red"
+            lines.append('    v%d [%s];' % (stats.id, attributes))
+        for source, target in edges:
+            lines.append('    v%d -> v%d;' % (source, target))
+        lines.append("}")
+        return "\n".join(lines)
+
+    def save(self, filename, hot=0.1):
+        """Write the graph (if `filename` ends in `.dot` or `.json`) or
+        the report to `filename`
+        """
+        if filename.endswith(".dot"):
+            text = self.toDOT(hot=hot)
+        elif filename.endswith(".json"):
+            text = self.toJSON(hot=hot)
+        else:
+            text = self.report()
+        f = open(filename, 'w')
+        f.write(text + "\n")
+        f.close()
+
+def _parseProfile():
+    return parser.parse("--profile-variables", action="store", type="string",
+                        default=os.getenv("FIPY_PROFILE_VARIABLES"))
+
+def _startRequested():
+    filename = _parseProfile()
+    if filename is None:
+        return None
+
+    profiler = VariableProfiler()
+    profiler.start()
+
+    def _finish():
+        if filename in ("", "-", "1", "stderr"):
+            sys.stderr.write(profiler.report() + "\n")
+        else:
+            profiler.save(filename)
+
+    import atexit
+    atexit.register(_finish)
+    return profiler
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "spatialIndex.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""Nearest-neighbor and radius queries on a fixed set of points
+
+:func:`~fipy.tools.numerix.nearest` compares every query point with every
+data point. A `_SpatialIndex` is built once for the data and then answers
+each query by looking only at nearby data. It uses
+:class:`scipy.spatial.cKDTree` if :term:`SciPy` is available, and a
+uniform grid of buckets otherwise.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+# distances within this fraction of the nearest count as ties
+_tieTolerance = 1e-10
+
+def _lowestOfNearest(M, queries, ids, distance2):
+    """For each of `M` queries, the lowest of the `ids` paired with it
+    whose squared distance is within the tie tolerance of the least, or 0
+    for queries with no pairs, and that least squared distance, or `inf`
+
+    >>> print _lowestOfNearest(3, (0, 0, 0, 2, 2), (5, 2, 4, 7, 3), (1., 4., 1., 2., 2. + 1e-12))
+    (array([4, 0, 3]), array([  1.,  inf,   2.]))
+    """
+    queries, ids, distance2 = [numerix.asarray(a) for a in (queries, ids, distance2)]
+    least = numerix.zeros((M,), 'd') + numerix.inf
+    nearest = numerix.zeros((M,), dtype=int)
+
+    order = numerix.lexsort((distance2, queries))
+    queries, ids, distance2 = queries[order], ids[order], distance2[order]
+    first = numerix.concatenate((queries[:1] == queries[:1],
+                                 queries[1:] != queries[:-1]))
+    least[queries[first]] = distance2[first]
+
+    tied = distance2 <= least[queries] * (1 + _tieTolerance)**2
+    queries, ids = queries[tied], ids[tied]
+    order = numerix.lexsort((ids, queries))
+    queries, ids = queries[order], ids[order]
+    first = numerix.concatenate((queries[:1] == queries[:1],
+                                 queries[1:] != queries[:-1]))
+    nearest[queries[first]] = ids[first]
+
+    return nearest, least
+
+class _SpatialIndex(object):
+    """Index of `data`, shaped (D, N), for queries of points shaped (D, M)
+
+    >>> data = ((0., 1., 2., 0., 1., 2.),
+    ...         (0., 0., 0., 1., 1., 1.))
+    >>> for index in (_SpatialIndex(data), _BucketGrid(data)):
+    ...     print index.nearest(((0.1, 1.9, 5., -3.), (0.2, 0.8, 0., 0.9)))
+    ...     print [list(ids) for ids in index.within(((0., 1.5), (0., 0.5)), radius=1.)]
+    [0 5 2 3]
+    [[0, 1, 3], [1, 2, 4, 5]]
+    [0 5 2 3]
+    [[0, 1, 3], [1, 2, 4, 5]]
+
+    Both indices agree with a brute-force search
+
+    >>> from fipy import Grid2D
+    >>> m0 = Grid2D(dx=(.1, 1., 10.), dy=(.1, 1., 10.))
+    >>> m1 = Grid2D(nx=2, ny=2, dx=5., dy=5.)
+    >>> print _BucketGrid(m0.cellCenters.globalValue).nearest(m1.cellCenters.globalValue)
+    [4 5 7 8]
+    >>> points = numerix.random.random((3, 100))
+    >>> data = numerix.random.random((3, 1000))
+    >>> print numerix.allequal(_BucketGrid(data).nearest(points),
+    ...                        numerix.nearest(data, points))
+    True
+
+    Points equidistant from several data, like those on the faces and
+    vertices of the cells of a grid, go to the lowest index in both
+
+    >>> m = Grid2D(nx=4, ny=3, dx=.1, dy=.3)
+    >>> x, y = numerix.indices((9, 7)) * numerix.array((.05, .15))[..., numerix.newaxis, numerix.newaxis]
+    >>> points = numerix.array((x.ravel(), y.ravel()))
+    >>> x, y = m.cellCenters.globalValue
+    >>> d2 = ((x[..., numerix.newaxis] - points[0])**2
+    ...       + (y[..., numerix.newaxis] - points[1])**2).swapaxes(0, 1)
+    >>> brute = numerix.array([numerix.nonzero(d <= d.min() * (1 + 1e-9))[0].min() for d in d2])
+    >>> print [numerix.allequal(index.nearest(points), brute)
+    ...        for index in (_SpatialIndex(m.cellCenters.globalValue),
+    ...                      _BucketGrid(m.cellCenters.globalValue))]
+    [True, True]
+    >>> print _SpatialIndex(m.cellCenters.globalValue).nearest(((.1, .2, .4), (.3, .6, .9)))
+    [ 0  5 11]
+
+even when more data are tied than meet at a grid vertex
+
+    >>> angles = numerix.arange(8) * numerix.pi / 4 + .3
+    >>> data = numerix.array((numerix.cos(angles), numerix.sin(angles)))[..., ::-1]
+    >>> print [index.nearest(((0.,), (0.,))) for index in (_SpatialIndex(data), _BucketGrid(data))]
+    [array([0]), array([0])]
+    """
+    def __new__(cls, data):
+        if cls is _SpatialIndex:
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                cls = _BucketGrid
+            else:
+                cls = _KDTree
+        return object.__new__(cls)
+
+    def __init__(self, data):
+        self.data = numerix.array(data, dtype=float)
+
+    @staticmethod
+    def _asPoints(points):
+        points = numerix.array(points, dtype=float)
+        if points.ndim == 1:
+            points = points[..., numerix.newaxis]
+        return points
+
+    def nearest(self, points):
+        """Indices of the data closest to each of `points`, the lowest of
+        those that are equally close"""
+        raise NotImplementedError
+
+    def within(self, points, radius):
+        """List of the indices of the data within `radius` of each of `points`"""
+        raise NotImplementedError
+
+class _KDTree(_SpatialIndex):
+    def __init__(self, data):
+        super(_KDTree, self).__init__(data)
+        from scipy.spatial import cKDTree
+        self.tree = cKDTree(self.data.swapaxes(0, 1))
+
+    def nearest(self, points):
+        points = self._asPoints(points)
+        M = points.shape[-1]
+        N = self.data.shape[-1]
+        if N == 0:
+            return numerix.arange(0)
+
+        # the tree returns any one of several equidistant data, so look
+        # for ties wherever the second nearest is as close as the first
+        k = min(N, 2)
+        distances, ids = self.tree.query(points.swapaxes(0, 1), k=k)
+        distances = numerix.array(distances, dtype=float).reshape((M, k))
+        nearest = numerix.array(ids, dtype=int).reshape((M, k))[..., 0]
+        tied = numerix.nonzero(distances[..., -1] <= distances[..., 0] * (1 + _tieTolerance))[0]
+        if k < 2 or len(tied) == 0:
+            return nearest
+
+        # enough neighbors to see the ties around a grid vertex
+        k = min(N, 2**len(self.data))
+        distances, ids = self.tree.query(points[..., tied].swapaxes(0, 1), k=k)
+        distances = numerix.array(distances, dtype=float).reshape((len(tied), k))
+        ids = numerix.array(ids, dtype=int).reshape((len(tied), k))
+        lowest, least = _lowestOfNearest(len(tied), numerix.repeat(numerix.arange(len(tied)), k),
+                                         ids.flat, (distances**2).flat)
+        nearest[tied] = lowest
+
+        # and all of them, where even those are tied
+        crowded = numerix.nonzero(distances[..., -1]**2 <= least * (1 + _tieTolerance)**2)[0]
+        if k < N:
+            for i in crowded:
+                point = points[..., tied[i]]
+                IDs = numerix.array(self.tree.query_ball_point(point,
+                                                               numerix.sqrt(least[i]) * (1 + 2 * _tieTolerance)),
+                                    dtype=int)
+                separation = self.data[..., IDs] - point[..., numerix.newaxis]
+                nearest[tied[i]] = _lowestOfNearest(1, numerix.zeros(IDs.shape, dtype=int), IDs,
+                                                    (separation * separation).sum(axis=0))[0][0]
+
+        return nearest
+
+    def within(self, points, radius):
+        points = self._asPoints(points)
+        return [numerix.sort(numerix.array(ids, dtype=int))
+                for ids in self.tree.query_ball_point(points.swapaxes(0, 1), radius)]
+
+class _BucketGrid(_SpatialIndex):
+    """Data sorted into a uniform grid of cubic buckets
+
+    Queries gather the data in the shells of buckets around the bucket
+    that holds each point, working outward until no closer data can
+    remain.
+    """
+    def __new__(cls, data, pointsPerBucket=2):
+        return object.__new__(cls)
+
+    def __init__(self, data, pointsPerBucket=2):
+        super(_BucketGrid, self).__init__(data)
+        D, N = self.data.shape
+
+        if N > 0:
+            self.lower = self.data.min(axis=1)
+            extent = self.data.max(axis=1) - self.lower
+        else:
+            self.lower = numerix.zeros((D,), 'd')
+            extent = numerix.zeros((D,), 'd')
+
+        span = extent[extent > 0]
+        if len(span) > 0:
+            self.width = (numerix.prod(span) * pointsPerBucket / N)**(1. / len(span))
+        else:
+            self.width = 1.
+        while True:
+            self.shape = (extent / self.width).astype(int) + 1
+            if numerix.prod(self.shape) <= 8 * N + 8:
+                break
+            self.width *= 2
+
+        keys = self._keys(self._bucketCoords(self.data))
+        self.order = numerix.argsort(keys, kind='mergesort')
+        self.counts = numerix.bincount(keys, minlength=int(numerix.prod(self.shape)))
+        self.starts = numerix.cumsum(self.counts) - self.counts
+
+    def _bucketCoords(self, points):
+        coords = numerix.floor((points - self.lower[..., numerix.newaxis]) / self.width).astype(int)
+        return numerix.clip(coords, 0, (self.shape - 1)[..., numerix.newaxis])
+
+    def _keys(self, coords):
+        keys = numerix.zeros(coords.shape[1:], dtype=int)
+        for d in range(len(self.shape)):
+            keys = keys * self.shape[d] + coords[d]
+        return keys
+
+    def _offsets(self, reach, ring=None):
+        """Bucket offsets up to `reach` away, or exactly `ring` away"""
+        D = len(self.shape)
+        offsets = numerix.array(numerix.indices((2 * reach + 1,) * D), dtype=int).reshape((D, -1)) - reach
+        if ring is not None:
+            offsets = offsets[..., abs(offsets).max(axis=0) == ring]
+        return offsets
+
+    def _gather(self, points, coords, queries, offsets):
+        """Pairs of query and data indices for the data in the buckets at
+        `offsets` from the bucket of each of `queries`, with their squared
+        distances.
+        """
+        S = offsets.shape[-1]
+        buckets = (coords[..., queries][..., numerix.newaxis]
+                   + offsets[:, numerix.newaxis, :]).reshape((len(self.shape), -1))
+        queries = numerix.repeat(queries, S)
+
+        inside = ((buckets >= 0) & (buckets < self.shape[..., numerix.newaxis])).all(axis=0)
+        keys = self._keys(buckets[..., inside])
+        queries = queries[inside]
+
+        counts = self.counts[keys]
+        total = counts.sum()
+        queries = numerix.repeat(queries, counts)
+        within = numerix.arange(total) - numerix.repeat(numerix.cumsum(counts) - counts, counts)
+        ids = self.order[numerix.repeat(self.starts[keys], counts) + within]
+
+        separation = self.data[..., ids] - points[..., queries]
+        return queries, ids, (separation * separation).sum(axis=0)
+
+    def nearest(self, points):
+        points = self._asPoints(points)
+        M = points.shape[-1]
+        if self.data.shape[-1] == 0:
+            return numerix.arange(0)
+
+        coords = self._bucketCoords(points)
+        kept = (numerix.zeros((0,), dtype=int), numerix.zeros((0,), dtype=int), numerix.zeros((0,), 'd'))
+
+        active = numerix.arange(M)
+        ring = 0
+        while len(active) > 0:
+            found = self._gather(points, coords, active, self._offsets(ring, ring))
+            queries, ids, d2 = [numerix.concatenate(pair) for pair in zip(kept, found)]
+            nearest, least = _lowestOfNearest(M, queries, ids, d2)
+
+            # only data tied with the nearest so far can still win
+            close = d2 <= least[queries] * (1 + _tieTolerance)**2
+            kept = (queries[close], ids[close], d2[close])
+
+            if ring >= self.shape.max():
+                break
+
+            # anything in a further shell is at least `ring * width` away
+            active = active[least[active] * (1 + _tieTolerance)**2 >= (ring * self.width)**2]
+            ring += 1
+
+        return nearest
+
+    def within(self, points, radius):
+        points = self._asPoints(points)
+        M = points.shape[-1]
+        reach = int(numerix.ceil(radius / self.width))
+        queries, ids, d2 = self._gather(points, self._bucketCoords(points),
+                                        numerix.arange(M), self._offsets(reach))
+        close = d2 <= radius**2
+        queries, ids = queries[close], ids[close]
+
+        order = numerix.lexsort((ids, queries))
+        queries, ids = queries[order], ids[order]
+        bounds = numerix.searchsorted(queries, numerix.arange(M + 1))
+        return [ids[bounds[i]:bounds[i+1]] for i in range(M)]
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
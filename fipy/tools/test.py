@@ -43,6 +43,9 @@ def _suite():
             'numerix',
             'dump',
             'vector',
+            'kernel',
+            'spatialIndex',
+            'performance.variableProfiler',
         ), base = __name__)
 
     return theSuite
@@ -47,7 +47,10 @@ class _AddOverFacesVariable(CellVariable):
         self.faceVariable = self._requires(faceVariable)
 
     def _calcValue(self):
-        if inline.doInline and self.faceVariable.rank < 2:
+        if self.mesh._implicitTopology:
+            return self._makeValue(value=self.mesh._sumOverFaces(numerix.array(self.faceVariable.numericValue))
+                                   / self.mesh.cellVolumes)
+        elif inline.doInline and self.faceVariable.rank < 2:
             return self._calcValueInline()
         else:
             return self._calcValueNoInline()
@@ -55,48 +58,37 @@ class _AddOverFacesVariable(CellVariable):
     def _calcValueInline(self):
 
         NCells = self.mesh.numberOfCells
-        ids = self.mesh.cellFaceIDs
+        connectivity = self.mesh._cellFaceConnectivity
 
         val = self._array.copy()
 
         inline._runInline("""
-        int i;
+        long i;
 
         for(i = 0; i < numberOfCells; i++)
           {
-          int j;
+          long k;
           value[i] = 0.;
-          for(j = 0; j < numberOfCellFaces; j++)
+          for(k = offsets[i]; k < offsets[i + 1]; k++)
             {
-              // cellFaceIDs can be masked, which caused subtle and
-              // unreproduceable problems on OS X (who knows why not elsewhere)
-              long id = ids[i + j * numberOfCells];
-              if (id >= 0) {
-                  value[i] += orientations[i + j * numberOfCells] * faceVariable[id];
-              }
+              value[i] += orientations[k] * faceVariable[faceIDs[k]];
             }
             value[i] = value[i] / cellVolume[i];
           }
           """,
-                          numberOfCellFaces = self.mesh._maxFacesPerCell,
                           numberOfCells = NCells,
                           faceVariable = self.faceVariable.numericValue,
-                          ids = numerix.array(ids),
+                          offsets = connectivity.offsets,
+                          faceIDs = connectivity.faceIDs,
                           value = val,
-                          orientations = numerix.array(self.mesh._cellToFaceOrientations),
+                          orientations = connectivity.orientations,
                           cellVolume = numerix.array(self.mesh.cellVolumes))
 
         return self._makeValue(value = val)
 
     def _calcValueNoInline(self):
-        ids = self.mesh.cellFaceIDs
+        connectivity = self.mesh._cellFaceConnectivity
 
-        contributions = numerix.take(self.faceVariable, ids, axis=-1)
+        contributions = numerix.array(self.faceVariable)[..., connectivity.faceIDs]
 
-        # FIXME: numerix.MA.filled casts away dimensions
-        s = (numerix.newaxis,) * (len(contributions.shape) - 2) + (slice(0,None,None),) + (slice(0,None,None),)
-
-        faceContributions = contributions * self.mesh._cellToFaceOrientations[s]
-
-        return numerix.tensordot(numerix.ones(faceContributions.shape[-2], 'd'),
-                                 numerix.MA.filled(faceContributions, 0.), (0, -2)) / self.mesh.cellVolumes
+        return connectivity.sum(connectivity.orientations * contributions) / self.mesh.cellVolumes
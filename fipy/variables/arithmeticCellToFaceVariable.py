@@ -41,6 +41,12 @@ from fipy.tools import numerix
 from fipy.tools import inline
 
 class _ArithmeticCellToFaceVariable(_CellToFaceVariable):
+    def _calcValue(self):
+        if self.mesh._implicitTopology:
+            return self._makeValue(value=self.mesh._arithmeticFaceValues(numerix.array(self.var.numericValue)))
+        else:
+            return super(_ArithmeticCellToFaceVariable, self)._calcValue()
+
     if inline.doInline:
         def _calcValue_(self, alpha, id1, id2):
             val = self._array.copy()
@@ -64,4 +70,5 @@ class _ArithmeticCellToFaceVariable(_CellToFaceVariable):
         def _calcValue_(self, alpha, id1, id2):
             cell1 = numerix.take(self.var, id1, axis=-1)
             cell2 = numerix.take(self.var, id2, axis=-1)
-            return (cell2 - cell1) * alpha + cell1
+            return self._calcValueInto(lambda out: numerix.add((cell2 - cell1) * alpha, cell1, out),
+                                       cell1, alpha)
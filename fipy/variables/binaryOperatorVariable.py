@@ -37,6 +37,7 @@ __docformat__ = 'restructuredtext'
 __all__ = []
 
 from fipy.tools import numerix
+from fipy.tools.dimensions import physicalField
 
 def _BinaryOperatorVariable(operatorClass=None):
     """
@@ -78,13 +79,18 @@ def _BinaryOperatorVariable(operatorClass=None):
                     self.var[1] = physicalField.PhysicalField(value=self.var[1])
                 val1 = self.var[1]
 
-            return self.op(self.var[0].value, val1)
+            return self._applyOp(self.var[0].value, val1)
 
         @property
         def unit(self):
             if self._unit is None:
+                one0, one1 = self.var[0]._unitAsOne, self.var[1]._unitAsOne
+                if not (isinstance(one0, physicalField.PhysicalField)
+                        or isinstance(one1, physicalField.PhysicalField)):
+                    # nothing to combine
+                    return physicalField._unity
                 try:
-                    return self._extractUnit(self.op(self.var[0]._unitAsOne, self.var[1]._unitAsOne))
+                    return self._extractUnit(self.op(one0, one1))
                 except:
                     return self._extractUnit(self._calcValue_())
             else:
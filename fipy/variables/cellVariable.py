@@ -36,8 +36,11 @@
 
 __docformat__ = 'restructuredtext'
 
+import os
+
 from fipy.variables.meshVariable import _MeshVariable
 from fipy.tools import numerix
+from fipy.tools import parser
 
 __all__ = ["CellVariable"]
 
@@ -63,6 +66,12 @@ class CellVariable(_MeshVariable):
 
     """
 
+    _doubleBuffer = (os.getenv("FIPY_DOUBLE_BUFFER") is not None) or False
+    if parser.parse("--no-double-buffer", action="store_true"):
+        _doubleBuffer = False
+    if parser.parse("--double-buffer", action="store_true"):
+        _doubleBuffer = True
+
     def __init__(self, mesh, name='', value=0., rank=None, elementshape=None, unit=None, hasOld=0):
         _MeshVariable.__init__(self, mesh=mesh, name=name, value=value,
                                rank=rank, elementshape=elementshape, unit=unit)
@@ -299,6 +308,39 @@ class CellVariable(_MeshVariable):
         >>> print numerix.allclose(CellVariable(mesh=Grid1D(dx=(2.0, 1.0, 0.5)),
         ...                                     value=(0, 1, 2)).leastSquaresGrad.globalValue, [[0.461538461538, 0.8, 1.2]])
         True
+
+        Only the faces a cell actually has contribute, so triangles in a
+        mesh padded out to the four faces of its quadrilaterals are not
+        skewed by the empty slots
+
+        >>> from fipy import Tri2D
+        >>> m = Grid2D(nx=2, ny=1) + (Tri2D(nx=1, ny=1) + ((2,), (0,)))
+        >>> x, y = m.cellCenters
+        >>> print numerix.allclose(CellVariable(mesh=m, value=3 * x + 2 * y).leastSquaresGrad.globalValue,
+        ...                        [[2.4, 3., 8. / 3, 3., 3., 3.],
+        ...                         [0., 0., 2., 16. / 9, 2., 16. / 9]])
+        True
+
+        On triangular meshes, with or without quadrilaterals, each cell's
+        gradient is the least-squares fit over the faces it has
+
+        >>> def fitted(var):
+        ...     mesh = var.mesh
+        ...     hasFace = ~numerix.MA.getmaskarray(mesh.cellFaceIDs)
+        ...     neighbors = numerix.MA.filled(mesh._cellToCellIDs, numerix.arange(mesh.numberOfCells))
+        ...     distanceNormals = numerix.MA.filled(mesh._cellToCellDistances * mesh._cellNormals, 0)
+        ...     grads = []
+        ...     for ID in range(mesh.numberOfCells):
+        ...         A = distanceNormals[..., hasFace[..., ID], ID]
+        ...         b = var.value[neighbors[hasFace[..., ID], ID]] - var.value[ID]
+        ...         grads.append(numerix.linalg.solve((A[:, numerix.newaxis] * A).sum(-1), (A * b).sum(-1)))
+        ...     return numerix.array(grads).swapaxes(0, 1)
+        >>> for m in (Tri2D(nx=2, ny=2), m):
+        ...     x, y = m.cellCenters
+        ...     var = CellVariable(mesh=m, value=x * x + 3 * x * y)
+        ...     print numerix.allclose(var.leastSquaresGrad.value, fitted(var))
+        True
+        True
         """
 
         if not hasattr(self, '_leastSquaresGrad'):
@@ -492,15 +534,76 @@ class CellVariable(_MeshVariable):
            ...
         AssertionError: The updateOld method requires the CellVariable to have an old value. Set hasOld to True when instantiating the CellVariable.
 
+        With :option:`--double-buffer`, the current and old values share one
+        array until either of them is modified, when the array displaced
+        by the previous update is reused rather than a new one allocated
+
+            >>> CellVariable._doubleBuffer = True
+            >>> v = CellVariable(mesh=Grid1D(nx=3), value=(1., 2., 3.), hasOld=True)
+            >>> v.updateOld()
+            >>> v.value is v.old.value
+            True
+            >>> v[0] = 4.
+            >>> print v, v.old
+            [ 4.  2.  3.] [ 1.  2.  3.]
+            >>> v.updateOld()
+            >>> v.value = (5., 6., 7.)
+            >>> print v, v.old
+            [ 5.  6.  7.] [ 4.  2.  3.]
+
+        Resetting to the old value is a swap, too
+
+            >>> v._resetToOld()
+            >>> print v, v.value is v.old.value
+            [ 4.  2.  3.] True
+            >>> CellVariable._doubleBuffer = False
         """
         if self._old is None:
             raise AssertionError, 'The updateOld method requires the CellVariable to have an old value. Set hasOld to True when instantiating the CellVariable.'
-        else:
+        elif not (self._doubleBuffer and self._shareWithOld(fromOld=False)):
             self._old.value = self.value.copy()
 
     def _resetToOld(self):
         if self._old is not None:
-            self.value = (self._old.value)
+            if not (self._doubleBuffer and self._shareWithOld(fromOld=True)):
+                self.value = (self._old.value)
+
+    def _shareWithOld(self, fromOld):
+        """Make `self` and `self.old` share one read-only array, holding the
+        value of `self.old` if `fromOld`, otherwise that of `self`.
+
+        The array that this displaces is kept for the next modification of
+        `self` (see `Variable._makeWritable()`). Returns `False`, having done
+        nothing, if the values cannot be shared (e.g., they have units or
+        `self` is constrained).
+        """
+        if fromOld:
+            source, target = self._old, self
+        else:
+            source, target = self, self._old
+
+        ndarray = numerix.NUMERIX.ndarray
+        shared, displaced = source._value, target._value
+        if (len(self.constraints) > 0
+            or not isinstance(shared, ndarray)
+            or not isinstance(displaced, ndarray)
+            or shared.shape != displaced.shape):
+            return False
+
+        if shared.flags.writeable:
+            shared = shared.view()
+            shared.flags.writeable = False
+        source._value = shared
+        target._value = shared
+        target._markFresh()
+
+        while isinstance(displaced, ndarray) and not displaced.flags.writeable:
+            displaced = displaced.base
+        if (isinstance(displaced, ndarray)
+            and not numerix.NUMERIX.may_share_memory(displaced, shared)):
+            self._spareArray = displaced
+
+        return True
 
     def _getShapeFromMesh(mesh):
         """
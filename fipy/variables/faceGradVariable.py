@@ -175,7 +175,11 @@ class _FaceGradVariable(FaceVariable):
         T1 = (t1grad1 + t1grad2) / 2.
         T2 = (t2grad1 + t2grad2) / 2.
 
-        return normals[s] * N[numerix.newaxis] + tangents1[s] * T1[numerix.newaxis] + tangents2[s] * T2[numerix.newaxis]
+        return self._calcValueInto(lambda out: numerix.add(normals[s] * N[numerix.newaxis]
+                                                           + tangents1[s] * T1[numerix.newaxis],
+                                                           tangents2[s] * T2[numerix.newaxis],
+                                                           out),
+                                   N, grad1, normals)
 
 def _test():
     import fipy.tests.doctestPlus
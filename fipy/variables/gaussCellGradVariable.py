@@ -77,48 +77,53 @@ class _GaussCellGradVariable(CellVariable):
         self.faceGradientContributions = _FaceGradContributions(self.var)
 
 
-    def _calcValueInline(self, N, M, ids, orientations, volumes):
+    def _calcValueInline(self, N, connectivity, volumes):
         val = self._array.copy()
 
         inline._runIterateElementInline("""
             ITEM(val, i, vec) = 0.;
 
-            int k;
-            for (k = 0; k < M; k++) {
-                int id = ITEM(ids, i, &k);
-                ITEM(val, i, vec) += ITEM(orientations, i, &k) * ITEM(areaProj, id, vec) * ITEM(faceValues, id, NULL);
+            long k;
+            for (k = offsets[i]; k < offsets[i + 1]; k++) {
+                long id = faceIDs[k];
+                ITEM(val, i, vec) += orientations[k] * ITEM(areaProj, id, vec) * ITEM(faceValues, id, NULL);
             }
 
             ITEM(val, i, vec) /= ITEM(volumes, i, NULL);
         """,val = val,
-            ids = numerix.array(numerix.MA.filled(ids, 0)),
-            orientations = numerix.array(numerix.MA.filled(orientations, 0)),
+            offsets = connectivity.offsets,
+            faceIDs = connectivity.faceIDs,
+            orientations = connectivity.orientations,
             volumes = numerix.array(volumes),
             areaProj = numerix.array(self.mesh._areaProjections),
             faceValues = numerix.array(self.var.arithmeticFaceValue),
-            M = M,
             ni = N,
             shape=numerix.array(numerix.shape(val)))
 
         return self._makeValue(value = val)
 
-    def _calcValueNoInline(self, N, M, ids, orientations, volumes):
-        contributions = numerix.take(self.faceGradientContributions, ids, axis=-1)
-        grad = numerix.array(numerix.sum(orientations * contributions, -2))
-        return grad / volumes
+    def _calcValueNoInline(self, N, connectivity, volumes):
+        contributions = numerix.array(self.faceGradientContributions)[..., connectivity.faceIDs]
+        grad = connectivity.sum(connectivity.orientations * contributions)
+        return self._calcValueInto(lambda out: numerix.divide(grad, volumes, out),
+                                   grad, volumes)
+
+    def _calcValueImplicit(self):
+        spacing = numerix.array((self.mesh.dx, self.mesh.dy, self.mesh.dz), 'd')
+        spacing = spacing.reshape((3,) + (1,) * (len(self.var.shape)))
+        faceValues = numerix.array(self.var.arithmeticFaceValue.numericValue)
+        return self._makeValue(value=self.mesh._faceDifferences(faceValues) / spacing)
 
     def _calcValue(self):
-        if inline.doInline and self.var.rank == 0:
+        if self.mesh._implicitTopology:
+            return self._calcValueImplicit()
+        elif inline.doInline and self.var.rank == 0:
             return self._calcValueInline(N=self.mesh.numberOfCells,
-                                         M=self.mesh._maxFacesPerCell,
-                                         ids=self.mesh.cellFaceIDs,
-                                         orientations=self.mesh._cellToFaceOrientations,
+                                         connectivity=self.mesh._cellFaceConnectivity,
                                          volumes=self.mesh.cellVolumes)
         else:
             return self._calcValueNoInline(N=self.mesh.numberOfCells,
-                                           M=self.mesh._maxFacesPerCell,
-                                           ids=self.mesh.cellFaceIDs,
-                                           orientations=self.mesh._cellToFaceOrientations,
+                                           connectivity=self.mesh._cellFaceConnectivity,
                                            volumes=self.mesh.cellVolumes)
 
 
@@ -77,6 +77,6 @@ class _HarmonicCellToFaceVariable(_CellToFaceVariable):
             value = (value == 0.) * eps + (value != 0.) * value
             cell1Xcell2 = cell1 * cell2
             value = ((value > eps) | (value < -eps)) * cell1Xcell2 / value
-            value = (cell1Xcell2 >= 0.) * value
 
-            return value
+            return self._calcValueInto(lambda out: numerix.multiply(cell1Xcell2 >= 0., value, out),
+                                       cell1, alpha)
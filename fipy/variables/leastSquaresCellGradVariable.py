@@ -51,29 +51,27 @@ class _LeastSquaresCellGradVariable(CellVariable):
 
     @property
     def _neighborValue(self):
-        return numerix.take(numerix.array(self.var), self.mesh._cellToCellIDs)
+        return numerix.array(self.var)[..., self.mesh._cellFaceConnectivity.neighborIDs]
 
     def _calcValue(self):
-        cellToCellDistances = self.mesh._cellToCellDistances
-        cellNormals = self.mesh._cellNormals
+        connectivity = self.mesh._cellFaceConnectivity
+        cellToCellDistances = connectivity.entries(self.mesh._cellToCellDistances)
+        cellNormals = connectivity.entries(self.mesh._cellNormals)
         neighborValue = self._neighborValue
-        value = numerix.array(self.var)
+        value = numerix.array(self.var)[..., connectivity.cellIDs]
         cellDistanceNormals = cellToCellDistances * cellNormals
 
         N = self.mesh.numberOfCells
-        M = self.mesh._maxFacesPerCell
         D = self.mesh.dim
 
-        mat = numerix.zeros((D, D, M, N), 'd')
+        mat = numerix.zeros((D, D, N), 'd')
 
         ## good god! numpy.outer should have an axis argument!!!
         for i in range(D):
             for j in range(D):
-                mat[i,j] = cellDistanceNormals[i] * cellDistanceNormals[j]
+                mat[i,j] = connectivity.sum(cellDistanceNormals[i] * cellDistanceNormals[j])
 
-        mat = numerix.sum(mat, axis=2)
-
-        vec = numerix.array(numerix.sum((neighborValue - value) * cellDistanceNormals, axis=1))
+        vec = connectivity.sum((neighborValue - value) * cellDistanceNormals)
 
         if D == 1:
             vec[0] = vec[0] / mat[0, 0]
@@ -49,34 +49,34 @@ class _ModCellGradVariable(_GaussCellGradVariable):
         self.modPy = modPy
 
 
-    def _calcValueInline(self, N, M, ids, orientations, volumes):
+    def _calcValueInline(self, N, connectivity, volumes):
         val = self._array.copy()
 
         inline._runIterateElementInline(self.modIn + """
             ITEM(val, i, vec) = 0.;
 
-            int k;
-            for (k = 0; k < M; k++) {
-                int id = ITEM(ids, i, &k);
-                ITEM(val, i, vec) += ITEM(orientations, i, &k) * ITEM(areaProj, id, vec) * ITEM(faceValues, id, NULL);
+            long k;
+            for (k = offsets[i]; k < offsets[i + 1]; k++) {
+                long id = faceIDs[k];
+                ITEM(val, i, vec) += orientations[k] * ITEM(areaProj, id, vec) * ITEM(faceValues, id, NULL);
             }
 
             ITEM(val, i, vec) /= ITEM(volumes, i, NULL);
             ITEM(val, i, vec) = mod(ITEM(val, i, vec) * gridSpacing[vec[0]]) /  gridSpacing[vec[0]];
         """,val = val,
-            ids = numerix.array(ids),
-            orientations = numerix.array(orientations),
+            offsets = connectivity.offsets,
+            faceIDs = connectivity.faceIDs,
+            orientations = connectivity.orientations,
             volumes = numerix.array(volumes),
             areaProj = numerix.array(self.mesh._areaProjections),
             faceValues = numerix.array(self.var.arithmeticFaceValue),
-            M = M,
             ni = N,
             gridSpacing = numerix.array(self.mesh._meshSpacing),
             shape=numerix.array(numerix.shape(val)))
 
         return self._makeValue(value = val)
 
-    def _calcValueNoInline(self, N, M, ids, orientations, volumes):
-        value = _GaussCellGradVariable._calcValueNoInline(self, N, M, ids, orientations, volumes)
+    def _calcValueNoInline(self, N, connectivity, volumes):
+        value = _GaussCellGradVariable._calcValueNoInline(self, N, connectivity, volumes)
         gridSpacing = self.mesh._meshSpacing
         return self.modPy(value * gridSpacing) / gridSpacing
@@ -38,6 +38,7 @@ import sys
 
 from fipy.variables.variable import Variable
 from fipy.tools import numerix
+from fipy.tools import kernel
 
 def _OperatorVariableClass(baseClass=object):
     class _OperatorVariable(baseClass):
@@ -68,21 +69,38 @@ def _OperatorVariableClass(baseClass=object):
             raise TypeError, "The value of an `_OperatorVariable` cannot be assigned"
 
         def _calcValue(self):
-            if not self.canInline:
+            if not self.canInline or kernel.backend is None:
                 return self._calcValue_()
             else:
-                from fipy.tools import inline
-                if inline.doInline:
-                    return self._execInline(comment=self.comment)
-                else:
-                    return self._calcValue_()
+                return kernel.backend._evaluate(self)
+
+        def _canFuse(self):
+            """Whether `self` can be evaluated as part of an enclosing kernel
+            """
+            return (self.canInline
+                    and not self._isCached()
+                    and len(self.constraints) == 0)
 
         def _calcValue_(self):
             pass
 
+        def _applyOp(self, *values):
+            """Apply `op` to `values`
+
+            If buffers are reused and `op` is composed of ufuncs, the
+            result is written into the array that held the previous value.
+            """
+            if self._reuseBuffers and self._bufferSignature(values) is not None:
+                symbol = kernel._symbolFor(self)
+                if symbol is not None and symbol.func is not None:
+                    return self._calcValueInto(lambda out: symbol._call(values, out=out),
+                                               *values)
+
+            return self.op(*values)
+
         def _isCached(self):
             return (Variable._isCached(self)
-                    or (len(self.subscribedVariables) > 1 and not self._cacheNever))
+                    or (self._hasMultipleSubscribers() and not self._cacheNever))
 
         def _getCstring(self, argDict={}, id="", freshen=False):
             if self.canInline: # and not self._isCached():
@@ -90,7 +108,7 @@ def _OperatorVariableClass(baseClass=object):
             else:
                 s = baseClass._getCstring(self, argDict=argDict, id=id)
             if freshen:
-                self._markFresh()
+                self._markCalculated()
 
             return s
 
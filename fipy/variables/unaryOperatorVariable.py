@@ -34,6 +34,8 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+from fipy.tools.dimensions import physicalField
+
 def _UnaryOperatorVariable(operatorClass=None):
     """
     Test BinOp pickling
@@ -64,14 +66,17 @@ def _UnaryOperatorVariable(operatorClass=None):
 
     class unOp(operatorClass):
         def _calcValue_(self):
-            return self.op(self.var[0].value)
+            return self._applyOp(self.var[0].value)
 
         @property
         def unit(self):
             assert(hasattr(self, "_unit") == True)
             if self._unit is None:
+                one = self.var[0]._unitAsOne
+                if not isinstance(one, physicalField.PhysicalField):
+                    return physicalField._unity
                 try:
-                    return self._extractUnit(self.op(self.var[0]._unitAsOne))
+                    return self._extractUnit(self.op(one))
                 except:
                     return self._extractUnit(self._calcValue())
             else:
@@ -34,7 +34,11 @@
 
 __docformat__ = 'restructuredtext'
 
+import itertools
+import numbers
 import os
+import types
+import weakref
 
 from fipy.tools.dimensions import physicalField
 from fipy.tools import numerix
@@ -43,6 +47,9 @@ from fipy.tools import inline
 
 __all__ = ["Variable"]
 
+## The types of value that `Variable._makeValue()` stores as they are
+_arrayTypes = (type(None), type(numerix.array(1)), type(numerix.MA.array(1)))
+
 class Variable(object):
     """
     Lazily evaluated quantity with units.
@@ -75,6 +82,25 @@ class Variable(object):
 
     _cacheNever = False
 
+    _reuseBuffers = (os.getenv("FIPY_REUSE_BUFFERS") is not None) or False
+    if parser.parse("--no-reuse-buffers", action="store_true"):
+        _reuseBuffers = False
+    if parser.parse("--reuse-buffers", action="store_true"):
+        _reuseBuffers = True
+
+    _internOperators = (os.getenv("FIPY_INTERN") is not None) or False
+    if parser.parse("--no-intern", action="store_true"):
+        _internOperators = False
+    if parser.parse("--intern", action="store_true"):
+        _internOperators = True
+
+    ## Operator `Variable` objects, keyed by their operation and inputs, so
+    ## that identical expressions share one node (see `_intern()`)
+    _internTable = weakref.WeakValueDictionary()
+
+    ## The `VariableProfiler` recording evaluations, if any
+    _profiler = None
+
     def __new__(cls, *args, **kwds):
         return object.__new__(cls)
 
@@ -242,6 +268,10 @@ class Variable(object):
             >>> Variable(value="1 m").unit
             <PhysicalUnit m>
         """
+        if len(self.requiredVariables) == 0 and self._value is not None:
+            # no need to apply constraints to find the unit of a
+            # `Variable` that depends on nothing else
+            return self._extractUnit(self._value)
         return self._extractUnit(self.value)
 
     def _setUnit(self, unit):
@@ -463,18 +493,22 @@ class Variable(object):
     def __setitem__(self, index, value):
         if self._value is None:
             self._getValue()
+        self._makeWritable(whole=(index is Ellipsis
+                                  or (isinstance(index, slice) and index == slice(None))))
         self._value[index] = value
         self._markFresh()
 
     def itemset(self, value):
         if self._value is None:
             self._getValue()
+        self._makeWritable(whole=(numerix.getShape(self._value) == ()))
         self._value.itemset(value)
         self._markFresh()
 
     def put(self, indices, value):
         if self._value is None:
             self._getValue()
+        self._makeWritable()
         numerix.put(self._value, indices, value)
         self._markFresh()
 
@@ -508,31 +542,86 @@ class Variable(object):
 
         """
 
-        if self.stale or not self._isCached() or self._value is None:
-            value = self._calcValue()
+        stale = self.stale
+        if stale or not self._isCached() or self._value is None:
+            if self._profiler is None:
+                value = self._calcValue()
+            else:
+                value = self._profiler._calcValue(self)
             if self._isCached():
                 self._setValueInternal(value=value)
             else:
                 self._setValueInternal(value=None)
-            self._markFresh()
+            self._markCalculated(changed=stale)
         else:
             value = self._value
+            if self._profiler is not None:
+                self._profiler._hit(self)
 
         if len(self.constraints) > 0:
-            value = value.copy()
-            for constraint in self.constraints:
-                if constraint.where is None:
-                    value[:] = constraint.value
-                else:
-                    mask = constraint.where
-                    if not hasattr(mask, 'dtype') or mask.dtype != bool:
-                        mask = numerix.array(mask, dtype=numerix.NUMERIX.bool)
+            value = self._constrainValue(value)
+
+        return value
+
+    def _constrainValue(self, value):
+        """Return a copy of `value` with `constraints` imposed on it.
 
-                    if 0 not in value.shape:
-                        try:
-                            value[..., mask] = constraint.value
-                        except:
-                            value[..., mask] = numerix.array(constraint.value)[..., mask]
+        A cached `Variable` keeps the result until its own value, or the
+        value or mask of one of its constraints, changes.
+
+            >>> from fipy.boundaryConditions.constraint import Constraint
+            >>> v = Variable(value=(0, 1, 2, 3))
+            >>> mask = Variable(value=(True, False, False, False))
+            >>> c = Constraint(value=Variable(value=5), where=mask)
+            >>> v.constrain(c)
+            >>> v.value is v.value
+            True
+            >>> print v
+            [5 1 2 3]
+            >>> c.value.value = 7
+            >>> print v
+            [7 1 2 3]
+            >>> mask[3] = True
+            >>> print v
+            [7 1 2 7]
+            >>> v[1] = 9
+            >>> print v
+            [7 9 2 7]
+
+        Constraints that may change without notice are imposed afresh on
+        every access
+
+            >>> bare = numerix.array((False, False, True, False))
+            >>> v.constrain(0, where=bare)
+            >>> print v
+            [7 9 0 7]
+            >>> bare[1] = True
+            >>> print v
+            [7 0 0 7]
+        """
+        key = None
+        if self._isCached():
+            key = [self._version]
+            for constraint in self.constraints:
+                version = constraint._getVersion()
+                if version is None:
+                    key = None
+                    break
+                key.append((constraint, version))
+
+        if key is not None and key == getattr(self, "_constrainedKey", None):
+            return self._constrainedValue
+
+        value = value.copy()
+        for constraint in self.constraints:
+            constraint._apply(value)
+
+        if key is not None:
+            self._constrainedKey = key
+            self._constrainedValue = value
+        else:
+            self._constrainedKey = None
+            self._constrainedValue = None
 
         return value
 
@@ -671,7 +760,7 @@ class Variable(object):
             elif array is not None:
                 array[:] = value
                 value = array
-            elif type(value) not in (type(None), type(numerix.array(1)), type(numerix.MA.array(1))):
+            elif type(value) not in _arrayTypes:
                 value = numerix.array(value)
 ##                 # numerix does strange things with really large integers.
 ##                 # Even though Python knows how to do arithmetic with them,
@@ -727,6 +816,7 @@ class Variable(object):
 
         value = self._makeValue(value=tmp, unit=unit, array=None)
 
+        self._makeWritable(whole=(where is None))
         if numerix.getShape(self._value) == ():
             self._value.itemset(value)
         else:
@@ -734,6 +824,43 @@ class Variable(object):
 
         self._markFresh()
 
+    def _makeWritable(self, whole=False):
+        """Give `self` an array of its own to modify, if its value is
+        held in a read-only array (e.g., one shared with the old value of a
+        `CellVariable`).
+
+        A spare array of the right shape and type, left in
+        `self._spareArray`, is used in preference to a new one.
+
+            >>> a = Variable(value=(1, 2, 3))
+            >>> shared = a._value.view()
+            >>> shared.flags.writeable = False
+            >>> a._value = shared
+            >>> a[1] = 5
+            >>> print a, shared
+            [1 5 3] [1 2 3]
+
+        :Parameters:
+          - `whole`: whether the entire value is about to be overwritten, so
+            that the current contents need not be copied
+        """
+        array = getattr(self, "_value", None)
+        if (not isinstance(array, numerix.NUMERIX.ndarray)
+            or array.flags.writeable):
+            return
+
+        spare = getattr(self, "_spareArray", None)
+        self._spareArray = None
+        if (spare is None
+            or spare.shape != array.shape
+            or spare.dtype != array.dtype
+            or numerix.NUMERIX.may_share_memory(spare, array)):
+            spare = array.copy()
+        elif not whole:
+            spare[...] = array
+
+        self._value = spare
+
     def _setNumericValue(self, value):
         if isinstance(self._value, physicalField.PhysicalField):
             self._value.value = value
@@ -806,6 +933,82 @@ class Variable(object):
     def _calcValue(self):
         return self._value
 
+    @staticmethod
+    def _bufferSignature(inputs):
+        """The types and shapes that determine the result of a calculation,
+        or `None` if any of `inputs` is not a plain array or number
+        """
+        signature = []
+        for value in inputs:
+            if type(value) is type(numerix.array(1)):
+                signature.append((value.dtype, value.shape))
+            elif type(value) in (type(1), type(1.), type(True)):
+                signature.append(type(value))
+            else:
+                return None
+        return tuple(signature)
+
+    def _calcValueInto(self, calc, *inputs):
+        """
+        Call `calc(out)` to recalculate the value of `self`, writing into
+        the array that `self` allocated for its previous value, if
+        the types and shapes of `inputs` are unchanged.
+
+        `calc(None)` must return a newly allocated array.
+
+        The numpy and numexpr kernels evaluate `b` on their own, so choose
+        the default backend
+
+            >>> from fipy.tools import kernel
+            >>> backend, kernel.backend = kernel.backend, None
+            >>> reuseBuffers, Variable._reuseBuffers = Variable._reuseBuffers, True
+            >>> a = Variable(value=(1., 2., 3.))
+            >>> b = a * 2
+            >>> b.cacheMe()
+            >>> first = b.value
+            >>> a.value = (4., 5., 6.)
+            >>> print b.value is first, b
+            True [  8.  10.  12.]
+
+        A change of shape or type falls back to a new array
+
+            >>> a._setValueInternal(value=(1, 2))
+            >>> a._markFresh()
+            >>> print b.value is first, b
+            False [2 4]
+
+        Only cached values keep their buffer
+
+            >>> b.dontCacheMe()
+            >>> print b.value is b.value
+            False
+            >>> Variable._reuseBuffers = reuseBuffers
+            >>> kernel.backend = backend
+
+        :Parameters:
+          - `calc`: function taking an `out` array or `None`
+          - `inputs`: values whose types and shapes determine the
+            type and shape of the result
+        """
+        if not (self._reuseBuffers and self._isCached()):
+            self._buffer = None
+            return calc(None)
+
+        signature = self._bufferSignature(inputs)
+        if (signature is not None
+            and getattr(self, "_buffer", None) is not None
+            and signature == self._bufferKey):
+            return calc(self._buffer)
+
+        value = calc(None)
+        if signature is not None and type(value) is type(numerix.array(1)):
+            self._buffer = value
+            self._bufferKey = signature
+        else:
+            self._buffer = None
+
+        return value
+
     def _calcValueNoInline(self):
         raise NotImplementedError
 
@@ -813,35 +1016,129 @@ class Variable(object):
         raise NotImplementedError
 
     def _getSubscribedVariables(self):
-        self._subscribedVariables = [sub for sub in self._subscribedVariables if sub() is not None]
-
         return self._subscribedVariables
 
     def _setSubscribedVariables(self, sVars):
         self._subscribedVariables = sVars
+        self._pruneSubscribersAt = max(8, 2 * len(sVars))
 
     subscribedVariables = property(_getSubscribedVariables,
                                    _setSubscribedVariables)
 
-    def __markStale(self):
-        for subscriber in self.subscribedVariables:
-            if subscriber() is not None:
-                ## Even though getSubscribedVariables() strips out dead
-                ## references, subscriber() might still be dead due to the
-                ## vagaries of garbage collection and the possibility that
-                ## later subscribedVariables were removed, changing the
-                ## dependencies of this subscriber.
-                ## See <https://github.com/usnistgov/fipy/issues/103> for more explanation.
-                subscriber()._markStale()
+    def _pruneSubscribedVariables(self):
+        """Strip dead references from `subscribedVariables`
+
+        Called whenever the list has doubled in length since it was last
+        pruned, so that the cost of pruning is amortized over the
+        subscriptions.
+
+            >>> a = Variable(1.)
+            >>> for i in range(100):
+            ...     b = a * i
+            >>> len(a.subscribedVariables) < 10
+            True
+            >>> len([sub for sub in a.subscribedVariables if sub() is not None])
+            1
+        """
+        self._subscribedVariables = [sub for sub in self._subscribedVariables if sub() is not None]
+        self._pruneSubscribersAt = max(8, 2 * len(self._subscribedVariables))
+
+    def _hasMultipleSubscribers(self):
+        live = 0
+        for sub in self._subscribedVariables:
+            ## Dead references are only pruned periodically, and
+            ## sub() might die at any time due to the vagaries of garbage
+            ## collection and the possibility that the dependencies of this
+            ## subscriber have changed.
+            ## See <https://github.com/usnistgov/fipy/issues/103> for more explanation.
+            if sub() is not None:
+                live += 1
+                if live > 1:
+                    return True
+        return False
+
+    ## Staleness is pulled, not pushed. Every change to the value of a
+    ## `Variable` draws a new `_version` from `_versions`. A `Variable`
+    ## remembers the versions of its `requiredVariables` when it was last
+    ## calculated and is stale if any of them has moved on (or is stale
+    ## itself). Writes are O(1); they only advance `_epoch`, which
+    ## invalidates the memo of the last epoch at which each `Variable` was
+    ## found to be fresh.
+
+    _versions = itertools.count(1)
+    _epoch = 0
+
+    _stale = True
+    _version = 0
+    _requiredVersions = ()
+    _freshAt = -1
+
+    def _getStale(self):
+        """
+        Whether the value of `self` needs to be recalculated
+
+            >>> a = Variable(value=3)
+            >>> b = a * 4
+            >>> c = b + 1
+            >>> print c
+            13
+            >>> c.stale
+            False
+            >>> a.value = 5
+            >>> c.stale
+            True
+            >>> print c
+            21
+
+        Recalculating an intermediate `Variable` leaves its subscribers stale
+
+            >>> a.value = 6
+            >>> print b
+            24
+            >>> b.stale, c.stale
+            (False, True)
+            >>> print c
+            25
+        """
+        if self._stale:
+            return True
+        elif self._freshAt == Variable._epoch:
+            return False
+
+        for var, version in zip(self.requiredVariables, self._requiredVersions):
+            if var.stale or var._version != version:
+                self._stale = True
+                return True
+
+        self._freshAt = Variable._epoch
+        return False
+
+    def _setStale(self, stale):
+        self._stale = bool(stale)
+        if stale:
+            Variable._epoch += 1
+
+    stale = property(_getStale, _setStale)
+
+    def _markCalculated(self, changed=True):
+        """Record that `self` is consistent with its `requiredVariables`
+
+        :Parameters:
+          - `changed`: whether the value of `self` may differ from before,
+            so that its subscribers must be recalculated
+        """
+        self._stale = False
+        self._requiredVersions = [var._version for var in self.requiredVariables]
+        if changed:
+            self._version = self._versions.next()
+        self._freshAt = Variable._epoch
 
     def _markFresh(self):
-        self.stale = 0
-        self.__markStale()
+        self._markCalculated()
+        Variable._epoch += 1
 
     def _markStale(self):
-        if not self.stale:
-            self.stale = 1
-            self.__markStale()
+        self.stale = True
 
     def _requires(self, var):
         if isinstance(var, Variable):
@@ -860,7 +1157,9 @@ class Variable(object):
         # due to circular references between the subscriber
         # and the subscribee
         import weakref
-        self.subscribedVariables.append(weakref.ref(var))
+        self._subscribedVariables.append(weakref.ref(var))
+        if len(self._subscribedVariables) > self._pruneSubscribersAt:
+            self._pruneSubscribedVariables()
 
     @property
     def _variableClass(self):
@@ -999,6 +1298,90 @@ class Variable(object):
             # If self and other have un-broadcastable shapes, we don't know how to combine them.
             return None
 
+    def _intern(self, build, *parts):
+        """
+        Return the operator `Variable` previously built from the same
+        `parts` (the operation and the identities of its inputs), if it is
+        still alive, or else the result of `build()`.
+
+        Sharing is off by default, so each expression is its own node and
+        naming, constraining or caching one of them leaves the others alone
+
+            >>> internOperators, Variable._internOperators = Variable._internOperators, False
+            >>> a = Variable(value=(3, 5))
+            >>> b = Variable(value=(4, 6))
+            >>> c1, c2 = a + b, a + b
+            >>> c1 is c2
+            False
+            >>> c1.name = "c1"
+            >>> c1.constrain(0)
+            >>> c1.cacheMe()
+            >>> print c2.name == "c1", len(c2.constraints), c2._cached
+            False 0 False
+            >>> print c1, c2
+            [0 0] [ 7 11]
+
+        With :option:`--intern`, identical subexpressions share a single
+        node, which is only calculated once when its inputs change
+
+            >>> Variable._internOperators = True
+            >>> a = Variable(value=3)
+            >>> b = Variable(value=4)
+            >>> (a + b) is (a + b)
+            True
+            >>> (1 - a) is (1 - a)
+            True
+            >>> (a + b) is (b + a)
+            False
+            >>> (a * 2) is (a * 2.)
+            False
+            >>> -abs(a) is -abs(a)
+            True
+            >>> a[...,numerix.newaxis] is a[...,numerix.newaxis]
+            True
+
+        Arrays can change without notice, so expressions involving them are
+        never shared
+
+            >>> (a + numerix.array(1)) is (a + numerix.array(1))
+            False
+
+        nor are nodes that have been given a name of their own
+
+            >>> c = a + b
+            >>> c.name = "c"
+            >>> (a + b) is c
+            False
+
+        but every handle on a shared node sees what is done to it
+
+            >>> d1, d2 = a - b, a - b
+            >>> d1.cacheMe()
+            >>> d2._cached
+            True
+            >>> Variable._internOperators = internOperators
+        """
+        if not self._internOperators:
+            return build()
+
+        try:
+            key = _internKey(parts)
+        except (TypeError, ValueError):
+            return build()
+
+        var = self._internTable.get(key)
+        if (var is None
+            or len(var._name) > 0
+            or len(getattr(var, "_constraints", ())) > 0):
+            var = build()
+            if var is not NotImplemented:
+                # `key` holds only the identities of `Variable` inputs, which
+                # must not be reused while `var` is in the table
+                var._internedFrom = parts
+                self._internTable[key] = var
+
+        return var
+
     def _OperatorVariableClass(self, baseClass=None):
         from fipy.variables import operatorVariable
 
@@ -1013,6 +1396,14 @@ class Variable(object):
             <PhysicalUnit m>
 
         """
+        return self._intern(lambda: self._buildUnaryOperatorVariable(op=op,
+                                                                     operatorClass=operatorClass,
+                                                                     opShape=opShape,
+                                                                     canInline=canInline,
+                                                                     unit=unit),
+                            "unary", op, self, operatorClass, opShape, canInline, unit)
+
+    def _buildUnaryOperatorVariable(self, op, operatorClass, opShape, canInline, unit):
         operatorClass = operatorClass or self._OperatorVariableClass()
         from fipy.variables import unaryOperatorVariable
         unOp = unaryOperatorVariable._UnaryOperatorVariable(operatorClass)
@@ -1057,6 +1448,14 @@ class Variable(object):
           - `operatorClass`: the `Variable` class that the binary operator should inherit from
           - `opShape`: the shape that should result from the operation
         """
+        return self._intern(lambda: self._buildBinaryOperatorVariable(op=op, other=other,
+                                                                      operatorClass=operatorClass,
+                                                                      opShape=opShape,
+                                                                      canInline=canInline,
+                                                                      unit=unit),
+                            "binary", op, self, other, operatorClass, opShape, canInline, unit)
+
+    def _buildBinaryOperatorVariable(self, op, other, operatorClass, opShape, canInline, unit):
         if not isinstance(other, Variable):
             from fipy.variables.constant import _Constant
             other = _Constant(value=other)
@@ -1424,11 +1823,12 @@ class Variable(object):
             IndexError: 0-d arrays can't be indexed
 
         """
-        return self._UnaryOperatorVariable(lambda a: a[index],
-                                           operatorClass=self._getitemClass(index=index),
-                                           opShape=numerix._indexShape(index=index, arrayShape=self.shape),
-                                           unit=self.unit,
-                                           canInline=False)
+        return self._intern(lambda: self._buildUnaryOperatorVariable(op=lambda a: a[index],
+                                                                     operatorClass=self._getitemClass(index=index),
+                                                                     opShape=numerix._indexShape(index=index, arrayShape=self.shape),
+                                                                     unit=self.unit,
+                                                                     canInline=False),
+                            "getitem", self, index)
 
     def take(self, ids, axis=0):
         return numerix.take(self.value, ids, axis)
@@ -1656,6 +2056,33 @@ class Variable(object):
         pass
 
 
+_immutableTypes = (numbers.Number, basestring, type, types.BuiltinFunctionType,
+                   types.CodeType, type(numerix.NUMERIX.add))
+
+def _internKey(obj):
+    """Hashable stand-in for `obj` in the key of an interned operator
+    `Variable`. Raises `TypeError` if `obj` may change without notice.
+    """
+    if isinstance(obj, Variable):
+        return (Variable, id(obj))
+    elif isinstance(obj, tuple):
+        return (tuple,) + tuple(_internKey(item) for item in obj)
+    elif isinstance(obj, slice):
+        return (slice, _internKey(obj.start), _internKey(obj.stop), _internKey(obj.step))
+    elif isinstance(obj, types.FunctionType):
+        # lambdas are created anew for every operation, so compare their
+        # code and captured values rather than their identities
+        return (types.FunctionType, obj.__code__,
+                _internKey(obj.__defaults__),
+                _internKey(tuple(cell.cell_contents for cell in obj.__closure__ or ())))
+    elif obj is None or obj is Ellipsis or isinstance(obj, _immutableTypes):
+        return (type(obj), obj)
+    else:
+        raise TypeError, "%s cannot be interned" % type(obj).__name__
+
+from fipy.tools.performance import variableProfiler
+variableProfiler._startRequested()
+
 def _test():
     import fipy.tests.doctestPlus
     return fipy.tests.doctestPlus.testmod()